@@ -1,6 +1,7 @@
 """AIエージェント"""
 from app.agents.budget_agent import BudgetAgent
 from app.agents.calendar_agent import CalendarAgent
+from app.agents.event_agent import EventAgent
 from app.agents.priority_agent import PriorityAgent
 from app.agents.root_agent import RootAgent
 from app.agents.scout_agent import ScoutAgent
@@ -10,6 +11,7 @@ __all__ = [
     "ScoutAgent",
     "PriorityAgent",
     "CalendarAgent",
+    "EventAgent",
     "TripAgent",
     "BudgetAgent",
     "RootAgent",
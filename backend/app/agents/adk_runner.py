@@ -2,8 +2,10 @@
 
 FastAPI エンドポイントから ADK エージェントをプログラム的に実行するための
 Runner と SessionService のセットアップを提供します。
+Runner は初回の実行時に生成し、以降はアプリケーションライフサイクルで再利用します。
 """
 import uuid
+from typing import Optional
 
 import structlog
 from google.adk.runners import Runner
@@ -15,15 +17,22 @@ from app.config import settings
 
 logger = structlog.get_logger(__name__)
 
-# セッションサービス（インメモリ）
-session_service = InMemorySessionService()
+_runner: Optional[Runner] = None
 
-# Runner（アプリケーションライフサイクルで再利用）
-runner = Runner(
-    app_name="oshi-agent",
-    agent=scout_workflow,
-    session_service=session_service,
-)
+
+def get_runner() -> Runner:
+    """Runner を取得（シングルトン）"""
+    global _runner
+
+    if _runner is None:
+        _runner = Runner(
+            app_name="oshi-agent",
+            agent=scout_workflow,
+            # セッションサービス（インメモリ）
+            session_service=InMemorySessionService(),
+        )
+
+    return _runner
 
 
 async def run_scout_workflow_adk(
@@ -41,8 +50,9 @@ async def run_scout_workflow_adk(
     """
     try:
         session_id = f"scout_{user_id}_{uuid.uuid4().hex[:8]}"
+        runner = get_runner()
 
-        session = await session_service.create_session(
+        session = await runner.session_service.create_session(
             app_name="oshi-agent",
             user_id=user_id,
             session_id=session_id,
@@ -69,6 +69,7 @@ def search_oshi_info(oshi_name: str, additional_keywords: str = "") -> dict:
 def save_info(oshi_id: str, title: str, url: str, snippet: str = "") -> dict:
     """検索で見つかった情報をデータベースに保存します。
     既に保存済みのURLは重複チェックによりスキップされます。
+    トラッキングパラメータやwww・AMP版などの表記ゆれがあるURLも同じ情報として扱われます。
 
     Args:
         oshi_id: 推しのID
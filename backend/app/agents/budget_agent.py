@@ -1,5 +1,7 @@
 """Budget Agent - 予算管理エージェント"""
-from collections import defaultdict
+import asyncio
+import hashlib
+import json
 from typing import Any
 
 import structlog
@@ -10,6 +12,30 @@ from app.repositories.expense_repository import ExpenseRepository
 
 logger = structlog.get_logger(__name__)
 
+# アドバイス生成のプロンプトに渡す支出の最大件数
+ADVICE_EXPENSE_LIMIT = 20
+
+
+def advice_digest(
+    expenses_summary: list[dict[str, Any]],
+    by_category: dict[str, int],
+    expenses_count: int,
+) -> str:
+    """アドバイスの入力（支出サマリーと集計値）のダイジェスト
+
+    同じダイジェストなら同じプロンプトになるため、キャッシュ済みのアドバイスを再利用できる。
+    """
+    payload = json.dumps(
+        {
+            "expenses": expenses_summary,
+            "by_category": by_category,
+            "count": expenses_count,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
 
 class BudgetAgent:
     """予算管理を行うエージェント"""
@@ -43,10 +69,43 @@ class BudgetAgent:
                 month=month,
             )
 
-            # 月次支出データを取得
-            expenses = self.expense_repo.get_monthly(user_id, year, month)
+            # カテゴリ別の件数・合計は月次ロールアップ（1ドキュメント）から読み、
+            # プロンプト用の支出だけを件数を絞って取得する（並行実行）
+            rollup, expenses = await asyncio.gather(
+                asyncio.to_thread(
+                    self.expense_repo.get_monthly_rollup, user_id, year, month
+                ),
+                asyncio.to_thread(
+                    self.expense_repo.get_monthly,
+                    user_id,
+                    year,
+                    month,
+                    limit=ADVICE_EXPENSE_LIMIT,
+                ),
+            )
+
+            if rollup is not None:
+                by_category = {
+                    category.value: rollup.by_category.get(category.value, 0)
+                    for category in ExpenseCategory
+                    if rollup.count_by_category.get(category.value, 0) > 0
+                }
+                expenses_count = rollup.count
+            elif expenses:
+                # ロールアップ未作成（バックフィル前）の月は集計クエリで代替
+                logger.warning(
+                    "budget_report_rollup_missing",
+                    user_id=user_id,
+                    year=year,
+                    month=month,
+                )
+                by_category, expenses_count = await self._aggregate_by_category(
+                    user_id, year, month
+                )
+            else:
+                by_category, expenses_count = {}, 0
 
-            if not expenses:
+            if expenses_count == 0:
                 logger.info(
                     "budget_report_no_data",
                     user_id=user_id,
@@ -62,11 +121,6 @@ class BudgetAgent:
                     "advice": "この月の支出データがありません。",
                 }
 
-            # カテゴリ別集計
-            by_category = defaultdict(int)
-            for expense in expenses:
-                by_category[expense.category.value] += expense.amount
-
             total = sum(by_category.values())
 
             # Geminiでアドバイス生成
@@ -77,20 +131,34 @@ class BudgetAgent:
                     "description": expense.description,
                     "date": expense.expense_date.strftime("%Y-%m-%d"),
                 }
-                for expense in expenses[:20]  # 最大20件
+                for expense in expenses
             ]
 
-            advice = self.gemini_client.generate_budget_advice(
-                expenses=expenses_summary,
-                budget=None,  # 予算機能は将来拡張
-            )
+            # 支出が変わっていなければキャッシュ済みのアドバイスを返す
+            digest = advice_digest(expenses_summary, by_category, expenses_count)
+            if rollup is not None and rollup.advice and rollup.advice_digest == digest:
+                logger.info(
+                    "budget_advice_cache_hit", user_id=user_id, year=year, month=month
+                )
+                advice = rollup.advice
+            else:
+                logger.info(
+                    "budget_advice_cache_miss", user_id=user_id, year=year, month=month
+                )
+                advice = await asyncio.to_thread(
+                    self.gemini_client.generate_budget_advice,
+                    expenses=expenses_summary,
+                    budget=None,  # 予算機能は将来拡張
+                )
+                if rollup is not None:
+                    await self._save_advice(user_id, year, month, advice, digest)
 
             report = {
                 "year": year,
                 "month": month,
                 "total": total,
-                "by_category": dict(by_category),
-                "expenses_count": len(expenses),
+                "by_category": by_category,
+                "expenses_count": expenses_count,
                 "advice": advice,
             }
 
@@ -100,7 +168,7 @@ class BudgetAgent:
                 year=year,
                 month=month,
                 total=total,
-                expenses_count=len(expenses),
+                expenses_count=expenses_count,
             )
             return report
 
@@ -113,3 +181,44 @@ class BudgetAgent:
                 error=str(e),
             )
             raise
+
+    async def _aggregate_by_category(
+        self, user_id: str, year: int, month: int
+    ) -> tuple[dict[str, int], int]:
+        """集計クエリでカテゴリ別合計と件数を求める"""
+        categories = list(ExpenseCategory)
+        aggregates = await asyncio.gather(
+            *(
+                asyncio.to_thread(
+                    self.expense_repo.aggregate_monthly,
+                    user_id,
+                    year,
+                    month,
+                    category,
+                )
+                for category in categories
+            )
+        )
+        by_category = {
+            category.value: aggregate.total
+            for category, aggregate in zip(categories, aggregates)
+            if aggregate.count > 0
+        }
+        return by_category, sum(aggregate.count for aggregate in aggregates)
+
+    async def _save_advice(
+        self, user_id: str, year: int, month: int, advice: str, digest: str
+    ) -> None:
+        """アドバイスをキャッシュ（失敗してもレポート生成は継続）"""
+        try:
+            await asyncio.to_thread(
+                self.expense_repo.save_advice, user_id, year, month, advice, digest
+            )
+        except Exception as e:
+            logger.warning(
+                "budget_advice_cache_save_failed",
+                user_id=user_id,
+                year=year,
+                month=month,
+                error=str(e),
+            )
@@ -1,7 +1,13 @@
 """Calendar Agent - カレンダー登録エージェント"""
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
+
 import structlog
 
 from app.external.google_calendar import GoogleCalendarClient
+from app.models.event import EventModel
+from app.models.workflow_results import CalendarRegistrationResult
 from app.repositories.event_repository import EventRepository
 
 logger = structlog.get_logger(__name__)
@@ -75,3 +81,144 @@ class CalendarAgent:
                 error=str(e),
             )
             raise
+
+    async def register_events(
+        self, event_ids: list[str], oauth_token: str
+    ) -> list[CalendarRegistrationResult]:
+        """複数のイベントをまとめてGoogle Calendarに登録
+
+        イベントは1回のバッチ読み取りで取得し、未登録のものだけを
+        バッチHTTPリクエストで登録する。失敗したイベントは未登録のまま残る。
+
+        Args:
+            event_ids: イベントIDのリスト
+            oauth_token: OAuth2アクセストークン
+
+        Returns:
+            入力順の登録結果
+        """
+        try:
+            logger.info("calendar_register_batch_start", count=len(event_ids))
+
+            events = await asyncio.to_thread(self.event_repo.get_many, event_ids)
+            unique_events = [
+                events[event_id]
+                for event_id in dict.fromkeys(event_ids)
+                if event_id in events
+            ]
+            created = await self._register_unregistered(unique_events, oauth_token)
+
+            results = [
+                CalendarRegistrationResult(
+                    event_id=event_id, error=f"Event not found: {event_id}"
+                )
+                if event_id not in events
+                else self._result(events[event_id], created)
+                for event_id in event_ids
+            ]
+
+            logger.info(
+                "calendar_register_batch_success",
+                requested=len(event_ids),
+                registered=sum(1 for event_id, _ in created.values() if event_id),
+                failed=sum(1 for _, error in created.values() if error),
+            )
+            return results
+
+        except Exception as e:
+            logger.error("calendar_register_batch_failed", error=str(e))
+            raise
+
+    async def register_upcoming_events(
+        self, oshi_id: str, oauth_token: str
+    ) -> list[CalendarRegistrationResult]:
+        """推しの今後のイベントのうち未登録のものをまとめてGoogle Calendarに登録
+
+        Args:
+            oshi_id: 推しID
+            oauth_token: OAuth2アクセストークン
+
+        Returns:
+            開始日時順の今後のイベントの登録結果（登録済みのものを含む）
+        """
+        try:
+            logger.info("calendar_register_upcoming_start", oshi_id=oshi_id)
+
+            events = await asyncio.to_thread(self.event_repo.get_all_by_oshi, oshi_id)
+            upcoming = [event for event in events if self._is_upcoming(event)]
+            created = await self._register_unregistered(upcoming, oauth_token)
+            results = [self._result(event, created) for event in upcoming]
+
+            logger.info(
+                "calendar_register_upcoming_success",
+                oshi_id=oshi_id,
+                upcoming=len(upcoming),
+                registered=sum(1 for event_id, _ in created.values() if event_id),
+                failed=sum(1 for _, error in created.values() if error),
+            )
+            return results
+
+        except Exception as e:
+            logger.error(
+                "calendar_register_upcoming_failed", oshi_id=oshi_id, error=str(e)
+            )
+            raise
+
+    async def _register_unregistered(
+        self, events: list[EventModel], oauth_token: str
+    ) -> dict[str, tuple[Optional[str], Optional[str]]]:
+        """未登録のイベントをバッチHTTPリクエストで登録し、IDを1回のバッチ書き込みで保存
+
+        Returns:
+            登録を試みたイベントID → (Google CalendarのイベントID, エラー内容)
+        """
+        targets = [event for event in events if not event.calendar_event_id]
+        if not targets:
+            return {}
+
+        calendar_client = GoogleCalendarClient(oauth_token)
+        bodies = [
+            calendar_client.build_event_body(
+                summary=event.title,
+                start_time=event.start_datetime,
+                end_time=event.end_datetime,
+                location=event.location,
+                description=event.description,
+            )
+            for event in targets
+        ]
+        outcomes = await asyncio.to_thread(calendar_client.create_events, bodies)
+        created = {event.id: outcome for event, outcome in zip(targets, outcomes)}
+
+        calendar_ids = {
+            event_id: calendar_event_id
+            for event_id, (calendar_event_id, _) in created.items()
+            if calendar_event_id
+        }
+        if calendar_ids:
+            await asyncio.to_thread(self.event_repo.update_calendar_ids, calendar_ids)
+        return created
+
+    @staticmethod
+    def _result(
+        event: EventModel, created: dict[str, tuple[Optional[str], Optional[str]]]
+    ) -> CalendarRegistrationResult:
+        """登録結果を組み立てる（今回登録しなかったものは登録済み）"""
+        if event.id not in created:
+            return CalendarRegistrationResult(
+                event_id=event.id,
+                calendar_event_id=event.calendar_event_id,
+                already_registered=True,
+            )
+        calendar_event_id, error = created[event.id]
+        return CalendarRegistrationResult(
+            event_id=event.id, calendar_event_id=calendar_event_id, error=error
+        )
+
+    @staticmethod
+    def _is_upcoming(event: EventModel) -> bool:
+        """開始日時が現在以降のイベントか"""
+        start = event.start_datetime
+        if start.tzinfo is None:
+            return start >= datetime.utcnow()
+        return start >= datetime.now(timezone.utc)
@@ -0,0 +1,217 @@
+"""Event Agent - イベント抽出エージェント"""
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import structlog
+
+from app.external.circuit_breaker import CircuitOpenError
+from app.external.gemini_client import GeminiClient
+from app.models.event import EventCreate, EventModel
+from app.models.info import CollectedInfoModel, Priority
+from app.repositories.event_repository import EventRepository
+from app.repositories.info_repository import InfoRepository
+from app.utils.text_utils import normalize_name
+
+logger = structlog.get_logger(__name__)
+
+# イベント重複判定のキー（正規化したタイトル, 開始日時, 正規化した会場）
+EventKey = tuple[str, datetime, str]
+
+
+class EventAgent:
+    """重要な収集情報からイベントを抽出して登録するエージェント"""
+
+    # イベント抽出の対象にする重要度
+    TARGET_PRIORITIES = frozenset({Priority.URGENT.value, Priority.IMPORTANT.value})
+    # 1回のGemini呼び出しでまとめて抽出する情報数
+    EXTRACTION_BATCH_SIZE = 10
+    # 同時に実行するGemini呼び出しの上限
+    EXTRACTION_CONCURRENCY = 4
+
+    def __init__(
+        self,
+        info_repo: InfoRepository,
+        event_repo: EventRepository,
+        gemini_client: GeminiClient,
+    ):
+        self.info_repo = info_repo
+        self.event_repo = event_repo
+        self.gemini_client = gemini_client
+
+    async def extract_events(
+        self, oshi_id: str, priority_results: dict[str, str]
+    ) -> list[str]:
+        """重要度判定の結果から urgent / important の情報のイベントを登録
+
+        情報は EXTRACTION_BATCH_SIZE 件ずつ1回のプロンプトにまとめて抽出し、
+        推しの既存イベントと (タイトル, 開始日時, 会場) で重複を除いてからバッチ作成する。
+        まとめた抽出がリトライ後も失敗した場合は、そのまとまりだけ1件ずつ抽出し直す
+        （サーキットブレーカーが開いている場合は抽出せず、情報IDをログに残す）。
+
+        Args:
+            oshi_id: 推しID
+            priority_results: {info_id: priority}（Priority Agent の結果）
+
+        Returns:
+            作成したイベントIDのリスト
+        """
+        try:
+            info_ids = [
+                info_id
+                for info_id, priority in priority_results.items()
+                if priority in self.TARGET_PRIORITIES
+            ]
+            if not info_ids:
+                return []
+
+            logger.info(
+                "event_extract_start", oshi_id=oshi_id, info_count=len(info_ids)
+            )
+
+            infos_by_id, existing_events = await asyncio.gather(
+                asyncio.to_thread(self.info_repo.get_many, info_ids),
+                asyncio.to_thread(self.event_repo.get_all_by_oshi, oshi_id),
+            )
+            infos = [
+                infos_by_id[info_id] for info_id in info_ids if info_id in infos_by_id
+            ]
+
+            semaphore = asyncio.Semaphore(self.EXTRACTION_CONCURRENCY)
+            failed_info_ids: list[str] = []
+
+            async def extract_one(item: dict[str, str]) -> Optional[dict[str, Any]]:
+                async with semaphore:
+                    return await asyncio.to_thread(
+                        self.gemini_client.extract_event_info,
+                        item["title"],
+                        item["content"],
+                    )
+
+            async def extract(chunk: list[CollectedInfoModel]) -> dict[str, Any]:
+                items = [
+                    {
+                        "id": info.id,
+                        "title": info.title,
+                        "content": f"{info.snippet or ''} ({info.url})",
+                    }
+                    for info in chunk
+                ]
+                try:
+                    async with semaphore:
+                        return await asyncio.to_thread(
+                            self.gemini_client.extract_events_batch, items
+                        )
+                except CircuitOpenError as e:
+                    failed_info_ids.extend(item["id"] for item in items)
+                    logger.warning(
+                        "event_extract_batch_failed",
+                        oshi_id=oshi_id,
+                        info_ids=[item["id"] for item in items],
+                        fallback=False,
+                        error=str(e),
+                    )
+                    return {}
+                except Exception as e:
+                    logger.warning(
+                        "event_extract_batch_failed",
+                        oshi_id=oshi_id,
+                        info_ids=[item["id"] for item in items],
+                        fallback=True,
+                        error=str(e),
+                    )
+
+                results = await asyncio.gather(*(extract_one(item) for item in items))
+                return {
+                    item["id"]: result
+                    for item, result in zip(items, results)
+                    if result is not None
+                }
+
+            chunks = [
+                infos[start : start + self.EXTRACTION_BATCH_SIZE]
+                for start in range(0, len(infos), self.EXTRACTION_BATCH_SIZE)
+            ]
+            extracted: dict[str, Any] = {}
+            for chunk_result in await asyncio.gather(*(extract(c) for c in chunks)):
+                extracted.update(chunk_result)
+
+            known_keys = {self._event_key(event) for event in existing_events}
+            events_to_create = []
+            for info in infos:
+                event_data = self._to_event_create(
+                    oshi_id, info.id, extracted.get(info.id)
+                )
+                if event_data is None:
+                    continue
+                key = self._event_key(event_data)
+                if key in known_keys:
+                    continue
+                known_keys.add(key)
+                events_to_create.append(event_data)
+
+            created_events = []
+            if events_to_create:
+                created_events = await asyncio.to_thread(
+                    self.event_repo.create_batch, events_to_create
+                )
+
+            logger.info(
+                "event_extract_success",
+                oshi_id=oshi_id,
+                info_count=len(infos),
+                prompt_count=len(chunks),
+                extracted_count=len(extracted),
+                created_count=len(created_events),
+                failed_info_ids=failed_info_ids,
+            )
+            return [event.id for event in created_events]
+
+        except Exception as e:
+            logger.error("event_extract_failed", oshi_id=oshi_id, error=str(e))
+            raise
+
+    @staticmethod
+    def _to_event_create(
+        oshi_id: str, info_id: str, raw: Optional[dict[str, Any]]
+    ) -> Optional[EventCreate]:
+        """抽出結果をイベント作成リクエストに変換（必須項目が欠けていればNone）"""
+        if not raw or not raw.get("title") or not raw.get("start_datetime"):
+            return None
+        try:
+            start_datetime = datetime.fromisoformat(raw["start_datetime"])
+            end_datetime = (
+                datetime.fromisoformat(raw["end_datetime"])
+                if raw.get("end_datetime")
+                else None
+            )
+            return EventCreate(
+                oshi_id=oshi_id,
+                info_id=info_id,
+                title=str(raw["title"])[:200],
+                start_datetime=start_datetime,
+                end_datetime=end_datetime,
+                location=str(raw["location"])[:200] if raw.get("location") else None,
+                description=(
+                    str(raw["description"])[:2000] if raw.get("description") else None
+                ),
+            )
+        except (TypeError, ValueError) as e:
+            logger.warning("event_extract_invalid", info_id=info_id, error=str(e))
+            return None
+
+    @staticmethod
+    def _event_key(event: EventCreate | EventModel) -> EventKey:
+        """重複判定のキー
+
+        Firestore から読んだ日時はUTCのタイムゾーン付きになるため、
+        保存時と同じタイムゾーンなしのUTCに揃えて比較する。
+        """
+        start = event.start_datetime
+        if start.tzinfo is not None:
+            start = start.astimezone(timezone.utc).replace(tzinfo=None)
+        return (
+            normalize_name(event.title),
+            start.replace(second=0, microsecond=0),
+            normalize_name(event.location or ""),
+        )
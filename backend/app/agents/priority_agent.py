@@ -1,8 +1,21 @@
 """Priority Agent - 重要度判定エージェント"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
 import structlog
 
+from app.config import settings
 from app.external.gemini_client import GeminiClient
+from app.models.info import CollectedInfoModel
 from app.repositories.info_repository import InfoRepository
+from app.utils.near_duplicate import (
+    cluster_near_duplicates,
+    jaccard,
+    lsh_band_keys,
+    number_tokens,
+    shingles,
+)
 
 logger = structlog.get_logger(__name__)
 
@@ -10,17 +23,35 @@ logger = structlog.get_logger(__name__)
 class PriorityAgent:
     """情報の重要度を判定するエージェント"""
 
+    # 同一の告知とみなすタイトル+スニペットのJaccard類似度
+    NEAR_DUPLICATE_THRESHOLD = 0.6
+
     def __init__(
         self,
         info_repo: InfoRepository,
         gemini_client: GeminiClient,
+        reuse_max_age_days: Optional[float] = None,
+        clock: Callable[[], datetime] = datetime.utcnow,
     ):
         self.info_repo = info_repo
         self.gemini_client = gemini_client
+        self.reuse_max_age = timedelta(
+            days=(
+                settings.priority_reuse_max_age_days
+                if reuse_max_age_days is None
+                else reuse_max_age_days
+            )
+        )
+        self._clock = clock
 
     async def judge_priority(self, info_ids: list[str]) -> dict[str, str]:
         """情報の重要度を判定
 
+        同じ告知が別URLで複数収集されている場合は近似重複としてまとめ、
+        代表1件の判定結果をクラスタ内の全情報に反映する。最近のスカウトで判定済みの
+        同じ推しの近似重複（数字・日付も一致するもの）があれば、Geminiを呼ばずに
+        その判定結果を引き継ぐ。
+
         Args:
             info_ids: 判定する情報IDのリスト
 
@@ -33,36 +64,64 @@ class PriorityAgent:
                 info_count=len(info_ids),
             )
 
-            results = {}
-
-            for info_id in info_ids:
-                # 情報を取得
-                info = self.info_repo.get_by_id(info_id)
+            # 情報を1回のバッチ読み取りで取得
+            found = self.info_repo.get_many(info_ids)
+            infos = []
+            for info_id in dict.fromkeys(info_ids):
+                info = found.get(info_id)
                 if not info:
                     logger.warning("priority_judge_info_not_found", info_id=info_id)
                     continue
+                infos.append(info)
+
+            # 近似重複をクラスタにまとめ、代表1件だけを判定する
+            clusters = self._cluster_near_duplicates(infos)
+
+            results = {}
+            classified_count = 0
+            for cluster in clusters:
+                representative = cluster[0]
+                band_keys = {
+                    info.id: lsh_band_keys(self._text(info)) for info in cluster
+                }
 
-                # Geminiで重要度判定（snippetがあれば追加コンテキストとして渡す）
-                priority = self.gemini_client.classify_priority(
-                    title=info.title,
-                    url=info.url,
-                    snippet=info.snippet,
+                # 判定済みの近似重複があれば判定結果を引き継ぐ
+                judged = await asyncio.to_thread(
+                    self._find_judged, representative, band_keys[representative.id]
                 )
+                if judged is not None:
+                    priority = judged.priority
+                else:
+                    # Geminiで重要度判定（snippetがあれば追加コンテキストとして渡す）
+                    priority = await asyncio.to_thread(
+                        self.gemini_client.classify_priority,
+                        title=representative.title,
+                        url=representative.url,
+                        snippet=representative.snippet,
+                    )
+                    classified_count += 1
 
-                # Firestoreを更新
-                self.info_repo.update_priority(info_id, priority)
+                # 判定結果とバンドキーをクラスタ全体に反映してFirestoreを更新
+                for info in cluster:
+                    self.info_repo.update_priority(
+                        info.id, priority, near_duplicate_keys=band_keys[info.id]
+                    )
+                    results[info.id] = priority.value
 
-                results[info_id] = priority.value
                 logger.info(
                     "priority_judged",
-                    info_id=info_id,
+                    info_id=representative.id,
                     priority=priority.value,
+                    cluster_size=len(cluster),
+                    reused_from=judged.id if judged else None,
                 )
 
             logger.info(
                 "priority_judge_success",
                 total_count=len(info_ids),
                 judged_count=len(results),
+                cluster_count=len(clusters),
+                classified_count=classified_count,
             )
             return results
 
@@ -73,3 +132,56 @@ class PriorityAgent:
                 error=str(e),
             )
             raise
+
+    @staticmethod
+    def _text(info: CollectedInfoModel) -> str:
+        """近似重複の判定に使うテキスト"""
+        return f"{info.title} {info.snippet or ''}"
+
+    def _find_judged(
+        self, info: CollectedInfoModel, band_keys: list[str]
+    ) -> Optional[CollectedInfoModel]:
+        """同じ推しの最近の判定済みの情報から、最も類似度の高い近似重複を探す（なければNone）
+
+        年や日付だけが違う告知（「ツアー2025」と「ツアー2026」、同じツアーの別日程など）は
+        文字の類似度では区別できないため、数字が一致する候補だけを対象にする。
+        """
+        text = self._text(info)
+        features = shingles(text)
+        numbers = number_tokens(text)
+        best: Optional[CollectedInfoModel] = None
+        best_score = self.NEAR_DUPLICATE_THRESHOLD
+        for candidate in self.info_repo.find_judged_near_duplicates(
+            info.oshi_id, band_keys, self._clock() - self.reuse_max_age
+        ):
+            if candidate.id == info.id:
+                continue
+            candidate_text = self._text(candidate)
+            if number_tokens(candidate_text) != numbers:
+                continue
+            score = jaccard(features, shingles(candidate_text))
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def _cluster_near_duplicates(
+        self, infos: list[CollectedInfoModel]
+    ) -> list[list[CollectedInfoModel]]:
+        """推しごとに近似重複（同じ告知の転載など）をクラスタにまとめる
+
+        各クラスタの先頭が代表で、入力順を保つ。
+        """
+        by_id = {info.id: info for info in infos}
+        items_by_oshi: dict[str, list[tuple[str, str]]] = {}
+        for info in infos:
+            items_by_oshi.setdefault(info.oshi_id, []).append(
+                (info.id, self._text(info))
+            )
+
+        clusters = []
+        for items in items_by_oshi.values():
+            for cluster in cluster_near_duplicates(
+                items, threshold=self.NEAR_DUPLICATE_THRESHOLD
+            ):
+                clusters.append([by_id[info_id] for info_id in cluster])
+        return clusters
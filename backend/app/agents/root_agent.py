@@ -1,24 +1,40 @@
 """Root Agent - オーケストレーター"""
-from typing import Any, Optional
+import asyncio
+from typing import Any, Awaitable, Callable, Optional, TypeVar
 
 import structlog
+from pydantic import BaseModel
 
+from app.agents.event_agent import EventAgent
 from app.agents.priority_agent import PriorityAgent
 from app.agents.scout_agent import ScoutAgent
+from app.agents.scout_lock import ScoutRunLock
+from app.agents.search_plan import (
+    SearchPlan,
+    SharedSearchResults,
+    search_plan_scope,
+)
 from app.external.gemini_client import GeminiClient
+from app.external.rate_limiter import RequestPriority, request_priority
 from app.models.network_node import NetworkNodeCreate, NodeRing, NodeType
+from app.models.oshi import OshiModel
 from app.models.workflow_results import (
     NetworkDiscoverResult,
     NetworkScoutResult,
     ScoutWorkflowResult,
 )
+from app.repositories import identity_map
 from app.repositories.info_repository import InfoRepository
 from app.repositories.network_repository import NetworkRepository
 from app.repositories.oshi_repository import OshiRepository
 from app.utils.enum_utils import enum_to_value
+from app.utils.stage_graph import StageGraph
+from app.utils.text_utils import normalize_name
 
 logger = structlog.get_logger(__name__)
 
+ResultT = TypeVar("ResultT")
+
 
 class RootAgent:
     """全エージェントを統括するオーケストレーター"""
@@ -31,6 +47,8 @@ class RootAgent:
         gemini_client: GeminiClient,
         info_repo: InfoRepository,
         network_repo: Optional[NetworkRepository] = None,
+        event_agent: Optional[EventAgent] = None,
+        scout_lock: Optional[ScoutRunLock] = None,
     ):
         self.oshi_repo = oshi_repo
         self.scout_agent = scout_agent
@@ -38,12 +56,47 @@ class RootAgent:
         self.gemini_client = gemini_client
         self.info_repo = info_repo
         self.network_repo = network_repo
+        self.event_agent = event_agent
+        self.scout_lock = scout_lock
+
+    async def _run_locked(
+        self,
+        oshi_id: str,
+        workflow: str,
+        run: Callable[[str], Awaitable[ResultT]],
+        result_model: Optional[type[BaseModel]] = None,
+    ) -> ResultT:
+        """推しごとのロックを取って実行（ロック未設定なら直接実行）
+
+        同じ推しの同じワークフローが実行中なら、新しく実行せずその結果を返す。
+        """
+        if not self.scout_lock:
+            return await run(oshi_id)
+        return await self.scout_lock.run(
+            oshi_id, workflow, lambda: run(oshi_id), result_model
+        )
+
+    async def _extract_events(
+        self, oshi_id: str, priority_results: dict[str, str]
+    ) -> list[str]:
+        """重要な情報からイベントを抽出（Event Agent 未設定・失敗時は空）
+
+        イベント抽出は付加的な処理のため、失敗してもスカウト結果は返す。
+        """
+        if not self.event_agent or not priority_results:
+            return []
+        try:
+            return await self.event_agent.extract_events(oshi_id, priority_results)
+        except Exception as e:
+            logger.warning("root_extract_events_failed", oshi_id=oshi_id, error=str(e))
+            return []
 
     async def run_scout_workflow(self, oshi_id: str) -> ScoutWorkflowResult:
         """指定された推しのScoutワークフローを実行
 
         1. Scout Agent で情報収集
         2. Priority Agent で重要度判定
+        3. Event Agent で urgent / important の情報からイベントを抽出
 
         Args:
             oshi_id: 推しID
@@ -54,6 +107,12 @@ class RootAgent:
         Raises:
             ValueError: 指定された推しが存在しない場合
         """
+        return await self._run_locked(
+            oshi_id, "scout", self._scout_workflow, ScoutWorkflowResult
+        )
+
+    async def _scout_workflow(self, oshi_id: str) -> ScoutWorkflowResult:
+        """Scoutワークフローの本体（run_scout_workflow を参照）"""
         try:
             logger.info(
                 "root_scout_workflow_start",
@@ -80,10 +139,14 @@ class RootAgent:
                     new_info_ids
                 )
 
+            # 3. Event Agent: イベント抽出
+            new_event_ids = await self._extract_events(oshi_id, priority_results)
+
             logger.info(
                 "root_scout_workflow_success",
                 oshi_id=oshi_id,
                 collected_count=len(new_info_ids),
+                event_count=len(new_event_ids),
             )
 
             return ScoutWorkflowResult(
@@ -92,6 +155,7 @@ class RootAgent:
                 collected_count=len(new_info_ids),
                 new_info_ids=new_info_ids,
                 priority_results=priority_results,
+                new_event_ids=new_event_ids,
             )
 
         except Exception as e:
@@ -108,55 +172,137 @@ class RootAgent:
         推し登録直後に呼ばれ、初回の情報収集とサマリー生成を行う。
         ネットワーク発見も同時に実行する。
 
+        各ステージは依存関係に従って並行実行する:
+
+            discover ──> network_scout ──┬──> priority ──> events
+            direct_scout ────────────────┴──> summary
+
+        直接スカウトはネットワーク発見を待たず、サマリー生成は重要度判定を待たない。
+
         Args:
             oshi_id: 推しID
 
         Returns:
-            Scout結果 + サマリー + ネットワーク情報
+            Scout結果 + サマリー + ネットワーク情報 + ステージ別実行時間
         """
+        return await self._run_locked(
+            oshi_id, "scout_and_summarize", self._scout_and_summarize
+        )
+
+    async def _scout_and_summarize(self, oshi_id: str) -> dict[str, Any]:
+        """Scout + サマリー生成の本体（run_scout_and_summarize を参照）"""
         try:
             logger.info("root_scout_and_summarize_start", oshi_id=oshi_id)
 
-            # 0. ネットワーク自動発見（初回）
-            network_result = None
-            if self.network_repo:
-                existing_nodes = self.network_repo.get_all_by_oshi(oshi_id)
-                if not existing_nodes:
-                    network_result = await self.discover_network(oshi_id)
-
-            # 1. Scoutワークフローを実行（ネットワーク対応版）
-            if self.network_repo:
-                scout_result = await self.run_network_scout(oshi_id)
-            else:
-                scout_result = await self.run_scout_workflow(oshi_id)
-
-            # 2. 収集された情報を取得してサマリー生成
             oshi = self.oshi_repo.get_by_id(oshi_id)
             if not oshi:
                 raise ValueError(f"Oshi not found: {oshi_id}")
 
-            infos = self.info_repo.get_all_by_oshi(oshi_id)
-            infos_data = [
-                {"title": info.title, "url": info.url, "snippet": info.snippet}
-                for info in infos[:10]
-            ]
+            async def discover() -> Optional[NetworkDiscoverResult]:
+                # ネットワーク自動発見（初回のみ）
+                if not self.network_repo:
+                    return None
+                existing_nodes = await asyncio.to_thread(
+                    self.network_repo.get_all_by_oshi, oshi_id
+                )
+                if existing_nodes:
+                    return None
+                return await self.discover_network(oshi_id)
 
-            summary = self.gemini_client.generate_oshi_summary(
-                oshi_name=oshi.name,
-                infos=infos_data,
-            )
+            async def direct_scout() -> list[str]:
+                return await self.scout_agent.collect_info(
+                    oshi_id=oshi.id,
+                    oshi_name=oshi.name,
+                    official_url=oshi.official_url,
+                    category=oshi.category,
+                )
 
-            result = {
-                **scout_result,
-                "summary": summary,
-            }
-            if network_result:
-                result["network"] = network_result
+            async def network_scout(discover) -> list[str]:
+                if not self.network_repo:
+                    return []
+                return await self.scout_agent.collect_from_network(
+                    oshi_id=oshi.id,
+                    oshi_name=oshi.name,
+                )
+
+            async def priority(direct_scout, network_scout) -> dict[str, str]:
+                all_new_ids = direct_scout + network_scout
+                if not all_new_ids:
+                    return {}
+                return await self.priority_agent.judge_priority(all_new_ids)
+
+            async def events(priority) -> list[str]:
+                return await self._extract_events(oshi_id, priority)
+
+            async def summary(direct_scout, network_scout) -> str:
+                # 収集された情報を取得してサマリー生成
+                infos = await asyncio.to_thread(self.info_repo.get_all_by_oshi, oshi_id)
+                infos_data = [
+                    {"title": info.title, "url": info.url, "snippet": info.snippet}
+                    for info in infos[:10]
+                ]
+                return await asyncio.to_thread(
+                    self.gemini_client.generate_oshi_summary,
+                    oshi_name=oshi.name,
+                    infos=infos_data,
+                )
+
+            graph = StageGraph()
+            graph.add("discover", discover)
+            graph.add("direct_scout", direct_scout)
+            graph.add("network_scout", network_scout, ["discover"])
+            graph.add("priority", priority, ["direct_scout", "network_scout"])
+            graph.add("events", events, ["priority"])
+            graph.add("summary", summary, ["direct_scout", "network_scout"])
+            # 登録直後のユーザーが結果を待っているため、検索はバッチスカウトより優先する
+            with request_priority(RequestPriority.URGENT):
+                stages = await graph.run()
+
+            direct_ids = stages["direct_scout"]
+            network_ids = stages["network_scout"]
+            all_new_ids = direct_ids + network_ids
+
+            if self.network_repo:
+                scout_result = NetworkScoutResult(
+                    oshi_id=oshi_id,
+                    oshi_name=oshi.name,
+                    direct_count=len(direct_ids),
+                    network_count=len(network_ids),
+                    total_count=len(all_new_ids),
+                    new_info_ids=all_new_ids,
+                    priority_results=stages["priority"],
+                    new_event_ids=stages["events"],
+                )
+            else:
+                scout_result = ScoutWorkflowResult(
+                    oshi_id=oshi_id,
+                    oshi_name=oshi.name,
+                    collected_count=len(all_new_ids),
+                    new_info_ids=all_new_ids,
+                    priority_results=stages["priority"],
+                    new_event_ids=stages["events"],
+                )
+
+            result = scout_result.model_dump()
+            # ネットワーク版の結果は total_count を収集件数として扱う
+            result.setdefault("collected_count", result.get("total_count", 0))
+            result["summary"] = stages["summary"]
+            if stages["discover"]:
+                result["network"] = stages["discover"].model_dump()
+
+            stage_report = graph.report()
+            result["stage_timings"] = stage_report
 
             logger.info(
                 "root_scout_and_summarize_success",
                 oshi_id=oshi_id,
-                summary_length=len(summary),
+                summary_length=len(result["summary"]),
+                total_ms=stage_report["total_ms"],
+                critical_path=stage_report["critical_path"],
+                stage_ms={
+                    name: stage["duration_ms"]
+                    for name, stage in stage_report["stages"].items()
+                },
             )
             return result
 
@@ -194,7 +340,8 @@ class RootAgent:
                 raise ValueError(f"Oshi not found: {oshi_id}")
 
             # Gemini でネットワークを発見
-            raw_nodes = self.gemini_client.discover_network(
+            raw_nodes = await asyncio.to_thread(
+                self.gemini_client.discover_network,
                 oshi_name=oshi.name,
                 category=oshi.category,
             )
@@ -208,17 +355,24 @@ class RootAgent:
                     nodes=[],
                 )
 
-            # 既存ノードとの重複を排除して保存
-            created_nodes = []
+            # 既存ノード名を一括取得し、メモリ上で重複を排除する
+            # （全角/半角・大文字/小文字の表記ゆれは同一ノードとみなす）
+            known_names = {
+                normalize_name(node.name)
+                for node in self.network_repo.get_all_by_oshi(oshi_id)
+            }
+
+            nodes_to_create = []
             for raw in raw_nodes:
                 name = raw.get("name", "")
                 if not name:
                     continue
 
-                # 重複チェック
-                existing = self.network_repo.find_by_name(oshi_id, name)
-                if existing:
+                # 重複チェック（既存ノード + 今回の発見結果内）
+                name_key = normalize_name(name)
+                if not name_key or name_key in known_names:
                     continue
+                known_names.add(name_key)
 
                 try:
                     node_type = NodeType(raw.get("node_type", "fan"))
@@ -230,16 +384,21 @@ class RootAgent:
                 except ValueError:
                     ring = NodeRing.OUTER
 
-                node_data = NetworkNodeCreate(
-                    oshi_id=oshi_id,
-                    name=name,
-                    node_type=node_type,
-                    ring=ring,
-                    relationship=raw.get("relationship", "")[:200],
-                    search_queries=raw.get("search_queries", []),
+                nodes_to_create.append(
+                    NetworkNodeCreate(
+                        oshi_id=oshi_id,
+                        name=name,
+                        node_type=node_type,
+                        ring=ring,
+                        relationship=raw.get("relationship", "")[:200],
+                        search_queries=raw.get("search_queries", []),
+                    )
                 )
-                created = self.network_repo.create(node_data)
-                created_nodes.append(created)
+
+            # 新規ノードを1回のバッチコミットで保存
+            created_nodes = []
+            if nodes_to_create:
+                created_nodes = self.network_repo.create_batch(nodes_to_create)
 
             logger.info(
                 "root_discover_network_success",
@@ -277,6 +436,7 @@ class RootAgent:
         1. ネットワークノード経由で情報収集
         2. 通常のスカウトも併せて実行
         3. Priority Agent で重要度判定
+        4. Event Agent で urgent / important の情報からイベントを抽出
 
         Args:
             oshi_id: 推しID
@@ -287,6 +447,12 @@ class RootAgent:
         Raises:
             ValueError: 指定された推しが存在しない場合
         """
+        return await self._run_locked(
+            oshi_id, "network_scout", self._network_scout, NetworkScoutResult
+        )
+
+    async def _network_scout(self, oshi_id: str) -> NetworkScoutResult:
+        """ネットワークスカウトの本体（run_network_scout を参照）"""
         try:
             logger.info("root_network_scout_start", oshi_id=oshi_id)
 
@@ -317,6 +483,9 @@ class RootAgent:
                     all_new_ids
                 )
 
+            # 4. Event Agent
+            new_event_ids = await self._extract_events(oshi_id, priority_results)
+
             logger.info(
                 "root_network_scout_success",
                 oshi_id=oshi_id,
@@ -332,6 +501,7 @@ class RootAgent:
                 total_count=len(all_new_ids),
                 new_info_ids=all_new_ids,
                 priority_results=priority_results,
+                new_event_ids=new_event_ids,
             )
 
         except Exception as e:
@@ -342,6 +512,75 @@ class RootAgent:
             )
             raise
 
+    async def run_scouts(
+        self,
+        oshis: list[OshiModel],
+        shared_results: Optional[SharedSearchResults] = None,
+    ) -> dict[str, Any]:
+        """指定した推しの情報収集を順に実行（scout-all・そのシャードの本体）
+
+        推しごとに読み書きしたドキュメントはその推しの処理が終わったら不要になるため、
+        推しごとにアイデンティティマップを作り直してメモリの使用量を抑える。
+
+        同じ名前・カテゴリの推しは同じ検索クエリを発行するため、実行前に全推しのクエリを
+        検索計画に登録し、同じクエリは1回だけ検索して結果を共有する。検索まで進まなかった
+        推しの要求は、その推しの処理が終わった時点で取り消す。
+
+        Args:
+            oshis: 処理する推し
+            shared_results: シャード間で共有する検索結果（scout-all のシャードから指定）
+
+        Returns:
+            実行結果（推しごとの収集件数など。失敗した推しはエラー内容）と検索クエリの集計
+        """
+        results = []
+        success_count = 0
+        error_count = 0
+
+        plan = SearchPlan(shared_results)
+        for oshi in oshis:
+            self.scout_agent.plan_queries(plan, oshi)
+        logger.info(
+            "root_search_planned",
+            oshis=len(oshis),
+            planned=plan.planned,
+            distinct=plan.distinct,
+        )
+
+        for oshi in oshis:
+            try:
+                with identity_map.identity_map_scope(), request_priority(
+                    RequestPriority.BATCH
+                ), search_plan_scope(plan, oshi.id):
+                    # 一覧で読んだ推しを get_by_id で読み直さない
+                    identity_map.remember(OshiRepository.COLLECTION_NAME, oshi.id, oshi)
+                    result = await self.run_scout_workflow(oshi.id)
+                results.append(result)
+                success_count += 1
+            except Exception as e:
+                logger.error(
+                    "root_all_scouts_oshi_failed",
+                    oshi_id=oshi.id,
+                    oshi_name=oshi.name,
+                    error=str(e),
+                )
+                results.append({
+                    "oshi_id": oshi.id,
+                    "oshi_name": oshi.name,
+                    "error": str(e),
+                })
+                error_count += 1
+
+        search_queries = plan.snapshot()
+        logger.info("root_search_plan_finished", **search_queries)
+        return {
+            "total_oshis": len(oshis),
+            "success_count": success_count,
+            "error_count": error_count,
+            "search_queries": search_queries,
+            "results": results,
+        }
+
     async def run_all_scouts(self) -> dict[str, Any]:
         """全推しの情報収集を実行（Cloud Scheduler から呼ばれる）
 
@@ -351,43 +590,13 @@ class RootAgent:
         try:
             logger.info("root_all_scouts_start")
 
-            all_oshis = self.oshi_repo.get_all()
-
-            results = []
-            success_count = 0
-            error_count = 0
-
-            for oshi in all_oshis:
-                try:
-                    result = await self.run_scout_workflow(oshi.id)
-                    results.append(result)
-                    success_count += 1
-                except Exception as e:
-                    logger.error(
-                        "root_all_scouts_oshi_failed",
-                        oshi_id=oshi.id,
-                        oshi_name=oshi.name,
-                        error=str(e),
-                    )
-                    results.append({
-                        "oshi_id": oshi.id,
-                        "oshi_name": oshi.name,
-                        "error": str(e),
-                    })
-                    error_count += 1
-
-            result = {
-                "total_oshis": len(all_oshis),
-                "success_count": success_count,
-                "error_count": error_count,
-                "results": results,
-            }
+            result = await self.run_scouts(self.oshi_repo.get_all())
 
             logger.info(
                 "root_all_scouts_success",
-                total=len(all_oshis),
-                success=success_count,
-                errors=error_count,
+                total=result["total_oshis"],
+                success=result["success_count"],
+                errors=result["error_count"],
             )
             return result
 
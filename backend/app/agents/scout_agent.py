@@ -1,14 +1,18 @@
 """Scout Agent - 情報収集エージェント"""
+import asyncio
 from typing import Optional
 
 import structlog
 
+from app.agents.search_plan import SearchPlan, current_search_plan
 from app.external.google_search import GoogleSearchClient
 from app.models.info import CollectedInfoCreate
 from app.models.network_node import NetworkNodeModel
+from app.models.oshi import OshiModel
 from app.repositories.info_repository import InfoRepository
 from app.repositories.network_repository import NetworkRepository
 from app.repositories.oshi_repository import OshiRepository
+from app.utils.url_utils import canonicalize_url
 
 logger = structlog.get_logger(__name__)
 
@@ -28,6 +32,9 @@ class ScoutAgent:
         self.search_client = search_client
         self.network_repo = network_repo
 
+    # collect_info の1クエリあたりの取得件数
+    COLLECT_NUM_RESULTS = 10
+
     # カテゴリ別の追加検索キーワード
     CATEGORY_KEYWORDS: dict[str, list[str]] = {
         "アイドル": ["ライブ チケット", "イベント 握手会"],
@@ -61,6 +68,18 @@ class ScoutAgent:
 
         return queries
 
+    def plan_queries(self, plan: SearchPlan, oshi: OshiModel) -> None:
+        """collect_info が発行する検索クエリを scout-all の検索計画に登録"""
+        for query in self._build_queries(oshi.name, oshi.category, oshi.official_url):
+            plan.add(query, self.COLLECT_NUM_RESULTS, owner=oshi.id)
+
+    def _search(self, query: str, num_results: int) -> list[dict]:
+        """検索を実行（scout-all の検索計画があれば、同じクエリの結果を共有する）"""
+        plan = current_search_plan()
+        if plan is not None:
+            return plan.search(self.search_client, query, num_results)
+        return self.search_client.search(query, num_results=num_results)
+
     async def collect_info(
         self,
         oshi_id: str,
@@ -94,11 +113,15 @@ class ScoutAgent:
             search_results = []
             seen_urls = set()
             for query in queries:
-                results = self.search_client.search(query, num_results=10)
+                # 検索APIは同期I/Oのため、イベントループを塞がないようスレッドで実行
+                results = await asyncio.to_thread(
+                    self._search, query, self.COLLECT_NUM_RESULTS
+                )
                 for r in results:
-                    url = r.get("link", "")
-                    if url not in seen_urls:
-                        seen_urls.add(url)
+                    # 表記ゆれのあるURLは正規化キーで同一とみなす
+                    url_key = canonicalize_url(r.get("link", ""))
+                    if url_key not in seen_urls:
+                        seen_urls.add(url_key)
                         search_results.append(r)
 
             if not search_results:
@@ -185,7 +208,9 @@ class ScoutAgent:
             seen_urls: set[str] = set()
 
             for node in nodes:
-                node_results = self._search_node(node, oshi_name, seen_urls)
+                node_results = await asyncio.to_thread(
+                    self._search_node, node, oshi_name, seen_urls
+                )
                 for result in node_results:
                     url = result["link"]
                     title = result["title"]
@@ -238,11 +263,14 @@ class ScoutAgent:
             queries = [f"{oshi_name} {node.name}"]
 
         for query in queries:
-            search_results = self.search_client.search(query, num_results=5)
+            search_results = self._search(query, 5)
             for r in search_results:
                 url = r.get("link", "")
-                if url and url not in seen_urls:
-                    seen_urls.add(url)
+                if not url:
+                    continue
+                url_key = canonicalize_url(url)
+                if url_key not in seen_urls:
+                    seen_urls.add(url_key)
                     results.append(r)
 
         return results
@@ -0,0 +1,398 @@
+"""Scout Coordinator - scout-all のシャード分割と実行
+
+全推しの情報収集を推しIDのハッシュで N 個のシャードに分け、シャードごとのジョブを
+Firestore に登録する。各インスタンスのワーカーは JobRepository のリースでシャードを
+1つずつ取得して実行するため、夜間の一括実行を複数の Cloud Run インスタンスに分散できる。
+
+- enqueue: 推しIDを1回だけ読んでシャードに振り分け、親ジョブとシャードのジョブを作成
+  （シャードの担当の推しIDはシャードの input_data に保存する）
+- work: 取得できるシャードが無くなるまで実行（どのインスタンスからでも呼べる）。
+  シャードは担当の推しだけをバッチ読み取りするため、推しのコレクションを読み直さない
+- progress: シャードの集計を合計した進捗。全シャードが終わったら親ジョブを確定する
+
+インスタンスが途中で停止したシャードは、リースの期限が切れた後に他のワーカーが取り直す。
+実行に失敗したシャードはすぐに未実行に戻す。いずれも実行回数が max_attempts に達したら
+失敗として確定する。
+
+/scout-all を受けたインスタンスは worker_url（SCOUT_ALL_WORKER_URL）に
+/agent/scout-all/work を shard_count - 1 件同時に送り、他のインスタンスにシャードを
+分担させる（dispatch_workers）。worker_url が空の場合は分散しないため、Cloud Scheduler
+などから /agent/scout-all/work を別途呼ぶ。
+
+同じ名前・カテゴリの推しは別のシャードに入っても同じ検索クエリを発行するため、
+search_result_repo を渡すと、検索結果を Firestore 経由で同じ実行の全シャードと共有する
+（SharedSearchResults）。
+"""
+import asyncio
+import socket
+import uuid
+from typing import Any, Optional
+
+import structlog
+
+from app.agents.root_agent import RootAgent
+from app.agents.search_plan import SharedSearchResults
+from app.models.job import JobModel, JobStatus, JobType
+from app.models.workflow_results import ScoutAllProgress, ScoutShardSummary
+from app.repositories.job_repository import JobRepository
+from app.repositories.oshi_repository import OshiRepository
+from app.repositories.search_result_repository import SearchResultRepository
+from app.utils.sharding import shard_of
+
+logger = structlog.get_logger(__name__)
+
+_TERMINAL_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED)
+
+
+def _summarize_shard(shard: int, result: dict[str, Any]) -> ScoutShardSummary:
+    """RootAgent.run_scouts の結果をシャードの集計にする（推しごとの結果は保存しない）"""
+    new_info_count = 0
+    new_event_count = 0
+    errors = []
+    for item in result["results"]:
+        if isinstance(item, dict):
+            errors.append({"oshi_id": item["oshi_id"], "error": item["error"]})
+        else:
+            new_info_count += len(item.new_info_ids)
+            new_event_count += len(item.new_event_ids)
+    search_queries = result.get("search_queries", {})
+    return ScoutShardSummary(
+        shard=shard,
+        total_oshis=result["total_oshis"],
+        success_count=result["success_count"],
+        error_count=result["error_count"],
+        new_info_count=new_info_count,
+        new_event_count=new_event_count,
+        requested_queries=search_queries.get("requested", 0),
+        executed_queries=search_queries.get("executed", 0),
+        errors=errors,
+    )
+
+
+class ScoutCoordinator:
+    """scout-all をシャードに分けて複数インスタンスで実行する"""
+
+    def __init__(
+        self,
+        job_repo: JobRepository,
+        oshi_repo: OshiRepository,
+        root_agent: RootAgent,
+        lease_seconds: float = 600.0,
+        max_attempts: int = 3,
+        search_result_repo: Optional[SearchResultRepository] = None,
+        worker_url: str = "",
+        internal_api_key: str = "",
+        worker_timeout_seconds: float = 3600.0,
+    ):
+        self.job_repo = job_repo
+        self.oshi_repo = oshi_repo
+        self.root_agent = root_agent
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.search_result_repo = search_result_repo
+        self.worker_url = worker_url
+        self.internal_api_key = internal_api_key
+        self.worker_timeout_seconds = worker_timeout_seconds
+
+    async def enqueue(self, shard_count: int) -> JobModel:
+        """親ジョブとシャードのジョブを作成
+
+        Args:
+            shard_count: シャード数
+
+        Returns:
+            JobModel: 親ジョブ（実行中）
+        """
+        try:
+            oshi_ids: list[list[str]] = [[] for _ in range(shard_count)]
+            for oshi_id in await asyncio.to_thread(self.oshi_repo.get_all_ids):
+                oshi_ids[shard_of(oshi_id, shard_count)].append(oshi_id)
+
+            parent = await asyncio.to_thread(
+                self.job_repo.create,
+                JobType.SCOUT_ALL,
+                {"shard_count": shard_count},
+            )
+            await asyncio.to_thread(
+                self.job_repo.create_shards, parent.id, shard_count, oshi_ids
+            )
+            parent = await asyncio.to_thread(
+                self.job_repo.update_status, parent.id, JobStatus.RUNNING
+            )
+            logger.info(
+                "scout_all_enqueued", job_id=parent.id, shard_count=shard_count
+            )
+            return parent
+        except Exception as e:
+            logger.error(
+                "scout_all_enqueue_failed", shard_count=shard_count, error=str(e)
+            )
+            raise
+
+    async def run(self, job_id: str, workers: int) -> dict[str, Any]:
+        """他のインスタンスに workers 件のワーカーを送り、このリクエストも実行する
+
+        送ったワーカーの応答（全シャードの終了）を待ってから返す。
+
+        Returns:
+            work の結果に、応答したワーカー数（dispatched_workers）を加えたもの
+        """
+        dispatch = asyncio.create_task(self.dispatch_workers(job_id, workers))
+        try:
+            result = await self.work(job_id)
+        finally:
+            dispatched = await dispatch
+        result["dispatched_workers"] = dispatched
+        return result
+
+    async def dispatch_workers(self, job_id: str, count: int) -> int:
+        """worker_url に /agent/scout-all/work を count 件同時に送る
+
+        Cloud Run は同時リクエストを空いているインスタンスに振り分ける（足りなければ
+        スケールアウトする）ため、最大 count 台のインスタンスがシャードを分担する。
+        送信の失敗はログに残すだけで例外は送出しない（取られなかったシャードは
+        送った側のワーカーが実行する）。
+
+        Returns:
+            正常に応答したワーカー数
+        """
+        if not self.worker_url or count <= 0:
+            return 0
+        # httpx は scout-all の実行時だけ使うため、初回の呼び出し時に読み込む
+        import httpx
+
+        async def request(client: "httpx.AsyncClient") -> bool:
+            try:
+                response = await client.post(
+                    "/agent/scout-all/work", params={"job_id": job_id}
+                )
+                response.raise_for_status()
+                return True
+            except Exception as e:
+                logger.warning(
+                    "scout_all_dispatch_failed", job_id=job_id, error=str(e)
+                )
+                return False
+
+        logger.info("scout_all_dispatch_start", job_id=job_id, workers=count)
+        async with httpx.AsyncClient(
+            base_url=self.worker_url,
+            headers={"X-Internal-API-Key": self.internal_api_key},
+            timeout=self.worker_timeout_seconds,
+        ) as client:
+            results = await asyncio.gather(*(request(client) for _ in range(count)))
+        succeeded = sum(results)
+        logger.info(
+            "scout_all_dispatch_complete",
+            job_id=job_id,
+            workers=count,
+            succeeded=succeeded,
+        )
+        return succeeded
+
+    def latest_job_id(self) -> Optional[str]:
+        """実行中の最新の scout-all の親ジョブID（無ければNone）"""
+        parent = self.job_repo.get_latest(JobType.SCOUT_ALL)
+        if parent is None or parent.status in _TERMINAL_STATUSES:
+            return None
+        return parent.id
+
+    async def work(
+        self, job_id: str, max_shards: Optional[int] = None
+    ) -> dict[str, Any]:
+        """取得できるシャードが無くなるまで（最大 max_shards 件）実行
+
+        Args:
+            job_id: 親ジョブID
+            max_shards: このワーカーが実行するシャード数の上限
+
+        Returns:
+            実行したシャードの集計と、親ジョブ全体の進捗
+        """
+        # 同じインスタンスの別リクエストとも区別する
+        owner = f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        processed: list[ScoutShardSummary] = []
+        try:
+            logger.info("scout_all_worker_start", job_id=job_id, owner=owner)
+            while max_shards is None or len(processed) < max_shards:
+                shard = await asyncio.to_thread(
+                    self.job_repo.claim_shard,
+                    job_id,
+                    owner,
+                    self.lease_seconds,
+                    self.max_attempts,
+                )
+                if shard is None:
+                    break
+                summary = await self._run_shard(shard, owner)
+                if summary is not None:
+                    processed.append(summary)
+
+            progress = await asyncio.to_thread(self.progress, job_id)
+            logger.info(
+                "scout_all_worker_success",
+                job_id=job_id,
+                owner=owner,
+                processed=len(processed),
+            )
+            return {
+                "job_id": job_id,
+                "worker": owner,
+                "processed_shards": processed,
+                "progress": progress,
+            }
+        except Exception as e:
+            logger.error("scout_all_worker_failed", job_id=job_id, error=str(e))
+            raise
+
+    async def _run_shard(
+        self, shard: JobModel, owner: str
+    ) -> Optional[ScoutShardSummary]:
+        """シャードの推しを処理して結果を保存（実行中はリースを延長し続ける）"""
+        index = shard.input_data["shard"]
+        oshi_ids = shard.input_data.get("oshi_ids", [])
+        heartbeat = asyncio.create_task(self._keep_lease(shard.id, owner))
+        try:
+            # enqueue 後に削除された推しは含まれない
+            found = await asyncio.to_thread(self.oshi_repo.get_many, oshi_ids)
+            oshis = [found[oshi_id] for oshi_id in oshi_ids if oshi_id in found]
+            logger.info(
+                "scout_shard_start", job_id=shard.id, shard=index, oshis=len(oshis)
+            )
+            result = await self.root_agent.run_scouts(
+                oshis, shared_results=self._shared_results(shard)
+            )
+            summary = _summarize_shard(index, result)
+        except Exception as e:
+            # 実行回数の上限までは未実行に戻し、他のワーカー（または自分）が再実行する
+            status = await asyncio.to_thread(
+                self.job_repo.release_shard,
+                shard.id,
+                owner,
+                self.max_attempts,
+                str(e),
+            )
+            logger.error(
+                "scout_shard_failed",
+                job_id=shard.id,
+                shard=index,
+                attempts=shard.attempts,
+                status=status.value if status else None,
+                error=str(e),
+            )
+            return None
+        finally:
+            heartbeat.cancel()
+
+        finished = await asyncio.to_thread(
+            self.job_repo.finish_shard,
+            shard.id,
+            owner,
+            JobStatus.COMPLETED,
+            summary.model_dump(),
+        )
+        if not finished:
+            # リースを失った（期限切れで他のワーカーが取り直した）結果は保存しない
+            logger.warning("scout_shard_lease_lost", job_id=shard.id, shard=index)
+            return None
+        logger.info(
+            "scout_shard_success",
+            job_id=shard.id,
+            shard=index,
+            success=summary.success_count,
+            errors=summary.error_count,
+        )
+        return summary
+
+    def _shared_results(self, shard: JobModel) -> Optional[SharedSearchResults]:
+        """同じ scout-all の実行（親ジョブ）の全シャードで共有する検索結果"""
+        if self.search_result_repo is None or shard.parent_job_id is None:
+            return None
+        return SharedSearchResults(self.search_result_repo, shard.parent_job_id)
+
+    async def _keep_lease(self, job_id: str, owner: str) -> None:
+        """リースの長さの 1/3 ごとにリースを延長（リースを失ったら延長をやめる）"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                renewed = await asyncio.to_thread(
+                    self.job_repo.renew_lease, job_id, owner, self.lease_seconds
+                )
+            except Exception as e:
+                logger.warning("scout_shard_renew_failed", job_id=job_id, error=str(e))
+                continue
+            if not renewed:
+                logger.warning("scout_shard_lease_lost", job_id=job_id)
+                return
+
+    def progress(self, job_id: str) -> Optional[ScoutAllProgress]:
+        """シャードの集計を合計した進捗（親ジョブが無ければNone）
+
+        全シャードが完了・失敗していれば、合計を親ジョブの結果として保存する。
+        """
+        try:
+            parent = self.job_repo.get_by_id(job_id)
+            if parent is None or parent.job_type != JobType.SCOUT_ALL:
+                return None
+            shards = self.job_repo.get_shards(job_id)
+
+            counts = {status: 0 for status in JobStatus}
+            totals = {
+                "total_oshis": 0,
+                "success_count": 0,
+                "error_count": 0,
+                "new_info_count": 0,
+                "new_event_count": 0,
+                "requested_queries": 0,
+                "executed_queries": 0,
+            }
+            errors: list[dict[str, str]] = []
+            for shard in shards:
+                counts[shard.status] += 1
+                if shard.status == JobStatus.COMPLETED and shard.output_data:
+                    summary = ScoutShardSummary(**shard.output_data)
+                    for key in totals:
+                        totals[key] += getattr(summary, key)
+                    errors.extend(summary.errors)
+                elif shard.status == JobStatus.FAILED:
+                    errors.append(
+                        {
+                            "shard": str(shard.input_data.get("shard")),
+                            "error": shard.error_message or "unknown",
+                        }
+                    )
+
+            status = parent.status
+            done = bool(shards) and all(
+                shard.status in _TERMINAL_STATUSES for shard in shards
+            )
+            if done and parent.status not in _TERMINAL_STATUSES:
+                failed = counts[JobStatus.FAILED]
+                status = JobStatus.FAILED if failed else JobStatus.COMPLETED
+
+            progress = ScoutAllProgress(
+                job_id=job_id,
+                status=status.value,
+                shard_count=parent.input_data.get("shard_count", len(shards)),
+                pending_shards=counts[JobStatus.PENDING],
+                running_shards=counts[JobStatus.RUNNING],
+                completed_shards=counts[JobStatus.COMPLETED],
+                failed_shards=counts[JobStatus.FAILED],
+                errors=errors,
+                **totals,
+            )
+            if status != parent.status:
+                self.job_repo.update_status(
+                    job_id, status, output_data=progress.model_dump()
+                )
+                logger.info(
+                    "scout_all_finished",
+                    job_id=job_id,
+                    status=status.value,
+                    total=progress.total_oshis,
+                    errors=progress.error_count,
+                )
+            return progress
+        except Exception as e:
+            logger.error("scout_all_progress_failed", job_id=job_id, error=str(e))
+            raise
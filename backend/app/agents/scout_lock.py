@@ -0,0 +1,250 @@
+"""Scout Lock - 推しごとのスカウト実行の排他
+
+ユーザー操作の /agent/scout・/agent/network/scout と、スケジューラーの scout-all が
+同じ推しを同時にスカウトすると、両方が同じURLを未登録と判定して情報を重複登録し、
+重要度判定の LLM 呼び出しも二重に発生する。推しごとのロックを Firestore に置き、
+同じ推しのスカウトは常に1つだけ実行する。
+
+- 同じワークフローの実行中に呼ばれた場合は、新しく実行せず実行中の結果を待って返す
+  （同じプロセス内は Future を共有し、他のインスタンスはロックに保存された結果を読む）
+- 別のワークフローの実行中に呼ばれた場合は、終わるのを待ってから実行する
+  （先の実行で登録済みのURLは find_by_url で弾かれるため重複しない）
+- ロックはリース方式。実行中は TTL の 1/3 ごとに延長し、インスタンスが停止して延長されなく
+  なったロックは期限切れの後に取り直す
+"""
+import asyncio
+import socket
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+import structlog
+from pydantic import BaseModel
+
+from app.repositories.scout_lock_repository import (
+    LOCK_COMPLETED,
+    LOCK_FAILED,
+    ScoutLockRepository,
+)
+
+logger = structlog.get_logger(__name__)
+
+ResultT = TypeVar("ResultT")
+
+
+class ScoutRunFailedError(Exception):
+    """待っていた他のインスタンスのスカウトが失敗した"""
+
+    def __init__(self, oshi_id: str, workflow: str, error: Optional[str]):
+        super().__init__(f"{workflow} for oshi {oshi_id} failed: {error or 'unknown'}")
+        self.oshi_id = oshi_id
+        self.workflow = workflow
+        self.error = error
+
+
+@dataclass
+class _InFlight:
+    """プロセス内で実行中（または他のインスタンスの実行を待機中）のスカウト"""
+
+    workflow: str
+    future: asyncio.Future
+
+
+# 推しID → 実行中のスカウト。リクエストごとに ScoutRunLock が作られるためモジュールで持つ
+_in_flight: dict[str, _InFlight] = {}
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    """待つ呼び出し元がいない場合の「例外が取り出されなかった」警告を抑える"""
+    if not future.cancelled():
+        future.exception()
+
+
+class ScoutRunLock:
+    """推しごとのスカウトを排他実行し、同時に呼ばれた同じワークフローは結果を共有する"""
+
+    def __init__(
+        self,
+        lock_repo: ScoutLockRepository,
+        ttl_seconds: float = 300.0,
+        poll_seconds: float = 2.0,
+        wait_timeout_seconds: float = 900.0,
+    ):
+        self.lock_repo = lock_repo
+        self.ttl_seconds = ttl_seconds
+        self.poll_seconds = poll_seconds
+        self.wait_timeout_seconds = wait_timeout_seconds
+
+    async def run(
+        self,
+        oshi_id: str,
+        workflow: str,
+        run: Callable[[], Awaitable[ResultT]],
+        result_model: Optional[type[BaseModel]] = None,
+    ) -> ResultT:
+        """ロックを取得してスカウトを実行（実行中なら結果を待つ）
+
+        Args:
+            oshi_id: 推しID
+            workflow: ワークフロー名。同じ名前の実行中のスカウトには相乗りする
+            run: スカウトの本体
+            result_model: 結果のモデル（他のインスタンスが保存した結果の復元に使う。
+                None なら結果は dict のまま扱う）
+
+        Returns:
+            スカウトの結果（相乗りした場合は実行中だったスカウトの結果）
+        """
+        while True:
+            entry = _in_flight.get(oshi_id)
+            if entry is None:
+                break
+            if entry.workflow == workflow:
+                logger.info("scout_lock_attached", oshi_id=oshi_id, workflow=workflow)
+                # 待っている側のキャンセルを実行中のスカウトに波及させない
+                return await asyncio.shield(entry.future)
+            logger.info(
+                "scout_lock_waiting",
+                oshi_id=oshi_id,
+                workflow=workflow,
+                running=entry.workflow,
+            )
+            await asyncio.wait([entry.future])
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        _in_flight[oshi_id] = _InFlight(workflow, future)
+        try:
+            result = await self._run_exclusive(oshi_id, workflow, run, result_model)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            current = _in_flight.get(oshi_id)
+            if current is not None and current.future is future:
+                del _in_flight[oshi_id]
+
+    async def _run_exclusive(
+        self,
+        oshi_id: str,
+        workflow: str,
+        run: Callable[[], Awaitable[ResultT]],
+        result_model: Optional[type[BaseModel]],
+    ) -> ResultT:
+        """Firestore のロックを取得して実行。他のインスタンスが実行中なら終わるまで待つ"""
+        owner = f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        deadline = asyncio.get_running_loop().time() + self.wait_timeout_seconds
+        while True:
+            acquired, lock = await asyncio.to_thread(
+                self.lock_repo.acquire, oshi_id, workflow, owner, self.ttl_seconds
+            )
+            if acquired:
+                return await self._run_as_owner(oshi_id, owner, run)
+
+            finished = await self._wait_for_release(oshi_id, lock["run_id"], deadline)
+            if finished is None or lock.get("workflow") != workflow:
+                # 実行が取り直された・別のワークフローだった場合は、ロックの取得からやり直す
+                continue
+
+            logger.info(
+                "scout_lock_attached_remote",
+                oshi_id=oshi_id,
+                workflow=workflow,
+                holder=lock.get("owner"),
+                status=finished["status"],
+            )
+            if finished["status"] == LOCK_FAILED:
+                raise ScoutRunFailedError(oshi_id, workflow, finished.get("error"))
+            stored = finished.get("result") or {}
+            return result_model(**stored) if result_model else stored
+
+    async def _run_as_owner(
+        self, oshi_id: str, owner: str, run: Callable[[], Awaitable[ResultT]]
+    ) -> ResultT:
+        """ロックを持ったまま実行し、結果を保存して解放する"""
+        heartbeat = asyncio.create_task(self._keep_lease(oshi_id, owner))
+        try:
+            result = await run()
+        except Exception as e:
+            heartbeat.cancel()
+            await self._release(oshi_id, owner, error=str(e))
+            raise
+        except asyncio.CancelledError:
+            heartbeat.cancel()
+            await asyncio.shield(self._release(oshi_id, owner, error="cancelled"))
+            raise
+
+        heartbeat.cancel()
+        stored = result.model_dump() if isinstance(result, BaseModel) else result
+        await self._release(oshi_id, owner, result=stored)
+        return result
+
+    async def _release(
+        self,
+        oshi_id: str,
+        owner: str,
+        result: Optional[dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """ロックを解放（失敗しても TTL で切れるため、スカウトの結果は返す）"""
+        try:
+            released = await asyncio.to_thread(
+                self.lock_repo.release,
+                oshi_id,
+                owner,
+                self.ttl_seconds,
+                result,
+                error,
+            )
+        except Exception as e:
+            logger.warning("scout_lock_release_failed", oshi_id=oshi_id, error=str(e))
+            return
+        if not released:
+            # 期限切れで他のワーカーに取られていた（その実行が結果を保存する）
+            logger.warning("scout_lock_lost", oshi_id=oshi_id)
+
+    async def _keep_lease(self, oshi_id: str, owner: str) -> None:
+        """TTL の 1/3 ごとにロックを延長（ロックを失ったら延長をやめる）"""
+        while True:
+            await asyncio.sleep(self.ttl_seconds / 3)
+            try:
+                renewed = await asyncio.to_thread(
+                    self.lock_repo.renew, oshi_id, owner, self.ttl_seconds
+                )
+            except Exception as e:
+                logger.warning("scout_lock_renew_failed", oshi_id=oshi_id, error=str(e))
+                continue
+            if not renewed:
+                logger.warning("scout_lock_lost", oshi_id=oshi_id)
+                return
+
+    async def _wait_for_release(
+        self, oshi_id: str, run_id: str, deadline: float
+    ) -> Optional[dict[str, Any]]:
+        """他のインスタンスの実行が終わるまでロックを確認し続ける
+
+        Returns:
+            終了したロックの内容。期限切れ・別の実行に置き換わった場合は None
+
+        Raises:
+            TimeoutError: wait_timeout_seconds を過ぎても終わらない場合
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            lock = await asyncio.to_thread(self.lock_repo.get, oshi_id)
+            if not lock or lock.get("run_id") != run_id:
+                return None
+            if lock.get("status") in (LOCK_COMPLETED, LOCK_FAILED):
+                return lock
+            if not self.lock_repo.is_held(lock):
+                return None
+            if loop.time() >= deadline:
+                raise TimeoutError(
+                    f"Timed out waiting for running scout of oshi {oshi_id}"
+                )
+            await asyncio.sleep(self.poll_seconds)
@@ -0,0 +1,372 @@
+"""Search Plan - scout-all の検索クエリの重複排除
+
+同じ推しを複数のユーザーが登録している場合や、同じカテゴリの推しでは、scout-all が
+推しのドキュメントごとに同じ Custom Search のクエリ（名前 + CATEGORY_KEYWORDS など）を
+何度も発行する。実行前に全推しのクエリを登録して要求数を数え、同じクエリは1回だけ
+検索して結果を要求した全推しに配る。
+
+- 結果は最後の要求が読んだ時点で破棄するため、保持するのは未配布の結果だけ
+- 推しの処理が検索の前に終わった場合（推しが削除済み・別の実行に合流・途中で失敗）は、
+  スコープを抜けるときにその推しの未消化の要求を取り消す
+- 失敗した検索は記録しない（次に要求した推しで再度検索する）
+- 計画と実行中の推しは contextvars で伝播するため、ScoutAgent の関数シグネチャは変えない
+
+シャード分割した scout-all では、シャードごとの計画に SharedSearchResults を渡すと、
+シャード内で1回にまとめた検索を Firestore 経由でさらに他のシャードと共有する
+（同じ実行の中で同じクエリを Custom Search に送るのは、原則として最初の1回だけ。
+他のシャードの検索を待つ時間には上限があり、超えた場合は自分で検索する）。
+"""
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+import structlog
+
+from app.config import settings
+from app.external.google_search import GoogleSearchClient
+from app.repositories.search_result_repository import (
+    SEARCH_COMPLETED,
+    SearchResultRepository,
+)
+from app.utils.cache_stats import get_cache_stats
+
+logger = structlog.get_logger(__name__)
+
+_SearchKey = tuple[str, int]
+
+_current: ContextVar[Optional["SearchPlan"]] = ContextVar("search_plan", default=None)
+_current_owner: ContextVar[Optional[str]] = ContextVar(
+    "search_plan_owner", default=None
+)
+
+
+class SharedSearchResults:
+    """scout-all の実行全体（全シャード）で共有する検索結果
+
+    最初にリースを取ったシャードだけが検索し、他のシャードは保存された結果を待って使う。
+    検索中はリースの長さの 1/3 ごとにリースを延長する（レートリミッターの待ちやリトライで
+    検索がリースより長くかかっても、他のシャードが重複して検索しない）。
+    待つ側は読み取りだけで保存を確認し、間隔を poll_seconds から max_poll_seconds まで
+    倍々に延ばす。wait_seconds を超えても保存されなければ自分で検索する。
+    """
+
+    def __init__(
+        self,
+        repo: SearchResultRepository,
+        run_id: str,
+        lease_seconds: Optional[float] = None,
+        poll_seconds: Optional[float] = None,
+        ttl_seconds: Optional[float] = None,
+        max_poll_seconds: Optional[float] = None,
+        wait_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.repo = repo
+        self.run_id = run_id
+        self.lease_seconds = (
+            settings.scout_search_share_lease_seconds
+            if lease_seconds is None
+            else lease_seconds
+        )
+        self.poll_seconds = (
+            settings.scout_search_share_poll_seconds
+            if poll_seconds is None
+            else poll_seconds
+        )
+        self.ttl_seconds = (
+            settings.scout_search_share_ttl_seconds
+            if ttl_seconds is None
+            else ttl_seconds
+        )
+        self.max_poll_seconds = (
+            settings.scout_search_share_max_poll_seconds
+            if max_poll_seconds is None
+            else max_poll_seconds
+        )
+        self.wait_seconds = (
+            settings.scout_search_share_wait_seconds
+            if wait_seconds is None
+            else wait_seconds
+        )
+        self._clock = clock
+        self._sleep = sleep
+        self.owner = f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+
+    def search(
+        self, client: GoogleSearchClient, query: str, num_results: int
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """(検索結果, 他のシャードの結果を使ったか)
+
+        他のシャードが検索中なら結果の保存を待つ。リースが切れたら取り直して自分で検索し、
+        wait_seconds を超えたらリースを取らずに自分で検索する（結果は保存しない）。
+        """
+        claimed, entry = self._claim_or_wait(query, num_results)
+        if entry.get("status") == SEARCH_COMPLETED:
+            return entry["results"], True
+        if not claimed:
+            logger.warning(
+                "search_share_wait_timeout",
+                run_id=self.run_id,
+                query=query,
+                owner=entry.get("owner"),
+                wait_seconds=self.wait_seconds,
+            )
+            return client.search(query, num_results=num_results), False
+
+        stop_renewing = self._keep_lease(query, num_results)
+        try:
+            results = client.search(query, num_results=num_results)
+        except Exception:
+            stop_renewing.set()
+            self.repo.abandon(self.run_id, query, num_results, self.owner)
+            raise
+        stop_renewing.set()
+        self.repo.complete(
+            self.run_id, query, num_results, self.owner, results, self.ttl_seconds
+        )
+        return results, False
+
+    def _claim_or_wait(
+        self, query: str, num_results: int
+    ) -> tuple[bool, dict[str, Any]]:
+        """リースを取るか、他のシャードの結果の保存を待つ
+
+        保存されずにリースが切れたときだけトランザクションで取り直す。
+
+        Returns:
+            (リースを取れたか, 最後に読んだ内容)。保存済みの結果か、wait_seconds を
+            超えた時点の他のシャードのリース
+        """
+        deadline = self._clock() + self.wait_seconds
+        delay = self.poll_seconds
+        claimed, entry = self.repo.claim(
+            self.run_id, query, num_results, self.owner, self.lease_seconds
+        )
+        while not claimed and entry.get("status") != SEARCH_COMPLETED:
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                break
+            self._sleep(min(delay, remaining))
+            delay = min(delay * 2, self.max_poll_seconds)
+            current = self.repo.get(self.run_id, query, num_results)
+            if current is not None and not self.repo.lease_expired(current):
+                entry = current
+                continue
+            claimed, entry = self.repo.claim(
+                self.run_id, query, num_results, self.owner, self.lease_seconds
+            )
+        return claimed, entry
+
+    def _keep_lease(self, query: str, num_results: int) -> threading.Event:
+        """検索中のリースを延長し続ける（返した Event を set すると止める）
+
+        検索はワーカースレッドで同期的に行うため、延長も別のスレッドで行う。
+        """
+        stop = threading.Event()
+
+        def renew() -> None:
+            while not stop.wait(self.lease_seconds / 3):
+                try:
+                    renewed = self.repo.renew(
+                        self.run_id, query, num_results, self.owner, self.lease_seconds
+                    )
+                except Exception as e:
+                    logger.warning(
+                        "search_share_renew_failed", run_id=self.run_id, error=str(e)
+                    )
+                    continue
+                if not renewed:
+                    logger.warning(
+                        "search_share_lease_lost", run_id=self.run_id, query=query
+                    )
+                    return
+
+        threading.Thread(target=renew, name="search-share-lease", daemon=True).start()
+        return stop
+
+
+class SearchPlan:
+    """1回の scout-all で発行する検索クエリの計画と、その結果の共有（スレッドセーフ）"""
+
+    def __init__(self, shared_results: Optional[SharedSearchResults] = None):
+        self._shared_results = shared_results
+        self._lock = threading.Lock()
+        # クエリ → 結果をまだ読んでいない要求の数
+        self._remaining: dict[_SearchKey, int] = {}
+        self._results: dict[_SearchKey, list[dict[str, Any]]] = {}
+        # 同じクエリを同時に検索しないためのクエリごとのロック
+        self._key_locks: dict[_SearchKey, threading.Lock] = {}
+        # 推しID → その推しの未消化の要求
+        self._pending: dict[str, Counter] = {}
+        self.planned = 0
+        self.distinct = 0
+        self.executed = 0
+        self.shared = 0
+        self.released = 0
+        self.stats = get_cache_stats("search_plan")
+
+    def add(self, query: str, num_results: int, owner: Optional[str] = None) -> None:
+        """クエリの要求を登録（owner は要求した推しのID）"""
+        key = (query, num_results)
+        with self._lock:
+            self.planned += 1
+            if key not in self._remaining:
+                self.distinct += 1
+                self._remaining[key] = 0
+                self._key_locks[key] = threading.Lock()
+            self._remaining[key] += 1
+            if owner is not None:
+                self._pending.setdefault(owner, Counter())[key] += 1
+
+    def search(
+        self, client: GoogleSearchClient, query: str, num_results: int
+    ) -> list[dict[str, Any]]:
+        """計画済みのクエリは1回だけ検索し、2回目以降は同じ結果を返す
+
+        計画にない（または実行中の推しの要求を使い切った）クエリは、共有中の結果が
+        あればそれを返し、無ければそのまま検索する。
+        """
+        key = (query, num_results)
+        owner = _current_owner.get()
+        with self._lock:
+            key_lock = self._key_locks.get(key)
+            planned = key_lock is not None and self._take_slot(owner, key)
+            results = self._results.get(key)
+        if not planned:
+            if results is not None:
+                self._record(shared=True)
+                return results
+            results, shared = self._fetch(client, query, num_results)
+            self._record(shared)
+            return results
+
+        with key_lock:
+            with self._lock:
+                results = self._results.get(key)
+            shared = results is not None
+            if not shared:
+                try:
+                    results, shared = self._fetch(client, query, num_results)
+                except Exception:
+                    # 失敗した要求も消化する（結果は記録しない）
+                    self._consume(key)
+                    raise
+            self._consume(key, results)
+        self._record(shared)
+        return results
+
+    def _fetch(
+        self, client: GoogleSearchClient, query: str, num_results: int
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """検索する（他のシャードと共有していれば、その結果を使うことがある）"""
+        if self._shared_results is None:
+            return client.search(query, num_results=num_results), False
+        return self._shared_results.search(client, query, num_results)
+
+    def release(self, owner: str) -> int:
+        """推しの未消化の要求を取り消す（取り消した要求数を返す）"""
+        with self._lock:
+            pending = self._pending.pop(owner, None)
+            if not pending:
+                return 0
+            released = 0
+            for key, count in pending.items():
+                if count <= 0 or key not in self._remaining:
+                    continue
+                released += count
+                self._remaining[key] -= count
+                if self._remaining[key] <= 0:
+                    self._discard(key)
+            self.released += released
+            return released
+
+    def _take_slot(self, owner: Optional[str], key: _SearchKey) -> bool:
+        """実行中の推しの要求を1件使う（推しの指定が無ければ計画の要求を使う）"""
+        if owner is None:
+            return True
+        pending = self._pending.get(owner)
+        if not pending or pending[key] <= 0:
+            return False
+        pending[key] -= 1
+        return True
+
+    def _consume(
+        self, key: _SearchKey, results: Optional[list[dict[str, Any]]] = None
+    ) -> None:
+        """要求を1件消化し、残りの要求があれば結果を残す"""
+        with self._lock:
+            if key not in self._remaining:
+                return
+            self._remaining[key] -= 1
+            if self._remaining[key] > 0:
+                if results is not None:
+                    self._results[key] = results
+            else:
+                # 最後の要求が読んだら破棄する
+                self._discard(key)
+
+    def _discard(self, key: _SearchKey) -> None:
+        self._results.pop(key, None)
+        del self._remaining[key]
+        del self._key_locks[key]
+
+    def _record(self, shared: bool) -> None:
+        with self._lock:
+            if shared:
+                self.shared += 1
+            else:
+                self.executed += 1
+        if shared:
+            self.stats.record_hit()
+        else:
+            self.stats.record_miss()
+
+    def snapshot(self) -> dict[str, Any]:
+        """実際に要求された検索数・そのうち API を呼んだ数・共有した数などの集計
+
+        requested は executed + shared（登録したが要求されなかった分は released）。
+        """
+        with self._lock:
+            requested = self.executed + self.shared
+            return {
+                "planned": self.planned,
+                "distinct": self.distinct,
+                "requested": requested,
+                "executed": self.executed,
+                "shared": self.shared,
+                "released": self.released,
+                "executed_ratio": (
+                    round(self.executed / requested, 4) if requested else 1.0
+                ),
+            }
+
+
+def current_search_plan() -> Optional[SearchPlan]:
+    """実行中の scout-all の検索計画（無ければNone）"""
+    return _current.get()
+
+
+@contextmanager
+def search_plan_scope(
+    plan: SearchPlan, owner: Optional[str] = None
+) -> Iterator[SearchPlan]:
+    """ブロック内の ScoutAgent の検索に計画を適用する
+
+    owner（推しID）を指定すると、ブロック内の検索はその推しの要求を消化し、
+    ブロックを抜けるときに未消化の要求を取り消す。
+    """
+    token = _current.set(plan)
+    owner_token = _current_owner.set(owner)
+    try:
+        yield plan
+    finally:
+        _current_owner.reset(owner_token)
+        _current.reset(token)
+        if owner is not None:
+            plan.release(owner)
@@ -1,18 +1,32 @@
 """Trip Agent - 遠征プラン生成エージェント"""
+import asyncio
+from datetime import date
+from typing import Any, Awaitable, Callable, Optional
+
 import structlog
 
 from app.external.gemini_client import GeminiClient
-from app.external.google_maps import GoogleMapsClient
+from app.external.google_maps import MATRIX_MAX_ELEMENTS, GoogleMapsClient
+from app.models.event import EventModel
 from app.models.trip_plan import (
     AccommodationInfo,
     TransportInfo,
     TripPlanCreate,
 )
+from app.models.workflow_results import TripPlanResult
 from app.repositories.event_repository import EventRepository
+from app.repositories.trip_advice_cache_repository import TripAdviceCacheRepository
 from app.repositories.trip_repository import TripRepository
+from app.utils.region_utils import departure_region
 
 logger = structlog.get_logger(__name__)
 
+# バッチ生成時に同時実行する外部API呼び出しの上限
+TRIP_BATCH_CONCURRENCY = 8
+
+# アドバイスの重複排除キー（生成時の出発地, 会場, 開催日時）
+AdviceKey = tuple[str, str, str]
+
 
 class TripAgent:
     """遠征プランを自動生成するエージェント"""
@@ -23,11 +37,13 @@ class TripAgent:
         trip_repo: TripRepository,
         maps_client: GoogleMapsClient,
         gemini_client: GeminiClient,
+        advice_cache: Optional[TripAdviceCacheRepository] = None,
     ):
         self.event_repo = event_repo
         self.trip_repo = trip_repo
         self.maps_client = maps_client
         self.gemini_client = gemini_client
+        self.advice_cache = advice_cache
 
     async def generate_plan(
         self, event_id: str, user_id: str, departure: str
@@ -55,84 +71,358 @@ class TripAgent:
             if not event:
                 raise ValueError(f"Event not found: {event_id}")
 
-            destination = event.location or "会場未定"
+            destination = self._destination(event)
 
             # Google Maps APIでルート計算
             directions = self.maps_client.get_directions(departure, destination)
 
-            if directions:
-                # 交通情報を設定
-                transport = TransportInfo(
-                    mode="transit",
-                    duration_minutes=directions["duration_seconds"] // 60,
-                    distance_km=directions["distance_meters"] / 1000.0,
-                    estimated_cost=self._estimate_transport_cost(
-                        directions["distance_meters"] / 1000.0
-                    ),
-                    route_description=directions["duration_text"]
-                    + " - "
-                    + directions["distance_text"],
+            # Geminiでアドバイス生成（キャッシュがあれば再利用）
+            advice_key = self._advice_key(departure, event)
+            advice_by_key = await self._resolve_advice(
+                [advice_key],
+                lambda key: asyncio.to_thread(self._generate_advice, *key),
+            )
+            advice = advice_by_key[advice_key]
+
+            plan_data = self._build_plan(event, departure, directions, advice)
+            plan = self.trip_repo.create(user_id, plan_data)
+
+            logger.info(
+                "trip_generate_success",
+                event_id=event_id,
+                plan_id=plan.id,
+                total_cost=plan_data.total_estimated_cost,
+            )
+            return plan.id
+
+        except Exception as e:
+            logger.error(
+                "trip_generate_failed",
+                event_id=event_id,
+                error=str(e),
+            )
+            raise
+
+    async def generate_plans(
+        self, user_id: str, requests: list[tuple[str, str]]
+    ) -> list[TripPlanResult]:
+        """複数の (イベント, 出発地) の遠征プランをまとめて生成
+
+        イベントは1回のバッチ読み取りで取得し、距離・所要時間は Distance Matrix API で
+        まとめて求める。アドバイスはキャッシュをまとめて引き、ミスした組み合わせだけを
+        TRIP_BATCH_CONCURRENCY 件まで並行して生成する。
+        作成したプランは1回のバッチ書き込みで保存する。
+
+        Args:
+            user_id: ユーザーID
+            requests: (イベントID, 出発地) のリスト
+
+        Returns:
+            入力順の生成結果（イベントが存在しない場合は error を設定）
+        """
+        try:
+            logger.info("trip_batch_start", user_id=user_id, count=len(requests))
+
+            events = await asyncio.to_thread(
+                self.event_repo.get_many, [event_id for event_id, _ in requests]
+            )
+            targets = [
+                (event_id, departure, events[event_id])
+                for event_id, departure in requests
+                if event_id in events
+            ]
+
+            semaphore = asyncio.Semaphore(TRIP_BATCH_CONCURRENCY)
+
+            async def limited(func, *args, **kwargs):
+                async with semaphore:
+                    return await asyncio.to_thread(func, *args, **kwargs)
+
+            # 同じ出発地・会場の組み合わせは1回だけ求める
+            route_keys = list(
+                dict.fromkeys(
+                    (departure, self._destination(event))
+                    for _, departure, event in targets
                 )
-            else:
-                # ルート取得失敗時のデフォルト
-                transport = TransportInfo(
-                    mode="transit",
-                    duration_minutes=None,
-                    distance_km=None,
-                    estimated_cost=None,
-                    route_description="ルート情報を取得できませんでした",
+            )
+            advice_keys = list(
+                dict.fromkeys(
+                    self._advice_key(departure, event)
+                    for _, departure, event in targets
                 )
+            )
 
-            # 宿泊情報（簡易判定: 距離100km以上なら1泊）
-            needs_accommodation = (
-                transport.distance_km and transport.distance_km > 100
+            directions_by_route, advice_by_key = await asyncio.gather(
+                self._lookup_routes(route_keys, limited),
+                self._resolve_advice(
+                    advice_keys,
+                    lambda key: limited(self._generate_advice_safe, *key),
+                ),
             )
-            accommodation = AccommodationInfo(
-                nights=1 if needs_accommodation else 0,
-                estimated_cost=8000 if needs_accommodation else 0,
-                notes="遠方のため前泊を推奨" if needs_accommodation else "",
+
+            plans_data = [
+                self._build_plan(
+                    event,
+                    departure,
+                    directions_by_route[(departure, self._destination(event))],
+                    advice_by_key[self._advice_key(departure, event)],
+                )
+                for _, departure, event in targets
+            ]
+
+            created_plans = []
+            if plans_data:
+                created_plans = await asyncio.to_thread(
+                    self.trip_repo.create_batch, user_id, plans_data
+                )
+            created = iter(created_plans)
+
+            results = []
+            for event_id, departure in requests:
+                if event_id not in events:
+                    results.append(
+                        TripPlanResult(
+                            event_id=event_id,
+                            departure=departure,
+                            error=f"Event not found: {event_id}",
+                        )
+                    )
+                    continue
+                plan = next(created)
+                results.append(
+                    TripPlanResult(
+                        event_id=event_id,
+                        departure=departure,
+                        plan_id=plan.id,
+                        total_estimated_cost=plan.total_estimated_cost,
+                    )
+                )
+
+            logger.info(
+                "trip_batch_success",
+                user_id=user_id,
+                requested=len(requests),
+                created=len(plans_data),
+                routes=len(route_keys),
+                advice_calls=len(advice_keys),
             )
+            return results
 
-            # 合計費用
-            total_cost = (transport.estimated_cost or 0) + (
-                accommodation.estimated_cost or 0
+        except Exception as e:
+            logger.error("trip_batch_failed", user_id=user_id, error=str(e))
+            raise
+
+    async def _lookup_routes(
+        self, route_keys: list[tuple[str, str]], limited
+    ) -> dict[tuple[str, str], Optional[dict[str, Any]]]:
+        """(出発地, 会場) の距離・所要時間を Distance Matrix API でまとめて求める
+
+        出発地 × 会場 の全組み合わせが必要数に近ければ1つの行列として問い合わせ、
+        疎な場合は出発地ごとに必要な会場だけを問い合わせる（不要な要素の課金を避ける）。
+        """
+        if not route_keys:
+            return {}
+
+        departures = list(dict.fromkeys(departure for departure, _ in route_keys))
+        destinations = list(dict.fromkeys(destination for _, destination in route_keys))
+        if len(departures) * len(destinations) <= max(
+            MATRIX_MAX_ELEMENTS, 2 * len(route_keys)
+        ):
+            groups = [(departures, destinations)]
+        else:
+            by_departure: dict[str, list[str]] = {}
+            for departure, destination in route_keys:
+                by_departure.setdefault(departure, []).append(destination)
+            groups = [
+                ([departure], group_destinations)
+                for departure, group_destinations in by_departure.items()
+            ]
+
+        matrices = await asyncio.gather(
+            *(
+                limited(self._get_distance_matrix_safe, origins, group_destinations)
+                for origins, group_destinations in groups
             )
+        )
+        resolved: dict[tuple[str, str], Optional[dict[str, Any]]] = {}
+        for matrix in matrices:
+            resolved.update(matrix)
+        return {key: resolved.get(key) for key in route_keys}
 
-            # Geminiでアドバイス生成
-            advice = self.gemini_client.generate_trip_advice(
-                departure=departure,
-                destination=destination,
-                event_date=event.start_datetime.isoformat(),
+    def _get_distance_matrix_safe(
+        self, origins: list[str], destinations: list[str]
+    ) -> dict[tuple[str, str], Optional[dict[str, Any]]]:
+        """距離行列の取得（失敗時は空としてバッチ全体は継続）"""
+        try:
+            return self.maps_client.get_distance_matrix(origins, destinations)
+        except Exception as e:
+            logger.warning(
+                "trip_batch_distance_matrix_failed",
+                origins=len(origins),
+                destinations=len(destinations),
+                error=str(e),
             )
+            return {}
 
-            # 遠征プランを作成
-            plan_data = TripPlanCreate(
-                event_id=event_id,
-                departure=departure,
-                destination=destination,
-                transport=transport,
-                accommodation=accommodation,
-                total_estimated_cost=total_cost,
-                advice=advice,
+    async def _resolve_advice(
+        self,
+        advice_keys: list[AdviceKey],
+        generate: Callable[[AdviceKey], Awaitable[Optional[str]]],
+    ) -> dict[AdviceKey, Optional[str]]:
+        """キャッシュを引き、ミスした組み合わせだけアドバイスを生成してキャッシュに保存する"""
+        cached: dict[AdviceKey, str] = {}
+        cache_keys: dict[AdviceKey, str] = {}
+        if self.advice_cache is not None:
+            cache_keys = {key: self._cache_key(key) for key in advice_keys}
+            found = await asyncio.to_thread(
+                self._get_cached_advice_safe, list(cache_keys.values())
             )
+            cached = {
+                key: found[cache_key]
+                for key, cache_key in cache_keys.items()
+                if cache_key in found
+            }
 
-            plan = self.trip_repo.create(user_id, plan_data)
+        misses = [key for key in advice_keys if key not in cached]
+        generated = dict(
+            zip(misses, await asyncio.gather(*(generate(key) for key in misses)))
+        )
 
+        if self.advice_cache is not None:
             logger.info(
-                "trip_generate_success",
-                event_id=event_id,
-                plan_id=plan.id,
-                total_cost=total_cost,
+                "trip_advice_cache_miss" if misses else "trip_advice_cache_hit",
+                hits=len(cached),
+                misses=len(misses),
+                hit_rate=self.advice_cache.stats.hit_rate,
             )
-            return plan.id
+            fresh = {
+                cache_keys[key]: advice for key, advice in generated.items() if advice
+            }
+            if fresh:
+                await asyncio.to_thread(self._save_cached_advice_safe, fresh)
+
+        return {**cached, **generated}
 
+    def _get_cached_advice_safe(self, cache_keys: list[str]) -> dict[str, str]:
+        """キャッシュの取得（失敗時はすべてミスとして生成を続ける）"""
+        try:
+            return self.advice_cache.get_many(cache_keys)
         except Exception as e:
-            logger.error(
-                "trip_generate_failed",
-                event_id=event_id,
+            logger.warning("trip_advice_cache_read_failed", error=str(e))
+            return {}
+
+    def _save_cached_advice_safe(self, entries: dict[str, str]) -> None:
+        """キャッシュの保存（失敗してもプラン生成は継続）"""
+        try:
+            self.advice_cache.put_many(entries)
+        except Exception as e:
+            logger.warning("trip_advice_cache_write_failed", error=str(e))
+
+    def _generate_advice(
+        self, departure: str, destination: str, event_date: str
+    ) -> str:
+        """Geminiでアドバイスを生成"""
+        return self.gemini_client.generate_trip_advice(
+            departure=departure,
+            destination=destination,
+            event_date=event_date,
+        )
+
+    def _generate_advice_safe(
+        self, departure: str, destination: str, event_date: str
+    ) -> Optional[str]:
+        """アドバイス生成（失敗時は None としてバッチ全体は継続）"""
+        try:
+            return self._generate_advice(departure, destination, event_date)
+        except Exception as e:
+            logger.warning(
+                "trip_batch_advice_failed",
+                departure=departure,
+                destination=destination,
                 error=str(e),
             )
-            raise
+            return None
+
+    def _advice_key(self, departure: str, event: EventModel) -> AdviceKey:
+        """アドバイスの重複排除キー（出発地・会場・開催日時）
+
+        キャッシュを使う場合は、同じ地域のファンで使い回せるよう出発地を都道府県に、
+        開催日時を日付にまとめる（生成するアドバイスもその粒度になる）。
+        """
+        destination = self._destination(event)
+        if self.advice_cache is None:
+            return departure, destination, event.start_datetime.isoformat()
+        return (
+            departure_region(departure) or departure,
+            destination,
+            event.start_datetime.date().isoformat(),
+        )
+
+    def _cache_key(self, advice_key: AdviceKey) -> str:
+        """アドバイスの重複排除キーに対応するキャッシュのドキュメントID"""
+        departure_area, destination, event_date = advice_key
+        return self.advice_cache.cache_key(
+            destination, date.fromisoformat(event_date), departure_area
+        )
+
+    @staticmethod
+    def _destination(event: EventModel) -> str:
+        """イベントの会場（未定の場合は仮の値）"""
+        return event.location or "会場未定"
+
+    def _build_plan(
+        self,
+        event: EventModel,
+        departure: str,
+        directions: Optional[dict[str, Any]],
+        advice: Optional[str],
+    ) -> TripPlanCreate:
+        """ルート情報とアドバイスから遠征プランを組み立てる"""
+        if directions:
+            # 交通情報を設定
+            transport = TransportInfo(
+                mode="transit",
+                duration_minutes=directions["duration_seconds"] // 60,
+                distance_km=directions["distance_meters"] / 1000.0,
+                estimated_cost=self._estimate_transport_cost(
+                    directions["distance_meters"] / 1000.0
+                ),
+                route_description=directions["duration_text"]
+                + " - "
+                + directions["distance_text"],
+            )
+        else:
+            # ルート取得失敗時のデフォルト
+            transport = TransportInfo(
+                mode="transit",
+                duration_minutes=None,
+                distance_km=None,
+                estimated_cost=None,
+                route_description="ルート情報を取得できませんでした",
+            )
+
+        # 宿泊情報（簡易判定: 距離100km以上なら1泊）
+        needs_accommodation = transport.distance_km and transport.distance_km > 100
+        accommodation = AccommodationInfo(
+            nights=1 if needs_accommodation else 0,
+            estimated_cost=8000 if needs_accommodation else 0,
+            notes="遠方のため前泊を推奨" if needs_accommodation else "",
+        )
+
+        # 合計費用
+        total_cost = (transport.estimated_cost or 0) + (
+            accommodation.estimated_cost or 0
+        )
+
+        return TripPlanCreate(
+            event_id=event.id,
+            departure=departure,
+            destination=self._destination(event),
+            transport=transport,
+            accommodation=accommodation,
+            total_estimated_cost=total_cost,
+            advice=advice,
+        )
 
     def _estimate_transport_cost(self, distance_km: float) -> int:
         """交通費を概算（簡易計算）
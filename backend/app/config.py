@@ -15,10 +15,94 @@ class Settings(BaseSettings):
     # Google Search API
     google_search_api_key: str
     google_search_cx: str
+    # Custom Search の秒間レート（インスタンス単位）
+    google_search_qps: float = 5.0
+    google_search_burst: int = 5
+    # Custom Search の日次クォータ（google_search_shared_quota なら全インスタンスの合計）
+    google_search_daily_quota: int = 10000
+    # URGENT 以外の呼び出しが使えない日次クォータの予約枠
+    google_search_urgent_reserve: int = 200
+    # 日次クォータの使用数を Firestore で共有する（False ならインスタンスごとに数える）
+    google_search_shared_quota: bool = True
+    # 共有クォータから一度に予約する件数（未使用分は最大でインスタンス数 × この値失われる）
+    google_search_quota_block: int = 20
 
     # Google Maps API
     google_maps_api_key: str
 
+    # 外部APIのサーキットブレーカー
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_recovery_seconds: float = 30.0
+    circuit_breaker_max_recovery_seconds: float = 300.0
+
+    # 近似重複の判定結果を引き継ぐ対象（この日数以内に収集した判定済みの情報）
+    priority_reuse_max_age_days: float = 30.0
+
+    # 遠征アドバイスキャッシュの有効期間（秒）
+    trip_advice_cache_ttl_seconds: float = 3 * 24 * 60 * 60
+
+    # scout-all のシャード数（1 なら1つのリクエストで全推しを処理する）
+    scout_all_shard_count: int = 1
+    # /scout-all が /agent/scout-all/work を shard_count - 1 件送ってシャードを分担させる
+    # サービスのURL。同じインスタンスに集まらないよう、Cloud Run の同時リクエスト数
+    # （concurrency）を小さくしたサービスを指定する。空の場合は分散しないため、
+    # Cloud Scheduler などから /agent/scout-all/work を別途呼ぶ
+    scout_all_worker_url: str = ""
+    # 送ったワーカーの応答（全シャードの終了）を待つ上限（秒）
+    scout_all_worker_timeout_seconds: float = 3600.0
+    # シャードのリースの長さ（秒）。実行中は 1/3 ごとに延長する
+    scout_shard_lease_seconds: float = 600.0
+    # シャードごとの実行回数の上限（リース切れでの再実行を含む）
+    scout_shard_max_attempts: int = 3
+    # シャード間で検索結果を共有する際の、検索中のリースの長さ（秒）
+    scout_search_share_lease_seconds: float = 60.0
+    # 他のシャードの検索結果の保存を確認する間隔（秒）。確認ごとに倍にする
+    scout_search_share_poll_seconds: float = 0.5
+    # 保存を確認する間隔の上限（秒）
+    scout_search_share_max_poll_seconds: float = 5.0
+    # 他のシャードの検索を待つ上限（秒）。超えたら自分で検索する
+    scout_search_share_wait_seconds: float = 120.0
+    # 共有した検索結果を残す期間（秒）。scout-all の実行中は残す
+    scout_search_share_ttl_seconds: float = 24 * 60 * 60
+
+    # 推しごとのスカウト実行ロック（同じ推しのスカウトの重複実行を防ぐ）
+    scout_lock_enabled: bool = True
+    # ロックのリースの長さ（秒）。実行中は 1/3 ごとに延長する
+    scout_lock_ttl_seconds: float = 300.0
+    # 他のインスタンスの実行の終了を確認する間隔（秒）
+    scout_lock_poll_seconds: float = 2.0
+    # 他のインスタンスの実行を待つ上限（秒）
+    scout_lock_wait_timeout_seconds: float = 900.0
+
+    # 起動時のウォームアップ（共有クライアントの生成・接続の確立）
+    warmup_enabled: bool = True
+    # 各依存先に軽量な疎通確認の呼び出しを行う
+    warmup_probe: bool = False
+    # ウォームアップ全体の上限（超えた場合も起動は続行する）
+    warmup_timeout_seconds: float = 20.0
+
+    # gzip 圧縮するレスポンス本文の最小サイズ（バイト）
+    gzip_minimum_size: int = 1024
+    # gzip の圧縮レベル（IDが大半の本文では高レベルにしてもほとんど小さくならず、時間だけ増える）
+    gzip_compress_level: int = 1
+
+    # リクエスト内で同じドキュメントを get_by_id で読み直さない（アイデンティティマップ）
+    repository_identity_map: bool = True
+
+    # ログ出力
+    log_level: str = "INFO"
+    # JSONへの変換と書き出しを別スレッドで行う
+    log_async: bool = True
+    # 別スレッドへ渡すキューの上限（満杯の間のログは捨てる）
+    log_queue_size: int = 10000
+    # イベント名 → 出力する割合（debug / info のみ。JSONで指定）
+    log_sample_rates: dict[str, float] = {
+        "scout_skip_duplicate": 0.01,
+        "priority_judged": 0.1,
+    }
+    # イベント名 → 1秒あたりの出力上限（debug / info のみ。JSONで指定）
+    log_rate_limits: dict[str, float] = {}
+
     # Frontend URL (CORS)
     frontend_url: str = "http://localhost:3000"
 
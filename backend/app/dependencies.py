@@ -1,18 +1,21 @@
 """依存性注入"""
 from typing import Optional
 
-from fastapi import Header, HTTPException
+from fastapi import Depends, Header, HTTPException
 
 from app.agents.budget_agent import BudgetAgent
 from app.agents.calendar_agent import CalendarAgent
+from app.agents.event_agent import EventAgent
 from app.agents.priority_agent import PriorityAgent
 from app.agents.root_agent import RootAgent
 from app.agents.scout_agent import ScoutAgent
+from app.agents.scout_coordinator import ScoutCoordinator
+from app.agents.scout_lock import ScoutRunLock
 from app.agents.trip_agent import TripAgent
 from app.config import settings
-from app.external.gemini_client import GeminiClient
+from app.external.gemini_client import get_shared_gemini_client
 from app.external.google_maps import GoogleMapsClient
-from app.external.google_search import GoogleSearchClient
+from app.external.google_search import get_shared_search_client
 from app.repositories.event_repository import EventRepository
 from app.repositories.expense_repository import ExpenseRepository
 from app.repositories.firestore_client import get_firestore_client
@@ -20,6 +23,9 @@ from app.repositories.info_repository import InfoRepository
 from app.repositories.job_repository import JobRepository
 from app.repositories.network_repository import NetworkRepository
 from app.repositories.oshi_repository import OshiRepository
+from app.repositories.scout_lock_repository import ScoutLockRepository
+from app.repositories.search_result_repository import SearchResultRepository
+from app.repositories.trip_advice_cache_repository import TripAdviceCacheRepository
 from app.repositories.trip_repository import TripRepository
 
 
@@ -50,6 +56,11 @@ def get_trip_repository():
     return TripRepository(get_db())
 
 
+def get_trip_advice_cache_repository():
+    """TripAdviceCacheRepositoryを取得"""
+    return TripAdviceCacheRepository(get_db())
+
+
 def get_expense_repository():
     """ExpenseRepositoryを取得"""
     return ExpenseRepository(get_db())
@@ -65,15 +76,25 @@ def get_network_repository():
     return NetworkRepository(get_db())
 
 
+def get_scout_lock_repository():
+    """ScoutLockRepositoryを取得"""
+    return ScoutLockRepository(get_db())
+
+
+def get_search_result_repository():
+    """SearchResultRepositoryを取得"""
+    return SearchResultRepository(get_db())
+
+
 # 外部APIクライアント
 def get_google_search_client():
-    """GoogleSearchClientを取得"""
-    return GoogleSearchClient()
+    """GoogleSearchClientを取得（プロセス内で共有）"""
+    return get_shared_search_client()
 
 
 def get_gemini_client():
-    """GeminiClientを取得"""
-    return GeminiClient()
+    """GeminiClientを取得（プロセス内で共有）"""
+    return get_shared_gemini_client()
 
 
 def get_google_maps_client():
@@ -107,6 +128,15 @@ def get_calendar_agent():
     )
 
 
+def get_event_agent():
+    """EventAgentを取得"""
+    return EventAgent(
+        info_repo=get_info_repository(),
+        event_repo=get_event_repository(),
+        gemini_client=get_gemini_client(),
+    )
+
+
 def get_trip_agent():
     """TripAgentを取得"""
     return TripAgent(
@@ -114,6 +144,7 @@ def get_trip_agent():
         trip_repo=get_trip_repository(),
         maps_client=get_google_maps_client(),
         gemini_client=get_gemini_client(),
+        advice_cache=get_trip_advice_cache_repository(),
     )
 
 
@@ -125,6 +156,18 @@ def get_budget_agent():
     )
 
 
+def get_scout_lock() -> Optional[ScoutRunLock]:
+    """ScoutRunLockを取得（無効化されていればNone）"""
+    if not settings.scout_lock_enabled:
+        return None
+    return ScoutRunLock(
+        lock_repo=get_scout_lock_repository(),
+        ttl_seconds=settings.scout_lock_ttl_seconds,
+        poll_seconds=settings.scout_lock_poll_seconds,
+        wait_timeout_seconds=settings.scout_lock_wait_timeout_seconds,
+    )
+
+
 def get_root_agent():
     """RootAgentを取得"""
     return RootAgent(
@@ -134,6 +177,30 @@ def get_root_agent():
         gemini_client=get_gemini_client(),
         info_repo=get_info_repository(),
         network_repo=get_network_repository(),
+        event_agent=get_event_agent(),
+        scout_lock=get_scout_lock(),
+    )
+
+
+def get_scout_coordinator(
+    root_agent: RootAgent = Depends(get_root_agent),
+    job_repo: JobRepository = Depends(get_job_repository),
+    oshi_repo: OshiRepository = Depends(get_oshi_repository),
+    search_result_repo: SearchResultRepository = Depends(
+        get_search_result_repository
+    ),
+):
+    """ScoutCoordinatorを取得（RootAgent はエンドポイントと同じインスタンス）"""
+    return ScoutCoordinator(
+        job_repo=job_repo,
+        oshi_repo=oshi_repo,
+        root_agent=root_agent,
+        lease_seconds=settings.scout_shard_lease_seconds,
+        max_attempts=settings.scout_shard_max_attempts,
+        search_result_repo=search_result_repo,
+        worker_url=settings.scout_all_worker_url,
+        internal_api_key=settings.internal_api_key,
+        worker_timeout_seconds=settings.scout_all_worker_timeout_seconds,
     )
 
 
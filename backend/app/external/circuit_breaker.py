@@ -0,0 +1,241 @@
+"""外部API呼び出しのサーキットブレーカー
+
+依存先ごとに連続失敗を数え、閾値を超えたら一定時間（オープン期間）呼び出しを遮断して即座に失敗させる。
+オープン期間の経過後はハーフオープン状態で少数のプローブ呼び出しだけを通し、
+成功すればクローズ、失敗すればオープン期間を倍にして（ジッター付き）再び遮断する。
+
+tenacity のリトライは CircuitOpenError をリトライしないよう設定すること。
+"""
+import random
+import threading
+import time
+from enum import Enum
+from typing import Any, Callable, Optional, TypeVar
+
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitState(str, Enum):
+    """サーキットの状態"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """サーキットがオープン中のため呼び出しを遮断した"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit is open (retry after {retry_after:.1f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """HTTP系の例外からステータスコードを取り出す（httpx / googleapiclient / google-api-core）"""
+    response = getattr(exc, "response", None)
+    if response is not None and isinstance(getattr(response, "status_code", None), int):
+        return response.status_code
+    resp = getattr(exc, "resp", None)
+    if resp is not None and getattr(resp, "status", None) is not None:
+        try:
+            return int(resp.status)
+        except (TypeError, ValueError):
+            return None
+    code = getattr(exc, "code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_dependency_failure(exc: BaseException) -> bool:
+    """依存先の障害とみなす例外か判定
+
+    リクエスト内容に起因する 4xx（408・429 を除く）は依存先の障害ではないため数えない。
+    """
+    status = _status_code(exc)
+    if status is not None and 400 <= status < 500 and status not in (408, 429):
+        return False
+    return True
+
+
+class CircuitBreaker:
+    """依存先ごとのサーキットブレーカー（スレッドセーフ）
+
+    Args:
+        name: 依存先の名前
+        failure_threshold: オープンに遷移する連続失敗回数
+        recovery_timeout: 最初のオープン期間（秒）
+        max_recovery_timeout: オープン期間の上限（秒）
+        jitter: オープン期間に加える揺らぎの割合（0.2 なら ±20%）
+        half_open_max_calls: ハーフオープン中に同時に通すプローブ数
+        is_failure: 失敗として数える例外の判定関数
+        clock: 単調増加時計（テスト用）
+        rng: ジッター用の乱数生成器（テスト用）
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        max_recovery_timeout: float = 300.0,
+        jitter: float = 0.2,
+        half_open_max_calls: int = 1,
+        is_failure: Callable[[BaseException], bool] = is_dependency_failure,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.max_recovery_timeout = max(recovery_timeout, max_recovery_timeout)
+        self.jitter = jitter
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._is_failure = is_failure
+        self._clock = clock
+        self._rng = rng or random.Random()
+
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._open_count = 0  # 回復せずに連続でオープンした回数（バックオフの指数）
+        self._open_until = 0.0
+        self._half_open_in_flight = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """現在の状態（オープン期間が過ぎていればハーフオープン）"""
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == CircuitState.OPEN and self._clock() >= self._open_until:
+            self._state = CircuitState.HALF_OPEN
+            self._half_open_in_flight = 0
+            logger.info("circuit_half_open", circuit=self.name)
+
+    def _open(self) -> None:
+        base = min(
+            self.recovery_timeout * (2 ** self._open_count), self.max_recovery_timeout
+        )
+        duration = base * (1 + self._rng.uniform(-self.jitter, self.jitter))
+        self._open_count += 1
+        self._state = CircuitState.OPEN
+        self._open_until = self._clock() + duration
+        self._half_open_in_flight = 0
+        logger.warning(
+            "circuit_opened",
+            circuit=self.name,
+            open_seconds=round(duration, 2),
+            consecutive_failures=self._consecutive_failures,
+        )
+
+    def before_call(self) -> None:
+        """呼び出し前の判定（遮断する場合は CircuitOpenError）"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CircuitState.OPEN:
+                raise CircuitOpenError(self.name, self._open_until - self._clock())
+            if self._state == CircuitState.HALF_OPEN:
+                if self._half_open_in_flight >= self.half_open_max_calls:
+                    # プローブの結果が出るまで他の呼び出しは遮断する
+                    raise CircuitOpenError(self.name, 0.0)
+                self._half_open_in_flight += 1
+
+    def record_success(self) -> None:
+        """呼び出し成功を記録"""
+        with self._lock:
+            if self._state != CircuitState.CLOSED:
+                logger.info("circuit_closed", circuit=self.name)
+            self._state = CircuitState.CLOSED
+            self._consecutive_failures = 0
+            self._open_count = 0
+            self._half_open_in_flight = 0
+
+    def record_failure(self, exc: BaseException) -> None:
+        """呼び出し失敗を記録"""
+        with self._lock:
+            if not self._is_failure(exc):
+                # 依存先は応答しているため、プローブとしては成功扱い
+                if self._state == CircuitState.HALF_OPEN:
+                    self._state = CircuitState.CLOSED
+                    self._open_count = 0
+                    self._half_open_in_flight = 0
+                self._consecutive_failures = 0
+                return
+
+            self._consecutive_failures += 1
+            if self._state == CircuitState.HALF_OPEN:
+                self._open()
+            elif (
+                self._state == CircuitState.CLOSED
+                and self._consecutive_failures >= self.failure_threshold
+            ):
+                self._open()
+
+    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """サーキットブレーカー経由で関数を呼び出す
+
+        Raises:
+            CircuitOpenError: サーキットがオープン中の場合
+        """
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self) -> dict[str, Any]:
+        """ヘルスチェック用の状態"""
+        with self._lock:
+            self._maybe_half_open()
+            retry_after = 0.0
+            if self._state == CircuitState.OPEN:
+                retry_after = max(0.0, self._open_until - self._clock())
+            return {
+                "state": self._state.value,
+                "consecutive_failures": self._consecutive_failures,
+                "retry_after_seconds": round(retry_after, 1),
+            }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """依存先名に対応するプロセス共有のサーキットブレーカーを取得"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name=name,
+                failure_threshold=settings.circuit_breaker_failure_threshold,
+                recovery_timeout=settings.circuit_breaker_recovery_seconds,
+                max_recovery_timeout=settings.circuit_breaker_max_recovery_seconds,
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+def circuit_breaker_states() -> dict[str, dict[str, Any]]:
+    """生成済みの全サーキットブレーカーの状態"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+def reset_circuit_breakers() -> None:
+    """全サーキットブレーカーを破棄（テスト用）"""
+    with _breakers_lock:
+        _breakers.clear()
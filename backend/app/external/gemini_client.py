@@ -1,12 +1,18 @@
 """Gemini APIクライアント"""
 import json
+import threading
 from typing import Any, Optional
 
-import google.generativeai as genai
 import structlog
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import (
+    retry,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
 
 from app.config import settings
+from app.external.circuit_breaker import CircuitOpenError, get_circuit_breaker
 from app.models.info import Priority
 
 logger = structlog.get_logger(__name__)
@@ -16,12 +22,20 @@ class GeminiClient:
     """Gemini APIクライアント"""
 
     def __init__(self):
+        # google.generativeai は読み込みに時間がかかるため、初回のクライアント生成時に読み込む
+        import google.generativeai as genai
+
         genai.configure(api_key=settings.gemini_api_key)
         self.model = genai.GenerativeModel("gemini-2.0-flash-exp")
 
+    def _generate_content(self, prompt: str) -> Any:
+        """サーキットブレーカー経由で Gemini API を呼び出す"""
+        return get_circuit_breaker("gemini").call(self.model.generate_content, prompt)
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type(CircuitOpenError),
         reraise=True,
     )
     def generate(self, prompt: str) -> str:
@@ -35,7 +49,7 @@ class GeminiClient:
         """
         try:
             logger.info("gemini_generate_start", prompt_length=len(prompt))
-            response = self.model.generate_content(prompt)
+            response = self._generate_content(prompt)
             result = response.text
             logger.info("gemini_generate_success", result_length=len(result))
             return result
@@ -46,6 +60,7 @@ class GeminiClient:
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type(CircuitOpenError),
         reraise=True,
     )
     def classify_priority(
@@ -100,7 +115,7 @@ URL: {url}{snippet_section}
             logger.info(
                 "classify_priority_start", title=title, url_length=len(url)
             )
-            response = self.model.generate_content(prompt)
+            response = self._generate_content(prompt)
             result_text = response.text.strip()
 
             # JSONパース
@@ -130,6 +145,7 @@ URL: {url}{snippet_section}
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type(CircuitOpenError),
         reraise=True,
     )
     def generate_oshi_summary(
@@ -173,7 +189,7 @@ URL: {url}{snippet_section}
                 oshi_name=oshi_name,
                 info_count=len(infos),
             )
-            response = self.model.generate_content(prompt)
+            response = self._generate_content(prompt)
             summary = response.text.strip()
 
             logger.info(
@@ -194,6 +210,7 @@ URL: {url}{snippet_section}
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type(CircuitOpenError),
         reraise=True,
     )
     def extract_event_info(
@@ -233,7 +250,7 @@ URL: {url}{snippet_section}
             logger.info(
                 "extract_event_info_start", title=title, content_length=len(content)
             )
-            response = self.model.generate_content(prompt)
+            response = self._generate_content(prompt)
             result_text = response.text.strip()
 
             # JSONパース
@@ -259,6 +276,101 @@ URL: {url}{snippet_section}
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type(CircuitOpenError),
+        reraise=True,
+    )
+    def extract_events_batch(
+        self, items: list[dict[str, str]]
+    ) -> dict[str, dict[str, Any]]:
+        """複数の情報からイベント情報を1回の呼び出しでまとめて抽出
+
+        Args:
+            items: {"id", "title", "content"} のリスト
+
+        Returns:
+            {id: イベント情報}（イベントでない情報は含まない）
+
+        Raises:
+            Exception: API呼び出しの失敗や応答がJSON配列でない場合（リトライ後も失敗した
+                場合は呼び出し元で1件ずつの抽出に切り替える）
+        """
+        if not items:
+            return {}
+
+        try:
+            # プロンプトを短く保つため、IDは連番で渡して応答から引き戻す
+            items_text = "\n\n".join(
+                f"[{index}]\nタイトル: {item['title']}\n内容: {item['content']}"
+                for index, item in enumerate(items, 1)
+            )
+
+            prompt = f"""以下の{len(items)}件の情報それぞれからイベント情報を抽出してください。
+
+{items_text}
+
+各情報について、イベント（ライブ、握手会、イベント出演など）の情報がある場合は以下の形式、
+ない場合は {{"index": 番号, "is_event": false}} とし、全件分をJSON配列のみで回答してください:
+[
+  {{
+    "index": 1,
+    "is_event": true,
+    "title": "イベント名",
+    "start_datetime": "2024-12-25T19:00:00",
+    "end_datetime": "2024-12-25T21:00:00",
+    "location": "会場名",
+    "description": "イベント詳細"
+  }}
+]
+
+日時はISO 8601形式で記述してください。
+"""
+
+            logger.info("extract_events_batch_start", item_count=len(items))
+            response = self._generate_content(prompt)
+            result_text = response.text.strip()
+
+            # JSONパース
+            if result_text.startswith("```json"):
+                result_text = result_text[7:]
+            if result_text.startswith("```"):
+                result_text = result_text[3:]
+            if result_text.endswith("```"):
+                result_text = result_text[:-3]
+            result_text = result_text.strip()
+
+            results = json.loads(result_text)
+            if not isinstance(results, list):
+                logger.warning(
+                    "extract_events_batch_invalid_format", result=result_text[:200]
+                )
+                raise ValueError("extract_events_batch response is not a JSON array")
+
+            events = {}
+            for result in results:
+                if not isinstance(result, dict) or not result.get("is_event", False):
+                    continue
+                index = result.get("index")
+                if not isinstance(index, int) or not 1 <= index <= len(items):
+                    continue
+                events[items[index - 1]["id"]] = result
+
+            logger.info(
+                "extract_events_batch_success",
+                item_count=len(items),
+                event_count=len(events),
+            )
+            return events
+
+        except Exception as e:
+            logger.error(
+                "extract_events_batch_failed", item_count=len(items), error=str(e)
+            )
+            raise
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type(CircuitOpenError),
         reraise=True,
     )
     def generate_trip_advice(
@@ -295,7 +407,7 @@ URL: {url}{snippet_section}
                 departure=departure,
                 destination=destination,
             )
-            response = self.model.generate_content(prompt)
+            response = self._generate_content(prompt)
             advice = response.text.strip()
 
             logger.info(
@@ -318,6 +430,7 @@ URL: {url}{snippet_section}
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type(CircuitOpenError),
         reraise=True,
     )
     def discover_network(
@@ -374,7 +487,7 @@ URL: {url}{snippet_section}
                 oshi_name=oshi_name,
                 category=category,
             )
-            response = self.model.generate_content(prompt)
+            response = self._generate_content(prompt)
             result_text = response.text.strip()
 
             # JSONパース
@@ -410,6 +523,7 @@ URL: {url}{snippet_section}
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type(CircuitOpenError),
         reraise=True,
     )
     def generate_budget_advice(
@@ -444,7 +558,7 @@ URL: {url}{snippet_section}
 """
 
             logger.info("generate_budget_advice_start", expenses_count=len(expenses))
-            response = self.model.generate_content(prompt)
+            response = self._generate_content(prompt)
             advice = response.text.strip()
 
             logger.info(
@@ -461,3 +575,19 @@ URL: {url}{snippet_section}
                 error=str(e),
             )
             raise
+
+
+_shared_client: Optional[GeminiClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_gemini_client() -> GeminiClient:
+    """プロセス内で共有する GeminiClient を取得
+
+    モデルの生成と API キーの設定をリクエストごとに行わないよう使い回す。
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = GeminiClient()
+        return _shared_client
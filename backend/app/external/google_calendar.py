@@ -1,15 +1,40 @@
 """Google Calendar APIクライアント"""
-from datetime import datetime
-from typing import Optional
+import json
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Optional
 
 import structlog
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import (
+    retry,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from app.external.circuit_breaker import CircuitOpenError, get_circuit_breaker
 
 logger = structlog.get_logger(__name__)
 
+# 1回のバッチHTTPリクエストに含められる Calendar API の呼び出し数の上限
+CALENDAR_BATCH_LIMIT = 50
+
+
+@lru_cache(maxsize=1)
+def calendar_discovery_document() -> dict[str, Any]:
+    """Calendar API v3 のディスカバリードキュメント
+
+    google-api-python-client に同梱されたもの（静的ディスカバリー）を一度だけ読み込み、
+    プロセス内で使い回す。トークンごとのクライアント生成ではネットワークアクセスも
+    JSONの再読み込みも発生しない。
+    """
+    from googleapiclient.discovery_cache import get_static_doc
+
+    document = get_static_doc("calendar", "v3")
+    if document is None:
+        raise RuntimeError("calendar v3 discovery document is not bundled")
+    return json.loads(document)
+
 
 class GoogleCalendarClient:
     """Google Calendar APIクライアント"""
@@ -19,12 +44,52 @@ class GoogleCalendarClient:
         Args:
             access_token: OAuth2アクセストークン
         """
+        # Google API の SDK は読み込みに時間がかかるため、初回のクライアント生成時に読み込む
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build_from_document
+
         self.credentials = Credentials(token=access_token)
-        self.service = build("calendar", "v3", credentials=self.credentials)
+        self.service = build_from_document(
+            calendar_discovery_document(), credentials=self.credentials
+        )
+
+    @staticmethod
+    def build_event_body(
+        summary: str,
+        start_time: datetime,
+        end_time: Optional[datetime] = None,
+        location: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """イベント登録APIのリクエストボディを組み立てる"""
+        if end_time is None:
+            # 終了時刻が未指定の場合は開始時刻+1時間
+            end_time = start_time + timedelta(hours=1)
+
+        event_body = {
+            "summary": summary,
+            "start": {
+                "dateTime": start_time.isoformat(),
+                "timeZone": "Asia/Tokyo",
+            },
+            "end": {
+                "dateTime": end_time.isoformat(),
+                "timeZone": "Asia/Tokyo",
+            },
+        }
+
+        if location:
+            event_body["location"] = location
+
+        if description:
+            event_body["description"] = description
+
+        return event_body
 
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type(CircuitOpenError),
         reraise=True,
     )
     def create_event(
@@ -48,29 +113,9 @@ class GoogleCalendarClient:
             作成されたイベントID
         """
         try:
-            if end_time is None:
-                # 終了時刻が未指定の場合は開始時刻+1時間
-                from datetime import timedelta
-
-                end_time = start_time + timedelta(hours=1)
-
-            event_body = {
-                "summary": summary,
-                "start": {
-                    "dateTime": start_time.isoformat(),
-                    "timeZone": "Asia/Tokyo",
-                },
-                "end": {
-                    "dateTime": end_time.isoformat(),
-                    "timeZone": "Asia/Tokyo",
-                },
-            }
-
-            if location:
-                event_body["location"] = location
-
-            if description:
-                event_body["description"] = description
+            event_body = self.build_event_body(
+                summary, start_time, end_time, location, description
+            )
 
             logger.info(
                 "calendar_create_event_start",
@@ -78,11 +123,8 @@ class GoogleCalendarClient:
                 start_time=start_time.isoformat(),
             )
 
-            event = (
-                self.service.events()
-                .insert(calendarId="primary", body=event_body)
-                .execute()
-            )
+            request = self.service.events().insert(calendarId="primary", body=event_body)
+            event = get_circuit_breaker("google_calendar").call(request.execute)
 
             event_id = event["id"]
             logger.info(
@@ -95,3 +137,70 @@ class GoogleCalendarClient:
         except Exception as e:
             logger.error("calendar_create_event_failed", summary=summary, error=str(e))
             raise
+
+    def create_events(
+        self, event_bodies: list[dict[str, Any]]
+    ) -> list[tuple[Optional[str], Optional[str]]]:
+        """複数のカレンダーイベントをバッチHTTPリクエストで作成
+
+        CALENDAR_BATCH_LIMIT 件ごとに1回のHTTPリクエストで送信する。
+        登録は冪等ではないため、バッチ全体の自動リトライは行わない。
+        失敗した項目はエラーとして返すので、呼び出し側で未登録のまま残して再実行すること。
+
+        Args:
+            event_bodies: build_event_body で組み立てたリクエストボディのリスト
+
+        Returns:
+            入力順の (作成されたイベントID, エラー内容) のリスト
+        """
+        results: list[tuple[Optional[str], Optional[str]]] = [
+            (None, None)
+        ] * len(event_bodies)
+
+        def on_response(request_id: str, response: dict, exception: Exception):
+            index = int(request_id)
+            if exception is not None:
+                results[index] = (None, str(exception))
+            else:
+                results[index] = (response["id"], None)
+
+        try:
+            logger.info("calendar_create_events_start", count=len(event_bodies))
+            breaker = get_circuit_breaker("google_calendar")
+            for start in range(0, len(event_bodies), CALENDAR_BATCH_LIMIT):
+                batch = self.service.new_batch_http_request(callback=on_response)
+                for index in range(
+                    start, min(start + CALENDAR_BATCH_LIMIT, len(event_bodies))
+                ):
+                    batch.add(
+                        self.service.events().insert(
+                            calendarId="primary", body=event_bodies[index]
+                        ),
+                        request_id=str(index),
+                    )
+                try:
+                    breaker.call(batch.execute)
+                except Exception as e:
+                    # このバッチの項目だけ失敗として扱い、残りのバッチは続行する
+                    logger.warning(
+                        "calendar_create_events_batch_failed",
+                        start=start,
+                        error=str(e),
+                    )
+                    for index in range(
+                        start, min(start + CALENDAR_BATCH_LIMIT, len(event_bodies))
+                    ):
+                        if results[index] == (None, None):
+                            results[index] = (None, str(e))
+
+            failed = sum(1 for _, error in results if error)
+            logger.info(
+                "calendar_create_events_success",
+                count=len(event_bodies),
+                failed=failed,
+            )
+            return results
+
+        except Exception as e:
+            logger.error("calendar_create_events_failed", error=str(e))
+            raise
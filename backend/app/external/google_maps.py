@@ -1,17 +1,109 @@
 """Google Maps APIクライアント"""
-from typing import Any, Optional
+import math
+import threading
+from typing import TYPE_CHECKING, Any, Optional
 
 import structlog
-from googleapiclient.discovery import build
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import (
+    retry,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
 
 from app.config import settings
+from app.external.circuit_breaker import CircuitOpenError, get_circuit_breaker
+
+if TYPE_CHECKING:
+    import httpx
 
 logger = structlog.get_logger(__name__)
 
+MAPS_API_BASE_URL = "https://maps.googleapis.com"
+
+# Distance Matrix API の1リクエストあたりの上限
+MATRIX_MAX_ORIGINS = 25
+MATRIX_MAX_DESTINATIONS = 25
+MATRIX_MAX_ELEMENTS = 100
+
+
+def plan_matrix_chunks(
+    origins: list[str], destinations: list[str]
+) -> list[tuple[list[str], list[str]]]:
+    """N×M の組み合わせを API 上限内のリクエスト単位に分割する
+
+    出発地 × 目的地 のブロックに分け、各ブロックの要素数が上限を超えない範囲で
+    リクエスト数が最小になるブロックの大きさを選ぶ。
+
+    Examples:
+        >>> origins = [f"o{i}" for i in range(30)]
+        >>> [(len(o), len(d)) for o, d in plan_matrix_chunks(origins, ["venue"])]
+        [(25, 1), (5, 1)]
+        >>> origins = [f"o{i}" for i in range(10)]
+        >>> destinations = [f"d{i}" for i in range(30)]
+        >>> [(len(o), len(d)) for o, d in plan_matrix_chunks(origins, destinations)]
+        [(10, 10), (10, 10), (10, 10)]
+    """
+    if not origins or not destinations:
+        return []
+
+    def request_count(destination_chunk: int) -> int:
+        origin_chunk = min(MATRIX_MAX_ORIGINS, MATRIX_MAX_ELEMENTS // destination_chunk)
+        return math.ceil(len(origins) / origin_chunk) * math.ceil(
+            len(destinations) / destination_chunk
+        )
+
+    # 同数なら目的地側を大きく取る（行が少ないほどURLが短い）
+    destination_chunk = min(
+        range(1, min(MATRIX_MAX_DESTINATIONS, len(destinations)) + 1),
+        key=lambda size: (request_count(size), -size),
+    )
+    origin_chunk = min(MATRIX_MAX_ORIGINS, MATRIX_MAX_ELEMENTS // destination_chunk)
+
+    return [
+        (
+            origins[o_start : o_start + origin_chunk],
+            destinations[d_start : d_start + destination_chunk],
+        )
+        for o_start in range(0, len(origins), origin_chunk)
+        for d_start in range(0, len(destinations), destination_chunk)
+    ]
+
+
+_http_client: Optional["httpx.Client"] = None
+_http_client_lock = threading.Lock()
+
+
+def get_maps_http_client() -> "httpx.Client":
+    """プロセス内で共有する Maps API 用のHTTPクライアントを取得
+
+    呼び出しごとに接続（TLSハンドシェイク）を張り直さないよう、
+    コネクションプールを持つ httpx.Client を使い回す。httpx.Client はスレッドセーフ。
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            import httpx
+
+            _http_client = httpx.Client(
+                base_url=MAPS_API_BASE_URL,
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return _http_client
+
+
+def close_maps_http_client() -> None:
+    """共有HTTPクライアントの接続を閉じる（シャットダウン時）"""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+
 
 class GoogleMapsClient:
-    """Google Maps APIクライアント（Directions API）"""
+    """Google Maps APIクライアント（Directions API / Distance Matrix API）"""
 
     def __init__(self):
         self.api_key = settings.google_maps_api_key
@@ -19,6 +111,7 @@ class GoogleMapsClient:
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type(CircuitOpenError),
         reraise=True,
     )
     def get_directions(
@@ -35,8 +128,6 @@ class GoogleMapsClient:
             ルート情報（distance, duration, stepsなど）
         """
         try:
-            import httpx
-
             logger.info(
                 "maps_directions_start",
                 origin=origin,
@@ -44,7 +135,7 @@ class GoogleMapsClient:
                 mode=mode,
             )
 
-            url = "https://maps.googleapis.com/maps/api/directions/json"
+            url = "/maps/api/directions/json"
             params = {
                 "origin": origin,
                 "destination": destination,
@@ -53,8 +144,12 @@ class GoogleMapsClient:
                 "key": self.api_key,
             }
 
-            response = httpx.get(url, params=params, timeout=30.0)
-            response.raise_for_status()
+            def request() -> "httpx.Response":
+                response = get_maps_http_client().get(url, params=params)
+                response.raise_for_status()
+                return response
+
+            response = get_circuit_breaker("google_maps").call(request)
             data = response.json()
 
             if data["status"] != "OK":
@@ -108,6 +203,106 @@ class GoogleMapsClient:
             )
             raise
 
+    def get_distance_matrix(
+        self, origins: list[str], destinations: list[str], mode: str = "transit"
+    ) -> dict[tuple[str, str], Optional[dict[str, Any]]]:
+        """複数の出発地・目的地の距離と所要時間をまとめて取得
+
+        N×M の組み合わせを API 上限（25 × 25、100要素）内のリクエストに分割して問い合わせる。
+        経路が見つからない組み合わせ、失敗したリクエストに含まれる組み合わせは None になる。
+
+        Args:
+            origins: 出発地のリスト
+            destinations: 目的地のリスト
+            mode: 移動手段（transit, driving, walking, bicycling）
+
+        Returns:
+            (出発地, 目的地) をキーとする距離情報
+            （distance_meters, distance_text, duration_seconds, duration_text）
+        """
+        origins = list(dict.fromkeys(origins))
+        destinations = list(dict.fromkeys(destinations))
+        results: dict[tuple[str, str], Optional[dict[str, Any]]] = {
+            (origin, destination): None
+            for origin in origins
+            for destination in destinations
+        }
+        chunks = plan_matrix_chunks(origins, destinations)
+
+        logger.info(
+            "maps_distance_matrix_start",
+            origins=len(origins),
+            destinations=len(destinations),
+            requests=len(chunks),
+        )
+
+        for chunk_origins, chunk_destinations in chunks:
+            try:
+                data = self._fetch_distance_matrix(
+                    chunk_origins, chunk_destinations, mode
+                )
+            except Exception as e:
+                logger.error(
+                    "maps_distance_matrix_chunk_failed",
+                    origins=len(chunk_origins),
+                    destinations=len(chunk_destinations),
+                    error=str(e),
+                )
+                continue
+
+            if data.get("status") != "OK":
+                logger.warning(
+                    "maps_distance_matrix_error", status=data.get("status")
+                )
+                continue
+
+            for origin, row in zip(chunk_origins, data.get("rows", [])):
+                for destination, element in zip(
+                    chunk_destinations, row.get("elements", [])
+                ):
+                    if element.get("status") != "OK":
+                        continue
+                    results[(origin, destination)] = {
+                        "distance_meters": element["distance"]["value"],
+                        "distance_text": element["distance"]["text"],
+                        "duration_seconds": element["duration"]["value"],
+                        "duration_text": element["duration"]["text"],
+                    }
+
+        logger.info(
+            "maps_distance_matrix_success",
+            pairs=len(results),
+            resolved=sum(1 for value in results.values() if value),
+            requests=len(chunks),
+        )
+        return results
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type(CircuitOpenError),
+        reraise=True,
+    )
+    def _fetch_distance_matrix(
+        self, origins: list[str], destinations: list[str], mode: str
+    ) -> dict[str, Any]:
+        """Distance Matrix API を1回呼び出す（上限内に分割済みであること）"""
+        url = "/maps/api/distancematrix/json"
+        params = {
+            "origins": "|".join(origins),
+            "destinations": "|".join(destinations),
+            "mode": mode,
+            "language": "ja",
+            "key": self.api_key,
+        }
+
+        def request() -> "httpx.Response":
+            response = get_maps_http_client().get(url, params=params)
+            response.raise_for_status()
+            return response
+
+        return get_circuit_breaker("google_maps").call(request).json()
+
     def get_distance(self, origin: str, destination: str) -> Optional[float]:
         """距離を取得（km）
 
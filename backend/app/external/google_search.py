@@ -1,26 +1,85 @@
 """Google Custom Search APIクライアント"""
-from typing import Any
+import threading
+from typing import Any, Optional
 
 import structlog
-from googleapiclient.discovery import build
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import (
+    retry,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
 
 from app.config import settings
+from app.external.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from app.external.rate_limiter import QuotaExceededError, QuotaRateLimiter
 
 logger = structlog.get_logger(__name__)
 
+_rate_limiter: Optional[QuotaRateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_search_rate_limiter() -> QuotaRateLimiter:
+    """プロセス内で共有する Custom Search 用レートリミッターを取得
+
+    GoogleSearchClient はリクエストごとに生成されるため、
+    秒間レートはクライアントではなくモジュール単位で平準化する。
+    日次クォータは全インスタンスの合計で数えるため Firestore で共有する。
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            quota_store = None
+            if settings.google_search_shared_quota:
+                from app.repositories.api_quota_repository import ApiQuotaRepository
+                from app.repositories.firestore_client import get_firestore_client
+
+                quota_store = ApiQuotaRepository(get_firestore_client())
+            _rate_limiter = QuotaRateLimiter(
+                name="google_search",
+                rate_per_second=settings.google_search_qps,
+                burst=settings.google_search_burst,
+                daily_quota=settings.google_search_daily_quota,
+                urgent_reserve=settings.google_search_urgent_reserve,
+                quota_store=quota_store,
+                reserve_block=settings.google_search_quota_block,
+            )
+        return _rate_limiter
+
 
 class GoogleSearchClient:
-    """Google Custom Search APIクライアント"""
+    """Google Custom Search APIクライアント
+
+    サービスオブジェクトはスレッド間で共有できるが、内部の httplib2.Http は
+    スレッドセーフではないため、HTTP接続はスレッドごとに持って使い回す。
+    """
+
+    def __init__(self, rate_limiter: Optional[QuotaRateLimiter] = None):
+        # googleapiclient は読み込みに時間がかかるため、初回のクライアント生成時に読み込む
+        from googleapiclient.discovery import build
 
-    def __init__(self):
         self.api_key = settings.google_search_api_key
         self.cx = settings.google_search_cx
         self.service = build("customsearch", "v1", developerKey=self.api_key)
+        self.rate_limiter = rate_limiter or get_search_rate_limiter()
+        self._local = threading.local()
+
+    def _thread_http(self) -> Any:
+        """呼び出し元スレッド専用の httplib2.Http（接続を保持して再利用する）"""
+        http = getattr(self._local, "http", None)
+        if http is None:
+            from googleapiclient.http import build_http
+
+            http = build_http()
+            self._local.http = http
+        return http
 
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
+        # クォータ切れ・サーキットオープンはリトライしても回復しないため即座に失敗させる
+        retry=retry_if_not_exception_type((QuotaExceededError, CircuitOpenError)),
         reraise=True,
     )
     def search(self, query: str, num_results: int = 10) -> list[dict[str, Any]]:
@@ -32,17 +91,22 @@ class GoogleSearchClient:
 
         Returns:
             検索結果のリスト（title, link, snippetを含む辞書）
+
+        Raises:
+            QuotaExceededError: 日次クォータを使い切っている場合
         """
         try:
             logger.info("google_search_start", query=query, num_results=num_results)
 
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
             # Custom Search APIは1リクエストで最大10件
             num_results = min(num_results, 10)
 
-            result = (
-                self.service.cse()
-                .list(q=query, cx=self.cx, num=num_results)
-                .execute()
+            request = self.service.cse().list(q=query, cx=self.cx, num=num_results)
+            result = get_circuit_breaker("google_search").call(
+                request.execute, http=self._thread_http()
             )
 
             items = result.get("items", [])
@@ -64,6 +128,25 @@ class GoogleSearchClient:
             )
             return search_results
 
+        except QuotaExceededError as e:
+            logger.warning("google_search_quota_exceeded", query=query, error=str(e))
+            raise
         except Exception as e:
             logger.error("google_search_failed", query=query, error=str(e))
             raise
+
+
+_shared_client: Optional[GoogleSearchClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_search_client() -> GoogleSearchClient:
+    """プロセス内で共有する GoogleSearchClient を取得
+
+    ディスカバリードキュメントからのサービス生成をリクエストごとに行わないよう使い回す。
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = GoogleSearchClient()
+        return _shared_client
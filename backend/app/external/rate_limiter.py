@@ -0,0 +1,271 @@
+"""外部APIの秒間・日次クォータを守るトークンバケット型レートリミッター
+
+待機中の呼び出し元は (優先度, 到着順) のキューに並び、先頭だけがトークンを取得できる。
+そのため同じ優先度内では到着順（FIFO）が守られ、緊急の呼び出しはバッチ処理の待ち行列を追い越す。
+優先度は contextvars で伝播するため、エージェント層の関数シグネチャを変えずに
+ワークフロー単位で指定できる（asyncio.to_thread のワーカースレッドにも引き継がれる）。
+
+秒間レートはインスタンスごとに平準化するが、日次クォータはプロジェクト単位のため
+DailyQuotaStore（Firestore）で全インスタンスの使用数を共有する。
+"""
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from enum import IntEnum
+from typing import Callable, Iterator, Optional, Protocol
+from zoneinfo import ZoneInfo
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Google API の日次クォータは太平洋時間の0時にリセットされる
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+
+class RequestPriority(IntEnum):
+    """レートリミッターの待ち行列での優先度（値が小さいほど優先）"""
+
+    URGENT = 0  # 推し登録直後の初回体験など、ユーザーが結果を待っている処理
+    INTERACTIVE = 1  # ユーザー操作による通常の処理
+    BATCH = 2  # Cloud Scheduler からの一括スカウトなど
+
+
+class QuotaExceededError(Exception):
+    """日次クォータを使い切った（リトライしても回復しない）"""
+
+
+_request_priority: ContextVar[RequestPriority] = ContextVar(
+    "request_priority", default=RequestPriority.INTERACTIVE
+)
+
+
+def current_request_priority() -> RequestPriority:
+    """現在のコンテキストの優先度を取得"""
+    return _request_priority.get()
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[None]:
+    """ブロック内の外部API呼び出しの優先度を指定する
+
+    Examples:
+        >>> with request_priority(RequestPriority.BATCH):
+        ...     current_request_priority().name
+        'BATCH'
+        >>> current_request_priority().name
+        'INTERACTIVE'
+    """
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+class DailyQuotaStore(Protocol):
+    """全インスタンスで共有する日次クォータの使用数（ApiQuotaRepository）"""
+
+    def reserve(self, name: str, day: date, count: int, limit: int) -> int:
+        """使用数が limit を超えない範囲で最大 count 件を予約し、予約できた件数を返す"""
+        ...
+
+
+def _quota_today() -> date:
+    return datetime.now(QUOTA_TIMEZONE).date()
+
+
+class QuotaRateLimiter:
+    """秒間レート（トークンバケット）と日次クォータを同時に守るリミッター
+
+    スレッドセーフ。同期クライアントから asyncio.to_thread 経由で呼ばれる前提。
+
+    Args:
+        name: ログ用の名前
+        rate_per_second: トークンの補充速度（リクエスト/秒）
+        burst: バケット容量（瞬間的に許容する連続リクエスト数）
+        daily_quota: 1日あたりの上限リクエスト数
+        urgent_reserve: URGENT 以外の呼び出しが使えない日次クォータの予約枠
+        quota_store: 日次クォータを共有するストア（省略時はインスタンス内で数える）
+        reserve_block: quota_store から一度に予約する件数（URGENT の予約枠は1件ずつ）
+        clock: 単調増加時計（テスト用）
+        today: クォータ日付を返す関数（テスト用）
+
+    quota_store から予約した分はインスタンスが使い切るまで手元に残るため、
+    日付が変わる前に使われなかった分（最大でインスタンス数 × reserve_block）は失われる。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_second: float,
+        burst: int,
+        daily_quota: int,
+        urgent_reserve: int = 0,
+        quota_store: Optional[DailyQuotaStore] = None,
+        reserve_block: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        today: Callable[[], date] = _quota_today,
+    ):
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive")
+        self.name = name
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self.daily_quota = daily_quota
+        self.urgent_reserve = min(urgent_reserve, daily_quota)
+        self.quota_store = quota_store
+        self.reserve_block = max(1, reserve_block)
+        self._clock = clock
+        self._today = today
+
+        self._cond = threading.Condition()
+        self._waiters: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._tokens = float(self.burst)
+        self._refilled_at = clock()
+        self._quota_day = today()
+        self._daily_used = 0
+        # quota_store から予約済みで未使用の件数（通常枠 / URGENT の予約枠）
+        self._reserved = 0
+        self._urgent_reserved = 0
+
+    @property
+    def daily_used(self) -> int:
+        """このインスタンスが本日使ったリクエスト数"""
+        with self._cond:
+            self._roll_quota_day()
+            return self._daily_used
+
+    def _roll_quota_day(self) -> None:
+        today = self._today()
+        if today != self._quota_day:
+            self._quota_day = today
+            self._daily_used = 0
+            self._reserved = 0
+            self._urgent_reserved = 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            float(self.burst),
+            self._tokens + (now - self._refilled_at) * self.rate_per_second,
+        )
+        self._refilled_at = now
+
+    def _check_daily_quota(self, priority: RequestPriority) -> None:
+        self._roll_quota_day()
+        if self.quota_store is not None:
+            if not self._reserve_shared_quota(priority):
+                raise QuotaExceededError(
+                    f"{self.name} shared daily quota exhausted "
+                    f"(quota={self.daily_quota}, priority={priority.name})"
+                )
+            return
+        limit = self.daily_quota
+        if priority != RequestPriority.URGENT:
+            limit -= self.urgent_reserve
+        if self._daily_used >= limit:
+            raise QuotaExceededError(
+                f"{self.name} daily quota exhausted "
+                f"({self._daily_used}/{self.daily_quota}, priority={priority.name})"
+            )
+
+    def _reserve_shared_quota(self, priority: RequestPriority) -> bool:
+        """手元に予約が無ければ quota_store から予約する（使える予約があるか）
+
+        通常枠は reserve_block 件ずつ予約し、Firestore へのアクセスを減らす。
+        URGENT の予約枠は他の優先度に使われないよう、必要な1件だけ別に予約する。
+        """
+        urgent = priority == RequestPriority.URGENT
+        if self._reserved > 0 or (urgent and self._urgent_reserved > 0):
+            return True
+        self._reserved += self.quota_store.reserve(
+            self.name,
+            self._quota_day,
+            self.reserve_block,
+            self.daily_quota - self.urgent_reserve,
+        )
+        if self._reserved > 0:
+            return True
+        if urgent:
+            self._urgent_reserved += self.quota_store.reserve(
+                self.name, self._quota_day, 1, self.daily_quota
+            )
+        return urgent and self._urgent_reserved > 0
+
+    def _consume_daily_quota(self) -> None:
+        self._daily_used += 1
+        if self.quota_store is None:
+            return
+        if self._reserved > 0:
+            self._reserved -= 1
+        else:
+            self._urgent_reserved -= 1
+
+    def acquire(
+        self,
+        priority: Optional[RequestPriority] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """1リクエスト分のトークンを取得（取得できるまでブロック）
+
+        Args:
+            priority: 優先度（省略時はコンテキストの優先度）
+            timeout: 最大待機秒数（省略時は無制限）
+
+        Raises:
+            QuotaExceededError: 日次クォータを使い切っている場合
+            TimeoutError: timeout 内にトークンを取得できなかった場合
+        """
+        if priority is None:
+            priority = current_request_priority()
+        deadline = None if timeout is None else self._clock() + timeout
+        entry = (int(priority), next(self._sequence))
+        waited = False
+
+        with self._cond:
+            self._check_daily_quota(priority)
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    self._refill()
+                    is_head = self._waiters[0] == entry
+                    if is_head and self._tokens >= 1:
+                        # 待機中に他の呼び出しがクォータを消費した可能性があるため再確認
+                        self._check_daily_quota(priority)
+                        self._tokens -= 1
+                        self._consume_daily_quota()
+                        heapq.heappop(self._waiters)
+                        self._cond.notify_all()
+                        break
+
+                    wait = None
+                    if is_head:
+                        wait = (1 - self._tokens) / self.rate_per_second
+                    if deadline is not None:
+                        remaining = deadline - self._clock()
+                        if remaining <= 0:
+                            raise TimeoutError(
+                                f"{self.name} rate limiter wait timed out"
+                            )
+                        wait = remaining if wait is None else min(wait, remaining)
+                    waited = True
+                    self._cond.wait(wait)
+            except BaseException:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+
+        if waited:
+            logger.debug(
+                "rate_limiter_waited",
+                limiter=self.name,
+                priority=priority.name,
+            )
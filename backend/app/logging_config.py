@@ -1,35 +1,228 @@
-"""structlogの設定（JSON形式でCloud Loggingに対応）"""
+"""structlogの設定（JSON形式でCloud Loggingに対応）
+
+ログの出力はホットパス（URLごと・判定ごとのログ）の処理時間に直接影響するため、
+- 出力しないレベルのログはプロセッサーを通さずに捨てる
+- 大量に出る debug / info ログはイベント名ごとのサンプリング・レート制限で間引く
+- JSONへの変換と書き出しは QueueHandler / QueueListener で別スレッドに移す
+- JSONへの変換には orjson を使う
+"""
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+import time
+from typing import Any, Callable, Optional
 
+import orjson
 import structlog
 
+from app.config import settings
+
+# サンプリング・レート制限の対象にするログレベル（warning 以上は常に出力する）
+_THROTTLED_METHODS = frozenset({"debug", "info"})
+
+
+class EventSampler:
+    """イベント名ごとのサンプリング・レート制限を行う structlog プロセッサー
+
+    - sample_rates: 出力する割合。1/割合 件に1件を出力し、sample_rate を付ける
+    - rate_limits: 1秒あたりの出力上限。超えた分は捨て、次に出力するログに
+      捨てた件数を suppressed として付ける
+
+    Examples:
+        >>> sampler = EventSampler(sample_rates={"noisy": 0.5})
+        >>> kept = []
+        >>> for _ in range(4):
+        ...     try:
+        ...         kept.append(sampler(None, "info", {"event": "noisy"}))
+        ...     except structlog.DropEvent:
+        ...         pass
+        >>> len(kept), kept[0]["sample_rate"]
+        (2, 0.5)
+    """
+
+    def __init__(
+        self,
+        sample_rates: Optional[dict[str, float]] = None,
+        rate_limits: Optional[dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        # イベント名 → 何件に1件出力するか（0 は出力しない）
+        self._every = {
+            event: max(1, round(1 / rate)) if rate > 0 else 0
+            for event, rate in (sample_rates or {}).items()
+            if rate < 1
+        }
+        self._rate_limits = {
+            event: limit for event, limit in (rate_limits or {}).items() if limit > 0
+        }
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counts: dict[str, int] = {}
+        # イベント名 → (残りトークン, 最終更新時刻)
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._suppressed: dict[str, int] = {}
+
+    def __call__(
+        self, logger: Any, method_name: str, event_dict: dict[str, Any]
+    ) -> dict[str, Any]:
+        if method_name not in _THROTTLED_METHODS:
+            return event_dict
+        event = event_dict.get("event")
+        every = self._every.get(event)
+        if every is not None:
+            if every == 0:
+                raise structlog.DropEvent
+            with self._lock:
+                count = self._counts.get(event, 0)
+                self._counts[event] = count + 1
+            if count % every:
+                raise structlog.DropEvent
+            event_dict["sample_rate"] = 1 / every
+        limit = self._rate_limits.get(event)
+        if limit is not None:
+            suppressed = self._take_token(event, limit)
+            if suppressed:
+                event_dict["suppressed"] = suppressed
+        return event_dict
+
+    def _take_token(self, event: str, limit: float) -> int:
+        """トークンを1つ消費し、前回の出力以降に捨てた件数を返す（足りなければ捨てる）"""
+        now = self._clock()
+        burst = max(1.0, limit)
+        with self._lock:
+            tokens, updated_at = self._buckets.get(event, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * limit)
+            if tokens < 1:
+                self._buckets[event] = (tokens, now)
+                self._suppressed[event] = self._suppressed.get(event, 0) + 1
+                raise structlog.DropEvent
+            self._buckets[event] = (tokens - 1, now)
+            return self._suppressed.pop(event, 0)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """キューが満杯ならレコードを捨てる QueueHandler（呼び出し元をブロックしない）
+
+    JSONへの変換はリスナーのスレッドで行うため、prepare ではレコードを整形しない。
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _orjson_dumps(
+    value: Any, default: Optional[Callable[[Any], Any]] = None, **_: Any
+) -> str:
+    """JSONRenderer 用のシリアライザー（標準の json.dumps の代わり）"""
+    return orjson.dumps(
+        value, default=default, option=orjson.OPT_NON_STR_KEYS
+    ).decode("utf-8")
+
+
+def build_formatter() -> structlog.stdlib.ProcessorFormatter:
+    """structlog・標準ライブラリ双方のログレコードをJSONに変換するフォーマッター"""
+    return structlog.stdlib.ProcessorFormatter(
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.JSONRenderer(serializer=_orjson_dumps),
+        ],
+        # uvicorn など標準ライブラリのロガーから来たレコード用
+        foreign_pre_chain=[
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+        ],
+    )
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+
+
+def shutdown_logging() -> None:
+    """キューに残ったログを書き出してリスナーを止める（シャットダウン時）
+
+    停止後のログ（log_queue_dropped を含む）はキューを通さず出力先に直接書き出す。
+    """
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    if _queue_handler is not None:
+        root.removeHandler(_queue_handler)
+    for handler in _listener.handlers:
+        root.addHandler(handler)
+    _listener.stop()
+    if _queue_handler is not None and _queue_handler.dropped:
+        structlog.get_logger(__name__).warning(
+            "log_queue_dropped", dropped=_queue_handler.dropped
+        )
+    _listener = None
+    _queue_handler = None
+
 
 def configure_logging():
     """structlogを設定"""
-    # 標準ライブラリのloggingをstructlogに統合
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=logging.INFO,
-    )
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    level = logging.getLevelName(settings.log_level.upper())
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(build_formatter())
+
+    # 標準ライブラリのloggingをstructlogと同じ出力先に統合
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    if settings.log_async:
+        _queue_handler = NonBlockingQueueHandler(
+            queue.Queue(maxsize=settings.log_queue_size)
+        )
+        _listener = logging.handlers.QueueListener(_queue_handler.queue, stream_handler)
+        _listener.start()
+        root.addHandler(_queue_handler)
+    else:
+        root.addHandler(stream_handler)
+    root.setLevel(level)
 
     # structlogの設定
     structlog.configure(
         processors=[
             structlog.contextvars.merge_contextvars,
-            structlog.stdlib.filter_by_level,
+            EventSampler(
+                sample_rates=settings.log_sample_rates,
+                rate_limits=settings.log_rate_limits,
+            ),
             structlog.stdlib.add_logger_name,
             structlog.stdlib.add_log_level,
             structlog.stdlib.PositionalArgumentsFormatter(),
             structlog.processors.TimeStamper(fmt="iso"),
+            # 例外情報は発生したスレッドでしか取得できないため、ここで文字列にする
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
             structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer(),  # JSON形式で出力
+            # JSONへの変換はハンドラーのフォーマッター（リスナーのスレッド）で行う
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
         ],
-        wrapper_class=structlog.stdlib.BoundLogger,
+        # 出力しないレベルのログはプロセッサーを通さない
+        wrapper_class=structlog.make_filtering_bound_logger(level),
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
         cache_logger_on_first_use=True,
     )
+
+
+atexit.register(shutdown_logging)
@@ -1,15 +1,21 @@
 """FastAPIメインアプリケーション"""
+import asyncio
 import os
+from contextlib import asynccontextmanager, suppress
 
 import structlog
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 
 from app.config import settings
-from app.logging_config import configure_logging
+from app.external.google_maps import close_maps_http_client
+from app.logging_config import configure_logging, shutdown_logging
+from app.repositories.identity_map import IdentityMapMiddleware
 from app.routers import agent_router, health_router
+from app.warmup import get_warmup_state, warm_up
 
 # ADK が参照する GOOGLE_API_KEY を既存の GEMINI_API_KEY から設定
 if not os.environ.get("GOOGLE_API_KEY"):
@@ -19,11 +25,47 @@ if not os.environ.get("GOOGLE_API_KEY"):
 configure_logging()
 logger = structlog.get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """起動時のウォームアップとシャットダウン時の後始末
+
+    ウォームアップは起動をブロックしないようバックグラウンドで実行する
+    （完了までは /ready が503を返し、トラフィックを受けない）。
+    """
+    logger.info(
+        "app_startup",
+        project=settings.google_cloud_project,
+        frontend_url=settings.frontend_url,
+    )
+    warmup_task = None
+    if settings.warmup_enabled:
+        warmup_task = asyncio.create_task(
+            warm_up(
+                probe=settings.warmup_probe,
+                timeout_seconds=settings.warmup_timeout_seconds,
+            )
+        )
+    else:
+        get_warmup_state().mark_ready()
+
+    yield
+
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await warmup_task
+    close_maps_http_client()
+    logger.info("app_shutdown")
+    shutdown_logging()
+
+
 # FastAPIアプリケーション
 app = FastAPI(
     title="Oshi Agent API",
     description="AI推し活マネージャー - マルチエージェントバックエンドAPI",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS設定
@@ -35,6 +77,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# レスポンス圧縮（Accept-Encoding: gzip のクライアントに、一定サイズ以上の本文のみ）
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.gzip_minimum_size,
+    compresslevel=settings.gzip_compress_level,
+)
+
+# リクエスト内のリポジトリで読み書きしたドキュメントを共有
+if settings.repository_identity_map:
+    app.add_middleware(IdentityMapMiddleware)
+
 
 # 例外ハンドラー
 @app.exception_handler(RequestValidationError)
@@ -74,23 +127,6 @@ app.include_router(health_router)
 app.include_router(agent_router)
 
 
-# 起動ログ
-@app.on_event("startup")
-async def startup_event():
-    """起動時ログ"""
-    logger.info(
-        "app_startup",
-        project=settings.google_cloud_project,
-        frontend_url=settings.frontend_url,
-    )
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """シャットダウン時ログ"""
-    logger.info("app_shutdown")
-
-
 # ルートエンドポイント
 @app.get("/")
 async def root():
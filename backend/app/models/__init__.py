@@ -1,6 +1,12 @@
 """Pydanticモデル"""
 from app.models.event import EventCreate, EventModel
-from app.models.expense import ExpenseCategory, ExpenseCreate, ExpenseModel
+from app.models.expense import (
+    ExpenseAggregate,
+    ExpenseCategory,
+    ExpenseCreate,
+    ExpenseModel,
+    ExpenseRollupModel,
+)
 from app.models.info import CollectedInfoCreate, CollectedInfoModel, Priority
 from app.models.job import JobModel, JobStatus, JobType
 from app.models.network_node import (
@@ -17,11 +23,13 @@ from app.models.trip_plan import (
     TripPlanModel,
 )
 from app.models.workflow_results import (
+    CalendarRegistrationResult,
     DiscoveredNode,
     EventInfo,
     NetworkDiscoverResult,
     NetworkScoutResult,
     ScoutWorkflowResult,
+    TripPlanResult,
 )
 
 __all__ = [
@@ -39,6 +47,8 @@ __all__ = [
     "ExpenseModel",
     "ExpenseCreate",
     "ExpenseCategory",
+    "ExpenseAggregate",
+    "ExpenseRollupModel",
     "JobModel",
     "JobStatus",
     "JobType",
@@ -51,4 +61,6 @@ __all__ = [
     "NetworkDiscoverResult",
     "EventInfo",
     "DiscoveredNode",
+    "TripPlanResult",
+    "CalendarRegistrationResult",
 ]
@@ -33,6 +33,35 @@ class ExpenseCreate(ExpenseBase):
     event_id: Optional[str] = Field(None, description="紐づくイベントID")
 
 
+class ExpenseAggregate(BaseModel):
+    """支出の集計結果（Firestore 集計クエリの結果）"""
+
+    count: int = Field(0, description="件数")
+    total: int = Field(0, description="合計金額（円）")
+
+
+class ExpenseRollupModel(BaseModel):
+    """ユーザー・月ごとの支出集計（支出の作成・削除時に更新される）"""
+
+    id: str = Field(..., description="ロールアップID（{user_id}_{YYYY-MM}）")
+    user_id: str = Field(..., description="ユーザーID")
+    year: int = Field(..., description="年")
+    month: int = Field(..., description="月")
+    total: int = Field(0, description="合計金額（円）")
+    count: int = Field(0, description="件数")
+    by_category: dict[str, int] = Field(
+        default_factory=dict, description="カテゴリ別合計金額"
+    )
+    count_by_category: dict[str, int] = Field(
+        default_factory=dict, description="カテゴリ別件数"
+    )
+    advice: Optional[str] = Field(None, description="キャッシュ済みの予算アドバイス")
+    advice_digest: Optional[str] = Field(
+        None, description="アドバイス生成時の支出サマリーのダイジェスト"
+    )
+    updated_at: Optional[datetime] = Field(None, description="更新日時")
+
+
 class ExpenseModel(ExpenseBase):
     """支出モデル（DB保存形式）"""
 
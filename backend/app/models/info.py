@@ -38,6 +38,7 @@ class CollectedInfoModel(CollectedInfoBase):
 
     id: str = Field(..., description="情報ID")
     oshi_id: str = Field(..., description="紐づく推しID")
+    canonical_url: Optional[str] = Field(None, description="重複判定用の正規化URLキー")
     source_node: Optional[str] = Field(None, description="情報源ネットワークノード名")
     collected_at: datetime = Field(..., description="収集日時")
     updated_at: datetime = Field(..., description="更新日時")
@@ -23,6 +23,8 @@ class JobType(str, Enum):
     CALENDAR = "calendar"  # カレンダー登録
     TRIP = "trip"  # 遠征プラン生成
     BUDGET = "budget"  # 予算レポート生成
+    SCOUT_ALL = "scout_all"  # 全推しの情報収集（シャードの親ジョブ）
+    SCOUT_SHARD = "scout_shard"  # 全推しの情報収集のシャード
 
 
 class JobModel(BaseModel):
@@ -38,6 +40,10 @@ class JobModel(BaseModel):
     created_at: datetime = Field(..., description="作成日時")
     started_at: Optional[datetime] = Field(None, description="開始日時")
     completed_at: Optional[datetime] = Field(None, description="完了日時")
+    parent_job_id: Optional[str] = Field(None, description="親ジョブID（シャードのみ）")
+    lease_owner: Optional[str] = Field(None, description="実行中のインスタンス")
+    lease_expires_at: Optional[datetime] = Field(None, description="リースの期限")
+    attempts: int = Field(default=0, description="実行を開始した回数")
 
     class Config:
         from_attributes = True
@@ -11,6 +11,7 @@ class ScoutWorkflowResult(BaseModel):
     collected_count: int
     new_info_ids: list[str]
     priority_results: dict[str, str]
+    new_event_ids: list[str] = []
 
 
 class NetworkScoutResult(BaseModel):
@@ -23,6 +24,7 @@ class NetworkScoutResult(BaseModel):
     total_count: int
     new_info_ids: list[str]
     priority_results: dict[str, str]
+    new_event_ids: list[str] = []
 
 
 class NetworkDiscoverResult(BaseModel):
@@ -53,3 +55,57 @@ class DiscoveredNode(BaseModel):
     ring: int
     relationship: str
     search_queries: list[str]
+
+
+class TripPlanResult(BaseModel):
+    """バッチ遠征プラン生成の1件分の結果"""
+
+    event_id: str
+    departure: str
+    plan_id: Optional[str] = None
+    total_estimated_cost: Optional[int] = None
+    error: Optional[str] = None
+
+
+class CalendarRegistrationResult(BaseModel):
+    """一括カレンダー登録の1件分の結果"""
+
+    event_id: str
+    calendar_event_id: Optional[str] = None
+    already_registered: bool = False
+    error: Optional[str] = None
+
+
+class ScoutShardSummary(BaseModel):
+    """scout-all のシャード1件分の集計（シャードのジョブの output_data）"""
+
+    shard: int
+    total_oshis: int
+    success_count: int
+    error_count: int
+    new_info_count: int
+    new_event_count: int
+    # 推しごとに実際に要求した検索数と、そのうち Custom Search を呼んだ数
+    requested_queries: int = 0
+    executed_queries: int = 0
+    errors: list[dict[str, str]] = []
+
+
+class ScoutAllProgress(BaseModel):
+    """シャード分割した scout-all の進捗（シャードの集計の合計）"""
+
+    job_id: str
+    status: str
+    shard_count: int
+    pending_shards: int
+    running_shards: int
+    completed_shards: int
+    failed_shards: int
+    total_oshis: int
+    success_count: int
+    error_count: int
+    new_info_count: int
+    new_event_count: int
+    requested_queries: int = 0
+    executed_queries: int = 0
+    errors: list[dict[str, str]] = []
@@ -1,4 +1,5 @@
 """リポジトリ層"""
+from app.repositories.api_quota_repository import ApiQuotaRepository
 from app.repositories.event_repository import EventRepository
 from app.repositories.expense_repository import ExpenseRepository
 from app.repositories.firestore_client import get_firestore_client
@@ -6,6 +7,8 @@ from app.repositories.info_repository import InfoRepository
 from app.repositories.job_repository import JobRepository
 from app.repositories.network_repository import NetworkRepository
 from app.repositories.oshi_repository import OshiRepository
+from app.repositories.search_result_repository import SearchResultRepository
+from app.repositories.trip_advice_cache_repository import TripAdviceCacheRepository
 from app.repositories.trip_repository import TripRepository
 
 __all__ = [
@@ -14,7 +17,10 @@ __all__ = [
     "InfoRepository",
     "EventRepository",
     "TripRepository",
+    "TripAdviceCacheRepository",
     "ExpenseRepository",
     "JobRepository",
     "NetworkRepository",
+    "SearchResultRepository",
+    "ApiQuotaRepository",
 ]
@@ -0,0 +1,93 @@
+"""外部APIの日次クォータ使用数のリポジトリ
+
+日次クォータはプロジェクト（APIキー）単位で数えられるため、インスタンスごとに数えると
+N 台のインスタンスで N 倍まで使ってしまう。ドキュメントIDは API 名とクォータ日付で、
+各インスタンスはトランザクションで使用数を加算してからリクエストを送る。
+ドキュメントは Firestore の TTL ポリシー（expires_at フィールド）で削除する。
+"""
+from datetime import date, datetime, timedelta
+from typing import Callable
+
+import structlog
+from google.cloud import firestore
+
+logger = structlog.get_logger(__name__)
+
+# クォータ日付が変わった後もしばらく使用数を残す（調査用）
+_RETENTION = timedelta(days=7)
+
+
+class ApiQuotaRepository:
+    """外部APIの日次クォータ使用数のリポジトリ"""
+
+    COLLECTION_NAME = "api_quotas"
+
+    def __init__(
+        self,
+        db: firestore.Client,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ):
+        self.db = db
+        self.collection = db.collection(self.COLLECTION_NAME)
+        self._clock = clock
+
+    @staticmethod
+    def quota_key(name: str, day: date) -> str:
+        """使用数のドキュメントID
+
+        Examples:
+            >>> ApiQuotaRepository.quota_key("google_search", date(2025, 1, 1))
+            'google_search_2025-01-01'
+        """
+        return f"{name}_{day.isoformat()}"
+
+    def reserve(self, name: str, day: date, count: int, limit: int) -> int:
+        """日次クォータから最大 count 件を予約
+
+        Args:
+            name: API名
+            day: クォータ日付
+            count: 予約したい件数
+            limit: 予約後の使用数の上限
+
+        Returns:
+            予約できた件数（上限に達している場合は0）
+        """
+        try:
+            doc_ref = self.collection.document(self.quota_key(name, day))
+
+            @firestore.transactional
+            def reserve_in_transaction(transaction) -> int:
+                snapshot = doc_ref.get(transaction=transaction)
+                current = snapshot.to_dict() if snapshot.exists else None
+                used = (current or {}).get("used", 0)
+                granted = max(0, min(count, limit - used))
+                if granted:
+                    now = self._clock()
+                    transaction.set(
+                        doc_ref,
+                        {
+                            "name": name,
+                            "day": day.isoformat(),
+                            "used": used + granted,
+                            "updated_at": now,
+                            "expires_at": now + _RETENTION,
+                        },
+                    )
+                return granted
+
+            return reserve_in_transaction(self.db.transaction())
+        except Exception as e:
+            logger.error("quota_reserve_failed", name=name, day=str(day), error=str(e))
+            raise
+
+    def used(self, name: str, day: date) -> int:
+        """全インスタンスの使用数（予約済みを含む）"""
+        try:
+            snapshot = self.collection.document(self.quota_key(name, day)).get()
+            if not snapshot.exists:
+                return 0
+            return (snapshot.to_dict() or {}).get("used", 0)
+        except Exception as e:
+            logger.error("quota_get_failed", name=name, day=str(day), error=str(e))
+            raise
@@ -6,6 +6,8 @@ import structlog
 from google.cloud import firestore
 
 from app.models.event import EventCreate, EventModel
+from app.repositories import identity_map
+from app.repositories.hydration import hydrate, hydrate_all
 
 logger = structlog.get_logger(__name__)
 
@@ -27,11 +29,7 @@ class EventRepository:
                 .order_by("start_datetime", direction=firestore.Query.ASCENDING)
                 .stream()
             )
-            events = []
-            for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                events.append(EventModel(**data))
+            events = hydrate_all(EventModel, docs)
             logger.info("get_all_by_oshi", oshi_id=oshi_id, count=len(events))
             return events
         except Exception as e:
@@ -39,18 +37,49 @@ class EventRepository:
             raise
 
     def get_by_id(self, event_id: str) -> Optional[EventModel]:
-        """IDでイベントを取得"""
+        """IDでイベントを取得（同じリクエスト内では1回だけ読む）"""
         try:
-            doc = self.collection.document(event_id).get()
-            if not doc.exists:
-                return None
-            data = doc.to_dict()
-            data["id"] = doc.id
-            return EventModel(**data)
+            return identity_map.load(
+                self.COLLECTION_NAME, event_id, lambda: self._get(event_id)
+            )
         except Exception as e:
             logger.error("get_by_id_failed", event_id=event_id, error=str(e))
             raise
 
+    def get_many(self, event_ids: list[str]) -> dict[str, EventModel]:
+        """複数IDのイベントを1回のバッチ読み取りで取得
+
+        同じリクエスト内で読み書き済みのイベントは読み直さない。
+
+        Returns:
+            イベントIDをキーとする辞書（存在しないIDは含まない）
+        """
+        try:
+            return identity_map.load_many(
+                self.COLLECTION_NAME, event_ids, self._get_many
+            )
+        except Exception as e:
+            logger.error("get_many_failed", count=len(event_ids), error=str(e))
+            raise
+
+    def _get(self, event_id: str) -> Optional[EventModel]:
+        doc = self.collection.document(event_id).get()
+        if not doc.exists:
+            return None
+        return hydrate(EventModel, doc)
+
+    def _get_many(self, event_ids: list[str]) -> dict[str, EventModel]:
+        refs = [
+            self.collection.document(event_id) for event_id in dict.fromkeys(event_ids)
+        ]
+        events = {}
+        for doc in self.db.get_all(refs):
+            if not doc.exists:
+                continue
+            events[doc.id] = hydrate(EventModel, doc)
+        logger.info("get_many", requested=len(refs), found=len(events))
+        return events
+
     def create(self, event_data: EventCreate) -> EventModel:
         """イベントを作成"""
         try:
@@ -67,22 +96,56 @@ class EventRepository:
             doc_ref.set(doc_data)
 
             doc_data["id"] = doc_ref.id
+            event = EventModel(**doc_data)
+            identity_map.remember(self.COLLECTION_NAME, event.id, event)
             logger.info(
                 "event_created", event_id=doc_ref.id, oshi_id=event_data.oshi_id
             )
-            return EventModel(**doc_data)
+            return event
         except Exception as e:
             logger.error("create_failed", error=str(e))
             raise
 
+    def create_batch(self, events_data: list[EventCreate]) -> list[EventModel]:
+        """イベントをバッチ作成"""
+        try:
+            now = datetime.utcnow()
+            created_events = []
+
+            # バッチ書き込みは1回500件まで
+            for start in range(0, len(events_data), 500):
+                batch = self.db.batch()
+                for event_data in events_data[start : start + 500]:
+                    doc_data = event_data.model_dump()
+                    doc_data.update(
+                        {
+                            "created_at": now,
+                            "updated_at": now,
+                        }
+                    )
+
+                    doc_ref = self.collection.document()
+                    batch.set(doc_ref, doc_data)
+
+                    doc_data["id"] = doc_ref.id
+                    created_events.append(EventModel(**doc_data))
+                batch.commit()
+
+            for event in created_events:
+                identity_map.remember(self.COLLECTION_NAME, event.id, event)
+            logger.info("event_batch_created", count=len(created_events))
+            return created_events
+        except Exception as e:
+            logger.error("create_batch_failed", error=str(e))
+            raise
+
     def update_calendar_id(
         self, event_id: str, calendar_event_id: str
     ) -> Optional[EventModel]:
         """カレンダーイベントIDを更新"""
         try:
             doc_ref = self.collection.document(event_id)
-            doc = doc_ref.get()
-            if not doc.exists:
+            if not identity_map.document_exists(self.COLLECTION_NAME, doc_ref):
                 return None
 
             doc_ref.update(
@@ -92,15 +155,52 @@ class EventRepository:
                 }
             )
 
-            updated_doc = doc_ref.get()
-            data = updated_doc.to_dict()
-            data["id"] = updated_doc.id
+            event = hydrate(EventModel, doc_ref.get())
+            identity_map.remember(self.COLLECTION_NAME, event_id, event)
             logger.info(
                 "calendar_id_updated",
                 event_id=event_id,
                 calendar_event_id=calendar_event_id,
             )
-            return EventModel(**data)
+            return event
         except Exception as e:
             logger.error("update_calendar_id_failed", event_id=event_id, error=str(e))
             raise
+
+    def update_calendar_ids(self, calendar_event_ids: dict[str, str]) -> int:
+        """複数イベントのカレンダーイベントIDをバッチ書き込みで更新
+
+        Args:
+            calendar_event_ids: イベントID → Google CalendarのイベントID
+
+        Returns:
+            更新件数
+        """
+        try:
+            now = datetime.utcnow()
+            items = list(calendar_event_ids.items())
+
+            # バッチ書き込みは1回500件まで
+            for start in range(0, len(items), 500):
+                batch = self.db.batch()
+                for event_id, calendar_event_id in items[start : start + 500]:
+                    batch.update(
+                        self.collection.document(event_id),
+                        {
+                            "calendar_event_id": calendar_event_id,
+                            "updated_at": now,
+                        },
+                    )
+                batch.commit()
+
+            for event_id, calendar_event_id in items:
+                identity_map.remember_patch(
+                    self.COLLECTION_NAME,
+                    event_id,
+                    {"calendar_event_id": calendar_event_id, "updated_at": now},
+                )
+            logger.info("calendar_ids_updated", count=len(items))
+            return len(items)
+        except Exception as e:
+            logger.error("update_calendar_ids_failed", error=str(e))
+            raise
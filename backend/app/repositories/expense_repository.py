@@ -1,11 +1,19 @@
 """支出リポジトリ"""
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Any, Optional
 
 import structlog
 from google.cloud import firestore
 
-from app.models.expense import ExpenseCreate, ExpenseModel
+from app.models.expense import (
+    ExpenseAggregate,
+    ExpenseCategory,
+    ExpenseCreate,
+    ExpenseModel,
+    ExpenseRollupModel,
+)
+from app.utils.enum_utils import enum_to_value
+from app.repositories.hydration import hydrate, hydrate_all
 
 logger = structlog.get_logger(__name__)
 
@@ -14,10 +22,48 @@ class ExpenseRepository:
     """支出リポジトリ"""
 
     COLLECTION_NAME = "expenses"
+    ROLLUP_COLLECTION_NAME = "expense_rollups"
+
+    # 1回のバッチ書き込みの上限
+    BATCH_LIMIT = 500
 
     def __init__(self, db: firestore.Client):
         self.db = db
         self.collection = db.collection(self.COLLECTION_NAME)
+        self.rollups = db.collection(self.ROLLUP_COLLECTION_NAME)
+
+    @staticmethod
+    def rollup_period(expense_date: datetime) -> tuple[int, int]:
+        """支出日が属する集計月（get_monthly と同じく UTC 基準）"""
+        if expense_date.tzinfo is not None:
+            expense_date = expense_date.astimezone(timezone.utc)
+        return expense_date.year, expense_date.month
+
+    @staticmethod
+    def rollup_id(user_id: str, year: int, month: int) -> str:
+        """ロールアップのドキュメントID"""
+        return f"{user_id}_{year:04d}-{month:02d}"
+
+    def _rollup_delta(
+        self, user_id: str, expense: dict[str, Any], sign: int
+    ) -> tuple[Any, dict[str, Any]]:
+        """支出1件分のロールアップ増減（set(merge=True) 用）"""
+        year, month = self.rollup_period(expense["expense_date"])
+        category = enum_to_value(expense["category"])
+        amount = expense["amount"] * sign
+        return self.rollups.document(self.rollup_id(user_id, year, month)), {
+            "user_id": user_id,
+            "year": year,
+            "month": month,
+            "total": firestore.Increment(amount),
+            "count": firestore.Increment(sign),
+            "by_category": {category: firestore.Increment(amount)},
+            "count_by_category": {category: firestore.Increment(sign)},
+            # 支出が変わったらキャッシュ済みのアドバイスを無効化
+            "advice": firestore.DELETE_FIELD,
+            "advice_digest": firestore.DELETE_FIELD,
+            "updated_at": datetime.utcnow(),
+        }
 
     def get_all_by_user(self, user_id: str) -> list[ExpenseModel]:
         """ユーザーの全支出を取得"""
@@ -27,41 +73,47 @@ class ExpenseRepository:
                 .order_by("expense_date", direction=firestore.Query.DESCENDING)
                 .stream()
             )
-            expenses = []
-            for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                expenses.append(ExpenseModel(**data))
+            expenses = hydrate_all(ExpenseModel, docs)
             logger.info("get_all_by_user", user_id=user_id, count=len(expenses))
             return expenses
         except Exception as e:
             logger.error("get_all_by_user_failed", user_id=user_id, error=str(e))
             raise
 
+    def _monthly_query(self, user_id: str, year: int, month: int):
+        """ユーザーの月次支出を絞り込むクエリ"""
+        # 月の開始と終了
+        start_date = datetime(year, month, 1)
+        if month == 12:
+            end_date = datetime(year + 1, 1, 1)
+        else:
+            end_date = datetime(year, month + 1, 1)
+
+        return (
+            self.collection.where("user_id", "==", user_id)
+            .where("expense_date", ">=", start_date)
+            .where("expense_date", "<", end_date)
+        )
+
     def get_monthly(
-        self, user_id: str, year: int, month: int
+        self, user_id: str, year: int, month: int, limit: Optional[int] = None
     ) -> list[ExpenseModel]:
-        """月次支出を取得"""
-        try:
-            # 月の開始と終了
-            start_date = datetime(year, month, 1)
-            if month == 12:
-                end_date = datetime(year + 1, 1, 1)
-            else:
-                end_date = datetime(year, month + 1, 1)
+        """月次支出を取得（新しい順）
 
-            docs = (
-                self.collection.where("user_id", "==", user_id)
-                .where("expense_date", ">=", start_date)
-                .where("expense_date", "<", end_date)
-                .order_by("expense_date", direction=firestore.Query.DESCENDING)
-                .stream()
+        Args:
+            user_id: ユーザーID
+            year: 年
+            month: 月
+            limit: 最大取得件数（省略時は全件）
+        """
+        try:
+            query = self._monthly_query(user_id, year, month).order_by(
+                "expense_date", direction=firestore.Query.DESCENDING
             )
-            expenses = []
-            for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                expenses.append(ExpenseModel(**data))
+            if limit is not None:
+                query = query.limit(limit)
+            docs = query.stream()
+            expenses = hydrate_all(ExpenseModel, docs)
             logger.info(
                 "get_monthly",
                 user_id=user_id,
@@ -80,8 +132,60 @@ class ExpenseRepository:
             )
             raise
 
+    def aggregate_monthly(
+        self,
+        user_id: str,
+        year: int,
+        month: int,
+        category: Optional[ExpenseCategory] = None,
+    ) -> ExpenseAggregate:
+        """月次支出の件数と合計金額をサーバー側で集計
+
+        ドキュメントは転送せず、Firestore の集計クエリ（count / sum）を使う。
+        カテゴリ指定時は (user_id, category, expense_date) の複合インデックスが必要。
+
+        Args:
+            user_id: ユーザーID
+            year: 年
+            month: 月
+            category: 集計対象のカテゴリ（省略時は全カテゴリ）
+        """
+        try:
+            query = self._monthly_query(user_id, year, month)
+            if category is not None:
+                query = query.where("category", "==", category.value)
+
+            aggregation = query.count(alias="count").sum("amount", alias="total")
+            values = {
+                result.alias: result.value
+                for result_set in aggregation.get()
+                for result in result_set
+            }
+            aggregate = ExpenseAggregate(
+                count=int(values.get("count") or 0),
+                total=int(values.get("total") or 0),
+            )
+            logger.info(
+                "aggregate_monthly",
+                user_id=user_id,
+                year=year,
+                month=month,
+                category=category.value if category else None,
+                count=aggregate.count,
+            )
+            return aggregate
+        except Exception as e:
+            logger.error(
+                "aggregate_monthly_failed",
+                user_id=user_id,
+                year=year,
+                month=month,
+                error=str(e),
+            )
+            raise
+
     def create(self, user_id: str, expense_data: ExpenseCreate) -> ExpenseModel:
-        """支出を作成"""
+        """支出を作成（月次ロールアップも同じバッチで更新）"""
         try:
             now = datetime.utcnow()
             doc_data = expense_data.model_dump()
@@ -93,7 +197,12 @@ class ExpenseRepository:
             )
 
             doc_ref = self.collection.document()
-            doc_ref.set(doc_data)
+            rollup_ref, rollup_delta = self._rollup_delta(user_id, doc_data, 1)
+
+            batch = self.db.batch()
+            batch.set(doc_ref, doc_data)
+            batch.set(rollup_ref, rollup_delta, merge=True)
+            batch.commit()
 
             doc_data["id"] = doc_ref.id
             logger.info("expense_created", expense_id=doc_ref.id, user_id=user_id)
@@ -101,3 +210,161 @@ class ExpenseRepository:
         except Exception as e:
             logger.error("create_failed", user_id=user_id, error=str(e))
             raise
+
+    def delete(self, expense_id: str) -> bool:
+        """支出を削除（月次ロールアップもトランザクション内で減算）"""
+        try:
+            doc_ref = self.collection.document(expense_id)
+
+            @firestore.transactional
+            def delete_in_transaction(transaction) -> bool:
+                snapshot = doc_ref.get(transaction=transaction)
+                if not snapshot.exists:
+                    return False
+                expense = snapshot.to_dict()
+                rollup_ref, rollup_delta = self._rollup_delta(
+                    expense["user_id"], expense, -1
+                )
+                transaction.delete(doc_ref)
+                transaction.set(rollup_ref, rollup_delta, merge=True)
+                return True
+
+            deleted = delete_in_transaction(self.db.transaction())
+            logger.info("expense_deleted", expense_id=expense_id, deleted=deleted)
+            return deleted
+        except Exception as e:
+            logger.error("delete_failed", expense_id=expense_id, error=str(e))
+            raise
+
+    def get_monthly_rollup(
+        self, user_id: str, year: int, month: int
+    ) -> Optional[ExpenseRollupModel]:
+        """月次ロールアップを取得（未作成ならNone）"""
+        try:
+            doc = self.rollups.document(self.rollup_id(user_id, year, month)).get()
+            if not doc.exists:
+                return None
+            return hydrate(ExpenseRollupModel, doc)
+        except Exception as e:
+            logger.error(
+                "get_monthly_rollup_failed",
+                user_id=user_id,
+                year=year,
+                month=month,
+                error=str(e),
+            )
+            raise
+
+    def save_advice(
+        self, user_id: str, year: int, month: int, advice: str, digest: str
+    ) -> bool:
+        """月次ロールアップに予算アドバイスをキャッシュ
+
+        ロールアップが存在しない月には保存しない（集計値のない不完全なロールアップを作らないため）。
+
+        Returns:
+            保存できた場合True
+        """
+        try:
+            doc_ref = self.rollups.document(self.rollup_id(user_id, year, month))
+            if not doc_ref.get().exists:
+                return False
+            doc_ref.update({"advice": advice, "advice_digest": digest})
+            logger.info(
+                "budget_advice_saved", user_id=user_id, year=year, month=month
+            )
+            return True
+        except Exception as e:
+            logger.error(
+                "save_advice_failed",
+                user_id=user_id,
+                year=year,
+                month=month,
+                error=str(e),
+            )
+            raise
+
+    def rebuild_rollups(
+        self, user_id: Optional[str] = None, dry_run: bool = False
+    ) -> int:
+        """支出データから月次ロールアップを再構築（既存データのバックフィル用）
+
+        対象ユーザーのロールアップを全件作り直し、支出がなくなった月のロールアップは削除する。
+        再構築中に作成された支出の増分は上書きされる可能性があるため、
+        アクセスの少ない時間帯に実行すること。
+
+        Args:
+            user_id: 対象ユーザーID（省略時は全ユーザー）
+            dry_run: Trueの場合は書き込まない
+
+        Returns:
+            作成したロールアップ数
+        """
+        try:
+            logger.info("rebuild_rollups_start", user_id=user_id, dry_run=dry_run)
+
+            query = self.collection
+            rollup_query = self.rollups
+            if user_id:
+                query = query.where("user_id", "==", user_id)
+                rollup_query = rollup_query.where("user_id", "==", user_id)
+
+            now = datetime.utcnow()
+            rollups: dict[str, dict[str, Any]] = {}
+            for doc in query.stream():
+                expense = doc.to_dict()
+                year, month = self.rollup_period(expense["expense_date"])
+                rollup_id = self.rollup_id(expense["user_id"], year, month)
+                rollup = rollups.setdefault(
+                    rollup_id,
+                    {
+                        "user_id": expense["user_id"],
+                        "year": year,
+                        "month": month,
+                        "total": 0,
+                        "count": 0,
+                        "by_category": {},
+                        "count_by_category": {},
+                        "updated_at": now,
+                    },
+                )
+                category = enum_to_value(expense["category"])
+                rollup["total"] += expense["amount"]
+                rollup["count"] += 1
+                rollup["by_category"][category] = (
+                    rollup["by_category"].get(category, 0) + expense["amount"]
+                )
+                rollup["count_by_category"][category] = (
+                    rollup["count_by_category"].get(category, 0) + 1
+                )
+
+            stale_ids = [
+                doc.id for doc in rollup_query.stream() if doc.id not in rollups
+            ]
+
+            if not dry_run:
+                # None は削除を表す
+                writes = [
+                    (self.rollups.document(rollup_id), rollup)
+                    for rollup_id, rollup in rollups.items()
+                ] + [(self.rollups.document(rollup_id), None) for rollup_id in stale_ids]
+                for start in range(0, len(writes), self.BATCH_LIMIT):
+                    batch = self.db.batch()
+                    for ref, rollup in writes[start : start + self.BATCH_LIMIT]:
+                        if rollup is None:
+                            batch.delete(ref)
+                        else:
+                            batch.set(ref, rollup)
+                    batch.commit()
+
+            logger.info(
+                "rebuild_rollups_success",
+                user_id=user_id,
+                rollups=len(rollups),
+                stale_deleted=len(stale_ids),
+                dry_run=dry_run,
+            )
+            return len(rollups)
+        except Exception as e:
+            logger.error("rebuild_rollups_failed", user_id=user_id, error=str(e))
+            raise
@@ -0,0 +1,170 @@
+"""リクエスト単位のアイデンティティマップ
+
+1つのリクエストの中では、ルーターの所有者確認・ワークフロー・サブワークフローがそれぞれ
+同じドキュメント（特に推し）を get_by_id で読み直していた。リクエストごとに
+（コレクション名, ドキュメントID）→ モデル の対応を持ち、同じドキュメントの読み取りを
+1回にまとめる。リクエスト中の書き込み（作成・更新・削除）もこの対応に反映するため、
+書き込んだ後の読み取りは書き込んだ内容を返す。
+
+対応はコンテキスト変数で持ち、IdentityMapMiddleware がリクエストごとに作る。
+asyncio.to_thread・asyncio.gather・FastAPI のスレッドプールはコンテキストを引き継ぐため、
+同じリクエストから呼ばれたリポジトリは同じ対応を共有する。リクエストの外（定期実行の
+スクリプトなど）ではこれまでどおり毎回 Firestore を読む。
+ヒット率は /health/caches の identity_map で確認できる。
+
+返すモデルはリクエスト内で共有されるため、呼び出し側で変更しないこと。
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from app.utils.cache_stats import get_cache_stats
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# 対応が無いことを表す値（None は「存在しないドキュメント」として記録する）
+MISSING: Any = object()
+
+
+class IdentityMap:
+    """（コレクション名, ドキュメントID）→ モデル の対応（スレッドセーフ）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str], Optional[BaseModel]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, collection: str, doc_id: str) -> Any:
+        """記録済みのモデル（存在しないドキュメントは None、未記録なら MISSING）"""
+        with self._lock:
+            entry = self._entries.get((collection, doc_id), MISSING)
+            if entry is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def put(self, collection: str, doc_id: str, model: Optional[BaseModel]) -> None:
+        """読み書きした結果を記録（None は存在しないドキュメント）"""
+        with self._lock:
+            self._entries[(collection, doc_id)] = model
+
+    def patch(self, collection: str, doc_id: str, fields: dict[str, Any]) -> None:
+        """部分更新を記録済みのモデルに反映（未記録なら何もしない）"""
+        with self._lock:
+            model = self._entries.get((collection, doc_id))
+            if model is not None:
+                self._entries[(collection, doc_id)] = model.model_copy(update=fields)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_current: ContextVar[Optional[IdentityMap]] = ContextVar(
+    "identity_map", default=None
+)
+
+
+def current_identity_map() -> Optional[IdentityMap]:
+    """実行中のリクエストのアイデンティティマップ（リクエストの外では None）"""
+    return _current.get()
+
+
+@contextmanager
+def identity_map_scope() -> Iterator[IdentityMap]:
+    """ブロック内の読み書きで共有するアイデンティティマップを作る"""
+    identity_map = IdentityMap()
+    token = _current.set(identity_map)
+    try:
+        yield identity_map
+    finally:
+        _current.reset(token)
+        stats = get_cache_stats("identity_map")
+        stats.record_hit(identity_map.hits)
+        stats.record_miss(identity_map.misses)
+
+
+def load(
+    collection: str, doc_id: str, loader: Callable[[], Optional[ModelT]]
+) -> Optional[ModelT]:
+    """記録済みならそのモデルを返し、無ければ loader で読んで記録する"""
+    identity_map = _current.get()
+    if identity_map is None:
+        return loader()
+    model = identity_map.get(collection, doc_id)
+    if model is MISSING:
+        model = loader()
+        identity_map.put(collection, doc_id, model)
+    return model
+
+
+def load_many(
+    collection: str,
+    doc_ids: list[str],
+    loader: Callable[[list[str]], dict[str, ModelT]],
+) -> dict[str, ModelT]:
+    """記録済みでないIDだけを loader でまとめて読み、ID → モデル の辞書を返す
+
+    存在しないIDは結果に含めない（存在しないことも記録する）。
+    """
+    identity_map = _current.get()
+    if identity_map is None:
+        return loader(doc_ids)
+    found: dict[str, ModelT] = {}
+    misses = []
+    for doc_id in dict.fromkeys(doc_ids):
+        model = identity_map.get(collection, doc_id)
+        if model is MISSING:
+            misses.append(doc_id)
+        elif model is not None:
+            found[doc_id] = model
+    if misses:
+        loaded = loader(misses)
+        for doc_id in misses:
+            model = loaded.get(doc_id)
+            identity_map.put(collection, doc_id, model)
+            if model is not None:
+                found[doc_id] = model
+    return found
+
+
+def remember(collection: str, doc_id: str, model: Optional[BaseModel]) -> None:
+    """書き込んだ結果を記録（None は削除）"""
+    identity_map = _current.get()
+    if identity_map is not None:
+        identity_map.put(collection, doc_id, model)
+
+
+def remember_patch(collection: str, doc_id: str, fields: dict[str, Any]) -> None:
+    """部分更新した内容を記録済みのモデルに反映"""
+    identity_map = _current.get()
+    if identity_map is not None:
+        identity_map.patch(collection, doc_id, fields)
+
+
+def document_exists(collection: str, doc_ref: Any) -> bool:
+    """更新前の存在確認（記録済みなら Firestore を読まない）"""
+    identity_map = _current.get()
+    if identity_map is not None:
+        model = identity_map.get(collection, doc_ref.id)
+        if model is not MISSING:
+            return model is not None
+    return doc_ref.get().exists
+
+
+class IdentityMapMiddleware:
+    """HTTPリクエストごとにアイデンティティマップを作るASGIミドルウェア"""
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with identity_map_scope():
+            await self.app(scope, receive, send)
@@ -6,6 +6,9 @@ import structlog
 from google.cloud import firestore
 
 from app.models.info import CollectedInfoCreate, CollectedInfoModel, Priority
+from app.utils.url_utils import canonicalize_url
+from app.repositories import identity_map
+from app.repositories.hydration import hydrate, hydrate_all
 
 logger = structlog.get_logger(__name__)
 
@@ -14,6 +17,7 @@ class InfoRepository:
     """収集情報リポジトリ"""
 
     COLLECTION_NAME = "collected_infos"
+    BATCH_LIMIT = 500
 
     def __init__(self, db: firestore.Client):
         self.db = db
@@ -27,11 +31,7 @@ class InfoRepository:
                 .order_by("collected_at", direction=firestore.Query.DESCENDING)
                 .stream()
             )
-            infos = []
-            for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                infos.append(CollectedInfoModel(**data))
+            infos = hydrate_all(CollectedInfoModel, docs)
             logger.info("get_all_by_oshi", oshi_id=oshi_id, count=len(infos))
             return infos
         except Exception as e:
@@ -39,31 +39,65 @@ class InfoRepository:
             raise
 
     def get_by_id(self, info_id: str) -> Optional[CollectedInfoModel]:
-        """IDで収集情報を取得"""
+        """IDで収集情報を取得（同じリクエスト内では1回だけ読む）"""
         try:
-            doc = self.collection.document(info_id).get()
-            if not doc.exists:
-                return None
-            data = doc.to_dict()
-            data["id"] = doc.id
-            return CollectedInfoModel(**data)
+            return identity_map.load(
+                self.COLLECTION_NAME, info_id, lambda: self._get(info_id)
+            )
         except Exception as e:
             logger.error("get_by_id_failed", info_id=info_id, error=str(e))
             raise
 
+    def get_many(self, info_ids: list[str]) -> dict[str, CollectedInfoModel]:
+        """複数IDの収集情報を1回のバッチ読み取りで取得
+
+        同じリクエスト内で読み書き済みの収集情報は読み直さない。
+
+        Returns:
+            {info_id: 収集情報}（存在しないIDは含まない）
+        """
+        try:
+            return identity_map.load_many(
+                self.COLLECTION_NAME, info_ids, self._get_many
+            )
+        except Exception as e:
+            logger.error("get_many_failed", count=len(info_ids), error=str(e))
+            raise
+
+    def _get(self, info_id: str) -> Optional[CollectedInfoModel]:
+        doc = self.collection.document(info_id).get()
+        if not doc.exists:
+            return None
+        return hydrate(CollectedInfoModel, doc)
+
+    def _get_many(self, info_ids: list[str]) -> dict[str, CollectedInfoModel]:
+        refs = [
+            self.collection.document(info_id) for info_id in dict.fromkeys(info_ids)
+        ]
+        infos = {}
+        for doc in self.db.get_all(refs):
+            if not doc.exists:
+                continue
+            infos[doc.id] = hydrate(CollectedInfoModel, doc)
+        logger.info("get_many", requested=len(refs), found=len(infos))
+        return infos
+
     def find_by_url(self, oshi_id: str, url: str) -> Optional[CollectedInfoModel]:
-        """URLで重複チェック"""
+        """URLで重複チェック
+
+        正規化URLキー（canonical_url）で照合するため、トラッキングパラメータや
+        www・既知のホストのAMP版などの表記ゆれがあっても同一の情報として検出する。
+        canonical_url を持たない既存データは backfill_canonical_urls で補完しておくこと。
+        """
         try:
             docs = (
                 self.collection.where("oshi_id", "==", oshi_id)
-                .where("url", "==", url)
+                .where("canonical_url", "==", canonicalize_url(url))
                 .limit(1)
                 .stream()
             )
             for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                return CollectedInfoModel(**data)
+                return hydrate(CollectedInfoModel, doc)
             return None
         except Exception as e:
             logger.error(
@@ -71,6 +105,39 @@ class InfoRepository:
             )
             raise
 
+    def backfill_canonical_urls(self, dry_run: bool = False) -> int:
+        """canonical_url が無い・正規化の規則が変わった収集情報の正規化URLキーを更新
+
+        Args:
+            dry_run: Trueの場合は書き込まない
+
+        Returns:
+            更新した（dry_run では更新が必要な）収集情報の数
+        """
+        try:
+            logger.info("backfill_canonical_urls_start", dry_run=dry_run)
+            updates = []
+            for doc in self.collection.select(["url", "canonical_url"]).stream():
+                data = doc.to_dict()
+                canonical_url = canonicalize_url(data.get("url") or "")
+                if data.get("canonical_url") != canonical_url:
+                    updates.append((doc.reference, canonical_url))
+
+            if not dry_run:
+                for start in range(0, len(updates), self.BATCH_LIMIT):
+                    batch = self.db.batch()
+                    for ref, canonical_url in updates[start : start + self.BATCH_LIMIT]:
+                        batch.update(ref, {"canonical_url": canonical_url})
+                    batch.commit()
+
+            logger.info(
+                "backfill_canonical_urls_success", updated=len(updates), dry_run=dry_run
+            )
+            return len(updates)
+        except Exception as e:
+            logger.error("backfill_canonical_urls_failed", error=str(e))
+            raise
+
     def create(self, info_data: CollectedInfoCreate) -> CollectedInfoModel:
         """収集情報を作成"""
         try:
@@ -78,6 +145,7 @@ class InfoRepository:
             doc_data = info_data.model_dump()
             doc_data.update(
                 {
+                    "canonical_url": canonicalize_url(info_data.url),
                     "priority": Priority.NORMAL.value,
                     "collected_at": now,
                     "updated_at": now,
@@ -88,10 +156,12 @@ class InfoRepository:
             doc_ref.set(doc_data)
 
             doc_data["id"] = doc_ref.id
+            info = CollectedInfoModel(**doc_data)
+            identity_map.remember(self.COLLECTION_NAME, info.id, info)
             logger.info(
                 "info_created", info_id=doc_ref.id, oshi_id=info_data.oshi_id
             )
-            return CollectedInfoModel(**doc_data)
+            return info
         except Exception as e:
             logger.error("create_failed", error=str(e))
             raise
@@ -109,6 +179,7 @@ class InfoRepository:
                 doc_data = info_data.model_dump()
                 doc_data.update(
                     {
+                        "canonical_url": canonicalize_url(info_data.url),
                         "priority": Priority.NORMAL.value,
                         "collected_at": now,
                         "updated_at": now,
@@ -122,25 +193,68 @@ class InfoRepository:
                 created_infos.append(CollectedInfoModel(**doc_data))
 
             batch.commit()
+            for info in created_infos:
+                identity_map.remember(self.COLLECTION_NAME, info.id, info)
             logger.info("info_batch_created", count=len(created_infos))
             return created_infos
         except Exception as e:
             logger.error("create_batch_failed", error=str(e))
             raise
 
-    def update_priority(self, info_id: str, priority: Priority) -> bool:
-        """重要度を更新"""
+    def find_judged_near_duplicates(
+        self,
+        oshi_id: str,
+        band_keys: list[str],
+        collected_since: datetime,
+        limit: int = 50,
+    ) -> list[CollectedInfoModel]:
+        """重要度判定済みの情報から、LSHバンドキーを共有する近似重複の候補を取得
+
+        バンドキーは update_priority で判定時に保存するため、判定済みの情報だけが対象。
+        collected_since 以降に収集した情報を新しい順に返す。
+        候補は呼び出し側で実際の類似度を検証すること。
+        """
+        if not band_keys:
+            return []
+        try:
+            docs = (
+                self.collection.where("oshi_id", "==", oshi_id)
+                .where("near_duplicate_keys", "array_contains_any", band_keys)
+                .where("collected_at", ">=", collected_since)
+                .order_by("collected_at", direction=firestore.Query.DESCENDING)
+                .limit(limit)
+                .stream()
+            )
+            return hydrate_all(CollectedInfoModel, docs)
+        except Exception as e:
+            logger.error(
+                "find_judged_near_duplicates_failed", oshi_id=oshi_id, error=str(e)
+            )
+            raise
+
+    def update_priority(
+        self,
+        info_id: str,
+        priority: Priority,
+        near_duplicate_keys: Optional[list[str]] = None,
+    ) -> bool:
+        """重要度を更新
+
+        Args:
+            near_duplicate_keys: 近似重複の照合用の LSH バンドキー（判定済みの印にもなる）
+        """
         try:
             doc_ref = self.collection.document(info_id)
-            doc = doc_ref.get()
-            if not doc.exists:
+            if not identity_map.document_exists(self.COLLECTION_NAME, doc_ref):
                 return False
 
-            doc_ref.update(
-                {
-                    "priority": priority.value,
-                    "updated_at": datetime.utcnow(),
-                }
+            now = datetime.utcnow()
+            updates = {"priority": priority.value, "updated_at": now}
+            if near_duplicate_keys is not None:
+                updates["near_duplicate_keys"] = near_duplicate_keys
+            doc_ref.update(updates)
+            identity_map.remember_patch(
+                self.COLLECTION_NAME, info_id, {"priority": priority, "updated_at": now}
             )
             logger.info("priority_updated", info_id=info_id, priority=priority.value)
             return True
@@ -1,11 +1,19 @@
-"""ジョブリポジトリ"""
-from datetime import datetime
-from typing import Any, Optional
+"""ジョブリポジトリ
+
+scout-all のシャードは親ジョブの子ジョブとして作成し、各インスタンスがリースを取得して
+実行する。リースの取得・延長・完了はトランザクション内で所有者と期限を確認するため、
+同じシャードを2つのインスタンスが同時に実行することはない。期限切れのリースは
+他のインスタンスが取り直す（インスタンスが途中で停止した場合の再実行）。
+"""
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
 
 import structlog
 from google.cloud import firestore
 
 from app.models.job import JobModel, JobStatus, JobType
+from app.repositories.hydration import hydrate, hydrate_all, hydrate_dict
+from app.utils.time_utils import as_naive_utc
 
 logger = structlog.get_logger(__name__)
 
@@ -15,9 +23,14 @@ class JobRepository:
 
     COLLECTION_NAME = "jobs"
 
-    def __init__(self, db: firestore.Client):
+    def __init__(
+        self,
+        db: firestore.Client,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ):
         self.db = db
         self.collection = db.collection(self.COLLECTION_NAME)
+        self._clock = clock
 
     def create(
         self,
@@ -82,10 +95,8 @@ class JobRepository:
             doc_ref.update(update_data)
 
             updated_doc = doc_ref.get()
-            data = updated_doc.to_dict()
-            data["id"] = updated_doc.id
             logger.info("job_status_updated", job_id=job_id, status=status.value)
-            return JobModel(**data)
+            return hydrate(JobModel, updated_doc)
         except Exception as e:
             logger.error("update_status_failed", job_id=job_id, error=str(e))
             raise
@@ -106,12 +117,324 @@ class JobRepository:
             )
 
             for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                return JobModel(**data)
+                return hydrate(JobModel, doc)
             return None
         except Exception as e:
             logger.error(
                 "get_latest_failed", job_type=job_type.value, user_id=user_id, error=str(e)
             )
             raise
+
+    def get_by_id(self, job_id: str) -> Optional[JobModel]:
+        """IDでジョブを取得"""
+        try:
+            doc = self.collection.document(job_id).get()
+            if not doc.exists:
+                return None
+            return hydrate(JobModel, doc)
+        except Exception as e:
+            logger.error("get_by_id_failed", job_id=job_id, error=str(e))
+            raise
+
+    def create_shards(
+        self,
+        parent_job_id: str,
+        shard_count: int,
+        oshi_ids: Optional[list[list[str]]] = None,
+    ) -> list[JobModel]:
+        """親ジョブのシャード（子ジョブ）をバッチ作成
+
+        Args:
+            parent_job_id: 親ジョブID
+            shard_count: シャード数（input_data に shard / shard_count を持たせる）
+            oshi_ids: シャードごとの担当の推しID（input_data の oshi_ids に保存）
+        """
+        try:
+            now = self._clock()
+            shards = []
+            # バッチ書き込みは1回500件まで
+            for start in range(0, shard_count, 500):
+                batch = self.db.batch()
+                for shard in range(start, min(start + 500, shard_count)):
+                    input_data = {"shard": shard, "shard_count": shard_count}
+                    if oshi_ids is not None:
+                        input_data["oshi_ids"] = oshi_ids[shard]
+                    doc_data = {
+                        "job_type": JobType.SCOUT_SHARD.value,
+                        "status": JobStatus.PENDING.value,
+                        "input_data": input_data,
+                        "user_id": None,
+                        "parent_job_id": parent_job_id,
+                        "attempts": 0,
+                        "created_at": now,
+                    }
+                    doc_ref = self.collection.document()
+                    batch.set(doc_ref, doc_data)
+                    shards.append(JobModel(id=doc_ref.id, **doc_data))
+                batch.commit()
+
+            logger.info(
+                "job_shards_created", parent_job_id=parent_job_id, count=len(shards)
+            )
+            return shards
+        except Exception as e:
+            logger.error(
+                "create_shards_failed", parent_job_id=parent_job_id, error=str(e)
+            )
+            raise
+
+    def get_shards(self, parent_job_id: str) -> list[JobModel]:
+        """親ジョブのシャードを取得"""
+        try:
+            docs = self.collection.where("parent_job_id", "==", parent_job_id).stream()
+            return hydrate_all(JobModel, docs)
+        except Exception as e:
+            logger.error(
+                "get_shards_failed", parent_job_id=parent_job_id, error=str(e)
+            )
+            raise
+
+    def claim_shard(
+        self,
+        parent_job_id: str,
+        owner: str,
+        lease_seconds: float,
+        max_attempts: int,
+    ) -> Optional[JobModel]:
+        """未実行またはリース切れのシャードを1件取得してリースを設定
+
+        リース切れのまま実行回数が max_attempts に達したシャードは失敗として確定する。
+
+        Args:
+            parent_job_id: 親ジョブID
+            owner: リースの所有者（実行するワーカーの識別子）
+            lease_seconds: リースの長さ（秒）
+            max_attempts: シャードごとの実行回数の上限
+
+        Returns:
+            取得したシャード（取得できるシャードが無ければNone）
+        """
+        try:
+            docs = (
+                self.collection.where("parent_job_id", "==", parent_job_id)
+                .where(
+                    "status",
+                    "in",
+                    [JobStatus.PENDING.value, JobStatus.RUNNING.value],
+                )
+                .stream()
+            )
+            now = self._clock()
+            for doc in docs:
+                data = doc.to_dict()
+                if not self._claimable(data, now):
+                    continue
+                shard = self._claim(doc.reference, owner, lease_seconds, max_attempts)
+                if shard is not None:
+                    logger.info(
+                        "job_shard_claimed",
+                        job_id=shard.id,
+                        parent_job_id=parent_job_id,
+                        owner=owner,
+                        attempts=shard.attempts,
+                    )
+                    return shard
+            return None
+        except Exception as e:
+            logger.error(
+                "claim_shard_failed", parent_job_id=parent_job_id, error=str(e)
+            )
+            raise
+
+    @staticmethod
+    def _claimable(data: dict[str, Any], now: datetime) -> bool:
+        """未実行、または実行中でリースの期限が切れているか"""
+        if data.get("status") == JobStatus.PENDING.value:
+            return True
+        expires_at = data.get("lease_expires_at")
+        return (
+            data.get("status") == JobStatus.RUNNING.value
+            and (expires_at is None or as_naive_utc(expires_at) <= now)
+        )
+
+    def _claim(
+        self,
+        doc_ref: Any,
+        owner: str,
+        lease_seconds: float,
+        max_attempts: int,
+    ) -> Optional[JobModel]:
+        """トランザクション内で状態を確認し直してリースを設定"""
+
+        @firestore.transactional
+        def claim_in_transaction(transaction) -> Optional[JobModel]:
+            snapshot = doc_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                return None
+            data = snapshot.to_dict()
+            now = self._clock()
+            if not self._claimable(data, now):
+                return None
+
+            attempts = data.get("attempts", 0)
+            if attempts >= max_attempts:
+                transaction.update(
+                    doc_ref,
+                    {
+                        "status": JobStatus.FAILED.value,
+                        "completed_at": now,
+                        "error_message": f"Lease expired after {attempts} attempts",
+                        "lease_owner": None,
+                        "lease_expires_at": None,
+                    },
+                )
+                logger.warning(
+                    "job_shard_abandoned", job_id=doc_ref.id, attempts=attempts
+                )
+                return None
+
+            update_data = {
+                "status": JobStatus.RUNNING.value,
+                "lease_owner": owner,
+                "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                "attempts": attempts + 1,
+                "started_at": now,
+            }
+            transaction.update(doc_ref, update_data)
+            data.update(update_data)
+            data["id"] = doc_ref.id
+            return hydrate_dict(JobModel, data)
+
+        return claim_in_transaction(self.db.transaction())
+
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """実行中のシャードのリースを延長
+
+        Returns:
+            延長できたか（他のワーカーにリースを取られていればFalse）
+        """
+        try:
+            doc_ref = self.collection.document(job_id)
+
+            @firestore.transactional
+            def renew_in_transaction(transaction) -> bool:
+                snapshot = doc_ref.get(transaction=transaction)
+                if not self._owned_by(snapshot, owner):
+                    return False
+                transaction.update(
+                    doc_ref,
+                    {
+                        "lease_expires_at": self._clock()
+                        + timedelta(seconds=lease_seconds)
+                    },
+                )
+                return True
+
+            return renew_in_transaction(self.db.transaction())
+        except Exception as e:
+            logger.error("renew_lease_failed", job_id=job_id, error=str(e))
+            raise
+
+    def finish_shard(
+        self,
+        job_id: str,
+        owner: str,
+        status: JobStatus,
+        output_data: Optional[dict[str, Any]] = None,
+        error_message: Optional[str] = None,
+    ) -> bool:
+        """シャードの結果を保存してリースを解放
+
+        Returns:
+            保存できたか（リースを失っていた場合は保存せずFalse）
+        """
+        try:
+            doc_ref = self.collection.document(job_id)
+
+            @firestore.transactional
+            def finish_in_transaction(transaction) -> bool:
+                snapshot = doc_ref.get(transaction=transaction)
+                if not self._owned_by(snapshot, owner):
+                    return False
+                transaction.update(
+                    doc_ref,
+                    {
+                        "status": status.value,
+                        "completed_at": self._clock(),
+                        "output_data": output_data,
+                        "error_message": error_message,
+                        "lease_owner": None,
+                        "lease_expires_at": None,
+                    },
+                )
+                return True
+
+            finished = finish_in_transaction(self.db.transaction())
+            logger.info(
+                "job_shard_finished",
+                job_id=job_id,
+                owner=owner,
+                status=status.value,
+                finished=finished,
+            )
+            return finished
+        except Exception as e:
+            logger.error("finish_shard_failed", job_id=job_id, error=str(e))
+            raise
+
+    def release_shard(
+        self, job_id: str, owner: str, max_attempts: int, error_message: str
+    ) -> Optional[JobStatus]:
+        """実行に失敗したシャードのリースを解放
+
+        実行回数が max_attempts に達していなければ未実行に戻して他のワーカー
+        （または同じワーカー）が取り直せるようにし、達していれば失敗として確定する。
+
+        Returns:
+            解放後の状態（PENDING / FAILED）。リースを失っていた場合はNone
+        """
+        try:
+            doc_ref = self.collection.document(job_id)
+
+            @firestore.transactional
+            def release_in_transaction(transaction) -> Optional[JobStatus]:
+                snapshot = doc_ref.get(transaction=transaction)
+                if not self._owned_by(snapshot, owner):
+                    return None
+                attempts = snapshot.to_dict().get("attempts", 0)
+                status = (
+                    JobStatus.FAILED if attempts >= max_attempts else JobStatus.PENDING
+                )
+                update_data = {
+                    "status": status.value,
+                    "error_message": error_message,
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                }
+                if status == JobStatus.FAILED:
+                    update_data["completed_at"] = self._clock()
+                transaction.update(doc_ref, update_data)
+                return status
+
+            status = release_in_transaction(self.db.transaction())
+            logger.info(
+                "job_shard_released",
+                job_id=job_id,
+                owner=owner,
+                status=status.value if status else None,
+            )
+            return status
+        except Exception as e:
+            logger.error("release_shard_failed", job_id=job_id, error=str(e))
+            raise
+
+    @staticmethod
+    def _owned_by(snapshot: Any, owner: str) -> bool:
+        """実行中で、リースの所有者が owner か"""
+        if not snapshot.exists:
+            return False
+        data = snapshot.to_dict()
+        return (
+            data.get("status") == JobStatus.RUNNING.value
+            and data.get("lease_owner") == owner
+        )
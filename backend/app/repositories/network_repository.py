@@ -7,6 +7,8 @@ from google.cloud import firestore
 
 from app.models.network_node import NetworkNodeCreate, NetworkNodeModel
 from app.utils.enum_utils import enum_to_value
+from app.repositories import identity_map
+from app.repositories.hydration import hydrate, hydrate_all
 
 logger = structlog.get_logger(__name__)
 
@@ -29,11 +31,7 @@ class NetworkRepository:
                 .order_by("discovered_at")
                 .stream()
             )
-            nodes = []
-            for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                nodes.append(NetworkNodeModel(**data))
+            nodes = hydrate_all(NetworkNodeModel, docs)
             logger.info("get_all_by_oshi", oshi_id=oshi_id, count=len(nodes))
             return nodes
         except Exception as e:
@@ -48,11 +46,7 @@ class NetworkRepository:
                 .where("is_active", "==", True)
                 .stream()
             )
-            nodes = []
-            for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                nodes.append(NetworkNodeModel(**data))
+            nodes = hydrate_all(NetworkNodeModel, docs)
             logger.info("get_active_by_oshi", oshi_id=oshi_id, count=len(nodes))
             return nodes
         except Exception as e:
@@ -60,18 +54,21 @@ class NetworkRepository:
             raise
 
     def get_by_id(self, node_id: str) -> Optional[NetworkNodeModel]:
-        """IDでノードを取得"""
+        """IDでノードを取得（同じリクエスト内では1回だけ読む）"""
         try:
-            doc = self.collection.document(node_id).get()
-            if not doc.exists:
-                return None
-            data = doc.to_dict()
-            data["id"] = doc.id
-            return NetworkNodeModel(**data)
+            return identity_map.load(
+                self.COLLECTION_NAME, node_id, lambda: self._get(node_id)
+            )
         except Exception as e:
             logger.error("get_by_id_failed", node_id=node_id, error=str(e))
             raise
 
+    def _get(self, node_id: str) -> Optional[NetworkNodeModel]:
+        doc = self.collection.document(node_id).get()
+        if not doc.exists:
+            return None
+        return hydrate(NetworkNodeModel, doc)
+
     def find_by_name(self, oshi_id: str, name: str) -> Optional[NetworkNodeModel]:
         """名前で重複チェック"""
         try:
@@ -82,9 +79,7 @@ class NetworkRepository:
                 .stream()
             )
             for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                return NetworkNodeModel(**data)
+                return hydrate(NetworkNodeModel, doc)
             return None
         except Exception as e:
             logger.error(
@@ -117,7 +112,9 @@ class NetworkRepository:
                 oshi_id=node_data.oshi_id,
                 name=node_data.name,
             )
-            return NetworkNodeModel(**doc_data)
+            node = NetworkNodeModel(**doc_data)
+            identity_map.remember(self.COLLECTION_NAME, node.id, node)
+            return node
         except Exception as e:
             logger.error("create_failed", error=str(e))
             raise
@@ -149,6 +146,8 @@ class NetworkRepository:
                 created_nodes.append(NetworkNodeModel(**doc_data))
 
             batch.commit()
+            for node in created_nodes:
+                identity_map.remember(self.COLLECTION_NAME, node.id, node)
             logger.info("network_node_batch_created", count=len(created_nodes))
             return created_nodes
         except Exception as e:
@@ -159,11 +158,14 @@ class NetworkRepository:
         """最終検索日時を更新"""
         try:
             doc_ref = self.collection.document(node_id)
-            doc = doc_ref.get()
-            if not doc.exists:
+            if not identity_map.document_exists(self.COLLECTION_NAME, doc_ref):
                 return False
 
-            doc_ref.update({"last_searched_at": datetime.utcnow()})
+            now = datetime.utcnow()
+            doc_ref.update({"last_searched_at": now})
+            identity_map.remember_patch(
+                self.COLLECTION_NAME, node_id, {"last_searched_at": now}
+            )
             return True
         except Exception as e:
             logger.error(
@@ -175,11 +177,13 @@ class NetworkRepository:
         """ノードを無効化"""
         try:
             doc_ref = self.collection.document(node_id)
-            doc = doc_ref.get()
-            if not doc.exists:
+            if not identity_map.document_exists(self.COLLECTION_NAME, doc_ref):
                 return False
 
             doc_ref.update({"is_active": False})
+            identity_map.remember_patch(
+                self.COLLECTION_NAME, node_id, {"is_active": False}
+            )
             logger.info("network_node_deactivated", node_id=node_id)
             return True
         except Exception as e:
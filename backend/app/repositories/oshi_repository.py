@@ -6,6 +6,8 @@ import structlog
 from google.cloud import firestore
 
 from app.models.oshi import OshiCreate, OshiModel
+from app.repositories import identity_map
+from app.repositories.hydration import hydrate, hydrate_all
 
 logger = structlog.get_logger(__name__)
 
@@ -23,26 +25,28 @@ class OshiRepository:
         """全推しを取得（定期実行用）"""
         try:
             docs = self.collection.stream()
-            oshis = []
-            for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                oshis.append(OshiModel(**data))
+            oshis = hydrate_all(OshiModel, docs)
             logger.info("get_all_oshis", count=len(oshis))
             return oshis
         except Exception as e:
             logger.error("get_all_oshis_failed", error=str(e))
             raise
 
+    def get_all_ids(self) -> list[str]:
+        """全推しのIDだけを取得（フィールドは読まない）"""
+        try:
+            oshi_ids = [doc.id for doc in self.collection.select([]).stream()]
+            logger.info("get_all_oshi_ids", count=len(oshi_ids))
+            return oshi_ids
+        except Exception as e:
+            logger.error("get_all_oshi_ids_failed", error=str(e))
+            raise
+
     def get_all_by_user(self, user_id: str) -> list[OshiModel]:
         """ユーザーの全推しを取得"""
         try:
             docs = self.collection.where("user_id", "==", user_id).stream()
-            oshis = []
-            for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                oshis.append(OshiModel(**data))
+            oshis = hydrate_all(OshiModel, docs)
             logger.info("get_all_by_user", user_id=user_id, count=len(oshis))
             return oshis
         except Exception as e:
@@ -50,18 +54,49 @@ class OshiRepository:
             raise
 
     def get_by_id(self, oshi_id: str) -> Optional[OshiModel]:
-        """IDで推しを取得"""
+        """IDで推しを取得（同じリクエスト内では1回だけ読む）"""
         try:
-            doc = self.collection.document(oshi_id).get()
-            if not doc.exists:
-                return None
-            data = doc.to_dict()
-            data["id"] = doc.id
-            return OshiModel(**data)
+            return identity_map.load(
+                self.COLLECTION_NAME, oshi_id, lambda: self._get(oshi_id)
+            )
         except Exception as e:
             logger.error("get_by_id_failed", oshi_id=oshi_id, error=str(e))
             raise
 
+    def get_many(self, oshi_ids: list[str]) -> dict[str, OshiModel]:
+        """複数IDの推しを1回のバッチ読み取りで取得
+
+        同じリクエスト内で読み書き済みの推しは読み直さない。
+
+        Returns:
+            推しIDをキーとする辞書（存在しないIDは含まない）
+        """
+        try:
+            return identity_map.load_many(
+                self.COLLECTION_NAME, oshi_ids, self._get_many
+            )
+        except Exception as e:
+            logger.error("get_many_failed", count=len(oshi_ids), error=str(e))
+            raise
+
+    def _get(self, oshi_id: str) -> Optional[OshiModel]:
+        doc = self.collection.document(oshi_id).get()
+        if not doc.exists:
+            return None
+        return hydrate(OshiModel, doc)
+
+    def _get_many(self, oshi_ids: list[str]) -> dict[str, OshiModel]:
+        refs = [
+            self.collection.document(oshi_id) for oshi_id in dict.fromkeys(oshi_ids)
+        ]
+        oshis = {}
+        for doc in self.db.get_all(refs):
+            if not doc.exists:
+                continue
+            oshis[doc.id] = hydrate(OshiModel, doc)
+        logger.info("get_many", requested=len(refs), found=len(oshis))
+        return oshis
+
     def create(self, user_id: str, oshi_data: OshiCreate) -> OshiModel:
         """推しを作成"""
         try:
@@ -79,8 +114,10 @@ class OshiRepository:
             doc_ref.set(doc_data)
 
             doc_data["id"] = doc_ref.id
+            oshi = OshiModel(**doc_data)
+            identity_map.remember(self.COLLECTION_NAME, oshi.id, oshi)
             logger.info("oshi_created", oshi_id=doc_ref.id, user_id=user_id)
-            return OshiModel(**doc_data)
+            return oshi
         except Exception as e:
             logger.error("create_failed", user_id=user_id, error=str(e))
             raise
@@ -89,8 +126,7 @@ class OshiRepository:
         """推しを更新"""
         try:
             doc_ref = self.collection.document(oshi_id)
-            doc = doc_ref.get()
-            if not doc.exists:
+            if not identity_map.document_exists(self.COLLECTION_NAME, doc_ref):
                 return None
 
             update_data = oshi_data.model_dump(exclude_unset=True)
@@ -98,11 +134,10 @@ class OshiRepository:
 
             doc_ref.update(update_data)
 
-            updated_doc = doc_ref.get()
-            data = updated_doc.to_dict()
-            data["id"] = updated_doc.id
+            oshi = hydrate(OshiModel, doc_ref.get())
+            identity_map.remember(self.COLLECTION_NAME, oshi_id, oshi)
             logger.info("oshi_updated", oshi_id=oshi_id)
-            return OshiModel(**data)
+            return oshi
         except Exception as e:
             logger.error("update_failed", oshi_id=oshi_id, error=str(e))
             raise
@@ -111,11 +146,11 @@ class OshiRepository:
         """推しを削除"""
         try:
             doc_ref = self.collection.document(oshi_id)
-            doc = doc_ref.get()
-            if not doc.exists:
+            if not identity_map.document_exists(self.COLLECTION_NAME, doc_ref):
                 return False
 
             doc_ref.delete()
+            identity_map.remember(self.COLLECTION_NAME, oshi_id, None)
             logger.info("oshi_deleted", oshi_id=oshi_id)
             return True
         except Exception as e:
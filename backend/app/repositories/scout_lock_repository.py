@@ -0,0 +1,187 @@
+"""推しごとのスカウト実行ロックのリポジトリ
+
+ドキュメントIDは推しID。実行中のワーカーは expires_at までリースを持ち、実行中は延長し続ける。
+インスタンスが停止して延長されなくなったロックは、期限が切れた後に他のワーカーが取り直す。
+実行が終わったら結果（またはエラー）を保存し、同じ実行を待っている他のインスタンスが
+読み取れるようにする。終了後のドキュメントは Firestore の TTL ポリシー（expires_at
+フィールド）で削除する。
+"""
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+import structlog
+from google.cloud import firestore
+
+from app.utils.time_utils import as_naive_utc
+
+logger = structlog.get_logger(__name__)
+
+LOCK_RUNNING = "running"
+LOCK_COMPLETED = "completed"
+LOCK_FAILED = "failed"
+
+
+class ScoutLockRepository:
+    """推しごとのスカウト実行ロックのリポジトリ"""
+
+    COLLECTION_NAME = "scout_locks"
+
+    def __init__(
+        self,
+        db: firestore.Client,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ):
+        self.db = db
+        self.collection = db.collection(self.COLLECTION_NAME)
+        self._clock = clock
+
+    def _is_held(self, data: Optional[dict[str, Any]]) -> bool:
+        """実行中で、リースの期限が切れていないか"""
+        if not data or data.get("status") != LOCK_RUNNING:
+            return False
+        expires_at = data.get("expires_at")
+        return expires_at is not None and as_naive_utc(expires_at) > self._clock()
+
+    def acquire(
+        self, oshi_id: str, workflow: str, owner: str, ttl_seconds: float
+    ) -> tuple[bool, dict[str, Any]]:
+        """ロックを取得
+
+        Args:
+            oshi_id: 推しID
+            workflow: ワークフロー名（scout / network_scout）
+            owner: ロックの所有者（実行ごとの識別子）
+            ttl_seconds: リースの長さ（秒）
+
+        Returns:
+            (取得できたか, ロックの内容)。取得できなかった場合は実行中の他のワーカーのロック
+        """
+        try:
+            doc_ref = self.collection.document(oshi_id)
+
+            @firestore.transactional
+            def acquire_in_transaction(transaction) -> tuple[bool, dict[str, Any]]:
+                snapshot = doc_ref.get(transaction=transaction)
+                current = snapshot.to_dict() if snapshot.exists else None
+                if self._is_held(current):
+                    return False, current
+
+                now = self._clock()
+                lock = {
+                    "oshi_id": oshi_id,
+                    "workflow": workflow,
+                    "owner": owner,
+                    "run_id": uuid.uuid4().hex,
+                    "status": LOCK_RUNNING,
+                    "result": None,
+                    "error": None,
+                    "started_at": now,
+                    "completed_at": None,
+                    "expires_at": now + timedelta(seconds=ttl_seconds),
+                }
+                transaction.set(doc_ref, lock)
+                return True, lock
+
+            acquired, lock = acquire_in_transaction(self.db.transaction())
+            logger.info(
+                "scout_lock_acquire",
+                oshi_id=oshi_id,
+                workflow=workflow,
+                acquired=acquired,
+                holder=lock.get("owner"),
+            )
+            return acquired, lock
+        except Exception as e:
+            logger.error("acquire_failed", oshi_id=oshi_id, error=str(e))
+            raise
+
+    def renew(self, oshi_id: str, owner: str, ttl_seconds: float) -> bool:
+        """実行中のロックのリースを延長
+
+        Returns:
+            延長できたか（期限切れで他のワーカーに取られていればFalse）
+        """
+        try:
+            doc_ref = self.collection.document(oshi_id)
+
+            @firestore.transactional
+            def renew_in_transaction(transaction) -> bool:
+                snapshot = doc_ref.get(transaction=transaction)
+                current = snapshot.to_dict() if snapshot.exists else None
+                if not current or current.get("owner") != owner:
+                    return False
+                if current.get("status") != LOCK_RUNNING:
+                    return False
+                transaction.update(
+                    doc_ref,
+                    {"expires_at": self._clock() + timedelta(seconds=ttl_seconds)},
+                )
+                return True
+
+            return renew_in_transaction(self.db.transaction())
+        except Exception as e:
+            logger.error("renew_failed", oshi_id=oshi_id, error=str(e))
+            raise
+
+    def release(
+        self,
+        oshi_id: str,
+        owner: str,
+        ttl_seconds: float,
+        result: Optional[dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        """結果（またはエラー）を保存してロックを解放
+
+        結果は待っている他のインスタンスが読み取るため、TTL の間は残す。
+
+        Returns:
+            解放できたか（リースを失っていた場合はFalse）
+        """
+        try:
+            doc_ref = self.collection.document(oshi_id)
+
+            @firestore.transactional
+            def release_in_transaction(transaction) -> bool:
+                snapshot = doc_ref.get(transaction=transaction)
+                current = snapshot.to_dict() if snapshot.exists else None
+                if not current or current.get("owner") != owner:
+                    return False
+                now = self._clock()
+                transaction.update(
+                    doc_ref,
+                    {
+                        "status": LOCK_FAILED if error is not None else LOCK_COMPLETED,
+                        "result": result,
+                        "error": error,
+                        "completed_at": now,
+                        "expires_at": now + timedelta(seconds=ttl_seconds),
+                    },
+                )
+                return True
+
+            released = release_in_transaction(self.db.transaction())
+            logger.info(
+                "scout_lock_released",
+                oshi_id=oshi_id,
+                released=released,
+                failed=error is not None,
+            )
+            return released
+        except Exception as e:
+            logger.error("release_failed", oshi_id=oshi_id, error=str(e))
+            raise
+
+    def get(self, oshi_id: str) -> Optional[dict[str, Any]]:
+        """ロックの内容を取得（無ければNone）"""
+        try:
+            doc = self.collection.document(oshi_id).get()
+            return doc.to_dict() if doc.exists else None
+        except Exception as e:
+            logger.error("get_failed", oshi_id=oshi_id, error=str(e))
+            raise
+
+    def is_held(self, lock: Optional[dict[str, Any]]) -> bool:
+        """ロックの内容が実行中（期限内）か"""
+        return self._is_held(lock)
@@ -0,0 +1,212 @@
+"""scout-all のシャード間で共有する検索結果のリポジトリ
+
+ドキュメントIDは scout-all の実行（親ジョブ）とクエリから作る。最初に検索するシャードが
+リースを取って検索し、結果を保存する。同じクエリを要求した他のシャードはリースの間は
+結果の保存を待ち、保存された結果を使う。検索中のシャードはリースを延長し続け、
+インスタンスが停止した場合は、リースの期限が切れた後に他のシャードが取り直す。ドキュメントは Firestore の TTL ポリシー
+（expires_at フィールド）で削除する。
+"""
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+import structlog
+from google.cloud import firestore
+
+from app.utils.time_utils import as_naive_utc
+
+logger = structlog.get_logger(__name__)
+
+SEARCH_RUNNING = "running"
+SEARCH_COMPLETED = "completed"
+
+
+class SearchResultRepository:
+    """scout-all のシャード間で共有する検索結果のリポジトリ"""
+
+    COLLECTION_NAME = "scout_search_results"
+
+    def __init__(
+        self,
+        db: firestore.Client,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ):
+        self.db = db
+        self.collection = db.collection(self.COLLECTION_NAME)
+        self._clock = clock
+
+    @staticmethod
+    def result_key(run_id: str, query: str, num_results: int) -> str:
+        """検索結果のドキュメントID"""
+        raw = "|".join([run_id, str(num_results), query])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def claim(
+        self,
+        run_id: str,
+        query: str,
+        num_results: int,
+        owner: str,
+        lease_seconds: float,
+    ) -> tuple[bool, dict[str, Any]]:
+        """クエリを検索する権利（リース）を取得
+
+        Args:
+            run_id: scout-all の実行ID（親ジョブID）
+            query: 検索クエリ
+            num_results: 取得件数
+            owner: 検索するワーカーの識別子
+            lease_seconds: リースの長さ（秒）
+
+        Returns:
+            (取得できたか, ドキュメントの内容)。取得できなかった場合は保存済みの結果か、
+            検索中の他のワーカーのリース
+        """
+        try:
+            doc_ref = self.collection.document(
+                self.result_key(run_id, query, num_results)
+            )
+
+            @firestore.transactional
+            def claim_in_transaction(transaction) -> tuple[bool, dict[str, Any]]:
+                snapshot = doc_ref.get(transaction=transaction)
+                current = snapshot.to_dict() if snapshot.exists else None
+                now = self._clock()
+                if current and current.get("status") == SEARCH_COMPLETED:
+                    return False, current
+                if (
+                    current
+                    and current.get("expires_at") is not None
+                    and as_naive_utc(current["expires_at"]) > now
+                ):
+                    return False, current
+
+                entry = {
+                    "run_id": run_id,
+                    "query": query,
+                    "num_results": num_results,
+                    "owner": owner,
+                    "status": SEARCH_RUNNING,
+                    "results": None,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=lease_seconds),
+                }
+                transaction.set(doc_ref, entry)
+                return True, entry
+
+            return claim_in_transaction(self.db.transaction())
+        except Exception as e:
+            logger.error("claim_failed", run_id=run_id, query=query, error=str(e))
+            raise
+
+    def get(
+        self, run_id: str, query: str, num_results: int
+    ) -> Optional[dict[str, Any]]:
+        """保存済みの結果、または検索中のリース（無ければNone）"""
+        try:
+            snapshot = self.collection.document(
+                self.result_key(run_id, query, num_results)
+            ).get()
+            return snapshot.to_dict() if snapshot.exists else None
+        except Exception as e:
+            logger.error("get_failed", run_id=run_id, query=query, error=str(e))
+            raise
+
+    def lease_expired(self, entry: dict[str, Any]) -> bool:
+        """検索中のリースの期限が切れているか（保存済みの結果はFalse）"""
+        if entry.get("status") == SEARCH_COMPLETED:
+            return False
+        expires_at = entry.get("expires_at")
+        return expires_at is None or as_naive_utc(expires_at) <= self._clock()
+
+    def renew(
+        self,
+        run_id: str,
+        query: str,
+        num_results: int,
+        owner: str,
+        lease_seconds: float,
+    ) -> bool:
+        """検索中のリースを延長
+
+        Returns:
+            延長できたか（リースを失っていた場合はFalse）
+        """
+        try:
+            doc_ref = self.collection.document(
+                self.result_key(run_id, query, num_results)
+            )
+
+            @firestore.transactional
+            def renew_in_transaction(transaction) -> bool:
+                snapshot = doc_ref.get(transaction=transaction)
+                current = snapshot.to_dict() if snapshot.exists else None
+                if not current or current.get("owner") != owner:
+                    return False
+                if current.get("status") != SEARCH_RUNNING:
+                    return False
+                transaction.update(
+                    doc_ref,
+                    {"expires_at": self._clock() + timedelta(seconds=lease_seconds)},
+                )
+                return True
+
+            return renew_in_transaction(self.db.transaction())
+        except Exception as e:
+            logger.error("renew_failed", run_id=run_id, query=query, error=str(e))
+            raise
+
+    def complete(
+        self,
+        run_id: str,
+        query: str,
+        num_results: int,
+        owner: str,
+        results: list[dict[str, Any]],
+        ttl_seconds: float,
+    ) -> None:
+        """検索結果を保存（保存後は TTL の間、同じ実行の他のシャードが読む）"""
+        try:
+            now = self._clock()
+            self.collection.document(self.result_key(run_id, query, num_results)).set(
+                {
+                    "run_id": run_id,
+                    "query": query,
+                    "num_results": num_results,
+                    "owner": owner,
+                    "status": SEARCH_COMPLETED,
+                    "results": results,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=ttl_seconds),
+                }
+            )
+        except Exception as e:
+            logger.error("complete_failed", run_id=run_id, query=query, error=str(e))
+            raise
+
+    def abandon(self, run_id: str, query: str, num_results: int, owner: str) -> bool:
+        """検索に失敗したリースを手放す（他のシャードがすぐに取り直せるようにする）
+
+        Returns:
+            手放せたか（リースを失っていた場合はFalse）
+        """
+        try:
+            doc_ref = self.collection.document(
+                self.result_key(run_id, query, num_results)
+            )
+
+            @firestore.transactional
+            def abandon_in_transaction(transaction) -> bool:
+                snapshot = doc_ref.get(transaction=transaction)
+                current = snapshot.to_dict() if snapshot.exists else None
+                if not current or current.get("owner") != owner:
+                    return False
+                if current.get("status") != SEARCH_RUNNING:
+                    return False
+                transaction.delete(doc_ref)
+                return True
+
+            return abandon_in_transaction(self.db.transaction())
+        except Exception as e:
+            logger.error("abandon_failed", run_id=run_id, query=query, error=str(e))
+            raise
@@ -0,0 +1,127 @@
+"""遠征アドバイスキャッシュリポジトリ
+
+同じ会場・開催日に同じ地域から向かうファンには同じアドバイスを使い回す。
+期限切れのドキュメントは Firestore の TTL ポリシー（expires_at フィールド）で削除されるが、
+削除は即時ではないため読み取り時にも期限を確認する。
+"""
+import hashlib
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional
+
+import structlog
+from google.cloud import firestore
+
+from app.config import settings
+from app.utils.cache_stats import get_cache_stats
+from app.utils.text_utils import normalize_name
+from app.utils.time_utils import as_naive_utc
+
+logger = structlog.get_logger(__name__)
+
+
+class TripAdviceCacheRepository:
+    """遠征アドバイスキャッシュリポジトリ"""
+
+    COLLECTION_NAME = "trip_advice_cache"
+    BATCH_LIMIT = 500
+
+    def __init__(
+        self,
+        db: firestore.Client,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ):
+        self.db = db
+        self.collection = db.collection(self.COLLECTION_NAME)
+        self.ttl = timedelta(
+            seconds=(
+                settings.trip_advice_cache_ttl_seconds
+                if ttl_seconds is None
+                else ttl_seconds
+            )
+        )
+        self._clock = clock
+        self.stats = get_cache_stats(self.COLLECTION_NAME)
+
+    @staticmethod
+    def cache_key(destination: str, event_date: date, departure_area: str) -> str:
+        """キャッシュのドキュメントID
+
+        Args:
+            destination: 会場
+            event_date: 開催日
+            departure_area: 出発地の地域（都道府県、判定できない場合は出発地そのもの）
+        """
+        raw = "|".join(
+            [
+                normalize_name(destination),
+                event_date.isoformat(),
+                normalize_name(departure_area),
+            ]
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict[str, str]:
+        """有効期限内のアドバイスをまとめて取得
+
+        Returns:
+            キー → アドバイス（ミス・期限切れのキーは含まない）
+        """
+        try:
+            unique_keys = list(dict.fromkeys(keys))
+            if not unique_keys:
+                return {}
+            refs = [self.collection.document(key) for key in unique_keys]
+            now = self._clock()
+            found: dict[str, str] = {}
+            for doc in self.db.get_all(refs):
+                if not doc.exists:
+                    continue
+                data = doc.to_dict()
+                expires_at = data.get("expires_at")
+                if expires_at is None or as_naive_utc(expires_at) <= now:
+                    continue
+                found[doc.id] = data["advice"]
+
+            self.stats.record_hit(len(found))
+            self.stats.record_miss(len(unique_keys) - len(found))
+            logger.info(
+                "trip_advice_cache_lookup",
+                requested=len(unique_keys),
+                hits=len(found),
+                hit_rate=self.stats.hit_rate,
+            )
+            return found
+        except Exception as e:
+            logger.error("get_many_failed", count=len(keys), error=str(e))
+            raise
+
+    def get(self, key: str) -> Optional[str]:
+        """有効期限内のアドバイスを取得（ミス・期限切れの場合はNone）"""
+        return self.get_many([key]).get(key)
+
+    def put_many(self, entries: dict[str, str]) -> None:
+        """アドバイスをまとめて保存（有効期限は保存時刻からTTL後）"""
+        try:
+            now = self._clock()
+            items = list(entries.items())
+            for start in range(0, len(items), self.BATCH_LIMIT):
+                batch = self.db.batch()
+                for key, advice in items[start : start + self.BATCH_LIMIT]:
+                    batch.set(
+                        self.collection.document(key),
+                        {
+                            "advice": advice,
+                            "created_at": now,
+                            "expires_at": now + self.ttl,
+                        },
+                    )
+                batch.commit()
+            logger.info("trip_advice_cache_saved", count=len(items))
+        except Exception as e:
+            logger.error("put_many_failed", count=len(entries), error=str(e))
+            raise
+
+    def put(self, key: str, advice: str) -> None:
+        """アドバイスを保存"""
+        self.put_many({key: advice})
@@ -6,6 +6,7 @@ import structlog
 from google.cloud import firestore
 
 from app.models.trip_plan import TripPlanCreate, TripPlanModel
+from app.repositories.hydration import hydrate
 
 logger = structlog.get_logger(__name__)
 
@@ -26,9 +27,7 @@ class TripRepository:
                 self.collection.where("event_id", "==", event_id).limit(1).stream()
             )
             for doc in docs:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                return TripPlanModel(**data)
+                return hydrate(TripPlanModel, doc)
             return None
         except Exception as e:
             logger.error("get_by_event_failed", event_id=event_id, error=str(e))
@@ -60,3 +59,37 @@ class TripRepository:
         except Exception as e:
             logger.error("create_failed", error=str(e))
             raise
+
+    def create_batch(
+        self, user_id: str, plans_data: list[TripPlanCreate]
+    ) -> list[TripPlanModel]:
+        """遠征プランをバッチ作成"""
+        try:
+            now = datetime.utcnow()
+            created_plans = []
+
+            # バッチ書き込みは1回500件まで
+            for start in range(0, len(plans_data), 500):
+                batch = self.db.batch()
+                for plan_data in plans_data[start : start + 500]:
+                    doc_data = plan_data.model_dump()
+                    doc_data.update(
+                        {
+                            "user_id": user_id,
+                            "created_at": now,
+                            "updated_at": now,
+                        }
+                    )
+
+                    doc_ref = self.collection.document()
+                    batch.set(doc_ref, doc_data)
+
+                    doc_data["id"] = doc_ref.id
+                    created_plans.append(TripPlanModel(**doc_data))
+                batch.commit()
+
+            logger.info("trip_plan_batch_created", count=len(created_plans))
+            return created_plans
+        except Exception as e:
+            logger.error("create_batch_failed", error=str(e))
+            raise
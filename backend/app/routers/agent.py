@@ -1,34 +1,50 @@
 """エージェントルーター"""
+import asyncio
+import importlib.util
 from typing import Any, Optional
 
 import structlog
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
 from pydantic import BaseModel, Field
 
 from app.agents.budget_agent import BudgetAgent
 from app.agents.calendar_agent import CalendarAgent
 from app.agents.root_agent import RootAgent
+from app.agents.scout_coordinator import ScoutCoordinator
 from app.agents.trip_agent import TripAgent
+from app.config import settings
 from app.dependencies import (
     get_budget_agent,
     get_calendar_agent,
     get_network_repository,
     get_oshi_repository,
     get_root_agent,
+    get_scout_coordinator,
     get_trip_agent,
     get_user_id,
     verify_internal_api_key,
 )
+from app.models.workflow_results import (
+    CalendarRegistrationResult,
+    ScoutAllProgress,
+    TripPlanResult,
+)
 from app.repositories.network_repository import NetworkRepository
 from app.repositories.oshi_repository import OshiRepository
+from app.routers.responses import FastJSONResponse
 from app.utils.enum_utils import enum_to_value
 
-# ADK は Python 3.10+ が必要。利用可能な場合のみインポート
-try:
-    from app.agents.adk_runner import run_scout_workflow_adk
-    ADK_AVAILABLE = True
-except ImportError:
-    ADK_AVAILABLE = False
+def _adk_available() -> bool:
+    """ADK がインストールされているか（インポートせずに確認）"""
+    try:
+        return importlib.util.find_spec("google.adk") is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# ADK は Python 3.10+ が必要で、読み込みにも時間がかかるため、
+# 起動時は利用可否だけを確認し、実際のインポートは /scout-adk の初回呼び出しまで遅らせる
+ADK_AVAILABLE = _adk_available()
 
 logger = structlog.get_logger(__name__)
 
@@ -54,6 +70,7 @@ class ScoutResponse(BaseModel):
     collected_count: int
     new_info_ids: list[str]
     priority_results: dict[str, str]
+    new_event_ids: list[str] = []
 
 
 class PriorityRequest(BaseModel):
@@ -82,6 +99,22 @@ class CalendarResponse(BaseModel):
     calendar_event_id: str
 
 
+class CalendarBulkRequest(BaseModel):
+    """推しの今後のイベント一括カレンダー登録リクエスト"""
+
+    oshi_id: str = Field(..., description="推しID")
+    oauth_token: str = Field(..., description="OAuth2アクセストークン")
+
+
+class CalendarBulkResponse(BaseModel):
+    """推しの今後のイベント一括カレンダー登録レスポンス"""
+
+    oshi_id: str
+    results: list[CalendarRegistrationResult]
+    registered_count: int
+    failed_count: int
+
+
 class TripRequest(BaseModel):
     """Trip Agent実行リクエスト"""
 
@@ -95,6 +128,28 @@ class TripResponse(BaseModel):
     plan_id: str
 
 
+class TripBatchItem(BaseModel):
+    """バッチ遠征プランの1件分"""
+
+    event_id: str = Field(..., description="イベントID")
+    departure: str = Field(..., min_length=1, description="出発地")
+
+
+class TripBatchRequest(BaseModel):
+    """バッチ遠征プラン生成リクエスト"""
+
+    items: list[TripBatchItem] = Field(
+        ..., min_length=1, max_length=50, description="(イベント, 出発地) のリスト"
+    )
+
+
+class TripBatchResponse(BaseModel):
+    """バッチ遠征プラン生成レスポンス"""
+
+    plans: list[TripPlanResult]
+    created_count: int
+
+
 class SummaryRequest(BaseModel):
     """Summary生成リクエスト"""
 
@@ -153,6 +208,7 @@ class NetworkScoutResponse(BaseModel):
     total_count: int
     new_info_ids: list[str]
     priority_results: dict[str, str]
+    new_event_ids: list[str] = []
 
 
 class BudgetRequest(BaseModel):
@@ -199,10 +255,10 @@ async def run_scout(
             "api_scout_success",
             user_id=user_id,
             oshi_id=request.oshi_id,
-            collected_count=result["collected_count"],
+            collected_count=result.collected_count,
         )
 
-        return ScoutResponse(**result)
+        return FastJSONResponse(ScoutResponse(**result.model_dump()))
 
     except ValueError as e:
         logger.warning("api_scout_not_found", error=str(e))
@@ -234,6 +290,15 @@ async def run_scout_adk(
             detail="ADK is not available in this environment",
         )
 
+    try:
+        from app.agents.adk_runner import run_scout_workflow_adk
+    except ImportError as e:
+        logger.error("api_scout_adk_import_failed", error=str(e))
+        raise HTTPException(
+            status_code=501,
+            detail="ADK is not available in this environment",
+        )
+
     try:
         oshi = oshi_repo.get_by_id(request.oshi_id)
         if not oshi or oshi.user_id != user_id:
@@ -247,7 +312,7 @@ async def run_scout_adk(
 
         result = await run_scout_workflow_adk(
             oshi_id=request.oshi_id,
-            oshi_name=oshi.get("name", ""),
+            oshi_name=oshi.name,
             user_id=user_id,
         )
 
@@ -269,22 +334,82 @@ async def run_scout_adk(
 
 @router.post("/scout-all")
 async def run_scout_all(
+    shards: Optional[int] = Query(
+        None, ge=1, le=1000, description="シャード数（省略時は SCOUT_ALL_SHARD_COUNT）"
+    ),
     root_agent: RootAgent = Depends(get_root_agent),
+    coordinator: ScoutCoordinator = Depends(get_scout_coordinator),
 ):
-    """全推しのScout Agentを実行（Cloud Scheduler用）"""
+    """全推しのScout Agentを実行（Cloud Scheduler用）
+
+    シャード数が2以上の場合はシャードのジョブを登録し、SCOUT_ALL_WORKER_URL に
+    /scout-all/work を送って他のインスタンスに分担させる。このリクエストもワーカーとして
+    シャードを実行する。
+    """
     try:
-        logger.info("api_scout_all_start")
+        shard_count = shards or settings.scout_all_shard_count
+        logger.info("api_scout_all_start", shard_count=shard_count)
 
-        result = await root_agent.run_all_scouts()
+        if shard_count > 1:
+            parent = await coordinator.enqueue(shard_count)
+            result = await coordinator.run(parent.id, workers=shard_count - 1)
+        else:
+            result = await root_agent.run_all_scouts()
 
-        logger.info("api_scout_all_success")
-        return result
+        logger.info("api_scout_all_success", shard_count=shard_count)
+        # 推しごとの結果を含む大きなレスポンスのため、FastAPI の変換を経由せずに書き出す
+        return FastJSONResponse(result)
 
     except Exception as e:
         logger.error("api_scout_all_failed", error=str(e))
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.post("/scout-all/work")
+async def run_scout_all_worker(
+    job_id: Optional[str] = Query(None, description="親ジョブID（省略時は実行中の最新）"),
+    max_shards: Optional[int] = Query(None, ge=1, description="実行するシャード数の上限"),
+    coordinator: ScoutCoordinator = Depends(get_scout_coordinator),
+):
+    """scout-all のシャードを取得して実行（各インスタンスのワーカー用）"""
+    try:
+        job_id = job_id or await asyncio.to_thread(coordinator.latest_job_id)
+        if job_id is None:
+            return FastJSONResponse({"job_id": None, "processed_shards": []})
+
+        logger.info("api_scout_all_worker_start", job_id=job_id)
+        result = await coordinator.work(job_id, max_shards=max_shards)
+        logger.info(
+            "api_scout_all_worker_success",
+            job_id=job_id,
+            processed=len(result["processed_shards"]),
+        )
+        return FastJSONResponse(result)
+
+    except Exception as e:
+        logger.error("api_scout_all_worker_failed", job_id=job_id, error=str(e))
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/scout-all/{job_id}", response_model=ScoutAllProgress)
+async def get_scout_all_progress(
+    job_id: str,
+    coordinator: ScoutCoordinator = Depends(get_scout_coordinator),
+):
+    """シャード分割した scout-all の進捗を取得"""
+    try:
+        progress = await asyncio.to_thread(coordinator.progress, job_id)
+        if progress is None:
+            raise HTTPException(status_code=404, detail="ジョブが見つかりません")
+        return progress
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("api_scout_all_progress_failed", job_id=job_id, error=str(e))
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.post("/summary", response_model=SummaryResponse)
 async def run_summary(
     request: SummaryRequest,
@@ -368,6 +493,59 @@ async def run_calendar(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.post("/calendar/bulk", response_model=CalendarBulkResponse)
+async def run_calendar_bulk(
+    request: CalendarBulkRequest,
+    user_id: str = Depends(get_user_id),
+    oshi_repo: OshiRepository = Depends(get_oshi_repository),
+    calendar_agent: CalendarAgent = Depends(get_calendar_agent),
+):
+    """Calendar Agentを実行（推しの今後の未登録イベントを一括登録）"""
+    try:
+        # 推しの所有者確認
+        oshi = oshi_repo.get_by_id(request.oshi_id)
+        if not oshi or oshi.user_id != user_id:
+            raise HTTPException(status_code=403, detail="この推しへのアクセス権限がありません")
+
+        logger.info(
+            "api_calendar_bulk_start",
+            user_id=user_id,
+            oshi_id=request.oshi_id,
+        )
+
+        results = await calendar_agent.register_upcoming_events(
+            oshi_id=request.oshi_id,
+            oauth_token=request.oauth_token,
+        )
+        registered_count = sum(
+            1 for r in results if r.calendar_event_id and not r.already_registered
+        )
+        failed_count = sum(1 for r in results if r.error)
+
+        logger.info(
+            "api_calendar_bulk_success",
+            user_id=user_id,
+            oshi_id=request.oshi_id,
+            registered_count=registered_count,
+            failed_count=failed_count,
+        )
+
+        return FastJSONResponse(
+            CalendarBulkResponse(
+                oshi_id=request.oshi_id,
+                results=results,
+                registered_count=registered_count,
+                failed_count=failed_count,
+            )
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("api_calendar_bulk_failed", error=str(e))
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.post("/trip", response_model=TripResponse)
 async def run_trip(
     request: TripRequest,
@@ -406,6 +584,38 @@ async def run_trip(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.post("/trip/batch", response_model=TripBatchResponse)
+async def run_trip_batch(
+    request: TripBatchRequest,
+    user_id: str = Depends(get_user_id),
+    trip_agent: TripAgent = Depends(get_trip_agent),
+):
+    """Trip Agentを実行（複数イベント・出発地の遠征プランを一括生成）"""
+    try:
+        logger.info("api_trip_batch_start", user_id=user_id, count=len(request.items))
+
+        plans = await trip_agent.generate_plans(
+            user_id=user_id,
+            requests=[(item.event_id, item.departure) for item in request.items],
+        )
+        created_count = sum(1 for plan in plans if plan.plan_id)
+
+        logger.info(
+            "api_trip_batch_success",
+            user_id=user_id,
+            count=len(plans),
+            created_count=created_count,
+        )
+
+        return FastJSONResponse(
+            TripBatchResponse(plans=plans, created_count=created_count)
+        )
+
+    except Exception as e:
+        logger.error("api_trip_batch_failed", error=str(e))
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.post("/budget", response_model=BudgetResponse)
 async def run_budget(
     request: BudgetRequest,
@@ -467,10 +677,10 @@ async def discover_network(
             "api_network_discover_success",
             user_id=user_id,
             oshi_id=request.oshi_id,
-            discovered_count=result["discovered_count"],
+            discovered_count=result.discovered_count,
         )
 
-        return NetworkDiscoverResponse(**result)
+        return FastJSONResponse(NetworkDiscoverResponse(**result.model_dump()))
 
     except ValueError as e:
         logger.warning("api_network_discover_not_found", error=str(e))
@@ -495,19 +705,21 @@ async def get_network(
 
         nodes = network_repo.get_all_by_oshi(oshi_id)
 
-        return NetworkListResponse(
-            oshi_id=oshi_id,
-            nodes=[
-                NetworkNodeResponse(
-                    id=n.id,
-                    name=n.name,
-                    node_type=enum_to_value(n.node_type),
-                    ring=enum_to_value(n.ring),
-                    relationship=n.relationship,
-                    is_active=n.is_active,
-                )
-                for n in nodes
-            ],
+        return FastJSONResponse(
+            NetworkListResponse(
+                oshi_id=oshi_id,
+                nodes=[
+                    NetworkNodeResponse(
+                        id=n.id,
+                        name=n.name,
+                        node_type=enum_to_value(n.node_type),
+                        ring=enum_to_value(n.ring),
+                        relationship=n.relationship,
+                        is_active=n.is_active,
+                    )
+                    for n in nodes
+                ],
+            )
         )
 
     except Exception as e:
@@ -540,10 +752,10 @@ async def run_network_scout(
             "api_network_scout_success",
             user_id=user_id,
             oshi_id=request.oshi_id,
-            total_count=result["total_count"],
+            total_count=result.total_count,
         )
 
-        return NetworkScoutResponse(**result)
+        return FastJSONResponse(NetworkScoutResponse(**result.model_dump()))
 
     except ValueError as e:
         logger.warning("api_network_scout_not_found", error=str(e))
@@ -1,10 +1,56 @@
 """ヘルスチェックルーター"""
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.external.circuit_breaker import circuit_breaker_states, get_circuit_breaker
+from app.utils.cache_stats import cache_stats_snapshot
+from app.warmup import get_warmup_state
 
 router = APIRouter(tags=["health"])
 
+# サーキットブレーカーで保護している外部依存
+EXTERNAL_DEPENDENCIES = ("gemini", "google_search", "google_maps", "google_calendar")
+
 
 @router.get("/health")
 async def health_check():
     """ヘルスチェック"""
     return {"status": "healthy"}
+
+
+@router.get("/ready")
+async def readiness_check():
+    """レディネスチェック
+
+    起動時のウォームアップが終わるまでは503を返す。
+    ウォームアップの各ステップの結果（所要時間・失敗理由）もあわせて返す。
+    """
+    warmup = get_warmup_state().snapshot()
+    if not warmup["ready"]:
+        return JSONResponse(
+            status_code=503, content={"status": "warming_up", "warmup": warmup}
+        )
+    return {"status": "ready", "warmup": warmup}
+
+
+@router.get("/health/dependencies")
+async def dependencies_health_check():
+    """外部依存のサーキットブレーカー状態
+
+    いずれかのサーキットがクローズ以外なら status は degraded になる。
+    インスタンス自体は応答可能なため、HTTPステータスは常に200を返す。
+    """
+    for name in EXTERNAL_DEPENDENCIES:
+        get_circuit_breaker(name)
+    dependencies = circuit_breaker_states()
+    degraded = any(dep["state"] != "closed" for dep in dependencies.values())
+    return {
+        "status": "degraded" if degraded else "healthy",
+        "dependencies": dependencies,
+    }
+
+
+@router.get("/health/caches")
+async def caches_health_check():
+    """プロセス内のキャッシュのヒット率（インスタンス起動からの累計）"""
+    return {"caches": cache_stats_snapshot()}
@@ -0,0 +1,44 @@
+"""大きなレスポンス向けのJSONレスポンスクラス
+
+FastAPI はエンドポイントの戻り値を response_model で検証し直し、jsonable_encoder で
+辞書に変換してから標準の json で文字列化する。結果の件数が多いエンドポイントでは
+この変換がレスポンス時間の大半を占めるため、構築時に検証済みのモデル・辞書を
+そのまま高速なエンコーダーで書き出す。
+
+エンドポイントから Response を直接返すと FastAPI の再検証と変換は行われない。
+response_model は OpenAPI のスキーマとして引き続き指定しておく。
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    """orjson が直接扱えない値の変換（辞書・リストに含まれる Pydantic モデル）"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """レスポンス本文をJSONのバイト列に変換
+
+    Pydantic モデルは pydantic-core のシリアライザーで、それ以外は orjson で書き出す。
+    datetime・Enum・dataclass は orjson がそのまま扱える。
+
+    Examples:
+        >>> dumps({"oshi_id": "o1", "count": 2})
+        b'{"oshi_id":"o1","count":2}'
+    """
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode("utf-8")
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """検証済みの内容をそのまま書き出すJSONレスポンス"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,34 @@
+"""収集情報の正規化URLキー（canonical_url）をバックフィルする
+
+正規化URLキー導入前の収集情報や、正規化の規則を変更した後の既存データの更新に使う。
+find_by_url は canonical_url だけで照合するため、デプロイ前に実行すること。
+
+    python -m app.scripts.backfill_canonical_urls [--dry-run]
+"""
+import argparse
+
+import structlog
+
+from app.logging_config import configure_logging
+from app.repositories.firestore_client import get_firestore_client
+from app.repositories.info_repository import InfoRepository
+
+logger = structlog.get_logger(__name__)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--dry-run", action="store_true", help="対象の件数のみ数え、書き込まない"
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    repo = InfoRepository(get_firestore_client())
+    count = repo.backfill_canonical_urls(dry_run=args.dry_run)
+    print(f"canonical_url: {count}{' (dry run)' if args.dry_run else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
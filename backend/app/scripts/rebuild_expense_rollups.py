@@ -0,0 +1,34 @@
+"""支出の月次ロールアップを再構築する
+
+ロールアップ導入前の支出データのバックフィルや、不整合の修復に使う。
+
+    python -m app.scripts.rebuild_expense_rollups [--user-id USER_ID] [--dry-run]
+"""
+import argparse
+
+import structlog
+
+from app.logging_config import configure_logging
+from app.repositories.expense_repository import ExpenseRepository
+from app.repositories.firestore_client import get_firestore_client
+
+logger = structlog.get_logger(__name__)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-id", help="対象ユーザーID（省略時は全ユーザー）")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="集計のみ行い、書き込まない"
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    repo = ExpenseRepository(get_firestore_client())
+    count = repo.rebuild_rollups(user_id=args.user_id, dry_run=args.dry_run)
+    print(f"rollups: {count}{' (dry run)' if args.dry_run else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,4 +1,29 @@
 """ユーティリティ関数"""
+from app.utils.cache_stats import CacheStats, get_cache_stats
 from app.utils.enum_utils import enum_to_value
+from app.utils.near_duplicate import (
+    NearDuplicateIndex,
+    cluster_near_duplicates,
+    lsh_band_keys,
+    number_tokens,
+)
+from app.utils.region_utils import departure_region
+from app.utils.sharding import shard_of
+from app.utils.stage_graph import StageGraph
+from app.utils.text_utils import normalize_name
+from app.utils.time_utils import as_naive_utc
 
-__all__ = ["enum_to_value"]
+__all__ = [
+    "enum_to_value",
+    "normalize_name",
+    "StageGraph",
+    "NearDuplicateIndex",
+    "cluster_near_duplicates",
+    "lsh_band_keys",
+    "number_tokens",
+    "departure_region",
+    "CacheStats",
+    "get_cache_stats",
+    "shard_of",
+    "as_naive_utc",
+]
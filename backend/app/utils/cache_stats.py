@@ -0,0 +1,78 @@
+"""キャッシュのヒット率集計
+
+プロセス内でキャッシュ名ごとにヒット・ミス回数を数え、ヘルスチェックから参照できるようにする。
+"""
+import threading
+from typing import Any
+
+
+class CacheStats:
+    """キャッシュのヒット・ミス回数（スレッドセーフ）
+
+    Examples:
+        >>> stats = CacheStats("example")
+        >>> stats.record_hit(3)
+        >>> stats.record_miss()
+        >>> stats.hit_rate
+        0.75
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def record_hit(self, count: int = 1) -> None:
+        """ヒットを記録"""
+        with self._lock:
+            self._hits += count
+
+    def record_miss(self, count: int = 1) -> None:
+        """ミスを記録"""
+        with self._lock:
+            self._misses += count
+
+    @property
+    def hit_rate(self) -> float:
+        """ヒット率（参照がない場合は0）"""
+        with self._lock:
+            total = self._hits + self._misses
+            return self._hits / total if total else 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        """ヘルスチェック用の集計値"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+            }
+
+
+_stats: dict[str, CacheStats] = {}
+_stats_lock = threading.Lock()
+
+
+def get_cache_stats(name: str) -> CacheStats:
+    """キャッシュ名に対応するプロセス共有の集計を取得"""
+    with _stats_lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = CacheStats(name)
+            _stats[name] = stats
+        return stats
+
+
+def cache_stats_snapshot() -> dict[str, dict[str, Any]]:
+    """生成済みの全キャッシュの集計"""
+    with _stats_lock:
+        all_stats = list(_stats.values())
+    return {stats.name: stats.snapshot() for stats in all_stats}
+
+
+def reset_cache_stats() -> None:
+    """全キャッシュの集計を破棄（テスト用）"""
+    with _stats_lock:
+        _stats.clear()
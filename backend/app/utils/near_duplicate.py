@@ -0,0 +1,190 @@
+"""MinHashによる近似重複検出のユーティリティ
+
+同じ告知が公式サイト・ニュースサイト・ファンブログなど別URLで収集されるケースを、
+タイトルとスニペットの文字bigram集合のJaccard類似度で判定する。
+候補の絞り込みにはMinHash + LSH（バンド分割）を使い、全件比較を避ける。
+"""
+import hashlib
+import random
+import re
+import unicodedata
+from typing import Generic, Hashable, Optional, TypeVar
+
+# LSHのパラメータ（20バンド × 3行 = 60個のハッシュ関数）
+# Jaccard 0.6 の組が候補に挙がる確率は約99%
+LSH_BANDS = 20
+LSH_ROWS = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20240101)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(LSH_BANDS * LSH_ROWS)
+]
+
+# 記号・空白を除いた文字（日本語を含む単語構成文字）だけを特徴量に使う
+_NON_WORD_PATTERN = re.compile(r"[\W_]+")
+_NUMBER_PATTERN = re.compile(r"\d+")
+
+K = TypeVar("K", bound=Hashable)
+
+
+def shingles(text: str, size: int = 2) -> frozenset[str]:
+    """正規化したテキストから文字n-gramの集合を作る
+
+    Examples:
+        >>> sorted(shingles("Ｌｉｖｅ！"))
+        ['iv', 'li', 've']
+    """
+    normalized = _NON_WORD_PATTERN.sub(
+        "", unicodedata.normalize("NFKC", text).casefold()
+    )
+    if len(normalized) <= size:
+        return frozenset([normalized]) if normalized else frozenset()
+    return frozenset(
+        normalized[i : i + size] for i in range(len(normalized) - size + 1)
+    )
+
+
+def number_tokens(text: str) -> frozenset[str]:
+    """テキスト中の数字（年・日付・公演回など）の集合
+
+    bigram の Jaccard 類似度では「ツアー2025」と「ツアー2026」や、同じツアーの別日程を
+    区別できないため、判定結果を引き継ぐ前に数字が一致するかを確認する。
+
+    Examples:
+        >>> sorted(number_tokens("ツアー２０２５ 01月10日"))
+        ['1', '10', '2025']
+        >>> number_tokens("新曲MV公開")
+        frozenset()
+    """
+    return frozenset(
+        str(int(number))
+        for number in _NUMBER_PATTERN.findall(unicodedata.normalize("NFKC", text))
+    )
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    """Jaccard類似度"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def minhash_signature(features: frozenset[str]) -> tuple[int, ...]:
+    """特徴量集合のMinHashシグネチャを計算"""
+    if not features:
+        return tuple([_MERSENNE_PRIME] * len(_PERMUTATIONS))
+
+    hashes = [
+        int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "big")
+        for f in features
+    ]
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS
+    )
+
+
+def _bands(signature: tuple[int, ...]):
+    """シグネチャを LSH のバンドに分割"""
+    for band in range(LSH_BANDS):
+        yield band, signature[band * LSH_ROWS : (band + 1) * LSH_ROWS]
+
+
+def lsh_band_keys(text: str) -> list[str]:
+    """Firestore に保存して照合するための LSH バンドキー
+
+    バンドキーを1つでも共有する文書が近似重複の候補になる。候補は実際の
+    Jaccard類似度で検証すること。
+
+    Examples:
+        >>> len(lsh_band_keys("ツアー2025 チケット先行受付開始")) == LSH_BANDS
+        True
+        >>> lsh_band_keys("！！")
+        []
+    """
+    features = shingles(text)
+    if not features:
+        return []
+    return [
+        f"{band}:{hashlib.blake2b(repr(rows).encode(), digest_size=8).hexdigest()}"
+        for band, rows in _bands(minhash_signature(features))
+    ]
+
+
+class NearDuplicateIndex(Generic[K]):
+    """近似重複インデックス（推しごとに1つ作る想定）
+
+    MinHashシグネチャをバンドに分割してバケットに登録し、
+    同じバケットに入った候補だけを実際のJaccard類似度で検証する。
+    """
+
+    def __init__(self, threshold: float = 0.6):
+        self.threshold = threshold
+        self._buckets: dict[tuple[int, tuple[int, ...]], list[K]] = {}
+        self._features: dict[K, frozenset[str]] = {}
+
+    def find(self, text: str) -> Optional[K]:
+        """登録済みの中から最も類似度の高い近似重複のキーを返す（なければNone）"""
+        features = shingles(text)
+        if not features:
+            return None
+
+        best_key: Optional[K] = None
+        best_score = self.threshold
+        seen: set[K] = set()
+        for band in _bands(minhash_signature(features)):
+            for key in self._buckets.get(band, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                score = jaccard(features, self._features[key])
+                if score >= best_score:
+                    best_key, best_score = key, score
+        return best_key
+
+    def add(self, key: K, text: str) -> None:
+        """テキストを登録"""
+        features = shingles(text)
+        self._features[key] = features
+        for band in _bands(minhash_signature(features)):
+            self._buckets.setdefault(band, []).append(key)
+
+    def __len__(self) -> int:
+        return len(self._features)
+
+
+def cluster_near_duplicates(
+    items: list[tuple[K, str]], threshold: float = 0.6
+) -> list[list[K]]:
+    """近似重複するアイテムをクラスタにまとめる
+
+    各クラスタの先頭は最初に出現したアイテム（代表）で、入力順を保つ。
+
+    Args:
+        items: (キー, テキスト) のリスト
+        threshold: 同一とみなすJaccard類似度の下限
+
+    Returns:
+        キーのクラスタのリスト
+
+    Examples:
+        >>> cluster_near_duplicates([
+        ...     ("a", "ツアー2025 チケット先行受付開始"),
+        ...     ("b", "新曲MV公開"),
+        ...     ("c", "【速報】ツアー2025 チケット先行受付開始！"),
+        ... ])
+        [['a', 'c'], ['b']]
+    """
+    index: NearDuplicateIndex[K] = NearDuplicateIndex(threshold)
+    clusters: dict[K, list[K]] = {}
+
+    for key, text in items:
+        representative = index.find(text)
+        if representative is None:
+            index.add(key, text)
+            clusters[key] = [key]
+        else:
+            clusters[representative].append(key)
+
+    return list(clusters.values())
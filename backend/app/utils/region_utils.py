@@ -0,0 +1,132 @@
+"""出発地の地域判定のユーティリティ関数
+
+遠征アドバイスのキャッシュで、出発地を都道府県単位にまとめるために使う。
+"""
+import unicodedata
+from typing import Optional
+
+PREFECTURES = (
+    "北海道",
+    "青森県",
+    "岩手県",
+    "宮城県",
+    "秋田県",
+    "山形県",
+    "福島県",
+    "茨城県",
+    "栃木県",
+    "群馬県",
+    "埼玉県",
+    "千葉県",
+    "東京都",
+    "神奈川県",
+    "新潟県",
+    "富山県",
+    "石川県",
+    "福井県",
+    "山梨県",
+    "長野県",
+    "岐阜県",
+    "静岡県",
+    "愛知県",
+    "三重県",
+    "滋賀県",
+    "京都府",
+    "大阪府",
+    "兵庫県",
+    "奈良県",
+    "和歌山県",
+    "鳥取県",
+    "島根県",
+    "岡山県",
+    "広島県",
+    "山口県",
+    "徳島県",
+    "香川県",
+    "愛媛県",
+    "高知県",
+    "福岡県",
+    "佐賀県",
+    "長崎県",
+    "熊本県",
+    "大分県",
+    "宮崎県",
+    "鹿児島県",
+    "沖縄県",
+)
+
+# 都道府県名を含まない出発地によく使われる都市・駅名
+CITY_ALIASES = {
+    "札幌": "北海道",
+    "函館": "北海道",
+    "仙台": "宮城県",
+    "さいたま": "埼玉県",
+    "大宮": "埼玉県",
+    "新宿": "東京都",
+    "渋谷": "東京都",
+    "池袋": "東京都",
+    "品川": "東京都",
+    "上野": "東京都",
+    "八王子": "東京都",
+    "横浜": "神奈川県",
+    "川崎": "神奈川県",
+    "金沢": "石川県",
+    "浜松": "静岡県",
+    "名古屋": "愛知県",
+    "梅田": "大阪府",
+    "難波": "大阪府",
+    "なんば": "大阪府",
+    "神戸": "兵庫県",
+    "三ノ宮": "兵庫県",
+    "三宮": "兵庫県",
+    "博多": "福岡県",
+    "北九州": "福岡県",
+    "小倉": "福岡県",
+    "那覇": "沖縄県",
+}
+
+# 「東京」「大阪」のような接尾辞なしの表記
+_PREFECTURE_STEMS = {
+    prefecture if prefecture == "北海道" else prefecture[:-1]: prefecture
+    for prefecture in PREFECTURES
+}
+
+
+def _earliest_match(text: str, candidates: dict[str, str]) -> Optional[str]:
+    best: Optional[tuple[int, int, str]] = None
+    for name, prefecture in candidates.items():
+        position = text.find(name)
+        if position < 0:
+            continue
+        # 出現位置が早いものを優先し、同じ位置なら長い名前を優先
+        key = (position, -len(name), prefecture)
+        if best is None or key < best:
+            best = key
+    return best[2] if best else None
+
+
+def departure_region(departure: str) -> Optional[str]:
+    """出発地の都道府県を推定する
+
+    Args:
+        departure: 出発地（住所・駅名・都市名など）
+
+    Returns:
+        都道府県名（判定できない場合はNone）
+
+    Examples:
+        >>> departure_region("大阪府堺市")
+        '大阪府'
+        >>> departure_region("東京駅")
+        '東京都'
+        >>> departure_region("名古屋")
+        '愛知県'
+        >>> departure_region("京都駅")
+        '京都府'
+        >>> departure_region("Tokyo") is None
+        True
+    """
+    text = unicodedata.normalize("NFKC", departure)
+    return _earliest_match(
+        text, {prefecture: prefecture for prefecture in PREFECTURES}
+    ) or _earliest_match(text, {**_PREFECTURE_STEMS, **CITY_ALIASES})
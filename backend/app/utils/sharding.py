@@ -0,0 +1,21 @@
+"""シャード分割のユーティリティ関数
+
+Python の hash() はプロセスごとに値が変わるため、複数のインスタンスで同じ割り当てに
+なるようにキーのハッシュ値からシャード番号を決める。
+"""
+import hashlib
+
+
+def shard_of(key: str, shard_count: int) -> int:
+    """キー（推しIDなど）を割り当てるシャード番号（0 〜 shard_count - 1）
+
+    Examples:
+        >>> shard_of("oshi-1", 4) == shard_of("oshi-1", 4)
+        True
+        >>> shard_of("oshi-1", 1)
+        0
+    """
+    if shard_count <= 1:
+        return 0
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shard_count
@@ -0,0 +1,126 @@
+"""ワークフローのステージをDAGとして並行実行するユーティリティ"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
+
+
+@dataclass
+class StageTiming:
+    """ステージの実行時間（ワークフロー開始からの経過秒）"""
+
+    started_at: float
+    finished_at: float
+
+    @property
+    def duration(self) -> float:
+        return self.finished_at - self.started_at
+
+
+class StageGraph:
+    """依存関係のあるステージを、依存が解決したものから並行に実行する
+
+    ステージ関数は依存先ステージの結果をキーワード引数で受け取る。
+    依存先は先に add() 済みである必要があるため、グラフは常に非循環になる。
+
+    Examples:
+        >>> async def main():
+        ...     graph = StageGraph()
+        ...     graph.add("a", lambda: asyncio.sleep(0, result=1))
+        ...     graph.add("b", lambda: asyncio.sleep(0, result=2))
+        ...     graph.add("sum", lambda a, b: asyncio.sleep(0, result=a + b), ["a", "b"])
+        ...     return await graph.run()
+        >>> asyncio.run(main())["sum"]
+        3
+    """
+
+    def __init__(self):
+        self._stages: dict[str, tuple[Callable[..., Awaitable[Any]], tuple[str, ...]]] = {}
+        self.timings: dict[str, StageTiming] = {}
+
+    def add(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[Any]],
+        depends_on: Iterable[str] = (),
+    ) -> None:
+        """ステージを追加
+
+        Args:
+            name: ステージ名
+            func: 依存先の結果をキーワード引数で受け取るコルーチン関数
+            depends_on: 依存するステージ名
+        """
+        if name in self._stages:
+            raise ValueError(f"Stage already defined: {name}")
+        deps = tuple(depends_on)
+        for dep in deps:
+            if dep not in self._stages:
+                raise ValueError(f"Unknown dependency for {name}: {dep}")
+        self._stages[name] = (func, deps)
+
+    async def run(self) -> dict[str, Any]:
+        """全ステージを実行し、{ステージ名: 結果} を返す
+
+        いずれかのステージが失敗した場合は残りのステージをキャンセルして例外を再送出する。
+        """
+        self.timings = {}
+        origin = time.perf_counter()
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def run_stage(name: str) -> Any:
+            func, deps = self._stages[name]
+            dep_results = await asyncio.gather(*(tasks[dep] for dep in deps))
+            started_at = time.perf_counter() - origin
+            result = await func(**dict(zip(deps, dep_results)))
+            self.timings[name] = StageTiming(
+                started_at=started_at,
+                finished_at=time.perf_counter() - origin,
+            )
+            return result
+
+        for name in self._stages:
+            tasks[name] = asyncio.create_task(run_stage(name))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return {name: task.result() for name, task in tasks.items()}
+
+    def critical_path(self) -> list[str]:
+        """最後に終了したステージから、最も遅く終わった依存先を辿ったパス"""
+        if not self.timings:
+            return []
+
+        path = [max(self.timings, key=lambda n: self.timings[n].finished_at)]
+        while True:
+            _, deps = self._stages[path[-1]]
+            if not deps:
+                break
+            path.append(max(deps, key=lambda n: self.timings[n].finished_at))
+        return list(reversed(path))
+
+    def report(self) -> dict[str, Any]:
+        """ステージごとの開始・終了・所要時間（ミリ秒）とクリティカルパスを返す"""
+        critical_path = self.critical_path()
+        return {
+            "total_ms": round(
+                max((t.finished_at for t in self.timings.values()), default=0.0) * 1000,
+                1,
+            ),
+            "critical_path": critical_path,
+            "stages": {
+                name: {
+                    "start_ms": round(t.started_at * 1000, 1),
+                    "end_ms": round(t.finished_at * 1000, 1),
+                    "duration_ms": round(t.duration * 1000, 1),
+                    "critical": name in critical_path,
+                }
+                for name, t in self.timings.items()
+            },
+        }
@@ -0,0 +1,27 @@
+"""文字列正規化のユーティリティ関数"""
+import re
+import unicodedata
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_name(name: str) -> str:
+    """名前を重複判定用のキーに正規化する
+
+    NFKC正規化で全角英数・半角カナ・全角スペースなどの表記ゆれを吸収し、
+    大文字小文字を区別せず、空白を取り除いた文字列を返す。
+
+    Args:
+        name: 人物名・組織名など
+
+    Returns:
+        正規化済みのキー
+
+    Examples:
+        >>> normalize_name("ＹＯＡＳＯＢＩ")
+        'yoasobi'
+        >>> normalize_name("ｱｲﾄﾞﾙ　マネージャー")
+        'アイドルマネージャー'
+    """
+    normalized = unicodedata.normalize("NFKC", name).casefold()
+    return _WHITESPACE_PATTERN.sub("", normalized)
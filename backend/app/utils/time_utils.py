@@ -0,0 +1,16 @@
+"""日時のユーティリティ関数"""
+from datetime import datetime, timezone
+
+
+def as_naive_utc(value: datetime) -> datetime:
+    """Firestore から読んだタイムゾーン付き日時を utcnow と比較できる形にする
+
+    Examples:
+        >>> from datetime import timedelta
+        >>> jst = timezone(timedelta(hours=9))
+        >>> as_naive_utc(datetime(2026, 1, 1, 9, 0, tzinfo=jst))
+        datetime.datetime(2026, 1, 1, 0, 0)
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,166 @@
+"""URL正規化のユーティリティ関数
+
+同じページを指すURLの表記ゆれ（トラッキングパラメータ、www、末尾スラッシュ、
+フラグメント等）を吸収し、重複判定用の正規化キーを生成する。
+別ページを同じキーに潰すと新着情報を取りこぼすため、ページを区別しうるものは残す。
+http/https・モバイル版のホスト・AMP版のパスは、同じページを指すことが分かっている
+ホストでだけ同一視する。
+"""
+import re
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+# 除去するクエリパラメータ（完全一致）
+# ref・si・output などはサイトによってはページを区別する値のため、ここには含めず
+# HOST_TRACKING_PARAMS でホストを限定して除去する
+TRACKING_PARAMS = frozenset(
+    {
+        "fbclid",
+        "gclid",
+        "dclid",
+        "gbraid",
+        "wbraid",
+        "msclkid",
+        "yclid",
+        "igshid",
+        "mc_cid",
+        "mc_eid",
+        "_ga",
+        "_gl",
+        "spm",
+        "cmpid",
+        "ncid",
+    }
+)
+
+# ホスト限定で除去するクエリパラメータ（共有元・共有時刻など）
+HOST_TRACKING_PARAMS = {
+    "x.com": frozenset({"s", "t", "ref_src", "ref_url"}),
+    "twitter.com": frozenset({"s", "t", "ref_src", "ref_url"}),
+    "youtube.com": frozenset({"feature", "si"}),
+    "youtu.be": frozenset({"feature", "si"}),
+    "open.spotify.com": frozenset({"si"}),
+    "amazon.co.jp": frozenset({"ref", "ref_"}),
+    "amazon.com": frozenset({"ref", "ref_"}),
+}
+
+# 除去するクエリパラメータ（前方一致）
+TRACKING_PARAM_PREFIXES = ("utm_", "ga_", "hsa_", "pk_", "mtm_")
+
+# どのホストでも同じページを指すホスト名の先頭ラベル
+_WWW_PREFIX = "www."
+
+# モバイル版を示すことが分かっているホスト名の先頭ラベル
+# （他のホストの m. / sp. / mobile. / amp. は別サービスのことがあるため除去しない）
+_HOST_MOBILE_PREFIXES = {
+    "ameblo.jp": ("sp.",),
+    "yahoo.co.jp": ("sp.", "mobile."),
+    "youtube.com": ("m.",),
+    "twitter.com": ("mobile.", "m."),
+    "x.com": ("mobile.",),
+    "facebook.com": ("m.",),
+}
+
+# パスの /amp・.amp が AMP 版を示すことが分かっているホスト
+# （/sp・/mobile や他のホストの /amp は通常のディレクトリ名のことがあるため対象外）
+_AMP_PATH_HOSTS = frozenset({"news.yahoo.co.jp"})
+_AMP_PATH_SEGMENTS = re.compile(r"/amp(?=/|$)")
+_AMP_PATH_SUFFIX = re.compile(r"(?:\.amp|/amp\.html?)$")
+
+# http を https にリダイレクトすることが分かっているホスト（他のホストではスキームを残す）
+_HTTPS_HOSTS = (
+    frozenset(HOST_TRACKING_PARAMS) | frozenset(_HOST_MOBILE_PREFIXES) | _AMP_PATH_HOSTS
+)
+
+_DEFAULT_INDEX_FILES = re.compile(r"/index\.(?:html?|php|aspx?)$")
+
+
+def _is_tracking_param(name: str, host: str) -> bool:
+    lowered = name.lower()
+    return (
+        lowered in TRACKING_PARAMS
+        or lowered.startswith(TRACKING_PARAM_PREFIXES)
+        or lowered in HOST_TRACKING_PARAMS.get(host, ())
+    )
+
+
+def _normalize_host(host: str) -> str:
+    host = host.lower().rstrip(".")
+    if host.startswith(_WWW_PREFIX) and host.count(".") > 1:
+        host = host[len(_WWW_PREFIX) :]
+    for base, prefixes in _HOST_MOBILE_PREFIXES.items():
+        for prefix in prefixes:
+            if host == f"{prefix}{base}":
+                return base
+    return host
+
+
+def _normalize_path(path: str, host: str) -> str:
+    # パーセントエンコードの表記ゆれを統一（%e3 → %E3、不要なエンコードの解除）
+    path = quote(unquote(path), safe="/:@!$&'()*+,;=-._~")
+    if host in _AMP_PATH_HOSTS:
+        path = _AMP_PATH_SUFFIX.sub("", path)
+        path = _AMP_PATH_SEGMENTS.sub("", path)
+    path = _DEFAULT_INDEX_FILES.sub("/", path)
+    path = re.sub(r"/{2,}", "/", path)
+    if len(path) > 1:
+        path = path.rstrip("/")
+    return path or "/"
+
+
+def canonicalize_url(url: str) -> str:
+    """URLを重複判定用の正規化キーに変換する
+
+    - https はキーに含めない。http は既知のホストでだけ https と同一視し、
+      それ以外のホストでは http:// を残す
+    - ホスト名を小文字化し、www. とデフォルトポートを除去。モバイル版の接頭辞
+      （m. / sp. など）は既知のホストでだけ除去
+    - index.html と末尾スラッシュを除去。AMP 版のパス表記は既知のホストでだけ除去
+    - トラッキング用クエリパラメータ（ref 等はホスト限定）を除去し、残りをキー順にソート
+    - フラグメントを除去
+
+    正規化キーは比較専用であり、アクセス用のURLとしては元のURLを使うこと。
+
+    Args:
+        url: 検索結果などのURL
+
+    Returns:
+        正規化キー（URLとして解釈できない場合は前後の空白を除いた元の文字列）
+
+    Examples:
+        >>> canonicalize_url("https://www.Example.com/news/123/?utm_source=x&id=5#top")
+        'example.com/news/123?id=5'
+        >>> canonicalize_url("http://news.yahoo.co.jp/amp/articles/abc")
+        'news.yahoo.co.jp/articles/abc'
+        >>> canonicalize_url("http://example.com/news/123")
+        'http://example.com/news/123'
+        >>> canonicalize_url("https://m.youtube.com/watch?v=abc&feature=share")
+        'youtube.com/watch?v=abc'
+        >>> canonicalize_url("https://m.example.com/amp/news/123")
+        'm.example.com/amp/news/123'
+    """
+    raw = url.strip()
+    try:
+        parts = urlsplit(raw if "://" in raw else f"https://{raw}")
+        host = parts.hostname
+        port = parts.port
+    except ValueError:
+        return raw
+
+    if not host:
+        return raw
+
+    host = _normalize_host(host)
+    query = [
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name, host)
+    ]
+    query.sort()
+
+    path = _normalize_path(parts.path, host)
+    keep_scheme = parts.scheme.lower() == "http" and host not in _HTTPS_HOSTS
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    key = urlunsplit(("", host, path, urlencode(query), "")).lstrip("/")
+    return f"http://{key}" if keep_scheme else key
@@ -0,0 +1,174 @@
+"""起動時のウォームアップ
+
+アプリの lifespan からバックグラウンドタスクとして起動し、共有クライアントの生成と
+接続の確立を済ませる。起動（/health の応答）はウォームアップを待たず、重いSDKの読み込みも
+起動後に行う。完了までは /ready が503を返すため、トラフィックは完了後に流れる。
+各ステップは並列に実行し、失敗しても ready にする
+（クライアントは初回利用時にあらためて生成される）。
+
+probe を有効にすると、課金・クォータ消費のない軽量な呼び出しで各依存先への接続を確立する。
+Custom Search は検索1回ごとにクォータを消費し、Calendar はユーザーのトークンが必要なため、
+いずれもクライアント（ディスカバリードキュメント）の準備のみ行う。
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Callable
+
+import structlog
+
+from app.external.gemini_client import get_shared_gemini_client
+from app.external.google_calendar import calendar_discovery_document
+from app.external.google_maps import get_maps_http_client
+from app.external.google_search import get_shared_search_client
+from app.repositories.firestore_client import get_firestore_client
+from app.repositories.oshi_repository import OshiRepository
+
+logger = structlog.get_logger(__name__)
+
+
+class WarmupState:
+    """ウォームアップの進行状況（/ready から参照する）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = False
+        self._steps: dict[str, dict[str, Any]] = {}
+
+    @property
+    def ready(self) -> bool:
+        """ウォームアップが終わり、リクエストを受け付けられるか"""
+        with self._lock:
+            return self._ready
+
+    def mark_ready(self) -> None:
+        """ウォームアップの完了を記録"""
+        with self._lock:
+            self._ready = True
+
+    def record_step(self, name: str, status: str, duration_ms: float, **extra: Any):
+        """ステップの結果を記録"""
+        with self._lock:
+            self._steps[name] = {
+                "status": status,
+                "duration_ms": round(duration_ms, 1),
+                **extra,
+            }
+
+    def snapshot(self) -> dict[str, Any]:
+        """/ready 用の状態"""
+        with self._lock:
+            return {
+                "ready": self._ready,
+                "steps": {name: dict(step) for name, step in self._steps.items()},
+            }
+
+
+_state = WarmupState()
+
+
+def get_warmup_state() -> WarmupState:
+    """プロセス共有のウォームアップ状態を取得"""
+    return _state
+
+
+def reset_warmup_state() -> None:
+    """ウォームアップ状態を破棄（テスト用）"""
+    global _state
+    _state = WarmupState()
+
+
+def _warm_firestore(probe: bool) -> None:
+    db = get_firestore_client()
+    if probe:
+        # 1ドキュメントだけ読み、gRPCチャネルを確立する
+        list(db.collection(OshiRepository.COLLECTION_NAME).limit(1).stream())
+
+
+def _warm_gemini(probe: bool) -> None:
+    client = get_shared_gemini_client()
+    if probe:
+        # トークン数の計算は生成の課金対象外
+        client.model.count_tokens("ping")
+
+
+def _warm_google_search(probe: bool) -> None:
+    get_shared_search_client()
+
+
+def _warm_google_maps(probe: bool) -> None:
+    http_client = get_maps_http_client()
+    if probe:
+        # APIキーを使わない HEAD リクエストで、プールにTLS接続を1本確立する
+        http_client.head("/")
+
+
+def _warm_google_calendar(probe: bool) -> None:
+    from googleapiclient.discovery import build_from_document  # noqa: F401
+
+    calendar_discovery_document()
+
+
+# ステップ名 → 実行する関数（引数は probe の有無）
+WARMUP_STEPS: dict[str, Callable[[bool], None]] = {
+    "firestore": _warm_firestore,
+    "gemini": _warm_gemini,
+    "google_search": _warm_google_search,
+    "google_maps": _warm_google_maps,
+    "google_calendar": _warm_google_calendar,
+}
+
+
+async def _run_step(name: str, step: Callable[[bool], None], probe: bool) -> None:
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(step, probe)
+    except Exception as e:
+        duration_ms = (time.perf_counter() - started) * 1000
+        _state.record_step(name, "failed", duration_ms, error=str(e))
+        logger.warning(
+            "warmup_step_failed",
+            step=name,
+            duration_ms=round(duration_ms, 1),
+            error=str(e),
+        )
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    _state.record_step(name, "ok", duration_ms)
+    logger.info("warmup_step_success", step=name, duration_ms=round(duration_ms, 1))
+
+
+async def warm_up(probe: bool, timeout_seconds: float) -> dict[str, Any]:
+    """共有クライアントを生成して接続を確立し、完了後に ready にする
+
+    上限時間を超えた場合も ready にする（未完了のステップは初回利用時に完了する）。
+
+    Args:
+        probe: 各依存先に軽量な疎通確認の呼び出しを行うか
+        timeout_seconds: ウォームアップ全体の上限（秒）
+
+    Returns:
+        ウォームアップ状態のスナップショット
+    """
+    started = time.perf_counter()
+    logger.info("warmup_start", probe=probe, steps=list(WARMUP_STEPS))
+    steps = list(WARMUP_STEPS.items())
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(_run_step(name, step, probe) for name, step in steps)),
+            timeout=timeout_seconds,
+        )
+    except asyncio.TimeoutError:
+        pending = [name for name, _ in steps if name not in _state.snapshot()["steps"]]
+        for name in pending:
+            _state.record_step(name, "timeout", timeout_seconds * 1000)
+        logger.warning(
+            "warmup_timeout", timeout_seconds=timeout_seconds, pending=pending
+        )
+
+    _state.mark_ready()
+    logger.info(
+        "warmup_complete",
+        duration_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+    return _state.snapshot()
@@ -0,0 +1,6 @@
+"""ベンチマーク・負荷試験スイート
+
+本番の外部サービス（Firestore / Gemini / Custom Search / Maps）には接続せず、
+`benchmarks.fakes` のスタブとテストと共通の `tests.fakes`（インメモリ Firestore）を
+使ってバックエンドの性能を計測する。
+"""
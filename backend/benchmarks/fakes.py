@@ -0,0 +1,191 @@
+"""ベンチマーク用のスタブ外部クライアント
+
+StubGeminiClient / StubGoogleSearchClient / StubGoogleMapsClient は
+実クライアントを継承し、ネットワーク呼び出し部分だけを固定レイテンシの応答に置き換える。
+Firestore のフェイク（InMemoryFirestore）はテストと共通の tests.fakes にある。
+
+実クライアントのパース処理・リトライ処理はそのまま動くため、
+アプリケーション側のCPUコストも含めて計測できる。
+"""
+import itertools
+import json
+import time
+import uuid
+from typing import Any, Optional
+
+from app.external.gemini_client import GeminiClient
+from app.external.google_maps import GoogleMapsClient
+from app.external.google_search import GoogleSearchClient
+
+
+# ---------------------------------------------------------------------------
+# Gemini
+# ---------------------------------------------------------------------------
+class _StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubGenerativeModel:
+    """genai.GenerativeModel の代替（プロンプト内容から応答形式を判定）"""
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self._counter = itertools.count()
+
+    def generate_content(self, prompt: str) -> _StubResponse:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+        n = next(self._counter)
+        if '"priority"' in prompt:
+            priority = ("urgent", "important", "normal", "normal")[n % 4]
+            return _StubResponse(
+                json.dumps({"priority": priority, "reason": "stub"})
+            )
+        if '"node_type"' in prompt:
+            nodes = [
+                {
+                    "name": f"関係者{i}",
+                    "node_type": ("member", "staff", "org", "fan", "media")[i % 5],
+                    "ring": 1 if i < 5 else 2,
+                    "relationship": "スタブ",
+                    "search_queries": [f"関係者{i} 最新情報"],
+                }
+                for i in range(10)
+            ]
+            return _StubResponse(json.dumps(nodes, ensure_ascii=False))
+        if '"index"' in prompt:
+            count = prompt.count("\nタイトル: ")
+            results = [{"index": i, "is_event": False} for i in range(1, count + 1)]
+            return _StubResponse(json.dumps(results))
+        if '"is_event"' in prompt:
+            return _StubResponse(json.dumps({"is_event": False}))
+        return _StubResponse("スタブ応答です。" * 10)
+
+
+class StubGeminiClient(GeminiClient):
+    """Gemini API を呼ばない GeminiClient"""
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.model = StubGenerativeModel(latency_seconds)
+
+
+# ---------------------------------------------------------------------------
+# Custom Search
+# ---------------------------------------------------------------------------
+class _StubRequest:
+    def __init__(self, payload: dict, latency_seconds: float):
+        self._payload = payload
+        self._latency_seconds = latency_seconds
+
+    def execute(self, http: Any = None) -> dict:
+        if self._latency_seconds:
+            time.sleep(self._latency_seconds)
+        return self._payload
+
+
+class _StubCse:
+    def __init__(self, service: "StubSearchService"):
+        self._service = service
+
+    def list(self, q: str, cx: str, num: int = 10) -> _StubRequest:
+        return _StubRequest(self._service.results_for(q, num), self._service.latency_seconds)
+
+
+class StubSearchService:
+    """customsearch v1 service の代替
+
+    各クエリの結果の半分は固定URL（2回目以降は重複扱い）、残り半分は毎回新しいURLを返す。
+    """
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self._counter = itertools.count()
+
+    def cse(self) -> _StubCse:
+        return _StubCse(self)
+
+    def results_for(self, query: str, num: int) -> dict:
+        n = next(self._counter)
+        key = uuid.uuid5(uuid.NAMESPACE_URL, query).hex[:12]
+        items = []
+        for i in range(num):
+            path = f"{key}/{i}" if i % 2 == 0 else f"{key}/{n}-{i}"
+            items.append(
+                {
+                    "title": f"{query} の記事 {i}",
+                    "link": f"https://example.com/{path}",
+                    "snippet": f"{query} に関するスタブのスニペット {i}",
+                }
+            )
+        return {"items": items}
+
+
+class StubGoogleSearchClient(GoogleSearchClient):
+    """Custom Search API を呼ばない GoogleSearchClient"""
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.api_key = "stub"
+        self.cx = "stub"
+        self.service = StubSearchService(latency_seconds)
+        self.rate_limiter = None
+
+    def _thread_http(self) -> None:
+        # スタブのサービスはHTTP接続を使わない
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Maps
+# ---------------------------------------------------------------------------
+class StubGoogleMapsClient(GoogleMapsClient):
+    """Directions / Distance Matrix API を呼ばない GoogleMapsClient"""
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.api_key = "stub"
+        self.latency_seconds = latency_seconds
+        self.matrix_requests = 0
+
+    @staticmethod
+    def _stub_distance(origin: str) -> int:
+        return 1000 * (50 + len(origin) * 37 % 500)
+
+    def _fetch_distance_matrix(
+        self, origins: list[str], destinations: list[str], mode: str
+    ) -> dict[str, Any]:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        self.matrix_requests += 1
+        rows = []
+        for origin in origins:
+            distance_meters = self._stub_distance(origin)
+            element = {
+                "status": "OK",
+                "distance": {
+                    "value": distance_meters,
+                    "text": f"{distance_meters // 1000} km",
+                },
+                "duration": {
+                    "value": distance_meters // 25,
+                    "text": f"{distance_meters // 25 // 60} 分",
+                },
+            }
+            rows.append({"elements": [element] * len(destinations)})
+        return {"status": "OK", "rows": rows}
+
+    def get_directions(
+        self, origin: str, destination: str, mode: str = "transit"
+    ) -> Optional[dict[str, Any]]:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        distance_meters = self._stub_distance(origin)
+        return {
+            "distance_meters": distance_meters,
+            "distance_text": f"{distance_meters // 1000} km",
+            "duration_seconds": distance_meters // 25,
+            "duration_text": f"{distance_meters // 25 // 60} 分",
+            "start_address": origin,
+            "end_address": destination,
+            "steps": [],
+        }
@@ -0,0 +1,204 @@
+"""リポジトリの読み取り時のモデル組み立て（ハイドレーション）のベンチマーク
+
+Firestore から読んだ 10,000 件のドキュメント相当の DocumentSnapshot について、従来の
+`data = doc.to_dict(); data["id"] = doc.id; Model(**data)` と、リポジトリの一覧取得が使う
+`hydrate_all`（to_dict の deepcopy を省き、検証は同じ）を比較する。
+
+使い方（backend/ ディレクトリで実行）:
+    python -m benchmarks.hydration
+    python -m benchmarks.hydration --docs 50000 --runs 3 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+import types
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+# Settings が必須とする環境変数（実サービスには接続しないためダミー値で良い）
+for _key in (
+    "GOOGLE_CLOUD_PROJECT",
+    "GEMINI_API_KEY",
+    "GOOGLE_SEARCH_API_KEY",
+    "GOOGLE_SEARCH_CX",
+    "GOOGLE_MAPS_API_KEY",
+    "INTERNAL_API_KEY",
+):
+    os.environ.setdefault(_key, "hydration")
+
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds  # noqa: E402
+from google.cloud.firestore_v1.base_document import DocumentSnapshot  # noqa: E402
+
+from app.models.expense import ExpenseCategory, ExpenseModel  # noqa: E402
+from app.models.info import CollectedInfoModel, Priority  # noqa: E402
+from app.models.trip_plan import TripPlanModel  # noqa: E402
+from app.repositories.hydration import hydrate_all  # noqa: E402
+
+BASE_TIME = datetime(2026, 4, 1, tzinfo=timezone.utc)
+PRIORITIES = [priority.value for priority in Priority]
+CATEGORIES = [category.value for category in ExpenseCategory]
+
+
+def _firestore_time(offset_minutes: int) -> DatetimeWithNanoseconds:
+    # Firestore の Timestamp はタイムゾーン付きの DatetimeWithNanoseconds で返る
+    value = BASE_TIME + timedelta(minutes=offset_minutes)
+    return DatetimeWithNanoseconds(
+        value.year, value.month, value.day, value.hour, value.minute, tzinfo=timezone.utc
+    )
+
+
+def info_docs(count: int) -> list[dict[str, Any]]:
+    """InfoRepository が保存する形の収集情報"""
+    return [
+        {
+            "id": f"info{i:06d}",
+            "oshi_id": "oshi-bench",
+            "title": f"新曲リリースイベント第{i}弾のお知らせ",
+            "url": f"https://example.com/news/{i}?utm_source=x",
+            "canonical_url": f"example.com/news/{i}",
+            "snippet": "会場・日程・チケット情報の詳細はこちら。" * 3,
+            "priority": PRIORITIES[i % len(PRIORITIES)],
+            "source_node": None if i % 3 else f"関連人物{i % 17}",
+            "collected_at": _firestore_time(i),
+            "updated_at": _firestore_time(i),
+        }
+        for i in range(count)
+    ]
+
+
+def expense_docs(count: int) -> list[dict[str, Any]]:
+    """ExpenseRepository が保存する形の支出"""
+    return [
+        {
+            "id": f"expense{i:06d}",
+            "user_id": "user-bench",
+            "oshi_id": "oshi-bench" if i % 2 else None,
+            "event_id": None,
+            "amount": 1000 + i % 9000,
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "description": f"グッズ購入 {i}",
+            "expense_date": _firestore_time(i),
+            "created_at": _firestore_time(i),
+        }
+        for i in range(count)
+    ]
+
+
+def trip_plan_docs(count: int) -> list[dict[str, Any]]:
+    """TripRepository が保存する形の遠征プラン（入れ子のモデルを含む）"""
+    return [
+        {
+            "id": f"plan{i:06d}",
+            "user_id": "user-bench",
+            "event_id": f"event{i:06d}",
+            "departure": "東京",
+            "destination": "大阪城ホール",
+            "transport": {
+                "mode": "train",
+                "duration_minutes": 150,
+                "distance_km": 500,
+                "estimated_cost": 14000,
+                "route_description": "東海道新幹線",
+            },
+            "accommodation": {"nights": i % 2, "estimated_cost": 8000, "notes": None},
+            "total_estimated_cost": 22000,
+            "advice": "早めの予約がおすすめです。",
+            "created_at": _firestore_time(i),
+            "updated_at": _firestore_time(i),
+        }
+        for i in range(count)
+    ]
+
+
+def _median_ms(func: Callable[[], Any], runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def _compare(
+    to_dict: Callable[[], Any], hydrated: Callable[[], Any], runs: int
+) -> dict[str, float]:
+    to_dict_ms = _median_ms(to_dict, runs)
+    hydrated_ms = _median_ms(hydrated, runs)
+    return {
+        "to_dict_ms": round(to_dict_ms, 1),
+        "hydrated_ms": round(hydrated_ms, 1),
+        "speedup": round(to_dict_ms / hydrated_ms, 1),
+    }
+
+
+def _snapshots(docs: list[dict[str, Any]]) -> list[DocumentSnapshot]:
+    """クエリ結果と同じ DocumentSnapshot（参照はIDだけを持つ）"""
+    snapshots = []
+    for doc in docs:
+        data = dict(doc)
+        reference = types.SimpleNamespace(id=data.pop("id"))
+        snapshots.append(DocumentSnapshot(reference, data, True, None, None, None))
+    return snapshots
+
+
+def _to_dict_and_validate(
+    model_cls: type, snapshots: list[DocumentSnapshot]
+) -> list[Any]:
+    models = []
+    for doc in snapshots:
+        data = doc.to_dict()
+        data["id"] = doc.id
+        models.append(model_cls(**data))
+    return models
+
+
+def measure_snapshots(count: int, runs: int) -> dict[str, dict[str, float]]:
+    """DocumentSnapshot → モデル（リポジトリの一覧取得と同じ経路）の比較"""
+    report = {}
+    for name, model_cls, docs in (
+        ("CollectedInfoModel", CollectedInfoModel, info_docs(count)),
+        ("ExpenseModel", ExpenseModel, expense_docs(count)),
+        ("TripPlanModel", TripPlanModel, trip_plan_docs(count)),
+    ):
+        snapshots = _snapshots(docs)
+        assert hydrate_all(model_cls, snapshots[:1]) == _to_dict_and_validate(
+            model_cls, snapshots[:1]
+        ), name
+        report[name] = _compare(
+            lambda: _to_dict_and_validate(model_cls, snapshots),
+            lambda: hydrate_all(model_cls, snapshots),
+            runs,
+        )
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=10000, help="ドキュメント数")
+    parser.add_argument("--runs", type=int, default=5, help="計測回数（中央値を出力）")
+    parser.add_argument("--json", action="store_true", help="JSONで出力")
+    args = parser.parse_args(argv)
+
+    report = {
+        "docs": args.docs,
+        "snapshots": measure_snapshots(args.docs, args.runs),
+    }
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return report
+
+    print(f"{args.docs} 件あたりの時間（中央値）")
+    print(f"{'':<36} {'to_dict':>10} {'hydrated':>10} {'speedup':>8}")
+    for name, stats in report["snapshots"].items():
+        print(
+            f"{name:<36} {stats['to_dict_ms']:>8.1f}ms "
+            f"{stats['hydrated_ms']:>8.1f}ms {stats['speedup']:>7.1f}x"
+        )
+    return report
+
+
+if __name__ == "__main__":
+    main()
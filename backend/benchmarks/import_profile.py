@@ -0,0 +1,173 @@
+"""起動時間（インポート時間・初回リクエストまでの時間）のプロファイル
+
+新しいインタプリタで `python -X importtime` を使って `app.main` を読み込み、
+累計インポート時間の中央値と、自己時間の大きいモジュールを出力する。
+あわせて `/health` への初回リクエストが返るまでの時間と、
+`app.main` の読み込みで重いSDK（初回利用時に遅延ロードする）が
+読み込まれていないかを確認する。設定は本番と同じ既定値を使う
+（起動時のウォームアップは受け付け開始後にバックグラウンドで重いSDKを読み込む）。
+
+使い方（backend/ ディレクトリで実行）:
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile --runs 10 --top 30 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Optional
+
+# Settings が必須とする環境変数（実サービスには接続しないためダミー値で良い）
+DUMMY_ENV = {
+    "GOOGLE_CLOUD_PROJECT": "import-profile",
+    "GEMINI_API_KEY": "import-profile",
+    "GOOGLE_SEARCH_API_KEY": "import-profile",
+    "GOOGLE_SEARCH_CX": "import-profile",
+    "GOOGLE_MAPS_API_KEY": "import-profile",
+    "INTERNAL_API_KEY": "import-profile",
+}
+
+# 起動時には読み込まず、初回利用時に読み込むSDK
+LAZY_MODULES = (
+    "google.adk",
+    "google.genai",
+    "google.generativeai",
+    "googleapiclient.discovery",
+)
+
+_FIRST_REQUEST_SCRIPT = """
+import json, os, sys, time
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+loaded = [m for m in %r if m in sys.modules]
+from fastapi.testclient import TestClient
+client = TestClient(app).__enter__()
+client_ready = time.perf_counter()
+client.get("/health").raise_for_status()
+responded = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_request_ms": (imported - start + responded - client_ready) * 1000,
+    "loaded_lazy_modules": loaded,
+}), flush=True)
+# シャットダウンはバックグラウンドのウォームアップ（ワーカースレッド）の終了を待つため、
+# 計測が終わったらそのまま終了する
+os._exit(0)
+"""
+
+
+def _env() -> dict[str, str]:
+    env = dict(os.environ)
+    for key, value in DUMMY_ENV.items():
+        env.setdefault(key, value)
+    return env
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """`-X importtime` の出力をモジュール → (自己時間μs, 累計時間μs) に変換
+
+    Examples:
+        >>> parse_importtime(
+        ...     "import time: self [us] | cumulative | imported package\\n"
+        ...     "import time:       120 |        300 |   app.config\\n"
+        ... )
+        {'app.config': (120, 300)}
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        modules[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return modules
+
+
+def profile_imports(module: str = "app.main") -> dict[str, tuple[int, int]]:
+    """新しいインタプリタでモジュールを読み込み、モジュールごとのインポート時間を取得"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=_env(),
+        check=True,
+    )
+    return parse_importtime(completed.stderr)
+
+
+def measure_first_request() -> dict[str, Any]:
+    """新しいインタプリタで app.main を読み込み、/health の初回応答までの時間を計測"""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", _FIRST_REQUEST_SCRIPT % (LAZY_MODULES,)],
+        capture_output=True,
+        text=True,
+        env=_env(),
+        check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    # インタプリタ自体の起動時間を含む、プロセス起動から応答までの時間
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def main(argv: Optional[list[str]] = None) -> dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main", help="計測するモジュール")
+    parser.add_argument("--runs", type=int, default=5, help="計測回数（中央値を出力）")
+    parser.add_argument("--top", type=int, default=20, help="表示するモジュール数")
+    parser.add_argument("--json", action="store_true", help="JSONで出力")
+    args = parser.parse_args(argv)
+
+    profiles = [profile_imports(args.module) for _ in range(args.runs)]
+    requests = [measure_first_request() for _ in range(args.runs)]
+
+    self_us: dict[str, list[int]] = {}
+    for profile in profiles:
+        for name, (self_time, _) in profile.items():
+            self_us.setdefault(name, []).append(self_time)
+    slowest = sorted(
+        ((name, statistics.median(times)) for name, times in self_us.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[: args.top]
+
+    report = {
+        "module": args.module,
+        "runs": args.runs,
+        "import_ms": statistics.median(
+            profile[args.module][1] / 1000 for profile in profiles
+        ),
+        "first_request_ms": statistics.median(r["first_request_ms"] for r in requests),
+        "process_ms": statistics.median(r["process_ms"] for r in requests),
+        "loaded_lazy_modules": sorted(
+            {m for r in requests for m in r["loaded_lazy_modules"]}
+        ),
+        "slowest_modules": [
+            {"module": name, "self_ms": round(us / 1000, 1)} for name, us in slowest
+        ],
+    }
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return report
+
+    print(f"{args.module} の累計インポート時間: {report['import_ms']:.0f}ms")
+    print(f"/health 初回応答まで（インポート込み）: {report['first_request_ms']:.0f}ms")
+    print(f"プロセス起動から初回応答まで: {report['process_ms']:.0f}ms")
+    loaded = ", ".join(report["loaded_lazy_modules"]) or "なし"
+    print(f"app.main の読み込みで読み込まれた遅延ロード対象: {loaded}")
+    print()
+    print(f"{'self':>9}  module")
+    for entry in report["slowest_modules"]:
+        print(f"{entry['self_ms']:>7.1f}ms  {entry['module']}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,485 @@
+"""エージェントルーターのHTTP負荷試験ハーネス
+
+実際の `app.main:app` を uvicorn で起動し、`app.dependencies` の get_* プロバイダを
+FastAPI の dependency_overrides でスタブ版に差し替えた上で、
+scout / summary / trip / trip_batch / budget / network の混合トラフィックを目標RPSで送信する。
+ルートごとに p50 / p95 / p99 レイテンシとエラー率を出力し、
+リトルの法則（同時実行数 = スループット × 平均レイテンシ）から
+1インスタンスで捌ける同時ユーザー数の目安を算出する。
+
+使い方（backend/ ディレクトリで実行）:
+    python -m benchmarks.load_test --rps 20 --duration 30
+    python -m benchmarks.load_test --rps 50 --gemini-latency 0.8 --mix scout=1,budget=3
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+# Settings が必須とする環境変数（実サービスには接続しないためダミー値で良い）
+for _key in (
+    "GOOGLE_CLOUD_PROJECT",
+    "GEMINI_API_KEY",
+    "GOOGLE_SEARCH_API_KEY",
+    "GOOGLE_SEARCH_CX",
+    "GOOGLE_MAPS_API_KEY",
+    "INTERNAL_API_KEY",
+):
+    os.environ.setdefault(_key, "loadtest")
+# 実サービスのクライアントを使わないため、起動時のウォームアップは行わない
+os.environ.setdefault("WARMUP_ENABLED", "false")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from app import dependencies  # noqa: E402
+from app.agents.budget_agent import BudgetAgent  # noqa: E402
+from app.agents.priority_agent import PriorityAgent  # noqa: E402
+from app.agents.root_agent import RootAgent  # noqa: E402
+from app.agents.scout_agent import ScoutAgent  # noqa: E402
+from app.agents.trip_agent import TripAgent  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.main import app  # noqa: E402
+from app.repositories.event_repository import EventRepository  # noqa: E402
+from app.repositories.expense_repository import ExpenseRepository  # noqa: E402
+from app.repositories.info_repository import InfoRepository  # noqa: E402
+from app.repositories.network_repository import NetworkRepository  # noqa: E402
+from app.repositories.oshi_repository import OshiRepository  # noqa: E402
+from app.repositories.trip_repository import TripRepository  # noqa: E402
+from benchmarks.fakes import (  # noqa: E402
+    StubGeminiClient,
+    StubGoogleMapsClient,
+    StubGoogleSearchClient,
+)
+from tests.fakes import InMemoryFirestore  # noqa: E402
+
+DEFAULT_MIX = {
+    "scout": 2,
+    "summary": 1,
+    "trip": 2,
+    # 1リクエストで複数プランを生成するため既定では送信しない（--mix で指定）
+    "trip_batch": 0,
+    "budget": 2,
+    "network": 2,
+    "network_scout": 1,
+}
+
+CATEGORIES = ["アイドル", "声優", "VTuber", "俳優"]
+EXPENSE_CATEGORIES = ["ticket", "goods", "transport", "accommodation", "food", "other"]
+DEPARTURES = ["東京", "大阪", "名古屋", "福岡", "札幌", "仙台"]
+
+
+@dataclass
+class Latencies:
+    """外部依存ごとのスタブレイテンシ（秒）"""
+
+    gemini: float = 0.0
+    search: float = 0.0
+    maps: float = 0.0
+
+
+@dataclass
+class Fixture:
+    """シード済みデータ"""
+
+    users: list[str]
+    oshis_by_user: dict[str, list[str]]
+    events_by_user: dict[str, list[str]]
+
+
+@dataclass
+class RouteStats:
+    """ルートごとの計測結果"""
+
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    status_counts: dict[str, int] = field(default_factory=dict)
+
+    def record(self, latency: float, status: str, ok: bool) -> None:
+        self.latencies.append(latency)
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """最近傍法によるパーセンタイル"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def seed(db: InMemoryFirestore, users: int, oshis_per_user: int) -> Fixture:
+    """負荷試験用のデータを投入"""
+    oshi_repo = OshiRepository(db)
+    event_repo = EventRepository(db)
+    expense_repo = ExpenseRepository(db)
+
+    from app.models.event import EventCreate
+    from app.models.expense import ExpenseCreate
+    from app.models.oshi import OshiCreate
+
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    fixture = Fixture(users=[], oshis_by_user={}, events_by_user={})
+
+    for u in range(users):
+        user_id = f"user-{u}"
+        fixture.users.append(user_id)
+        fixture.oshis_by_user[user_id] = []
+        fixture.events_by_user[user_id] = []
+
+        for o in range(oshis_per_user):
+            oshi = oshi_repo.create(
+                user_id,
+                OshiCreate(
+                    name=f"推し{u}-{o}",
+                    category=CATEGORIES[(u + o) % len(CATEGORIES)],
+                    official_url=f"https://oshi-{u}-{o}.example.jp",
+                ),
+            )
+            fixture.oshis_by_user[user_id].append(oshi.id)
+
+            for e in range(3):
+                event = event_repo.create(
+                    EventCreate(
+                        oshi_id=oshi.id,
+                        title=f"ライブ {e}",
+                        start_datetime=now + timedelta(days=7 * (e + 1)),
+                        location=rng.choice(DEPARTURES) + "ドーム",
+                    )
+                )
+                fixture.events_by_user[user_id].append(event.id)
+
+        for _ in range(30):
+            expense_repo.create(
+                user_id,
+                ExpenseCreate(
+                    amount=rng.randint(500, 15000),
+                    category=rng.choice(EXPENSE_CATEGORIES),
+                    description="負荷試験データ",
+                    expense_date=now - timedelta(days=rng.randint(0, 20)),
+                ),
+            )
+
+    return fixture
+
+
+def install_overrides(db: InMemoryFirestore, latencies: Latencies) -> None:
+    """get_* プロバイダをスタブ版に差し替える"""
+
+    def oshi_repo():
+        return OshiRepository(db)
+
+    def info_repo():
+        return InfoRepository(db)
+
+    def network_repo():
+        return NetworkRepository(db)
+
+    def scout_agent():
+        return ScoutAgent(
+            oshi_repo=oshi_repo(),
+            info_repo=info_repo(),
+            search_client=StubGoogleSearchClient(latencies.search),
+            network_repo=network_repo(),
+        )
+
+    def priority_agent():
+        return PriorityAgent(
+            info_repo=info_repo(),
+            gemini_client=StubGeminiClient(latencies.gemini),
+        )
+
+    def root_agent():
+        return RootAgent(
+            oshi_repo=oshi_repo(),
+            scout_agent=scout_agent(),
+            priority_agent=priority_agent(),
+            gemini_client=StubGeminiClient(latencies.gemini),
+            info_repo=info_repo(),
+            network_repo=network_repo(),
+        )
+
+    def trip_agent():
+        return TripAgent(
+            event_repo=EventRepository(db),
+            trip_repo=TripRepository(db),
+            maps_client=StubGoogleMapsClient(latencies.maps),
+            gemini_client=StubGeminiClient(latencies.gemini),
+        )
+
+    def budget_agent():
+        return BudgetAgent(
+            expense_repo=ExpenseRepository(db),
+            gemini_client=StubGeminiClient(latencies.gemini),
+        )
+
+    app.dependency_overrides.update(
+        {
+            dependencies.get_db: lambda: db,
+            dependencies.get_oshi_repository: oshi_repo,
+            dependencies.get_info_repository: info_repo,
+            dependencies.get_network_repository: network_repo,
+            dependencies.get_event_repository: lambda: EventRepository(db),
+            dependencies.get_trip_repository: lambda: TripRepository(db),
+            dependencies.get_expense_repository: lambda: ExpenseRepository(db),
+            dependencies.get_google_search_client: lambda: StubGoogleSearchClient(
+                latencies.search
+            ),
+            dependencies.get_gemini_client: lambda: StubGeminiClient(latencies.gemini),
+            dependencies.get_google_maps_client: lambda: StubGoogleMapsClient(
+                latencies.maps
+            ),
+            dependencies.get_scout_agent: scout_agent,
+            dependencies.get_priority_agent: priority_agent,
+            dependencies.get_root_agent: root_agent,
+            dependencies.get_trip_agent: trip_agent,
+            dependencies.get_budget_agent: budget_agent,
+        }
+    )
+
+
+def build_request(
+    route: str, fixture: Fixture, rng: random.Random
+) -> tuple[str, str, dict[str, str], Optional[dict[str, Any]]]:
+    """ルート名から (method, path, headers, json) を組み立てる"""
+    user_id = rng.choice(fixture.users)
+    headers = {
+        "X-Internal-Api-Key": settings.internal_api_key,
+        "X-User-Id": user_id,
+    }
+    oshi_id = rng.choice(fixture.oshis_by_user[user_id])
+    now = datetime.utcnow()
+
+    if route == "scout":
+        return "POST", "/agent/scout", headers, {"oshi_id": oshi_id}
+    if route == "summary":
+        return "POST", "/agent/summary", headers, {"oshi_id": oshi_id}
+    if route == "trip":
+        return "POST", "/agent/trip", headers, {
+            "event_id": rng.choice(fixture.events_by_user[user_id]),
+            "departure": rng.choice(DEPARTURES),
+        }
+    if route == "trip_batch":
+        events = fixture.events_by_user[user_id]
+        return "POST", "/agent/trip/batch", headers, {
+            "items": [
+                {"event_id": event_id, "departure": departure}
+                for event_id in rng.sample(events, min(len(events), 4))
+                for departure in rng.sample(DEPARTURES, 2)
+            ]
+        }
+    if route == "budget":
+        return "POST", "/agent/budget", headers, {"year": now.year, "month": now.month}
+    if route == "network":
+        return "GET", f"/agent/network/{oshi_id}", headers, None
+    if route == "network_scout":
+        return "POST", "/agent/network/scout", headers, {"oshi_id": oshi_id}
+    raise ValueError(f"Unknown route: {route}")
+
+
+async def run_load(
+    base_url: str,
+    fixture: Fixture,
+    mix: dict[str, int],
+    rps: float,
+    duration: float,
+    timeout: float,
+    seed_value: int,
+) -> tuple[dict[str, RouteStats], float]:
+    """目標RPSでオープンループ負荷をかける"""
+    rng = random.Random(seed_value)
+    routes = list(mix.keys())
+    weights = list(mix.values())
+    stats = {route: RouteStats() for route in routes}
+    interval = 1.0 / rps
+    total = int(rps * duration)
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=timeout, limits=limits
+    ) as client:
+
+        async def fire(route: str) -> None:
+            method, path, headers, body = build_request(route, fixture, rng)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, headers=headers, json=body)
+                status = str(response.status_code)
+                ok = response.status_code < 400
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+                ok = False
+            stats[route].record(time.perf_counter() - started, status, ok)
+
+        started = time.perf_counter()
+        tasks = []
+        for i in range(total):
+            # 送信時刻を固定スケジュールに合わせる（応答待ちで送信が遅れないようにする）
+            delay = started + i * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            route = rng.choices(routes, weights=weights)[0]
+            tasks.append(asyncio.create_task(fire(route)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    return stats, elapsed
+
+
+def summarize(
+    stats: dict[str, RouteStats], elapsed: float, target_rps: float
+) -> dict[str, Any]:
+    """集計結果を辞書にまとめる"""
+    routes = {}
+    all_latencies: list[float] = []
+    total_errors = 0
+    for route, s in stats.items():
+        all_latencies.extend(s.latencies)
+        total_errors += s.errors
+        count = len(s.latencies)
+        routes[route] = {
+            "count": count,
+            "error_rate": round(s.errors / count, 4) if count else 0.0,
+            "p50_ms": round(percentile(s.latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(s.latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(s.latencies, 99) * 1000, 1),
+            "mean_ms": round(statistics.fmean(s.latencies) * 1000, 1) if count else 0.0,
+            "status": s.status_counts,
+        }
+
+    completed = len(all_latencies)
+    throughput = completed / elapsed if elapsed else 0.0
+    mean_latency = statistics.fmean(all_latencies) if all_latencies else 0.0
+    return {
+        "target_rps": target_rps,
+        "achieved_rps": round(throughput, 2),
+        "requests": completed,
+        "error_rate": round(total_errors / completed, 4) if completed else 0.0,
+        "p50_ms": round(percentile(all_latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(all_latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(all_latencies, 99) * 1000, 1),
+        # リトルの法則: 平均同時処理数 = スループット × 平均滞在時間
+        "mean_concurrency": round(throughput * mean_latency, 2),
+        "routes": routes,
+    }
+
+
+def print_report(report: dict[str, Any]) -> None:
+    """表形式で出力"""
+    header = f"{'route':<15}{'count':>7}{'err%':>8}{'p50':>10}{'p95':>10}{'p99':>10}  status"
+    print(header)
+    print("-" * len(header))
+    for route, r in report["routes"].items():
+        print(
+            f"{route:<15}{r['count']:>7}{r['error_rate'] * 100:>7.1f}%"
+            f"{r['p50_ms']:>8.1f}ms{r['p95_ms']:>8.1f}ms{r['p99_ms']:>8.1f}ms  {r['status']}"
+        )
+    print("-" * len(header))
+    print(
+        f"target {report['target_rps']} rps / achieved {report['achieved_rps']} rps, "
+        f"errors {report['error_rate'] * 100:.1f}%, "
+        f"p50 {report['p50_ms']}ms p95 {report['p95_ms']}ms p99 {report['p99_ms']}ms, "
+        f"mean concurrency {report['mean_concurrency']}"
+    )
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    """`scout=2,budget=1` 形式のトラフィック比率をパース"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown route: {name}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int) -> uvicorn.Server:
+    """別スレッドで uvicorn を起動（Cloud Run と同じ単一プロセス・単一ワーカー）"""
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def main(argv: Optional[list[str]] = None) -> dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rps", type=float, default=10.0, help="目標リクエスト/秒")
+    parser.add_argument("--duration", type=float, default=20.0, help="計測時間（秒）")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="route=weight,...")
+    parser.add_argument("--users", type=int, default=20, help="仮想ユーザー数")
+    parser.add_argument("--oshis-per-user", type=int, default=2)
+    parser.add_argument("--gemini-latency", type=float, default=0.05, help="秒")
+    parser.add_argument("--search-latency", type=float, default=0.02, help="秒")
+    parser.add_argument("--maps-latency", type=float, default=0.03, help="秒")
+    parser.add_argument("--timeout", type=float, default=60.0, help="リクエストタイムアウト（秒）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="JSONで出力")
+    args = parser.parse_args(argv)
+
+    # 負荷試験中のログ出力がレイテンシを歪めないように抑制
+    import logging
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    db = InMemoryFirestore()
+    fixture = seed(db, args.users, args.oshis_per_user)
+    install_overrides(
+        db,
+        Latencies(
+            gemini=args.gemini_latency,
+            search=args.search_latency,
+            maps=args.maps_latency,
+        ),
+    )
+
+    port = _free_port()
+    server = start_server(port)
+    try:
+        stats, elapsed = asyncio.run(
+            run_load(
+                base_url=f"http://127.0.0.1:{port}",
+                fixture=fixture,
+                mix=args.mix,
+                rps=args.rps,
+                duration=args.duration,
+                timeout=args.timeout,
+                seed_value=args.seed,
+            )
+        )
+    finally:
+        server.should_exit = True
+        app.dependency_overrides.clear()
+
+    report = summarize(stats, elapsed, args.rps)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
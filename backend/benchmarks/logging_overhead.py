@@ -0,0 +1,155 @@
+"""ログ出力の呼び出し側の負荷のベンチマーク
+
+scout ワークフローと同じ比率のログ（URLごとの scout_skip_duplicate、判定ごとの
+priority_judged、その他の info）を出したときの呼び出し元スレッドの時間を、
+従来の設定（同期の JSONRenderer）と configure_logging の設定で比較する。
+出力先は /dev/null。非同期の設定では、最後にキューが空になるまでの時間も計測する。
+
+使い方（backend/ ディレクトリで実行）:
+    python -m benchmarks.logging_overhead
+    python -m benchmarks.logging_overhead --events 50000 --json
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Callable, Optional
+
+# Settings が必須とする環境変数（実サービスには接続しないためダミー値で良い）
+for _key in (
+    "GOOGLE_CLOUD_PROJECT",
+    "GEMINI_API_KEY",
+    "GOOGLE_SEARCH_API_KEY",
+    "GOOGLE_SEARCH_CX",
+    "GOOGLE_MAPS_API_KEY",
+    "INTERNAL_API_KEY",
+):
+    os.environ.setdefault(_key, "logging")
+
+import structlog  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.logging_config import configure_logging, shutdown_logging  # noqa: E402
+
+
+def configure_legacy_logging() -> None:
+    """変更前の configure_logging と同じ設定"""
+    logging.basicConfig(format="%(message)s", stream=sys.stdout, level=logging.INFO)
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.stdlib.filter_by_level,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+            structlog.processors.UnicodeDecoder(),
+            structlog.processors.JSONRenderer(),
+        ],
+        wrapper_class=structlog.stdlib.BoundLogger,
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        cache_logger_on_first_use=True,
+    )
+
+
+def workload(events: int) -> None:
+    """scout ワークフロー相当のログ（重複スキップ 70%・判定 20%・その他 10%）"""
+    logger = structlog.get_logger("benchmark")
+    for i in range(events):
+        kind = i % 10
+        if kind < 7:
+            logger.debug(
+                "scout_skip_duplicate",
+                oshi_id="oshi-bench",
+                url=f"https://example.com/news/{i}",
+            )
+        elif kind < 9:
+            logger.info(
+                "priority_judged",
+                info_id=f"info{i:06d}",
+                priority="important",
+                reason="公式サイトでのチケット先行受付の告知",
+            )
+        else:
+            logger.info("scout_search_complete", oshi_id="oshi-bench", results=10)
+
+
+def _reset_logging() -> None:
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    structlog.reset_defaults()
+
+
+def measure(
+    configure: Callable[[], None], events: int, level: str
+) -> dict[str, float]:
+    """呼び出し側の時間と、出力が終わるまでの時間"""
+    stdout = sys.stdout
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        try:
+            _reset_logging()
+            settings.log_level = level
+            configure()
+            started = time.perf_counter()
+            workload(events)
+            caller_ms = (time.perf_counter() - started) * 1000
+            shutdown_logging()
+            total_ms = (time.perf_counter() - started) * 1000
+        finally:
+            _reset_logging()
+            sys.stdout = stdout
+    return {
+        "caller_ms": round(caller_ms, 1),
+        "caller_us_per_event": round(caller_ms * 1000 / events, 2),
+        "total_ms": round(total_ms, 1),
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000, help="ログの件数")
+    parser.add_argument("--level", default="INFO", help="ログレベル")
+    parser.add_argument("--json", action="store_true", help="JSONで出力")
+    args = parser.parse_args(argv)
+
+    def configure_sync() -> None:
+        settings.log_async = False
+        configure_logging()
+
+    def configure_async() -> None:
+        settings.log_async = True
+        configure_logging()
+
+    report = {
+        name: measure(configure, args.events, args.level)
+        for name, configure in (
+            ("legacy", configure_legacy_logging),
+            ("sampled_sync", configure_sync),
+            ("sampled_async", configure_async),
+        )
+    }
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return report
+
+    print(f"{args.events} 件（{args.level}）")
+    print(f"{'config':<14} {'caller':>10} {'per event':>11} {'total':>10}")
+    for name, stats in report.items():
+        print(
+            f"{name:<14} {stats['caller_ms']:>8.1f}ms "
+            f"{stats['caller_us_per_event']:>9.2f}us {stats['total_ms']:>8.1f}ms"
+        )
+    return report
+
+
+if __name__ == "__main__":
+    main()
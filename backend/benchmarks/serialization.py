@@ -0,0 +1,217 @@
+"""レスポンスのシリアライズ（JSONエンコード・gzip圧縮）のベンチマーク
+
+`/agent/scout-all`（推しごとの新着情報IDと重要度判定を含む結果一覧）と
+`/agent/network/{oshi_id}`（ネットワークノード一覧）の現実的な大きさのペイロードについて、
+FastAPI 標準の経路（response_model による再検証 + jsonable_encoder + json.dumps）と
+FastJSONResponse（検証済みの内容をそのまま書き出す）のエンコード時間とバイト数、
+GZipMiddleware の圧縮レベルでの gzip の時間と圧縮後のバイト数を比較する。
+
+使い方（backend/ ディレクトリで実行）:
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --oshis 1000 --infos 50 --nodes 500 --json
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import statistics
+import time
+import uuid
+from typing import Any, Callable, Optional
+
+# Settings が必須とする環境変数（実サービスには接続しないためダミー値で良い）
+for _key in (
+    "GOOGLE_CLOUD_PROJECT",
+    "GEMINI_API_KEY",
+    "GOOGLE_SEARCH_API_KEY",
+    "GOOGLE_SEARCH_CX",
+    "GOOGLE_MAPS_API_KEY",
+    "INTERNAL_API_KEY",
+):
+    os.environ.setdefault(_key, "serialization")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.models.workflow_results import ScoutWorkflowResult  # noqa: E402
+from app.routers.agent import NetworkListResponse, NetworkNodeResponse  # noqa: E402
+from app.routers.responses import FastJSONResponse  # noqa: E402
+
+PRIORITIES = ("urgent", "important", "normal", "low")
+NODE_TYPES = ("member", "group", "unit", "collaborator")
+
+
+def _doc_id(seed: str) -> str:
+    # Firestore の自動IDと同じ20文字
+    return uuid.uuid5(uuid.NAMESPACE_URL, seed).hex[:20]
+
+
+def scout_all_payload(oshis: int, infos_per_oshi: int) -> dict[str, Any]:
+    """RootAgent.run_all_scouts と同じ形の結果（100件に1件は失敗）"""
+    results: list[Any] = []
+    for o in range(oshis):
+        oshi_id = _doc_id(f"oshi-{o}")
+        if o % 100 == 99:
+            results.append(
+                {"oshi_id": oshi_id, "oshi_name": f"推し{o}", "error": "timeout"}
+            )
+            continue
+        info_ids = [_doc_id(f"info-{o}-{i}") for i in range(infos_per_oshi)]
+        results.append(
+            ScoutWorkflowResult(
+                oshi_id=oshi_id,
+                oshi_name=f"推し{o}",
+                collected_count=infos_per_oshi,
+                new_info_ids=info_ids,
+                priority_results={
+                    info_id: PRIORITIES[i % len(PRIORITIES)]
+                    for i, info_id in enumerate(info_ids)
+                },
+                new_event_ids=[_doc_id(f"event-{o}-{e}") for e in range(2)],
+            )
+        )
+    return {
+        "total_oshis": oshis,
+        "success_count": sum(1 for r in results if not isinstance(r, dict)),
+        "error_count": sum(1 for r in results if isinstance(r, dict)),
+        "results": results,
+    }
+
+
+def network_payload(nodes: int) -> NetworkListResponse:
+    """get_network と同じ形のネットワーク一覧"""
+    return NetworkListResponse(
+        oshi_id=_doc_id("oshi-network"),
+        nodes=[
+            NetworkNodeResponse(
+                id=_doc_id(f"node-{n}"),
+                name=f"関連人物{n}",
+                node_type=NODE_TYPES[n % len(NODE_TYPES)],
+                ring=1 + n % 3,
+                relationship=f"{n % 7}年前からの共演者",
+                is_active=n % 5 != 0,
+            )
+            for n in range(nodes)
+        ],
+    )
+
+
+def _fastapi_encoder(
+    response_model: Optional[type], loop: asyncio.AbstractEventLoop
+) -> Callable[[Any], bytes]:
+    """FastAPI がエンドポイントの戻り値に行う処理（serialize_response + JSONResponse）"""
+    field = (
+        create_model_field("response", response_model, mode="serialization")
+        if response_model is not None
+        else None
+    )
+
+    def encode(content: Any) -> bytes:
+        serialized = loop.run_until_complete(
+            serialize_response(field=field, response_content=content)
+        )
+        return JSONResponse(serialized).body
+
+    return encode
+
+
+def _median_ms(func: Callable[[], Any], runs: int) -> tuple[float, Any]:
+    timings = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def measure(
+    content: Any, response_model: Optional[type], runs: int, gzip_level: int
+) -> dict[str, dict[str, float]]:
+    """標準経路と FastJSONResponse のエンコード時間・バイト数・gzip後のバイト数"""
+    loop = asyncio.new_event_loop()
+    try:
+        encoders = {
+            "fastapi": _fastapi_encoder(response_model, loop),
+            "fast_json": lambda value: FastJSONResponse(value).body,
+        }
+        report = {}
+        for name, encode in encoders.items():
+            encode_ms, body = _median_ms(lambda: encode(content), runs)
+            gzip_ms, compressed = _median_ms(
+                lambda: gzip.compress(body, compresslevel=gzip_level), runs
+            )
+            report[name] = {
+                "encode_ms": round(encode_ms, 2),
+                "bytes": len(body),
+                "gzip_ms": round(gzip_ms, 2),
+                "gzip_bytes": len(compressed),
+            }
+        return report
+    finally:
+        loop.close()
+
+
+def main(argv: Optional[list[str]] = None) -> dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--oshis", type=int, default=500, help="scout-all の推しの数")
+    parser.add_argument("--infos", type=int, default=30, help="推しごとの新着情報数")
+    parser.add_argument("--nodes", type=int, default=300, help="ネットワークのノード数")
+    parser.add_argument("--runs", type=int, default=20, help="計測回数（中央値を出力）")
+    parser.add_argument(
+        "--gzip-level",
+        type=int,
+        default=settings.gzip_compress_level,
+        help="gzip の圧縮レベル（既定は GZIP_COMPRESS_LEVEL）",
+    )
+    parser.add_argument("--json", action="store_true", help="JSONで出力")
+    args = parser.parse_args(argv)
+
+    report = {
+        "scout_all": measure(
+            scout_all_payload(args.oshis, args.infos),
+            None,
+            args.runs,
+            args.gzip_level,
+        ),
+        "network": measure(
+            network_payload(args.nodes), NetworkListResponse, args.runs, args.gzip_level
+        ),
+    }
+
+    # 2つの経路で同じJSONになることを確認（キー順・空白の違いは無視）
+    for name, content, model in (
+        ("scout_all", scout_all_payload(2, 3), None),
+        ("network", network_payload(3), NetworkListResponse),
+    ):
+        loop = asyncio.new_event_loop()
+        try:
+            expected = json.loads(_fastapi_encoder(model, loop)(content))
+        finally:
+            loop.close()
+        assert json.loads(FastJSONResponse(content).body) == expected, name
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return report
+
+    print(f"gzip level {args.gzip_level}")
+    print(
+        f"{'payload':<10} {'path':<10} {'encode':>10} {'bytes':>10} "
+        f"{'gzip':>10} {'gzip bytes':>11}"
+    )
+    for payload, paths in report.items():
+        for path, stats in paths.items():
+            print(
+                f"{payload:<10} {path:<10} {stats['encode_ms']:>8.2f}ms "
+                f"{stats['bytes']:>10} {stats['gzip_ms']:>8.2f}ms "
+                f"{stats['gzip_bytes']:>11}"
+            )
+    return report
+
+
+if __name__ == "__main__":
+    main()
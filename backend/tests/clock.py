@@ -0,0 +1,28 @@
+"""テスト用の手動で進める時計"""
+from datetime import datetime, timedelta
+
+
+class FakeClock:
+    """手動で進める時計（datetime.utcnow の代わり）"""
+
+    def __init__(self, start: datetime = datetime(2026, 4, 1, 3, 0)):
+        self.now = start
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += timedelta(seconds=seconds)
+
+
+class FakeMonotonicClock:
+    """手動で進める時計（time.monotonic の代わり）"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
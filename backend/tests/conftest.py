@@ -0,0 +1,16 @@
+"""テスト共通のフィクスチャ"""
+import pytest
+
+from tests.clock import FakeClock, FakeMonotonicClock
+
+
+@pytest.fixture
+def clock():
+    """テスト用の時計（datetime を返す）"""
+    return FakeClock()
+
+
+@pytest.fixture
+def monotonic_clock():
+    """テスト用の時計（time.monotonic と同じ秒数を返す）"""
+    return FakeMonotonicClock()
@@ -0,0 +1,316 @@
+"""テスト・ベンチマーク用のインメモリ Firestore
+
+InMemoryFirestore は firestore.Client のうちリポジトリ層が使う API のサブセットを
+メモリ上で再現する（トランザクションは firestore.transactional でそのまま使える）。
+ベンチマーク（benchmarks）もここから読み込む。
+"""
+import copy
+import threading
+import uuid
+from typing import Any, Optional
+
+from google.cloud.firestore_v1.transforms import DELETE_FIELD, Increment
+
+
+def _merge_fields(current: dict, data: dict) -> dict:
+    """set(merge=True) 相当のネストしたマージ（Increment を解決する）"""
+    merged = dict(current)
+    for key, value in data.items():
+        if value is DELETE_FIELD:
+            merged.pop(key, None)
+        elif isinstance(value, Increment):
+            merged[key] = (merged.get(key) or 0) + value.value
+        elif isinstance(value, dict):
+            base = merged.get(key)
+            merged[key] = _merge_fields(base if isinstance(base, dict) else {}, value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+class FakeDocumentSnapshot:
+    """DocumentSnapshot 相当"""
+
+    def __init__(self, reference: "FakeDocumentReference", data: Optional[dict]):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[dict]:
+        return copy.copy(self._data) if self._data is not None else None
+
+
+class FakeDocumentReference:
+    """DocumentReference 相当"""
+
+    def __init__(self, collection: "FakeCollection", doc_id: str):
+        self._collection = collection
+        self.id = doc_id
+
+    def get(
+        self, transaction: Optional["FakeTransaction"] = None
+    ) -> FakeDocumentSnapshot:
+        with self._collection.db.lock:
+            data = self._collection.docs.get(self.id)
+            return FakeDocumentSnapshot(self, copy.copy(data) if data else None)
+
+    def set(self, data: dict, merge: bool = False) -> None:
+        with self._collection.db.lock:
+            current = self._collection.docs.get(self.id) if merge else None
+            self._collection.docs[self.id] = _merge_fields(current or {}, data)
+
+    def update(self, data: dict) -> None:
+        with self._collection.db.lock:
+            if self.id not in self._collection.docs:
+                raise KeyError(f"No document to update: {self.id}")
+            self._collection.docs[self.id] = _merge_fields(
+                self._collection.docs[self.id], data
+            )
+
+    def delete(self) -> None:
+        with self._collection.db.lock:
+            self._collection.docs.pop(self.id, None)
+
+
+class FakeQuery:
+    """Query 相当（where / order_by / limit / select / stream）"""
+
+    _OPS = {
+        "==": lambda a, b: a == b,
+        "!=": lambda a, b: a != b,
+        "<": lambda a, b: a is not None and a < b,
+        "<=": lambda a, b: a is not None and a <= b,
+        ">": lambda a, b: a is not None and a > b,
+        ">=": lambda a, b: a is not None and a >= b,
+        "in": lambda a, b: a in b,
+        "array_contains": lambda a, b: b in (a or []),
+        "array_contains_any": lambda a, b: any(v in (a or []) for v in b),
+    }
+
+    def __init__(
+        self,
+        collection: "FakeCollection",
+        filters: tuple = (),
+        orders: tuple = (),
+        limit_count: Optional[int] = None,
+        fields: Optional[tuple] = None,
+    ):
+        self._collection = collection
+        self._filters = filters
+        self._orders = orders
+        self._limit = limit_count
+        self._fields = fields
+
+    def where(self, field: str, op: str, value: Any) -> "FakeQuery":
+        return FakeQuery(
+            self._collection,
+            self._filters + ((field, op, value),),
+            self._orders,
+            self._limit,
+            self._fields,
+        )
+
+    def order_by(self, field: str, direction: str = "ASCENDING") -> "FakeQuery":
+        return FakeQuery(
+            self._collection,
+            self._filters,
+            self._orders + ((field, direction),),
+            self._limit,
+            self._fields,
+        )
+
+    def limit(self, count: int) -> "FakeQuery":
+        return FakeQuery(
+            self._collection, self._filters, self._orders, count, self._fields
+        )
+
+    def select(self, field_paths: list[str]) -> "FakeQuery":
+        return FakeQuery(
+            self._collection,
+            self._filters,
+            self._orders,
+            self._limit,
+            tuple(field_paths),
+        )
+
+    def stream(self):
+        with self._collection.db.lock:
+            items = [
+                (doc_id, data)
+                for doc_id, data in self._collection.docs.items()
+                if all(
+                    self._OPS[op](data.get(field), value)
+                    for field, op, value in self._filters
+                )
+            ]
+            items = [(doc_id, copy.copy(data)) for doc_id, data in items]
+
+        for field, direction in reversed(self._orders):
+            items.sort(
+                key=lambda item: (item[1].get(field) is None, item[1].get(field)),
+                reverse=direction == "DESCENDING",
+            )
+        if self._limit is not None:
+            items = items[: self._limit]
+        if self._fields is not None:
+            items = [
+                (doc_id, {k: v for k, v in data.items() if k in self._fields})
+                for doc_id, data in items
+            ]
+
+        for doc_id, data in items:
+            ref = FakeDocumentReference(self._collection, doc_id)
+            yield FakeDocumentSnapshot(ref, data)
+
+    def get(self) -> list[FakeDocumentSnapshot]:
+        return list(self.stream())
+
+    def count(self, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        return FakeAggregationQuery(self).count(alias)
+
+    def sum(self, field: str, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        return FakeAggregationQuery(self).sum(field, alias)
+
+
+class FakeAggregationResult:
+    """AggregationResult 相当"""
+
+    def __init__(self, alias: str, value: Any):
+        self.alias = alias
+        self.value = value
+
+
+class FakeAggregationQuery:
+    """AggregationQuery 相当（count / sum）"""
+
+    def __init__(self, query: FakeQuery):
+        self._query = query
+        self._aggregations: list[tuple[str, Optional[str], str]] = []
+
+    def count(self, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        self._aggregations.append(("count", None, alias or "count"))
+        return self
+
+    def sum(self, field: str, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        self._aggregations.append(("sum", field, alias or f"sum_{field}"))
+        return self
+
+    def get(self) -> list[list[FakeAggregationResult]]:
+        docs = [snapshot.to_dict() for snapshot in self._query.stream()]
+        results = []
+        for kind, field, alias in self._aggregations:
+            if kind == "count":
+                value = len(docs)
+            else:
+                value = sum(
+                    doc.get(field)
+                    for doc in docs
+                    if isinstance(doc.get(field), (int, float))
+                )
+            results.append(FakeAggregationResult(alias, value))
+        return [results]
+
+
+class FakeCollection(FakeQuery):
+    """CollectionReference 相当"""
+
+    def __init__(self, db: "InMemoryFirestore", name: str):
+        self.db = db
+        self.name = name
+        self.docs: dict[str, dict] = {}
+        super().__init__(self)
+
+    def document(self, doc_id: Optional[str] = None) -> FakeDocumentReference:
+        return FakeDocumentReference(self, doc_id or uuid.uuid4().hex[:20])
+
+
+class FakeWriteBatch:
+    """WriteBatch 相当（commit時にまとめて適用）"""
+
+    def __init__(self, db: "InMemoryFirestore"):
+        self._db = db
+        self._ops: list[tuple] = []
+
+    def set(self, ref: FakeDocumentReference, data: dict, merge: bool = False):
+        self._ops.append(("set", ref, data, merge))
+
+    def update(self, ref: FakeDocumentReference, data: dict):
+        self._ops.append(("update", ref, data, None))
+
+    def delete(self, ref: FakeDocumentReference):
+        self._ops.append(("delete", ref, None, None))
+
+    def commit(self) -> None:
+        with self._db.lock:
+            for op, ref, data, merge in self._ops:
+                if op == "set":
+                    ref.set(data, merge=merge)
+                elif op == "update":
+                    ref.update(data)
+                else:
+                    ref.delete()
+        self._ops = []
+
+
+class FakeTransaction(FakeWriteBatch):
+    """Transaction 相当（firestore.transactional から呼ばれる部分）
+
+    開始から commit / rollback までデータベース全体のロックを持つため、
+    トランザクション同士は直列に実行される。
+    """
+
+    _read_only = False
+    _max_attempts = 5
+
+    def __init__(self, db: "InMemoryFirestore"):
+        super().__init__(db)
+        self._id: Optional[bytes] = None
+
+    def _clean_up(self) -> None:
+        self._ops = []
+        self._id = None
+
+    def _begin(self, retry_id: Optional[bytes] = None) -> None:
+        self._db.lock.acquire()
+        self._id = uuid.uuid4().bytes
+
+    def _commit(self) -> list:
+        try:
+            self.commit()
+        finally:
+            self._id = None
+            self._db.lock.release()
+        return []
+
+    def _rollback(self) -> None:
+        if self._id is not None:
+            self._clean_up()
+            self._db.lock.release()
+
+
+class InMemoryFirestore:
+    """firestore.Client のうちリポジトリ層が使う部分だけを実装したフェイク"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._collections: dict[str, FakeCollection] = {}
+
+    def collection(self, name: str) -> FakeCollection:
+        with self.lock:
+            if name not in self._collections:
+                self._collections[name] = FakeCollection(self, name)
+            return self._collections[name]
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch(self)
+
+    def transaction(self, **_: Any) -> FakeTransaction:
+        return FakeTransaction(self)
+
+    def get_all(self, references):
+        for ref in references:
+            yield ref.get()
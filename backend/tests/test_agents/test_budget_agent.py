@@ -0,0 +1,192 @@
+"""BudgetAgentのテスト"""
+import pytest
+from unittest.mock import MagicMock
+from datetime import datetime
+
+from app.agents.budget_agent import ADVICE_EXPENSE_LIMIT, BudgetAgent
+from app.external.gemini_client import GeminiClient
+from app.models.expense import (
+    ExpenseAggregate,
+    ExpenseCategory,
+    ExpenseModel,
+    ExpenseRollupModel,
+)
+from app.repositories.expense_repository import ExpenseRepository
+
+
+@pytest.fixture
+def mock_expense_repo():
+    """ExpenseRepositoryのモック"""
+    repo = MagicMock(spec=ExpenseRepository)
+    repo.get_monthly_rollup.return_value = None
+    repo.get_monthly.return_value = [_expense()]
+    return repo
+
+
+def _expense() -> ExpenseModel:
+    return ExpenseModel(
+        id="exp1",
+        user_id="user1",
+        amount=12000,
+        category=ExpenseCategory.TICKET,
+        expense_date=datetime(2025, 1, 10),
+        created_at=datetime(2025, 1, 10),
+    )
+
+
+@pytest.fixture
+def mock_gemini_client():
+    """GeminiClientのモック"""
+    client = MagicMock(spec=GeminiClient)
+    client.generate_budget_advice.return_value = "グッズ代を見直しましょう"
+    return client
+
+
+@pytest.fixture
+def budget_agent(mock_expense_repo, mock_gemini_client):
+    """BudgetAgentインスタンス"""
+    return BudgetAgent(
+        expense_repo=mock_expense_repo,
+        gemini_client=mock_gemini_client,
+    )
+
+
+@pytest.mark.asyncio
+async def test_generate_report_reads_rollup(
+    budget_agent, mock_expense_repo, mock_gemini_client
+):
+    """ロールアップがあれば集計クエリを使わず、1ドキュメントの読み取りで集計する"""
+    mock_expense_repo.get_monthly_rollup.return_value = ExpenseRollupModel(
+        id="user1_2025-01",
+        user_id="user1",
+        year=2025,
+        month=1,
+        total=1_650_000,
+        count=420,
+        by_category={"goods": 450_000, "ticket": 1_200_000, "food": 0},
+        count_by_category={"goods": 300, "ticket": 120, "food": 0},
+    )
+
+    report = await budget_agent.generate_report("user1", 2025, 1)
+
+    assert report["total"] == 1_650_000
+    assert report["by_category"] == {"ticket": 1_200_000, "goods": 450_000}
+    assert report["expenses_count"] == 420
+    mock_expense_repo.aggregate_monthly.assert_not_called()
+    mock_expense_repo.get_monthly.assert_called_once_with(
+        "user1", 2025, 1, limit=ADVICE_EXPENSE_LIMIT
+    )
+
+
+@pytest.mark.asyncio
+async def test_generate_report_falls_back_to_aggregation(
+    budget_agent, mock_expense_repo, mock_gemini_client
+):
+    """ロールアップ未作成の月は集計クエリで集計し、支出の取得はプロンプト用の件数に限定する"""
+    aggregates = {
+        ExpenseCategory.TICKET: ExpenseAggregate(count=120, total=1_200_000),
+        ExpenseCategory.GOODS: ExpenseAggregate(count=300, total=450_000),
+    }
+    mock_expense_repo.aggregate_monthly.side_effect = (
+        lambda user_id, year, month, category: aggregates.get(
+            category, ExpenseAggregate()
+        )
+    )
+    report = await budget_agent.generate_report("user1", 2025, 1)
+
+    assert report["total"] == 1_650_000
+    assert report["by_category"] == {"ticket": 1_200_000, "goods": 450_000}
+    assert report["expenses_count"] == 420
+    assert report["advice"] == "グッズ代を見直しましょう"
+
+    assert mock_expense_repo.aggregate_monthly.call_count == len(ExpenseCategory)
+    mock_expense_repo.get_monthly.assert_called_once_with(
+        "user1", 2025, 1, limit=ADVICE_EXPENSE_LIMIT
+    )
+    prompt_expenses = mock_gemini_client.generate_budget_advice.call_args.kwargs[
+        "expenses"
+    ]
+    assert prompt_expenses == [
+        {"category": "ticket", "amount": 12000, "description": None, "date": "2025-01-10"}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_generate_report_no_data(
+    budget_agent, mock_expense_repo, mock_gemini_client
+):
+    """支出がない月は集計クエリもアドバイス生成も行わない"""
+    mock_expense_repo.get_monthly.return_value = []
+
+    report = await budget_agent.generate_report("user1", 2025, 1)
+
+    assert report["total"] == 0
+    assert report["expenses_count"] == 0
+    mock_expense_repo.aggregate_monthly.assert_not_called()
+    mock_gemini_client.generate_budget_advice.assert_not_called()
+
+
+def _rollup(**kwargs) -> ExpenseRollupModel:
+    return ExpenseRollupModel(
+        id="user1_2025-01",
+        user_id="user1",
+        year=2025,
+        month=1,
+        total=12000,
+        count=1,
+        by_category={"ticket": 12000},
+        count_by_category={"ticket": 1},
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_generate_report_caches_advice_in_rollup(
+    budget_agent, mock_expense_repo, mock_gemini_client
+):
+    """初回はアドバイスを生成してロールアップにキャッシュし、支出が同じなら再利用する"""
+    mock_expense_repo.get_monthly_rollup.return_value = _rollup()
+
+    first = await budget_agent.generate_report("user1", 2025, 1)
+
+    mock_gemini_client.generate_budget_advice.assert_called_once()
+    mock_expense_repo.save_advice.assert_called_once()
+    _, _, _, advice, digest = mock_expense_repo.save_advice.call_args.args
+    assert advice == first["advice"]
+
+    # キャッシュが保存された状態で再度レポートを開く
+    mock_expense_repo.get_monthly_rollup.return_value = _rollup(
+        advice=advice, advice_digest=digest
+    )
+    second = await budget_agent.generate_report("user1", 2025, 1)
+
+    assert second == first
+    mock_gemini_client.generate_budget_advice.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_generate_report_regenerates_when_digest_differs(
+    budget_agent, mock_expense_repo, mock_gemini_client
+):
+    """支出サマリーが変わっていればキャッシュを使わない"""
+    mock_expense_repo.get_monthly_rollup.return_value = _rollup(
+        advice="古いアドバイス", advice_digest="stale"
+    )
+
+    report = await budget_agent.generate_report("user1", 2025, 1)
+
+    assert report["advice"] == "グッズ代を見直しましょう"
+    mock_gemini_client.generate_budget_advice.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_generate_report_survives_cache_save_failure(
+    budget_agent, mock_expense_repo, mock_gemini_client
+):
+    """キャッシュの保存に失敗してもレポートは返す"""
+    mock_expense_repo.get_monthly_rollup.return_value = _rollup()
+    mock_expense_repo.save_advice.side_effect = RuntimeError("firestore down")
+
+    report = await budget_agent.generate_report("user1", 2025, 1)
+
+    assert report["advice"] == "グッズ代を見直しましょう"
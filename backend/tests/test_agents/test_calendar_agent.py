@@ -0,0 +1,114 @@
+"""CalendarAgentのテスト"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.agents.calendar_agent import CalendarAgent
+from app.external.google_calendar import GoogleCalendarClient
+from app.models.event import EventModel
+from app.repositories.event_repository import EventRepository
+
+
+@pytest.fixture
+def mock_event_repo():
+    """EventRepositoryのモック"""
+    return MagicMock(spec=EventRepository)
+
+
+@pytest.fixture
+def calendar_agent(mock_event_repo):
+    """CalendarAgentインスタンス"""
+    return CalendarAgent(event_repo=mock_event_repo)
+
+
+def _event(
+    event_id: str,
+    calendar_event_id: Optional[str] = None,
+    start_datetime: datetime = datetime(2025, 3, 1, 18, 0),
+) -> EventModel:
+    return EventModel(
+        id=event_id,
+        oshi_id="oshi1",
+        title=f"ライブ {event_id}",
+        start_datetime=start_datetime,
+        location="日本武道館",
+        calendar_event_id=calendar_event_id,
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_register_events_inserts_only_unregistered_in_one_batch(
+    calendar_agent, mock_event_repo
+):
+    """未登録のイベントだけを1回の一括登録で送り、失敗したものは未登録のまま残す"""
+    mock_event_repo.get_many.return_value = {
+        "event1": _event("event1"),
+        "event2": _event("event2", calendar_event_id="cal-existing"),
+        "event3": _event("event3"),
+    }
+    calendar_client = MagicMock(spec=GoogleCalendarClient)
+    calendar_client.build_event_body.side_effect = GoogleCalendarClient.build_event_body
+    calendar_client.create_events.return_value = [
+        ("cal-1", None),
+        (None, "rate limited"),
+    ]
+
+    with patch(
+        "app.agents.calendar_agent.GoogleCalendarClient", return_value=calendar_client
+    ):
+        results = await calendar_agent.register_events(
+            ["event1", "event2", "event3", "missing"], "token"
+        )
+
+    calendar_client.create_events.assert_called_once()
+    bodies = calendar_client.create_events.call_args.args[0]
+    assert [body["summary"] for body in bodies] == ["ライブ event1", "ライブ event3"]
+    mock_event_repo.update_calendar_ids.assert_called_once_with({"event1": "cal-1"})
+
+    assert [r.calendar_event_id for r in results] == [
+        "cal-1",
+        "cal-existing",
+        None,
+        None,
+    ]
+    assert results[1].already_registered
+    assert results[2].error == "rate limited"
+    assert results[3].error == "Event not found: missing"
+
+
+@pytest.mark.asyncio
+async def test_register_upcoming_events_skips_past_and_registered(
+    calendar_agent, mock_event_repo
+):
+    """推しの今後の未登録イベントだけを一括登録し、IDは1回のバッチ書き込みで保存する"""
+    now = datetime.now(timezone.utc)
+    mock_event_repo.get_all_by_oshi.return_value = [
+        _event("past", start_datetime=now - timedelta(days=1)),
+        _event("registered", "cal-existing", start_datetime=now + timedelta(days=1)),
+        _event("tour1", start_datetime=now + timedelta(days=2)),
+        _event("tour2", start_datetime=now + timedelta(days=3)),
+    ]
+    calendar_client = MagicMock(spec=GoogleCalendarClient)
+    calendar_client.build_event_body.side_effect = GoogleCalendarClient.build_event_body
+    calendar_client.create_events.return_value = [("cal-1", None), ("cal-2", None)]
+
+    with patch(
+        "app.agents.calendar_agent.GoogleCalendarClient", return_value=calendar_client
+    ):
+        results = await calendar_agent.register_upcoming_events("oshi1", "token")
+
+    mock_event_repo.get_all_by_oshi.assert_called_once_with("oshi1")
+    assert len(calendar_client.create_events.call_args.args[0]) == 2
+    mock_event_repo.update_calendar_ids.assert_called_once_with(
+        {"tour1": "cal-1", "tour2": "cal-2"}
+    )
+    mock_event_repo.update_calendar_id.assert_not_called()
+    assert [(r.event_id, r.already_registered) for r in results] == [
+        ("registered", True),
+        ("tour1", False),
+        ("tour2", False),
+    ]
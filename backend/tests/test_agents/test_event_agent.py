@@ -0,0 +1,208 @@
+"""EventAgentのテスト"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from tenacity import wait_none
+
+from app.agents.event_agent import EventAgent
+from app.external.circuit_breaker import CircuitOpenError
+from app.external.gemini_client import GeminiClient
+from app.models.event import EventCreate
+from app.models.info import CollectedInfoCreate
+from app.repositories.event_repository import EventRepository
+from app.repositories.info_repository import InfoRepository
+from tests.fakes import InMemoryFirestore
+
+
+@pytest.fixture
+def db():
+    """インメモリFirestore"""
+    return InMemoryFirestore()
+
+
+@pytest.fixture
+def info_repo(db):
+    """InfoRepositoryインスタンス"""
+    return InfoRepository(db)
+
+
+@pytest.fixture
+def event_repo(db):
+    """EventRepositoryインスタンス"""
+    return EventRepository(db)
+
+
+@pytest.fixture
+def mock_gemini_client():
+    """GeminiClientのモック（タイトルに「ライブ」を含む情報をイベントとして返す）"""
+    client = MagicMock(spec=GeminiClient)
+    client.extract_events_batch.side_effect = lambda items: {
+        item["id"]: {
+            "is_event": True,
+            "title": item["title"],
+            "start_datetime": "2025-05-01T18:00:00",
+            "location": "日本武道館",
+        }
+        for item in items
+        if "ライブ" in item["title"]
+    }
+    return client
+
+
+@pytest.fixture
+def event_agent(info_repo, event_repo, mock_gemini_client):
+    """EventAgentインスタンス"""
+    return EventAgent(
+        info_repo=info_repo, event_repo=event_repo, gemini_client=mock_gemini_client
+    )
+
+
+def _create_infos(info_repo, titles):
+    return [
+        info_repo.create(
+            CollectedInfoCreate(
+                title=title, url=f"https://example.com/{i}", oshi_id="oshi1"
+            )
+        ).id
+        for i, title in enumerate(titles)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_extract_events_batches_prompts_and_skips_normal(
+    event_agent, info_repo, event_repo, mock_gemini_client
+):
+    """urgent / important の情報だけを EXTRACTION_BATCH_SIZE 件ずつまとめて抽出する"""
+    titles = [f"ツアー追加公演 ライブ{i}" for i in range(12)] + ["ブログ更新"]
+    info_ids = _create_infos(info_repo, titles)
+    priority_results = {info_id: "important" for info_id in info_ids[:12]}
+    priority_results[info_ids[12]] = "normal"
+
+    created_ids = await event_agent.extract_events("oshi1", priority_results)
+
+    assert len(created_ids) == 12
+    # 12件を1回ずつ判定するのではなく、10件 + 2件の2回のプロンプトで抽出する
+    calls = mock_gemini_client.extract_events_batch.call_args_list
+    batch_sizes = [len(call.args[0]) for call in calls]
+    assert sorted(batch_sizes) == [2, 10]
+    events = event_repo.get_many(created_ids)
+    assert all(event.info_id in info_ids for event in events.values())
+
+
+@pytest.mark.asyncio
+async def test_extract_events_deduplicates_against_existing(
+    event_agent, info_repo, event_repo
+):
+    """既存イベント・今回の抽出結果内で (タイトル, 開始日時, 会場) が同じものは作成しない"""
+    event_repo.create(
+        EventCreate(
+            oshi_id="oshi1",
+            title="春ツアー ライブ",
+            start_datetime=datetime(2025, 5, 1, 18, 0),
+            location="日本 武道館",
+        )
+    )
+    info_ids = _create_infos(
+        info_repo, ["春ツアー ライブ", "夏フェス ライブ", "夏フェス　ライブ"]
+    )
+
+    created_ids = await event_agent.extract_events(
+        "oshi1", {info_id: "urgent" for info_id in info_ids}
+    )
+
+    assert len(created_ids) == 1
+    assert len(event_repo.get_all_by_oshi("oshi1")) == 2
+
+
+@pytest.mark.asyncio
+async def test_extract_events_falls_back_to_single_items_when_batch_fails(
+    event_agent, info_repo, mock_gemini_client
+):
+    """まとめた抽出が失敗したまとまりは、1件ずつの抽出に切り替えてイベントを登録する"""
+    mock_gemini_client.extract_events_batch.side_effect = ValueError("invalid json")
+    mock_gemini_client.extract_event_info.side_effect = lambda title, content: (
+        {"is_event": True, "title": title, "start_datetime": "2025-05-01T18:00:00"}
+        if "ライブ" in title
+        else None
+    )
+    info_ids = _create_infos(info_repo, ["春ツアー ライブ", "ブログ更新"])
+
+    created_ids = await event_agent.extract_events(
+        "oshi1", {info_id: "urgent" for info_id in info_ids}
+    )
+
+    assert len(created_ids) == 1
+    assert mock_gemini_client.extract_event_info.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_extract_events_skips_fallback_while_circuit_is_open(
+    event_agent, info_repo, mock_gemini_client
+):
+    """サーキットブレーカーが開いている間は1件ずつの抽出も行わない"""
+    mock_gemini_client.extract_events_batch.side_effect = CircuitOpenError(
+        "gemini", 30.0
+    )
+    info_ids = _create_infos(info_repo, ["春ツアー ライブ"])
+
+    created_ids = await event_agent.extract_events("oshi1", {info_ids[0]: "urgent"})
+
+    assert created_ids == []
+    mock_gemini_client.extract_event_info.assert_not_called()
+
+
+def test_extract_events_batch_retries_and_raises_invalid_response(monkeypatch):
+    """JSON配列でない応答はリトライし、それでも失敗したら例外を送出する"""
+    monkeypatch.setattr(GeminiClient.extract_events_batch.retry, "wait", wait_none())
+    client = GeminiClient.__new__(GeminiClient)
+    client.model = MagicMock()
+    client.model.generate_content.return_value = MagicMock(text='{"index": 1}')
+
+    with pytest.raises(ValueError):
+        client.extract_events_batch([{"id": "a", "title": "ライブ", "content": ""}])
+
+    assert client.model.generate_content.call_count == 3
+
+
+def test_event_key_compares_stored_datetimes_in_utc():
+    """Firestoreから読んだタイムゾーン付きの開始日時も保存時のUTCと同じキーになる"""
+    jst = timezone(timedelta(hours=9))
+    stored = EventCreate(
+        oshi_id="oshi1",
+        title="ライブ",
+        start_datetime=datetime(2025, 5, 2, 3, 0, 30, tzinfo=jst),
+    )
+    extracted = EventCreate(
+        oshi_id="oshi1", title="ライブ", start_datetime=datetime(2025, 5, 1, 18, 0)
+    )
+    assert EventAgent._event_key(stored) == EventAgent._event_key(extracted)
+
+
+@pytest.mark.asyncio
+async def test_extract_events_without_target_priorities(
+    event_agent, mock_gemini_client
+):
+    """urgent / important の情報がなければGeminiを呼ばない"""
+    assert await event_agent.extract_events("oshi1", {"info1": "normal"}) == []
+    mock_gemini_client.extract_events_batch.assert_not_called()
+
+
+def test_extract_events_batch_maps_indexes_back_to_ids():
+    """まとめて抽出した結果は連番から情報IDに引き戻し、イベントでないものは除く"""
+    client = GeminiClient.__new__(GeminiClient)
+    client.model = MagicMock()
+    client.model.generate_content.return_value = MagicMock(
+        text='```json\n[{"index": 2, "is_event": true, "title": "ライブ"},'
+        ' {"index": 1, "is_event": false}, {"index": 9, "is_event": true}]\n```'
+    )
+
+    result = client.extract_events_batch(
+        [
+            {"id": "a", "title": "ブログ", "content": ""},
+            {"id": "b", "title": "ライブ告知", "content": ""},
+        ]
+    )
+
+    assert list(result) == ["b"]
+    assert result["b"]["title"] == "ライブ"
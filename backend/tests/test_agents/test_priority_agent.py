@@ -1,18 +1,21 @@
 """PriorityAgentのテスト"""
 import pytest
 from unittest.mock import MagicMock
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from app.agents.priority_agent import PriorityAgent
-from app.models.info import CollectedInfoModel, Priority
+from app.models.info import CollectedInfoCreate, CollectedInfoModel, Priority
 from app.repositories.info_repository import InfoRepository
 from app.external.gemini_client import GeminiClient
+from tests.fakes import InMemoryFirestore
 
 
 @pytest.fixture
 def mock_info_repo():
-    """InfoRepositoryのモック"""
-    return MagicMock(spec=InfoRepository)
+    """InfoRepositoryのモック（判定済みの近似重複なし）"""
+    repo = MagicMock(spec=InfoRepository)
+    repo.find_judged_near_duplicates.return_value = []
+    return repo
 
 
 @pytest.fixture
@@ -58,7 +61,7 @@ async def test_judge_priority_success(
         updated_at=datetime.utcnow(),
     )
 
-    mock_info_repo.get_by_id.side_effect = [info1, info2]
+    mock_info_repo.get_many.return_value = {"info1": info1, "info2": info2}
 
     # Geminiの判定結果
     mock_gemini_client.classify_priority.side_effect = [
@@ -78,7 +81,7 @@ async def test_judge_priority_success(
     assert result["info2"] == "important"
 
     # メソッド呼び出しの確認
-    assert mock_info_repo.get_by_id.call_count == 2
+    mock_info_repo.get_many.assert_called_once_with(["info1", "info2"])
     assert mock_gemini_client.classify_priority.call_count == 2
     assert mock_info_repo.update_priority.call_count == 2
 
@@ -100,7 +103,7 @@ async def test_judge_priority_info_not_found(
         updated_at=datetime.utcnow(),
     )
 
-    mock_info_repo.get_by_id.side_effect = [info1, None]
+    mock_info_repo.get_many.return_value = {"info1": info1}
     mock_gemini_client.classify_priority.return_value = Priority.NORMAL
     mock_info_repo.update_priority.return_value = True
 
@@ -113,7 +116,7 @@ async def test_judge_priority_info_not_found(
     assert "info_not_exist" not in result
 
     # メソッド呼び出しの確認
-    assert mock_info_repo.get_by_id.call_count == 2
+    mock_info_repo.get_many.assert_called_once()
     assert mock_gemini_client.classify_priority.call_count == 1
     assert mock_info_repo.update_priority.call_count == 1
 
@@ -131,5 +134,164 @@ async def test_judge_priority_empty_list(
 
     # メソッド呼び出しの確認
     mock_info_repo.get_by_id.assert_not_called()
+    mock_info_repo.find_judged_near_duplicates.assert_not_called()
     mock_gemini_client.classify_priority.assert_not_called()
     mock_info_repo.update_priority.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_judge_priority_propagates_verdict_to_near_duplicates(
+    priority_agent, mock_info_repo, mock_gemini_client
+):
+    """同じ告知の転載は代表1件だけ判定し、結果をクラスタ全体に反映する"""
+
+    def make_info(info_id, oshi_id, title, url, snippet):
+        return CollectedInfoModel(
+            id=info_id,
+            oshi_id=oshi_id,
+            title=title,
+            url=url,
+            snippet=snippet,
+            priority=Priority.NORMAL,
+            collected_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
+        )
+
+    infos = {
+        "official": make_info(
+            "official", "oshi1",
+            "ライブツアー2025 チケット先行受付開始",
+            "https://official.example.jp/news/1",
+            "ファンクラブ会員限定の最速先行は1月10日まで",
+        ),
+        "news": make_info(
+            "news", "oshi1",
+            "【速報】ライブツアー2025のチケット先行受付を開始 - ニュース",
+            "https://news.example.com/articles/123",
+            "ファンクラブ会員限定の最速先行は1月10日まで",
+        ),
+        "blog": make_info(
+            "blog", "oshi1",
+            "ライブツアー2025 チケット先行受付開始！",
+            "https://blog.example.net/entry/456",
+            "ファンクラブ会員限定の最速先行は1月10日まで",
+        ),
+        "song": make_info(
+            "song", "oshi1",
+            "新曲MV公開",
+            "https://official.example.jp/news/2",
+            "3rdシングルのミュージックビデオを公開しました",
+        ),
+        # 別の推しの同一テキストはクラスタにまとめない
+        "other_oshi": make_info(
+            "other_oshi", "oshi2",
+            "ライブツアー2025 チケット先行受付開始",
+            "https://other.example.jp/news/1",
+            "ファンクラブ会員限定の最速先行は1月10日まで",
+        ),
+    }
+    mock_info_repo.get_many.return_value = infos
+    mock_gemini_client.classify_priority.side_effect = [
+        Priority.URGENT,
+        Priority.IMPORTANT,
+        Priority.URGENT,
+    ]
+
+    result = await priority_agent.judge_priority(list(infos))
+
+    assert result == {
+        "official": "urgent",
+        "news": "urgent",
+        "blog": "urgent",
+        "song": "important",
+        "other_oshi": "urgent",
+    }
+    # 5件中、Gemini呼び出しはクラスタ数の3回だけ
+    assert mock_gemini_client.classify_priority.call_count == 3
+    assert mock_info_repo.update_priority.call_count == 5
+
+
+@pytest.mark.asyncio
+async def test_judge_priority_reuses_verdict_from_previous_scout(mock_gemini_client):
+    """前回のスカウトで判定済みの告知の転載は、Geminiを呼ばずに判定結果を引き継ぐ"""
+    info_repo = InfoRepository(InMemoryFirestore())
+    agent = PriorityAgent(info_repo=info_repo, gemini_client=mock_gemini_client)
+    mock_gemini_client.classify_priority.return_value = Priority.URGENT
+
+    def create(oshi_id, title, url):
+        return info_repo.create(
+            CollectedInfoCreate(
+                oshi_id=oshi_id,
+                title=title,
+                url=url,
+                snippet="ファンクラブ会員限定の最速先行は1月10日まで",
+            )
+        ).id
+
+    official = create(
+        "oshi1", "ライブツアー2025 チケット先行受付開始", "https://official.example.jp/1"
+    )
+    assert await agent.judge_priority([official]) == {official: "urgent"}
+
+    # 次のスカウトでニュースサイトの転載と、別の推しの同じ告知を収集
+    news = create(
+        "oshi1",
+        "【速報】ライブツアー2025のチケット先行受付を開始",
+        "https://news.example.com/123",
+    )
+    other = create(
+        "oshi2", "ライブツアー2025 チケット先行受付開始", "https://other.example.jp/1"
+    )
+    mock_gemini_client.classify_priority.return_value = Priority.NORMAL
+
+    result = await agent.judge_priority([news, other])
+
+    assert result == {news: "urgent", other: "normal"}
+    # 別の推しの情報だけを判定する
+    assert mock_gemini_client.classify_priority.call_count == 2
+    assert info_repo.get_by_id(news).priority is Priority.URGENT
+
+
+@pytest.mark.asyncio
+async def test_judge_priority_does_not_reuse_stale_or_different_dates(
+    mock_gemini_client,
+):
+    """年・日付が違う告知と、古い判定結果は引き継がずにGeminiで判定する"""
+    info_repo = InfoRepository(InMemoryFirestore())
+    mock_gemini_client.classify_priority.return_value = Priority.URGENT
+
+    def create(title, url):
+        return info_repo.create(
+            CollectedInfoCreate(
+                oshi_id="oshi1",
+                title=title,
+                url=url,
+                snippet="ファンクラブ会員限定の最速先行は1月10日まで",
+            )
+        ).id
+
+    agent = PriorityAgent(info_repo=info_repo, gemini_client=mock_gemini_client)
+    await agent.judge_priority(
+        [create("ライブツアー2025 チケット先行受付開始", "https://official.example.jp/1")]
+    )
+    mock_gemini_client.classify_priority.return_value = Priority.NORMAL
+
+    # 翌年のツアーの告知は文字の類似度が高くても別の告知
+    next_year = create(
+        "ライブツアー2026 チケット先行受付開始", "https://official.example.jp/2"
+    )
+    assert await agent.judge_priority([next_year]) == {next_year: "normal"}
+
+    # 引き継ぎ対象の期間を過ぎた判定結果は使わない
+    later = PriorityAgent(
+        info_repo=info_repo,
+        gemini_client=mock_gemini_client,
+        reuse_max_age_days=30,
+        clock=lambda: datetime.utcnow() + timedelta(days=31),
+    )
+    repost = create(
+        "【速報】ライブツアー2025のチケット先行受付を開始",
+        "https://news.example.com/123",
+    )
+    assert await later.judge_priority([repost]) == {repost: "normal"}
+    assert mock_gemini_client.classify_priority.call_count == 3
@@ -0,0 +1,212 @@
+"""RootAgentのテスト"""
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock
+from datetime import datetime
+
+from app.agents.event_agent import EventAgent
+from app.agents.priority_agent import PriorityAgent
+from app.agents.root_agent import RootAgent
+from app.agents.scout_agent import ScoutAgent
+from app.external.gemini_client import GeminiClient
+from app.models.network_node import NetworkNodeModel, NodeRing, NodeType
+from app.models.oshi import OshiModel
+from app.repositories.info_repository import InfoRepository
+from app.repositories.network_repository import NetworkRepository
+from app.repositories.oshi_repository import OshiRepository
+
+
+@pytest.fixture
+def mock_oshi_repo():
+    """OshiRepositoryのモック"""
+    repo = MagicMock(spec=OshiRepository)
+    repo.get_by_id.return_value = OshiModel(
+        id="oshi1",
+        user_id="user1",
+        name="テストアイドル",
+        category="アイドル",
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+    )
+    return repo
+
+
+@pytest.fixture
+def mock_network_repo():
+    """NetworkRepositoryのモック"""
+    repo = MagicMock(spec=NetworkRepository)
+    repo.create_batch.side_effect = lambda nodes: [
+        NetworkNodeModel(
+            id=f"node{i}",
+            discovered_at=datetime.utcnow(),
+            **node.model_dump(),
+        )
+        for i, node in enumerate(nodes)
+    ]
+    return repo
+
+
+@pytest.fixture
+def mock_gemini_client():
+    """GeminiClientのモック"""
+    return MagicMock(spec=GeminiClient)
+
+
+@pytest.fixture
+def root_agent(mock_oshi_repo, mock_network_repo, mock_gemini_client):
+    """RootAgentインスタンス"""
+    return RootAgent(
+        oshi_repo=mock_oshi_repo,
+        scout_agent=MagicMock(spec=ScoutAgent),
+        priority_agent=MagicMock(spec=PriorityAgent),
+        gemini_client=mock_gemini_client,
+        info_repo=MagicMock(spec=InfoRepository),
+        network_repo=mock_network_repo,
+    )
+
+
+def _existing_node(name: str) -> NetworkNodeModel:
+    return NetworkNodeModel(
+        id=f"existing-{name}",
+        oshi_id="oshi1",
+        name=name,
+        node_type=NodeType.ORGANIZATION,
+        ring=NodeRing.INNER,
+        relationship="所属事務所",
+        discovered_at=datetime.utcnow(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_discover_network_dedups_in_memory_and_batch_creates(
+    root_agent, mock_network_repo, mock_gemini_client
+):
+    """既存ノード・表記ゆれを除外し、残りを1回のバッチで保存する"""
+    mock_network_repo.get_all_by_oshi.return_value = [
+        _existing_node("スターダスト　プロモーション"),
+        _existing_node("ABC Radio"),
+    ]
+    mock_gemini_client.discover_network.return_value = [
+        # 既存ノードの表記ゆれ（半角スペース・全角英字）
+        {"name": "スターダスト プロモーション", "node_type": "org", "ring": 1},
+        {"name": "ＡＢＣ ｒａｄｉｏ", "node_type": "media", "ring": 2},
+        # 新規ノード（半角カナと全角カナの重複を含む）
+        {"name": "ﾏﾈｰｼﾞｬｰ田中", "node_type": "staff", "ring": 1},
+        {"name": "マネージャー田中", "node_type": "staff", "ring": 1},
+        {"name": "日本武道館", "node_type": "venue", "ring": 2},
+        {"name": "", "node_type": "fan", "ring": 2},
+    ]
+
+    result = await root_agent.discover_network("oshi1")
+
+    assert result.discovered_count == 2
+    assert [n["name"] for n in result.nodes] == ["ﾏﾈｰｼﾞｬｰ田中", "日本武道館"]
+
+    # 既存ノードの取得は1回、保存は1回のバッチのみ
+    mock_network_repo.get_all_by_oshi.assert_called_once_with("oshi1")
+    mock_network_repo.find_by_name.assert_not_called()
+    mock_network_repo.create.assert_not_called()
+    mock_network_repo.create_batch.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_discover_network_skips_batch_when_all_known(
+    root_agent, mock_network_repo, mock_gemini_client
+):
+    """全ノードが既存の場合はバッチ書き込みを行わない"""
+    mock_network_repo.get_all_by_oshi.return_value = [_existing_node("日本武道館")]
+    mock_gemini_client.discover_network.return_value = [
+        {"name": "日本武道館", "node_type": "venue", "ring": 2},
+    ]
+
+    result = await root_agent.discover_network("oshi1")
+
+    assert result.discovered_count == 0
+    mock_network_repo.create_batch.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_scout_and_summarize_overlaps_independent_stages(
+    root_agent, mock_network_repo, mock_gemini_client
+):
+    """直接スカウトはネットワーク発見を待たずに開始し、ステージ別時間が報告される"""
+    order = []
+
+    async def slow_discover(oshi_id):
+        order.append("discover_start")
+        await asyncio.sleep(0.05)
+        order.append("discover_end")
+        return None
+
+    async def collect_info(**kwargs):
+        order.append("direct_scout_start")
+        return ["info1"]
+
+    async def collect_from_network(**kwargs):
+        order.append("network_scout_start")
+        return ["info2"]
+
+    mock_network_repo.get_all_by_oshi.return_value = []
+    root_agent.discover_network = slow_discover
+    root_agent.scout_agent.collect_info.side_effect = collect_info
+    root_agent.scout_agent.collect_from_network.side_effect = collect_from_network
+    root_agent.priority_agent.judge_priority.return_value = {
+        "info1": "urgent",
+        "info2": "normal",
+    }
+    root_agent.info_repo.get_all_by_oshi.return_value = []
+    mock_gemini_client.generate_oshi_summary.return_value = "サマリー"
+
+    result = await root_agent.run_scout_and_summarize("oshi1")
+
+    # 直接スカウトは発見完了前に、ネットワークスカウトは発見完了後に開始
+    assert order.index("direct_scout_start") < order.index("discover_end")
+    assert order.index("network_scout_start") > order.index("discover_end")
+
+    assert result["collected_count"] == 2
+    assert result["new_info_ids"] == ["info1", "info2"]
+    assert result["priority_results"] == {"info1": "urgent", "info2": "normal"}
+    assert result["summary"] == "サマリー"
+    root_agent.priority_agent.judge_priority.assert_called_once_with(["info1", "info2"])
+
+    timings = result["stage_timings"]
+    assert set(timings["stages"]) == {
+        "discover",
+        "direct_scout",
+        "network_scout",
+        "priority",
+        "events",
+        "summary",
+    }
+    assert timings["critical_path"][0] == "discover"
+    assert timings["critical_path"][1] == "network_scout"
+
+
+@pytest.mark.asyncio
+async def test_run_scout_workflow_extracts_events_after_priority(
+    mock_oshi_repo, mock_gemini_client
+):
+    """重要度判定の結果をEvent Agentに渡し、抽出の失敗はスカウト結果に影響しない"""
+    event_agent = MagicMock(spec=EventAgent)
+    event_agent.extract_events.return_value = ["event1"]
+    root_agent = RootAgent(
+        oshi_repo=mock_oshi_repo,
+        scout_agent=MagicMock(spec=ScoutAgent),
+        priority_agent=MagicMock(spec=PriorityAgent),
+        gemini_client=mock_gemini_client,
+        info_repo=MagicMock(spec=InfoRepository),
+        event_agent=event_agent,
+    )
+    root_agent.scout_agent.collect_info.return_value = ["info1"]
+    root_agent.priority_agent.judge_priority.return_value = {"info1": "urgent"}
+
+    result = await root_agent.run_scout_workflow("oshi1")
+
+    event_agent.extract_events.assert_called_once_with("oshi1", {"info1": "urgent"})
+    assert result.new_event_ids == ["event1"]
+
+    event_agent.extract_events.side_effect = RuntimeError("gemini down")
+    result = await root_agent.run_scout_workflow("oshi1")
+    assert result.new_event_ids == []
+    assert result.collected_count == 1
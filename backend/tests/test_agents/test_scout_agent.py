@@ -181,3 +181,39 @@ async def test_collect_info_no_results(scout_agent, mock_search_client, mock_inf
     # メソッド呼び出しの確認
     assert mock_search_client.search.call_count >= 1
     mock_info_repo.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_collect_info_dedups_url_variants(
+    scout_agent, mock_search_client, mock_info_repo
+):
+    """トラッキングパラメータ・www・既知のホストのAMP版などのURL表記ゆれは1件として扱う"""
+    from datetime import datetime
+
+    mock_search_client.search.return_value = [
+        {"title": "ツアー決定", "link": "https://www.example.com/news/1/", "snippet": ""},
+        {"title": "ツアー決定", "link": "https://example.com/news/1?utm_source=x", "snippet": ""},
+        {"title": "ツアー決定", "link": "https://example.com/news/1#top", "snippet": ""},
+        {"title": "ツアー決定", "link": "https://news.yahoo.co.jp/articles/1", "snippet": ""},
+        {"title": "ツアー決定", "link": "http://news.yahoo.co.jp/amp/articles/1", "snippet": ""},
+    ]
+    mock_info_repo.find_by_url.return_value = None
+    mock_info_repo.create.return_value = CollectedInfoModel(
+        id="info1",
+        oshi_id="oshi1",
+        title="ツアー決定",
+        url="https://www.example.com/news/1/",
+        priority=Priority.NORMAL,
+        collected_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+    )
+
+    result = await scout_agent.collect_info(
+        oshi_id="oshi1",
+        oshi_name="テストアーティスト",
+    )
+
+    # example.com の3件と news.yahoo.co.jp の2件がそれぞれ1件になる
+    assert len(result) == 2
+    assert mock_info_repo.find_by_url.call_count == 2
+    assert mock_info_repo.create.call_count == 2
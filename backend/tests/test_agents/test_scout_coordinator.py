@@ -0,0 +1,253 @@
+"""ScoutCoordinatorのテスト（インメモリFirestoreを使用）"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+
+from app.agents.root_agent import RootAgent
+from app.agents.scout_coordinator import ScoutCoordinator
+from app.models.job import JobStatus
+from app.models.oshi import OshiCreate
+from app.models.workflow_results import ScoutWorkflowResult
+from app.repositories.job_repository import JobRepository
+from app.repositories.oshi_repository import OshiRepository
+from app.repositories.search_result_repository import SearchResultRepository
+from app.utils.sharding import shard_of
+from tests.fakes import InMemoryFirestore
+
+
+@pytest.fixture
+def db():
+    """インメモリFirestore（推し20件）"""
+    db = InMemoryFirestore()
+    oshi_repo = OshiRepository(db)
+    for i in range(20):
+        oshi_repo.create("user1", OshiCreate(name=f"推し{i}", category="アイドル"))
+    return db
+
+
+@pytest.fixture
+def scouted():
+    """run_scouts に渡された推しIDの記録"""
+    return []
+
+
+@pytest.fixture
+def root_agent(scouted):
+    """推しごとに新着情報1件を返す RootAgent（名前が「推し0」の推しは失敗）"""
+
+    async def run_scouts(oshis, shared_results=None):
+        await asyncio.sleep(0)
+        results = []
+        for oshi in oshis:
+            scouted.append(oshi.id)
+            if oshi.name == "推し0":
+                results.append(
+                    {"oshi_id": oshi.id, "oshi_name": oshi.name, "error": "timeout"}
+                )
+                continue
+            results.append(
+                ScoutWorkflowResult(
+                    oshi_id=oshi.id,
+                    oshi_name=oshi.name,
+                    collected_count=1,
+                    new_info_ids=[f"info-{oshi.id}"],
+                    priority_results={},
+                )
+            )
+        return {
+            "total_oshis": len(oshis),
+            "success_count": sum(1 for r in results if not isinstance(r, dict)),
+            "error_count": sum(1 for r in results if isinstance(r, dict)),
+            "search_queries": {"requested": 2 * len(oshis), "executed": len(oshis)},
+            "results": results,
+        }
+
+    agent = MagicMock(spec=RootAgent)
+    agent.run_scouts = AsyncMock(side_effect=run_scouts)
+    return agent
+
+
+@pytest.fixture
+def coordinator(db, root_agent):
+    """ScoutCoordinatorインスタンス"""
+    return ScoutCoordinator(
+        job_repo=JobRepository(db),
+        oshi_repo=OshiRepository(db),
+        root_agent=root_agent,
+        lease_seconds=60,
+    )
+
+
+@pytest.mark.asyncio
+async def test_workers_split_shards_and_aggregate_progress(
+    db, coordinator, root_agent, scouted
+):
+    """複数のワーカーがシャードを分担し、全推しを1回ずつ処理して進捗を合計する"""
+    parent = await coordinator.enqueue(4)
+
+    results = await asyncio.gather(
+        coordinator.work(parent.id), coordinator.work(parent.id)
+    )
+
+    all_oshi_ids = [oshi.id for oshi in OshiRepository(db).get_all()]
+    assert sorted(scouted) == sorted(all_oshi_ids)
+    processed = [
+        summary.shard for result in results for summary in result["processed_shards"]
+    ]
+    assert sorted(processed) == [0, 1, 2, 3]
+    # 各シャードには推しIDのハッシュで割り当てた推しだけを渡す
+    for call in root_agent.run_scouts.await_args_list:
+        (oshis,) = call.args
+        assert len({shard_of(oshi.id, 4) for oshi in oshis}) <= 1
+
+    progress = coordinator.progress(parent.id)
+    assert progress.status == JobStatus.COMPLETED.value
+    assert progress.completed_shards == 4
+    assert progress.total_oshis == 20
+    assert progress.success_count == 19
+    assert progress.error_count == 1
+    assert progress.new_info_count == 19
+    assert progress.requested_queries == 40
+    assert progress.executed_queries == 20
+    assert progress.errors[0]["error"] == "timeout"
+    assert JobRepository(db).get_by_id(parent.id).status == JobStatus.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_work_limits_shards_and_reports_partial_progress(coordinator):
+    """max_shards で1回の実行数を制限でき、途中の進捗を返す"""
+    parent = await coordinator.enqueue(3)
+
+    result = await coordinator.work(parent.id, max_shards=1)
+
+    progress = result["progress"]
+    assert len(result["processed_shards"]) == 1
+    assert progress.status == JobStatus.RUNNING.value
+    assert progress.completed_shards == 1
+    assert progress.pending_shards == 2
+    assert coordinator.latest_job_id() == parent.id
+
+
+@pytest.mark.asyncio
+async def test_failed_shard_marks_job_failed(coordinator, root_agent):
+    """シャードの実行に失敗したら、全シャードの終了時に親ジョブを失敗にする"""
+    root_agent.run_scouts.side_effect = RuntimeError("firestore unavailable")
+    parent = await coordinator.enqueue(2)
+
+    result = await coordinator.work(parent.id)
+
+    assert result["processed_shards"] == []
+    assert result["progress"].status == JobStatus.FAILED.value
+    assert result["progress"].failed_shards == 2
+    # 失敗したシャードは実行回数の上限（3回）まで再実行する
+    assert root_agent.run_scouts.await_count == 6
+    assert coordinator.latest_job_id() is None
+
+
+@pytest.mark.asyncio
+async def test_failed_shard_is_retried(db, coordinator, root_agent, scouted):
+    """一時的に失敗したシャードは未実行に戻り、再実行で完了する"""
+    run_scouts = root_agent.run_scouts.side_effect
+    failures = [RuntimeError("firestore unavailable")]
+
+    async def flaky(oshis, shared_results=None):
+        if failures:
+            raise failures.pop()
+        return await run_scouts(oshis, shared_results)
+
+    root_agent.run_scouts.side_effect = flaky
+    parent = await coordinator.enqueue(2)
+
+    result = await coordinator.work(parent.id)
+
+    assert result["progress"].status == JobStatus.COMPLETED.value
+    assert result["progress"].completed_shards == 2
+    assert len(scouted) == 20
+    shards = JobRepository(db).get_shards(parent.id)
+    assert sorted(shard.attempts for shard in shards) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_run_dispatches_workers_to_other_instances(db, root_agent, monkeypatch):
+    """worker_url に /agent/scout-all/work を送り、このリクエストもシャードを実行する"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"processed_shards": []})
+
+    async_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        httpx,
+        "AsyncClient",
+        lambda **kwargs: async_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    coordinator = ScoutCoordinator(
+        job_repo=JobRepository(db),
+        oshi_repo=OshiRepository(db),
+        root_agent=root_agent,
+        worker_url="https://worker.example.com",
+        internal_api_key="secret",
+    )
+    parent = await coordinator.enqueue(3)
+
+    result = await coordinator.run(parent.id, workers=2)
+
+    assert result["dispatched_workers"] == 2
+    assert len(result["processed_shards"]) == 3
+    assert [str(request.url) for request in requests] == [
+        f"https://worker.example.com/agent/scout-all/work?job_id={parent.id}"
+    ] * 2
+    assert requests[0].headers["X-Internal-API-Key"] == "secret"
+
+
+@pytest.mark.asyncio
+async def test_dispatch_workers_without_worker_url(coordinator):
+    """worker_url が無ければワーカーを送らない"""
+    assert await coordinator.dispatch_workers("job", 3) == 0
+
+
+@pytest.mark.asyncio
+async def test_shards_read_only_their_own_oshis(db, coordinator, scouted):
+    """推しは enqueue で1回だけ振り分け、シャードは担当の推しだけを読む"""
+    oshi_repo = coordinator.oshi_repo
+    oshi_repo.get_all = MagicMock(side_effect=AssertionError("full scan"))
+    parent = await coordinator.enqueue(4)
+    shards = JobRepository(db).get_shards(parent.id)
+    assigned = [shard.input_data["oshi_ids"] for shard in shards]
+    assert sorted(sum(assigned, [])) == sorted(oshi_repo.get_all_ids())
+    # enqueue 後に削除された推しは飛ばす
+    deleted = assigned[0][0] if assigned[0] else assigned[1][0]
+    oshi_repo.delete(deleted)
+
+    await coordinator.work(parent.id)
+
+    assert len(scouted) == 19
+    assert deleted not in scouted
+
+
+@pytest.mark.asyncio
+async def test_shards_share_search_results_of_the_same_job(db, root_agent):
+    """検索結果の共有は親ジョブ単位（同じ実行の全シャードで共有する）"""
+    coordinator = ScoutCoordinator(
+        job_repo=JobRepository(db),
+        oshi_repo=OshiRepository(db),
+        root_agent=root_agent,
+        search_result_repo=SearchResultRepository(db),
+    )
+    parent = await coordinator.enqueue(2)
+
+    await coordinator.work(parent.id)
+
+    run_ids = {
+        call.kwargs["shared_results"].run_id
+        for call in root_agent.run_scouts.await_args_list
+    }
+    assert run_ids == {parent.id}
+
+
+def test_progress_of_unknown_job(coordinator):
+    """存在しないジョブの進捗はNone"""
+    assert coordinator.progress("missing") is None
@@ -0,0 +1,199 @@
+"""ScoutRunLockのテスト（インメモリFirestoreを使用）"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.agents.priority_agent import PriorityAgent
+from app.agents.root_agent import RootAgent
+from app.agents.scout_agent import ScoutAgent
+from app.agents.scout_lock import ScoutRunFailedError, ScoutRunLock
+from app.external.gemini_client import GeminiClient
+from app.models.oshi import OshiCreate
+from app.models.workflow_results import ScoutWorkflowResult
+from app.repositories.info_repository import InfoRepository
+from app.repositories.oshi_repository import OshiRepository
+from app.repositories.scout_lock_repository import (
+    LOCK_COMPLETED,
+    LOCK_FAILED,
+    ScoutLockRepository,
+)
+from tests.fakes import InMemoryFirestore
+
+
+@pytest.fixture
+def db():
+    """インメモリFirestore"""
+    return InMemoryFirestore()
+
+
+@pytest.fixture
+def lock_repo(db, clock):
+    """ScoutLockRepositoryインスタンス"""
+    return ScoutLockRepository(db, clock=clock)
+
+
+@pytest.fixture
+def scout_lock(lock_repo):
+    """ScoutRunLockインスタンス（他のインスタンスの実行を短い間隔で確認する）"""
+    return ScoutRunLock(lock_repo, ttl_seconds=60, poll_seconds=0.01)
+
+
+def _result(oshi_id: str, info_id: str = "info1") -> ScoutWorkflowResult:
+    return ScoutWorkflowResult(
+        oshi_id=oshi_id,
+        oshi_name="推し",
+        collected_count=1,
+        new_info_ids=[info_id],
+        priority_results={info_id: "normal"},
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_running_result(scout_lock, lock_repo):
+    """同じワークフローを同時に呼ぶと、1回だけ実行して結果を共有する"""
+    calls = []
+
+    async def run():
+        calls.append("oshi1")
+        await asyncio.sleep(0.01)
+        return _result("oshi1")
+
+    results = await asyncio.gather(
+        *(
+            scout_lock.run("oshi1", "scout", run, ScoutWorkflowResult)
+            for _ in range(3)
+        )
+    )
+
+    assert calls == ["oshi1"]
+    assert results[0] is results[1] is results[2]
+    lock = lock_repo.get("oshi1")
+    assert lock["status"] == LOCK_COMPLETED
+    assert lock["result"] == _result("oshi1").model_dump()
+
+
+@pytest.mark.asyncio
+async def test_other_workflow_waits_for_running_scout(scout_lock):
+    """別のワークフローは実行中のスカウトが終わってから実行する"""
+    order = []
+
+    def make_run(name: str):
+        async def run():
+            order.append(f"{name}_start")
+            await asyncio.sleep(0.01)
+            order.append(f"{name}_end")
+            return _result("oshi1", name)
+
+        return run
+
+    await asyncio.gather(
+        scout_lock.run("oshi1", "scout", make_run("scout")),
+        scout_lock.run("oshi1", "network_scout", make_run("network")),
+    )
+
+    assert order == ["scout_start", "scout_end", "network_start", "network_end"]
+
+
+@pytest.mark.asyncio
+async def test_failure_is_shared_and_recorded(scout_lock, lock_repo):
+    """実行の失敗は相乗りした呼び出し元にも伝え、ロックに記録する"""
+    run = AsyncMock(side_effect=RuntimeError("search quota exceeded"))
+
+    results = await asyncio.gather(
+        scout_lock.run("oshi1", "scout", run),
+        scout_lock.run("oshi1", "scout", run),
+        return_exceptions=True,
+    )
+
+    assert run.await_count == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    lock = lock_repo.get("oshi1")
+    assert lock["status"] == LOCK_FAILED
+    assert lock["error"] == "search quota exceeded"
+    # 失敗の後は新しく実行できる
+    retry = AsyncMock(return_value=_result("oshi1"))
+    assert await scout_lock.run("oshi1", "scout", retry) == _result("oshi1")
+
+
+@pytest.mark.asyncio
+async def test_attaches_to_other_instance_result(scout_lock, lock_repo):
+    """他のインスタンスが実行中なら、実行せずに保存された結果を読んで返す"""
+    acquired, _ = lock_repo.acquire("oshi1", "scout", "instance-b", 60)
+    assert acquired
+    run = AsyncMock()
+
+    task = asyncio.create_task(
+        scout_lock.run("oshi1", "scout", run, ScoutWorkflowResult)
+    )
+    await asyncio.sleep(0.03)
+    assert not task.done()
+    lock_repo.release("oshi1", "instance-b", 60, _result("oshi1").model_dump())
+
+    assert await task == _result("oshi1")
+    run.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_other_instance_failure_raises(scout_lock, lock_repo):
+    """待っていた他のインスタンスの実行が失敗したら ScoutRunFailedError"""
+    lock_repo.acquire("oshi1", "scout", "instance-b", 60)
+
+    task = asyncio.create_task(scout_lock.run("oshi1", "scout", AsyncMock()))
+    await asyncio.sleep(0.03)
+    lock_repo.release("oshi1", "instance-b", 60, error="timeout")
+
+    with pytest.raises(ScoutRunFailedError, match="timeout"):
+        await task
+
+
+@pytest.mark.asyncio
+async def test_expired_lock_is_taken_over(scout_lock, lock_repo, clock):
+    """延長されずに期限が切れたロックは取り直して実行する"""
+    lock_repo.acquire("oshi1", "scout", "instance-b", 60)
+    run = AsyncMock(return_value=_result("oshi1"))
+
+    task = asyncio.create_task(scout_lock.run("oshi1", "scout", run))
+    await asyncio.sleep(0.03)
+    run.assert_not_awaited()
+    clock.advance(61)
+
+    assert await task == _result("oshi1")
+    run.assert_awaited_once()
+    # 停止したインスタンスは結果を保存できない
+    assert lock_repo.release("oshi1", "instance-b", 60, {"stale": True}) is False
+    assert lock_repo.get("oshi1")["result"] == _result("oshi1").model_dump()
+
+
+@pytest.mark.asyncio
+async def test_root_agent_collects_once_for_concurrent_scouts(db, scout_lock):
+    """ユーザー操作と scout-all が同じ推しを同時にスカウトしても収集は1回"""
+    oshi = OshiRepository(db).create(
+        "user1", OshiCreate(name="推し", category="アイドル")
+    )
+    scout_agent = MagicMock(spec=ScoutAgent)
+
+    async def collect_info(**kwargs):
+        await asyncio.sleep(0.01)
+        return ["info1"]
+
+    scout_agent.collect_info = AsyncMock(side_effect=collect_info)
+    priority_agent = MagicMock(spec=PriorityAgent)
+    priority_agent.judge_priority = AsyncMock(return_value={"info1": "urgent"})
+    root_agent = RootAgent(
+        oshi_repo=OshiRepository(db),
+        scout_agent=scout_agent,
+        priority_agent=priority_agent,
+        gemini_client=MagicMock(spec=GeminiClient),
+        info_repo=InfoRepository(db),
+        scout_lock=scout_lock,
+    )
+
+    user_result, all_result = await asyncio.gather(
+        root_agent.run_scout_workflow(oshi.id), root_agent.run_all_scouts()
+    )
+
+    scout_agent.collect_info.assert_awaited_once()
+    priority_agent.judge_priority.assert_awaited_once()
+    assert user_result.new_info_ids == ["info1"]
+    assert all_result["results"] == [user_result]
@@ -0,0 +1,266 @@
+"""scout-all の検索クエリの重複排除のテスト"""
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.agents.priority_agent import PriorityAgent
+from app.agents.root_agent import RootAgent
+from app.agents.scout_agent import ScoutAgent
+from app.agents.search_plan import (
+    SearchPlan,
+    SharedSearchResults,
+    search_plan_scope,
+)
+from app.external.gemini_client import GeminiClient
+from app.external.google_search import GoogleSearchClient
+from app.models.oshi import OshiCreate
+from app.repositories.info_repository import InfoRepository
+from app.repositories.oshi_repository import OshiRepository
+from app.repositories.search_result_repository import SearchResultRepository
+from tests.fakes import InMemoryFirestore
+
+
+@pytest.fixture
+def search_client():
+    """クエリごとに1件の結果を返す GoogleSearchClient のモック"""
+    client = MagicMock(spec=GoogleSearchClient)
+    client.search.side_effect = lambda query, num_results=10: [
+        {"title": query, "link": f"https://example.com/{query}", "snippet": ""}
+    ]
+    return client
+
+
+@pytest.fixture
+def db():
+    """インメモリFirestore"""
+    return InMemoryFirestore()
+
+
+@pytest.fixture
+def root_agent(db, search_client):
+    """実際の ScoutAgent を使う RootAgent（重要度判定はモック）"""
+    priority_agent = MagicMock(spec=PriorityAgent)
+    priority_agent.judge_priority = AsyncMock(return_value={})
+    return RootAgent(
+        oshi_repo=OshiRepository(db),
+        scout_agent=ScoutAgent(
+            oshi_repo=OshiRepository(db),
+            info_repo=InfoRepository(db),
+            search_client=search_client,
+        ),
+        priority_agent=priority_agent,
+        gemini_client=MagicMock(spec=GeminiClient),
+        info_repo=InfoRepository(db),
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_scouts_searches_each_query_once(db, root_agent, search_client):
+    """同じ名前・カテゴリの推しの検索は1回にまとめ、結果は全員に配る"""
+    oshi_repo = OshiRepository(db)
+    for user_id in ("user1", "user2", "user3"):
+        oshi_repo.create(user_id, OshiCreate(name="推しA", category="アイドル"))
+    oshi_repo.create("user4", OshiCreate(name="推しB", category="アイドル"))
+
+    result = await root_agent.run_scouts(oshi_repo.get_all())
+
+    queries = [call.args[0] for call in search_client.search.call_args_list]
+    assert sorted(queries) == sorted(set(queries))
+    assert len(queries) == 6
+    assert result["search_queries"] == {
+        "planned": 12,
+        "distinct": 6,
+        "requested": 12,
+        "executed": 6,
+        "shared": 6,
+        "released": 0,
+        "executed_ratio": 0.5,
+    }
+    # 推しごとに同じ検索結果から情報を登録する
+    assert [len(r.new_info_ids) for r in result["results"]] == [3, 3, 3, 3]
+
+
+def test_results_are_released_after_last_request(search_client):
+    """最後の要求が読んだ結果は破棄し、計画にないクエリはそのまま検索する"""
+    plan = SearchPlan()
+    plan.add("推し 最新情報", 10)
+    plan.add("推し 最新情報", 10)
+
+    first = plan.search(search_client, "推し 最新情報", 10)
+    assert plan.search(search_client, "推し 最新情報", 10) is first
+    assert plan._results == {}
+
+    plan.search(search_client, "推し 最新情報", 10)
+    plan.search(search_client, "推し 最新情報", 5)
+    assert search_client.search.call_count == 3
+    assert plan.snapshot()["executed"] == 3
+    assert plan.snapshot()["shared"] == 1
+
+
+def test_unconsumed_requests_are_released_when_oshi_finishes(search_client):
+    """検索まで進まなかった推しの要求は取り消し、共有中の結果を残さない"""
+    plan = SearchPlan()
+    for owner in ("oshi1", "oshi2", "oshi3"):
+        plan.add("推し 最新情報", 10, owner=owner)
+
+    with search_plan_scope(plan, "oshi1"):
+        plan.search(search_client, "推し 最新情報", 10)
+    assert plan._results != {}
+    # oshi2 は推しが見つからない・別の実行に合流したなどで検索しない
+    with pytest.raises(ValueError):
+        with search_plan_scope(plan, "oshi2"):
+            raise ValueError("Oshi not found")
+    with search_plan_scope(plan, "oshi3"):
+        plan.search(search_client, "推し 最新情報", 10)
+
+    assert plan._results == {}
+    assert plan._remaining == {}
+    assert plan.snapshot() == {
+        "planned": 3,
+        "distinct": 1,
+        "requested": 2,
+        "executed": 1,
+        "shared": 1,
+        "released": 1,
+        "executed_ratio": 0.5,
+    }
+
+
+@pytest.mark.asyncio
+async def test_run_scouts_releases_requests_of_failed_oshis(
+    db, root_agent, search_client
+):
+    """推しの処理が検索前に失敗しても、その推しの要求は実行数に数えない"""
+    oshi_repo = OshiRepository(db)
+    oshis = [
+        oshi_repo.create(user_id, OshiCreate(name="推しA", category="アイドル"))
+        for user_id in ("user1", "user2")
+    ]
+    root_agent.scout_agent.collect_info = AsyncMock(
+        side_effect=[RuntimeError("quota"), ["info1"]]
+    )
+
+    result = await root_agent.run_scouts(oshis)
+
+    assert result["error_count"] == 1
+    assert result["search_queries"]["requested"] == 0
+    assert result["search_queries"]["released"] == 6
+
+
+def test_failed_search_is_not_shared(search_client):
+    """失敗した検索は共有せず、次の要求で再度検索する"""
+    plan = SearchPlan()
+    plan.add("推し 最新情報", 10)
+    plan.add("推し 最新情報", 10)
+    search_client.search.side_effect = [RuntimeError("quota"), []]
+
+    with pytest.raises(RuntimeError):
+        plan.search(search_client, "推し 最新情報", 10)
+
+    assert plan.search(search_client, "推し 最新情報", 10) == []
+    assert search_client.search.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_shards_share_search_results_through_firestore(
+    db, root_agent, search_client
+):
+    """別のシャードに入った同じ名前の推しは、先に検索したシャードの結果を使う"""
+    oshi_repo = OshiRepository(db)
+    first = oshi_repo.create("user1", OshiCreate(name="推しA", category="アイドル"))
+    second = oshi_repo.create("user2", OshiCreate(name="推しA", category="アイドル"))
+    search_results = SearchResultRepository(db)
+
+    results = [
+        await root_agent.run_scouts(
+            [oshi], shared_results=SharedSearchResults(search_results, "job1")
+        )
+        for oshi in (first, second)
+    ]
+
+    assert search_client.search.call_count == 3
+    assert results[0]["search_queries"]["executed"] == 3
+    assert results[1]["search_queries"]["executed"] == 0
+    assert results[1]["search_queries"]["shared"] == 3
+
+
+def test_failed_shared_search_is_retried_by_next_shard(db, search_client):
+    """検索に失敗したシャードはリースを手放し、次のシャードが検索し直す"""
+    shared = SharedSearchResults(SearchResultRepository(db), "job1", poll_seconds=0)
+    search_client.search.side_effect = [RuntimeError("quota"), []]
+
+    with pytest.raises(RuntimeError):
+        shared.search(search_client, "推し 最新情報", 10)
+
+    assert shared.search(search_client, "推し 最新情報", 10) == ([], False)
+    assert shared.search(search_client, "推し 最新情報", 10) == ([], True)
+
+
+def test_waiting_shard_backs_off_and_searches_after_timeout(
+    db, search_client, monotonic_clock
+):
+    """他のシャードの検索を待つ間は読み取りだけで間隔を延ばし、上限を超えたら自分で検索する"""
+    repo = SearchResultRepository(db)
+    repo.claim("job1", "推し 最新情報", 10, "shard-a", 3600)
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        monotonic_clock.advance(seconds)
+
+    shared = SharedSearchResults(
+        MagicMock(wraps=repo),
+        "job1",
+        poll_seconds=0.1,
+        max_poll_seconds=0.4,
+        wait_seconds=1.0,
+        clock=monotonic_clock,
+        sleep=sleep,
+    )
+
+    results, was_shared = shared.search(search_client, "推し 最新情報", 10)
+
+    assert was_shared is False
+    assert results[0]["title"] == "推し 最新情報"
+    assert sleeps == pytest.approx([0.1, 0.2, 0.4, 0.3])
+    shared.repo.claim.assert_called_once()
+    assert shared.repo.get.call_count == 4
+    # リースを持つシャードの検索中の状態は上書きしない
+    assert repo.get("job1", "推し 最新情報", 10)["owner"] == "shard-a"
+
+
+def test_waiting_shard_uses_result_saved_while_waiting(
+    db, search_client, monotonic_clock
+):
+    """待っている間に他のシャードが保存した結果を使う"""
+    repo = SearchResultRepository(db)
+    repo.claim("job1", "推し 最新情報", 10, "shard-a", 3600)
+
+    def sleep(seconds):
+        repo.complete("job1", "推し 最新情報", 10, "shard-a", [{"link": "x"}], 3600)
+
+    shared = SharedSearchResults(
+        repo, "job1", poll_seconds=0.1, clock=monotonic_clock, sleep=sleep
+    )
+
+    assert shared.search(search_client, "推し 最新情報", 10) == ([{"link": "x"}], True)
+    search_client.search.assert_not_called()
+
+
+def test_lease_is_renewed_while_searching(db, search_client):
+    """検索がリースより長くかかっても、検索中はリースを延長して他のシャードに渡さない"""
+    repo = SearchResultRepository(db)
+    shared = SharedSearchResults(repo, "job1", lease_seconds=0.15)
+    other_claims = []
+
+    def slow_search(query, num_results=10):
+        for _ in range(3):
+            time.sleep(0.1)
+            other_claims.append(repo.claim("job1", query, 10, "shard-b", 60)[0])
+        return []
+
+    search_client.search.side_effect = slow_search
+
+    assert shared.search(search_client, "推し 最新情報", 10) == ([], False)
+    assert other_claims == [False, False, False]
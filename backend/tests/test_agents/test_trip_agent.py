@@ -12,9 +12,12 @@ from app.models.trip_plan import (
 )
 from app.models.event import EventModel
 from app.repositories.event_repository import EventRepository
+from app.repositories.trip_advice_cache_repository import TripAdviceCacheRepository
 from app.repositories.trip_repository import TripRepository
 from app.external.google_maps import GoogleMapsClient
 from app.external.gemini_client import GeminiClient
+from app.utils.cache_stats import reset_cache_stats
+from tests.fakes import InMemoryFirestore
 
 
 @pytest.fixture
@@ -295,3 +298,156 @@ def test_estimate_transport_cost(trip_agent):
 
     # 小数点も対応
     assert trip_agent._estimate_transport_cost(5.5) == 110
+
+
+def _event(event_id: str, location: str) -> EventModel:
+    return EventModel(
+        id=event_id,
+        oshi_id="oshi1",
+        title=f"ライブ {event_id}",
+        start_datetime=datetime(2025, 3, 1, 18, 0),
+        location=location,
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_generate_plans_batches_reads_calls_and_writes(
+    trip_agent, mock_event_repo, mock_trip_repo, mock_maps_client, mock_gemini_client
+):
+    """イベント取得・プラン保存は1回ずつ、同じ組み合わせのAPI呼び出しは1回にまとめる"""
+    mock_event_repo.get_many.return_value = {
+        "event1": _event("event1", "日本武道館"),
+        "event2": _event("event2", "大阪城ホール"),
+    }
+    mock_maps_client.get_distance_matrix.side_effect = lambda origins, destinations: {
+        (origin, destination): {
+            "distance_meters": 500000 if destination == "大阪城ホール" else 20000,
+            "distance_text": "",
+            "duration_seconds": 3600,
+            "duration_text": "",
+        }
+        for origin in origins
+        for destination in destinations
+    }
+    mock_gemini_client.generate_trip_advice.return_value = "早めに出発しましょう"
+    mock_trip_repo.create_batch.side_effect = lambda user_id, plans: [
+        TripPlanModel(
+            id=f"plan{i}",
+            user_id=user_id,
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
+            **plan.model_dump(),
+        )
+        for i, plan in enumerate(plans)
+    ]
+
+    results = await trip_agent.generate_plans(
+        "user1",
+        [
+            ("event1", "東京"),
+            ("event2", "東京"),
+            ("missing", "東京"),
+            ("event1", "東京"),
+        ],
+    )
+
+    assert [r.plan_id for r in results] == ["plan0", "plan1", None, "plan2"]
+    assert results[2].error == "Event not found: missing"
+    # 大阪（500km）は宿泊費込み、武道館（20km）は交通費のみ
+    assert results[0].total_estimated_cost == 400
+    assert results[1].total_estimated_cost == 10000 + 8000
+
+    mock_event_repo.get_many.assert_called_once()
+    mock_event_repo.get_by_id.assert_not_called()
+    mock_trip_repo.create_batch.assert_called_once()
+    mock_trip_repo.create.assert_not_called()
+    # 距離はペアごとではなく1回の距離行列で求め、重複した (event1, 東京) のアドバイスは再生成しない
+    mock_maps_client.get_distance_matrix.assert_called_once_with(
+        ["東京"], ["日本武道館", "大阪城ホール"]
+    )
+    mock_maps_client.get_directions.assert_not_called()
+    assert mock_gemini_client.generate_trip_advice.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_plans_tolerates_external_failures(
+    trip_agent, mock_event_repo, mock_trip_repo, mock_maps_client, mock_gemini_client
+):
+    """ルート計算・アドバイス生成の失敗はプラン単位で既定値にして継続する"""
+    mock_event_repo.get_many.return_value = {"event1": _event("event1", "日本武道館")}
+    mock_maps_client.get_distance_matrix.side_effect = RuntimeError("maps down")
+    mock_gemini_client.generate_trip_advice.side_effect = RuntimeError("gemini down")
+    mock_trip_repo.create_batch.return_value = [
+        MagicMock(id="plan0", total_estimated_cost=0)
+    ]
+
+    results = await trip_agent.generate_plans("user1", [("event1", "東京")])
+
+    assert results[0].plan_id == "plan0"
+    plan = mock_trip_repo.create_batch.call_args.args[1][0]
+    assert plan.transport.route_description == "ルート情報を取得できませんでした"
+    assert plan.advice is None
+
+
+@pytest.mark.asyncio
+async def test_generate_plans_queries_sparse_pairs_per_departure(
+    trip_agent, mock_event_repo, mock_trip_repo, mock_maps_client, mock_gemini_client
+):
+    """出発地 × 会場 の組み合わせが疎な場合は出発地ごとに必要な会場だけを問い合わせる"""
+    venues = [f"会場{i}" for i in range(12)]
+    departures = [f"出発地{i}" for i in range(12)]
+    mock_event_repo.get_many.return_value = {
+        f"event{i}": _event(f"event{i}", venue) for i, venue in enumerate(venues)
+    }
+    mock_maps_client.get_distance_matrix.return_value = {}
+    mock_gemini_client.generate_trip_advice.return_value = "アドバイス"
+    mock_trip_repo.create_batch.side_effect = lambda user_id, plans: [
+        MagicMock(id=f"plan{i}", total_estimated_cost=0) for i in range(len(plans))
+    ]
+
+    await trip_agent.generate_plans(
+        "user1", [(f"event{i}", departures[i]) for i in range(12)]
+    )
+
+    calls = mock_maps_client.get_distance_matrix.call_args_list
+    assert len(calls) == 12
+    assert all(len(c.args[0]) == 1 and len(c.args[1]) == 1 for c in calls)
+
+
+@pytest.mark.asyncio
+async def test_generate_plans_reuses_cached_advice_by_region(
+    mock_event_repo, mock_trip_repo, mock_maps_client, mock_gemini_client
+):
+    """同じ会場・開催日・地域のアドバイスはキャッシュから再利用する"""
+    reset_cache_stats()
+    advice_cache = TripAdviceCacheRepository(InMemoryFirestore())
+    trip_agent = TripAgent(
+        event_repo=mock_event_repo,
+        trip_repo=mock_trip_repo,
+        maps_client=mock_maps_client,
+        gemini_client=mock_gemini_client,
+        advice_cache=advice_cache,
+    )
+    mock_event_repo.get_many.return_value = {"event1": _event("event1", "日本武道館")}
+    mock_maps_client.get_distance_matrix.return_value = {}
+    mock_gemini_client.generate_trip_advice.return_value = "早めに出発しましょう"
+    mock_trip_repo.create_batch.side_effect = lambda user_id, plans: [
+        MagicMock(id=f"plan{i}", total_estimated_cost=0) for i in range(len(plans))
+    ]
+
+    # 大阪府内の2か所は1回だけ生成し、地域単位の汎用的なアドバイスにする
+    await trip_agent.generate_plans(
+        "user1", [("event1", "大阪府堺市"), ("event1", "梅田駅")]
+    )
+    mock_gemini_client.generate_trip_advice.assert_called_once_with(
+        departure="大阪府", destination="日本武道館", event_date="2025-03-01"
+    )
+
+    # 別ユーザーの同じ地域からのリクエストはキャッシュにヒットする
+    await trip_agent.generate_plans("user2", [("event1", "難波")])
+    assert mock_gemini_client.generate_trip_advice.call_count == 1
+    plan = mock_trip_repo.create_batch.call_args.args[1][0]
+    assert plan.advice == "早めに出発しましょう"
+    assert advice_cache.stats.snapshot()["hits"] == 1
@@ -0,0 +1 @@
+"""外部APIクライアントテストパッケージ"""
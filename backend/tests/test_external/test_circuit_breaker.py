@@ -0,0 +1,189 @@
+"""CircuitBreakerのテスト"""
+import random
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from tenacity import wait_none
+
+from app.external import circuit_breaker
+from app.external.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    get_circuit_breaker,
+)
+from app.external.gemini_client import GeminiClient
+from app.main import app
+
+
+class HttpStatusError(Exception):
+    """ステータスコード付きの例外（httpx.HTTPStatusError 相当）"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"status {status_code}")
+        self.response = MagicMock(status_code=status_code)
+
+
+@pytest.fixture
+def breaker(monotonic_clock):
+    """ジッターなしのサーキットブレーカー"""
+    return CircuitBreaker(
+        name="fake",
+        failure_threshold=3,
+        recovery_timeout=10.0,
+        max_recovery_timeout=40.0,
+        jitter=0.0,
+        clock=monotonic_clock,
+    )
+
+
+@pytest.fixture(autouse=True)
+def reset_registry():
+    """テストごとにプロセス共有のサーキットブレーカーを破棄"""
+    circuit_breaker.reset_circuit_breakers()
+    yield
+    circuit_breaker.reset_circuit_breakers()
+
+
+def _fail(breaker: CircuitBreaker, exc: Exception = None):
+    def outage():
+        raise exc or ConnectionError("down")
+
+    with pytest.raises(type(exc) if exc else ConnectionError):
+        breaker.call(outage)
+
+
+def test_opens_after_consecutive_failures_and_fails_fast(breaker):
+    """連続失敗が閾値に達するとオープンし、依存先を呼ばずに即座に失敗する"""
+    for _ in range(3):
+        _fail(breaker)
+    assert breaker.state == CircuitState.OPEN
+
+    dependency = MagicMock()
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.call(dependency)
+    dependency.assert_not_called()
+    assert exc_info.value.retry_after == pytest.approx(10.0)
+
+
+def test_success_resets_failure_count(breaker):
+    """途中で成功すれば連続失敗数はリセットされる"""
+    _fail(breaker)
+    _fail(breaker)
+    breaker.call(lambda: "ok")
+    _fail(breaker)
+    _fail(breaker)
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_half_open_probe_closes_on_success(breaker, monotonic_clock):
+    """オープン期間後はプローブを1件だけ通し、成功すればクローズする"""
+    for _ in range(3):
+        _fail(breaker)
+
+    monotonic_clock.now += 10.0
+    assert breaker.state == CircuitState.HALF_OPEN
+
+    breaker.before_call()  # プローブ中
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "second caller")
+    breaker.record_success()
+
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.call(lambda: "ok") == "ok"
+
+
+def test_half_open_failure_doubles_open_duration(breaker, monotonic_clock):
+    """プローブが失敗するとオープン期間が倍になり、上限で頭打ちになる"""
+    for _ in range(3):
+        _fail(breaker)
+
+    durations = []
+    for _ in range(4):
+        opened_at = monotonic_clock.now
+        monotonic_clock.now = breaker._open_until
+        durations.append(monotonic_clock.now - opened_at)
+        _fail(breaker)  # ハーフオープンのプローブが失敗
+        assert breaker.state == CircuitState.OPEN
+
+    assert durations == [10.0, 20.0, 40.0, 40.0]
+
+
+def test_open_duration_is_jittered(monotonic_clock):
+    """オープン期間にジッターが加わり、同時に復帰を試みる呼び出しが分散する"""
+    durations = set()
+    for seed in range(5):
+        breaker = CircuitBreaker(
+            name="fake",
+            failure_threshold=1,
+            recovery_timeout=10.0,
+            jitter=0.2,
+            clock=monotonic_clock,
+            rng=random.Random(seed),
+        )
+        _fail(breaker)
+        durations.add(breaker._open_until - monotonic_clock.now)
+
+    assert len(durations) == 5
+    assert all(8.0 <= d <= 12.0 for d in durations)
+
+
+def test_client_errors_do_not_trip_circuit(breaker):
+    """4xx（429 を除く）は依存先の障害として数えない"""
+    for _ in range(5):
+        _fail(breaker, HttpStatusError(400))
+    assert breaker.state == CircuitState.CLOSED
+
+    for _ in range(3):
+        _fail(breaker, HttpStatusError(429))
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_gemini_outage_fails_fast_without_retry_sleeps(monkeypatch):
+    """Gemini 障害時、オープン後の呼び出しは API もリトライも行わず即座に失敗する"""
+    monkeypatch.setattr(
+        circuit_breaker.settings, "circuit_breaker_failure_threshold", 3
+    )
+    monkeypatch.setattr(GeminiClient.generate.retry, "wait", wait_none())
+
+    client = GeminiClient.__new__(GeminiClient)
+    client.model = MagicMock()
+    client.model.generate_content.side_effect = ConnectionError("gemini down")
+
+    # 1回目: 3回リトライして失敗し、サーキットがオープンする
+    with pytest.raises(ConnectionError):
+        client.generate("prompt")
+    assert client.model.generate_content.call_count == 3
+    assert get_circuit_breaker("gemini").state == CircuitState.OPEN
+
+    # 2回目: API を呼ばず、リトライもせずに遮断される
+    with pytest.raises(CircuitOpenError):
+        client.generate("prompt")
+    assert client.model.generate_content.call_count == 3
+
+
+def test_health_dependencies_reports_circuit_states(monkeypatch):
+    """/health/dependencies でサーキット状態を確認でき、/health は変わらない"""
+    client = TestClient(app)
+
+    response = client.get("/health/dependencies")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "healthy"
+    assert set(data["dependencies"]) == {
+        "gemini",
+        "google_search",
+        "google_maps",
+        "google_calendar",
+    }
+
+    maps = get_circuit_breaker("google_maps")
+    for _ in range(maps.failure_threshold):
+        _fail(maps)
+
+    data = client.get("/health/dependencies").json()
+    assert data["status"] == "degraded"
+    assert data["dependencies"]["google_maps"]["state"] == "open"
+    assert data["dependencies"]["google_maps"]["retry_after_seconds"] > 0
+    assert client.get("/health").json() == {"status": "healthy"}
@@ -0,0 +1,106 @@
+"""GoogleCalendarClientのテスト"""
+from datetime import datetime
+from unittest.mock import patch
+
+from googleapiclient.discovery_cache import get_static_doc
+
+from app.external.circuit_breaker import reset_circuit_breakers
+from app.external.google_calendar import (
+    CALENDAR_BATCH_LIMIT,
+    GoogleCalendarClient,
+    calendar_discovery_document,
+)
+
+
+class FakeBatch:
+    """バッチHTTPリクエストの代わりに追加された呼び出しへ応答する"""
+
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.executed.append(len(self.requests))
+        if self.service.fail_batch == len(self.service.executed):
+            raise ConnectionError("calendar down")
+        for request_id, body in self.requests:
+            if body["summary"] == "invalid":
+                self.callback(request_id, None, ValueError("invalid event"))
+            else:
+                self.callback(request_id, {"id": f"cal-{request_id}"}, None)
+
+
+class FakeCalendarService:
+    """Calendar APIサービスの代わり（insert はリクエストボディをそのまま返す）"""
+
+    def __init__(self, fail_batch=None):
+        self.executed = []
+        self.fail_batch = fail_batch
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+    def events(self):
+        return self
+
+    def insert(self, calendarId, body):
+        return body
+
+
+def _client(service) -> GoogleCalendarClient:
+    client = GoogleCalendarClient("token")
+    client.service = service
+    return client
+
+
+def test_client_reuses_static_discovery_document():
+    """トークンごとのクライアント生成でディスカバリードキュメントを再取得しない"""
+    calendar_discovery_document.cache_clear()
+    with patch(
+        "googleapiclient.discovery_cache.get_static_doc", wraps=get_static_doc
+    ) as load_document:
+        first = GoogleCalendarClient("token-a")
+        second = GoogleCalendarClient("token-b")
+
+    load_document.assert_called_once_with("calendar", "v3")
+    assert first.credentials.token == "token-a"
+    assert second.credentials.token == "token-b"
+    assert hasattr(first.service.events(), "insert")
+
+
+def test_create_events_splits_into_batches_and_keeps_order():
+    """CALENDAR_BATCH_LIMIT 件ごとのバッチに分け、結果は入力順に返す"""
+    reset_circuit_breakers()
+    service = FakeCalendarService()
+    bodies = [
+        GoogleCalendarClient.build_event_body(
+            "invalid" if i == 3 else f"ライブ{i}", datetime(2025, 3, 1, 18, 0)
+        )
+        for i in range(CALENDAR_BATCH_LIMIT + 5)
+    ]
+
+    results = _client(service).create_events(bodies)
+
+    assert service.executed == [CALENDAR_BATCH_LIMIT, 5]
+    assert results[0] == ("cal-0", None)
+    assert results[3] == (None, "invalid event")
+    assert results[-1] == (f"cal-{CALENDAR_BATCH_LIMIT + 4}", None)
+
+
+def test_create_events_isolates_failed_batch():
+    """1つのバッチが失敗しても他のバッチの結果は返す"""
+    reset_circuit_breakers()
+    service = FakeCalendarService(fail_batch=1)
+    bodies = [
+        GoogleCalendarClient.build_event_body(f"ライブ{i}", datetime(2025, 3, 1))
+        for i in range(CALENDAR_BATCH_LIMIT + 1)
+    ]
+
+    results = _client(service).create_events(bodies)
+
+    assert all(error == "calendar down" for _, error in results[:CALENDAR_BATCH_LIMIT])
+    assert results[-1] == (f"cal-{CALENDAR_BATCH_LIMIT}", None)
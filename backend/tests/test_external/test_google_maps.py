@@ -0,0 +1,104 @@
+"""GoogleMapsClientの距離行列のテスト"""
+import pytest
+
+from app.external.google_maps import (
+    MATRIX_MAX_DESTINATIONS,
+    MATRIX_MAX_ELEMENTS,
+    MATRIX_MAX_ORIGINS,
+    GoogleMapsClient,
+    plan_matrix_chunks,
+)
+
+
+class FakeMatrixMapsClient(GoogleMapsClient):
+    """Distance Matrix API の代わりに呼び出しを記録して応答を返す"""
+
+    def __init__(self, unreachable=frozenset(), failing_origin=None):
+        self.api_key = "test"
+        self.requests = []
+        self.unreachable = unreachable
+        self.failing_origin = failing_origin
+
+    def _fetch_distance_matrix(self, origins, destinations, mode):
+        self.requests.append((origins, destinations))
+        if self.failing_origin in origins:
+            raise ConnectionError("maps down")
+        rows = []
+        for origin in origins:
+            elements = []
+            for destination in destinations:
+                if (origin, destination) in self.unreachable:
+                    elements.append({"status": "ZERO_RESULTS"})
+                    continue
+                meters = 1000 * (len(origin) + len(destination))
+                elements.append(
+                    {
+                        "status": "OK",
+                        "distance": {"value": meters, "text": f"{meters // 1000} km"},
+                        "duration": {"value": meters // 20, "text": "-"},
+                    }
+                )
+            rows.append({"elements": elements})
+        return {"status": "OK", "rows": rows}
+
+
+@pytest.mark.parametrize(
+    "n_origins, n_destinations, expected_requests",
+    [(1, 1, 1), (30, 1, 2), (1, 60, 3), (10, 10, 1), (10, 30, 3), (50, 50, 25)],
+)
+def test_plan_matrix_chunks_respects_limits(
+    n_origins, n_destinations, expected_requests
+):
+    """分割は API 上限を守り、全組み合わせをちょうど1回ずつ含む"""
+    origins = [f"o{i}" for i in range(n_origins)]
+    destinations = [f"d{i}" for i in range(n_destinations)]
+
+    chunks = plan_matrix_chunks(origins, destinations)
+
+    assert len(chunks) == expected_requests
+    pairs = []
+    for chunk_origins, chunk_destinations in chunks:
+        assert len(chunk_origins) <= MATRIX_MAX_ORIGINS
+        assert len(chunk_destinations) <= MATRIX_MAX_DESTINATIONS
+        assert len(chunk_origins) * len(chunk_destinations) <= MATRIX_MAX_ELEMENTS
+        pairs.extend((o, d) for o in chunk_origins for d in chunk_destinations)
+    assert sorted(pairs) == sorted((o, d) for o in origins for d in destinations)
+
+
+def test_get_distance_matrix_resolves_pairs_in_few_requests():
+    """30人の出発地から1会場への距離を2リクエストで求め、経路なしは None"""
+    origins = [f"出発地{i}" for i in range(30)]
+    client = FakeMatrixMapsClient(unreachable={("出発地3", "日本武道館")})
+
+    results = client.get_distance_matrix(origins + origins[:5], ["日本武道館"])
+
+    assert len(client.requests) == 2
+    assert len(results) == 30
+    assert results[("出発地3", "日本武道館")] is None
+    assert results[("出発地0", "日本武道館")]["distance_meters"] == 1000 * (4 + 5)
+
+
+def test_get_distance_matrix_isolates_failed_chunks():
+    """失敗したリクエストの組み合わせだけが None になる"""
+    origins = [f"o{i}" for i in range(30)]
+    client = FakeMatrixMapsClient(failing_origin="o27")
+
+    results = client.get_distance_matrix(origins, ["venue"])
+
+    assert all(results[(f"o{i}", "venue")] for i in range(25))
+    assert all(results[(f"o{i}", "venue")] is None for i in range(25, 30))
+
+
+def test_maps_http_client_is_shared_until_closed():
+    """HTTPクライアントはプロセス内で共有し、閉じた後は作り直す"""
+    from app.external.google_maps import close_maps_http_client, get_maps_http_client
+
+    first = get_maps_http_client()
+    assert get_maps_http_client() is first
+    assert str(first.base_url).startswith("https://maps.googleapis.com")
+
+    close_maps_http_client()
+    assert first.is_closed
+    second = get_maps_http_client()
+    assert second is not first
+    close_maps_http_client()
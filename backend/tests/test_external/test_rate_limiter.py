@@ -0,0 +1,204 @@
+"""QuotaRateLimiterのテスト"""
+import asyncio
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.external.google_search import GoogleSearchClient
+from app.external.rate_limiter import (
+    QuotaExceededError,
+    QuotaRateLimiter,
+    RequestPriority,
+    current_request_priority,
+    request_priority,
+)
+from app.repositories.api_quota_repository import ApiQuotaRepository
+from tests.clock import FakeClock, FakeMonotonicClock
+from tests.fakes import InMemoryFirestore
+
+
+def _limiter(
+    clock: FakeMonotonicClock, calendar: Optional[FakeClock] = None, **kwargs
+) -> QuotaRateLimiter:
+    """QuotaRateLimiter（日次クォータの日付は calendar の日付、無ければ固定）"""
+    calendar = calendar or FakeClock(datetime(2025, 1, 1))
+    params = {"rate_per_second": 1.0, "burst": 2, "daily_quota": 100}
+    params.update(kwargs)
+    return QuotaRateLimiter(
+        name="test", clock=clock, today=lambda: calendar.now.date(), **params
+    )
+
+
+def test_burst_then_refill(monotonic_clock):
+    """バースト分は即座に取得でき、以降は経過時間に応じて補充される"""
+    limiter = _limiter(monotonic_clock)
+    limiter.acquire()
+    limiter.acquire()
+
+    with pytest.raises(TimeoutError):
+        limiter.acquire(timeout=0)
+
+    monotonic_clock.now += 1.0
+    limiter.acquire(timeout=0)
+    assert limiter.daily_used == 3
+
+
+def test_daily_quota_raises_and_resets_next_day(monotonic_clock):
+    """日次クォータを超えると QuotaExceededError、日付が変わるとリセットされる"""
+    calendar = FakeClock(datetime(2025, 1, 1, 23, 0))
+    limiter = _limiter(monotonic_clock, calendar, burst=10, daily_quota=2)
+    limiter.acquire()
+    limiter.acquire()
+
+    with pytest.raises(QuotaExceededError):
+        limiter.acquire()
+
+    calendar.advance(60 * 60)
+    limiter.acquire()
+    assert limiter.daily_used == 1
+
+
+def test_urgent_reserve_is_kept_for_urgent_callers(monotonic_clock):
+    """予約枠は URGENT 以外からは使えない"""
+    limiter = _limiter(monotonic_clock, burst=10, daily_quota=3, urgent_reserve=1)
+    limiter.acquire(RequestPriority.BATCH)
+    limiter.acquire(RequestPriority.INTERACTIVE)
+
+    with pytest.raises(QuotaExceededError):
+        limiter.acquire(RequestPriority.BATCH)
+
+    limiter.acquire(RequestPriority.URGENT)
+    with pytest.raises(QuotaExceededError):
+        limiter.acquire(RequestPriority.URGENT)
+
+
+def test_urgent_waiter_jumps_ahead_of_batch_queue():
+    """トークン待ちのキューでは URGENT がバッチを追い越し、同一優先度内は到着順"""
+    limiter = QuotaRateLimiter(name="test", rate_per_second=20, burst=1, daily_quota=100)
+    limiter.acquire()  # バケットを空にする
+
+    order = []
+    lock = threading.Lock()
+
+    def worker(label: str, priority: RequestPriority):
+        limiter.acquire(priority)
+        with lock:
+            order.append(label)
+
+    threads = []
+    for label in ("batch1", "batch2", "batch3"):
+        threads.append(threading.Thread(target=worker, args=(label, RequestPriority.BATCH)))
+        threads[-1].start()
+        time.sleep(0.005)
+    urgent = threading.Thread(target=worker, args=("urgent", RequestPriority.URGENT))
+    urgent.start()
+    threads.append(urgent)
+
+    for thread in threads:
+        thread.join(timeout=5)
+
+    # batch1 は先に並んでいたため先頭で待機中の可能性がある
+    assert order.index("urgent") <= 1
+    batches = [label for label in order if label.startswith("batch")]
+    assert batches == ["batch1", "batch2", "batch3"]
+
+
+def test_timed_out_waiter_leaves_queue(monotonic_clock):
+    """タイムアウトした呼び出しはキューから外れ、後続をブロックしない"""
+    limiter = _limiter(monotonic_clock, burst=1)
+    limiter.acquire()
+
+    with pytest.raises(TimeoutError):
+        limiter.acquire(RequestPriority.URGENT, timeout=0)
+
+    monotonic_clock.now += 1.0
+    limiter.acquire(RequestPriority.BATCH, timeout=0)
+
+
+def test_shared_quota_caps_total_across_instances(monotonic_clock):
+    """日次クォータは全インスタンスの合計で数え、日付が変わると新しく数える"""
+    calendar = FakeClock(datetime(2025, 1, 1, 23, 0))
+    store = ApiQuotaRepository(InMemoryFirestore())
+    limiters = [
+        _limiter(
+            monotonic_clock,
+            calendar,
+            burst=10,
+            daily_quota=5,
+            quota_store=store,
+            reserve_block=2,
+        )
+        for _ in range(2)
+    ]
+    for _ in range(2):
+        limiters[0].acquire()
+    for _ in range(3):
+        limiters[1].acquire()
+
+    for limiter in limiters:
+        with pytest.raises(QuotaExceededError):
+            limiter.acquire()
+    assert store.used("test", datetime(2025, 1, 1).date()) == 5
+
+    calendar.advance(60 * 60)
+    limiters[0].acquire()
+    assert limiters[0].daily_used == 1
+    assert store.used("test", datetime(2025, 1, 2).date()) == 2
+
+
+def test_shared_quota_keeps_urgent_reserve_across_instances(monotonic_clock):
+    """共有クォータの予約枠は、どのインスタンスでも URGENT だけが1件ずつ使える"""
+    store = ApiQuotaRepository(InMemoryFirestore())
+    batch, urgent = (
+        _limiter(
+            monotonic_clock,
+            burst=10,
+            daily_quota=6,
+            urgent_reserve=2,
+            quota_store=store,
+            reserve_block=3,
+        )
+        for _ in range(2)
+    )
+    for _ in range(3):
+        batch.acquire(RequestPriority.BATCH)
+    urgent.acquire(RequestPriority.INTERACTIVE)
+
+    with pytest.raises(QuotaExceededError):
+        batch.acquire(RequestPriority.BATCH)
+    urgent.acquire(RequestPriority.URGENT)
+    batch.acquire(RequestPriority.URGENT)
+    with pytest.raises(QuotaExceededError):
+        urgent.acquire(RequestPriority.URGENT)
+    assert store.used("test", datetime(2025, 1, 1).date()) == 6
+
+
+@pytest.mark.asyncio
+async def test_priority_propagates_to_worker_threads():
+    """コンテキストの優先度が asyncio.to_thread のスレッドに引き継がれる"""
+    with request_priority(RequestPriority.URGENT):
+        seen = await asyncio.to_thread(current_request_priority)
+
+    assert seen == RequestPriority.URGENT
+    assert current_request_priority() == RequestPriority.INTERACTIVE
+
+
+def test_search_does_not_retry_quota_exceeded():
+    """クォータ切れはリトライせず、API も呼ばない"""
+    limiter = MagicMock(spec=QuotaRateLimiter)
+    limiter.acquire.side_effect = QuotaExceededError("exhausted")
+
+    client = GoogleSearchClient.__new__(GoogleSearchClient)
+    client.cx = "cx"
+    client.service = MagicMock()
+    client.rate_limiter = limiter
+
+    with pytest.raises(QuotaExceededError):
+        client.search("テスト")
+
+    limiter.acquire.assert_called_once()
+    client.service.cse.assert_not_called()
@@ -0,0 +1,134 @@
+"""ログ設定（サンプリング・レート制限・JSON出力）のテスト"""
+import json
+import logging
+import queue
+
+import pytest
+import structlog
+
+from app import logging_config
+from app.config import settings
+from app.logging_config import (
+    EventSampler,
+    NonBlockingQueueHandler,
+    configure_logging,
+    shutdown_logging,
+)
+
+
+def _emit(sampler: EventSampler, event: str, method: str = "info"):
+    """プロセッサーを通し、捨てられたら None を返す"""
+    try:
+        return sampler(None, method, {"event": event})
+    except structlog.DropEvent:
+        return None
+
+
+@pytest.fixture
+def restore_logging():
+    """テスト後に root ロガーと structlog の設定を元に戻す"""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    config = structlog.get_config()
+    yield
+    shutdown_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+    structlog.configure(**config)
+
+
+def test_sampler_keeps_every_nth_event():
+    """サンプリング対象のイベントは 1/割合 件に1件だけ出力する"""
+    sampler = EventSampler(sample_rates={"scout_skip_duplicate": 0.1})
+
+    kept = [_emit(sampler, "scout_skip_duplicate") for _ in range(30)]
+
+    assert [i for i, event in enumerate(kept) if event is not None] == [0, 10, 20]
+    assert kept[0]["sample_rate"] == 0.1
+
+
+def test_sampler_ignores_other_events_and_warnings():
+    """対象外のイベントと warning 以上のログは間引かない"""
+    sampler = EventSampler(sample_rates={"noisy": 0.0})
+
+    assert _emit(sampler, "noisy") is None
+    assert _emit(sampler, "noisy", method="warning") == {"event": "noisy"}
+    assert _emit(sampler, "other") == {"event": "other"}
+
+
+def test_rate_limit_drops_excess_and_reports_suppressed(monotonic_clock):
+    """上限を超えたログは捨て、次に出力するログに捨てた件数を付ける"""
+    sampler = EventSampler(rate_limits={"priority_judged": 2}, clock=monotonic_clock)
+
+    kept = [_emit(sampler, "priority_judged") for _ in range(5)]
+    assert sum(event is not None for event in kept) == 2
+
+    monotonic_clock.now = 0.5
+    event = _emit(sampler, "priority_judged")
+    assert event == {"event": "priority_judged", "suppressed": 3}
+    assert _emit(sampler, "priority_judged") is None
+
+
+@pytest.mark.parametrize("log_async", [False, True])
+def test_configure_logging_writes_json(
+    restore_logging, monkeypatch, capsys, log_async
+):
+    """structlog・標準ライブラリのログを1行1件のJSONで出力する"""
+    monkeypatch.setattr(settings, "log_async", log_async)
+    monkeypatch.setattr(settings, "log_level", "INFO")
+    monkeypatch.setattr(settings, "log_sample_rates", {"sampled": 0.5})
+    configure_logging()
+
+    logger = structlog.get_logger("test")
+    logger.debug("hidden")
+    logger.info("scout_complete", oshi_id="o1", count=3, name="推し")
+    for _ in range(2):
+        logger.info("sampled")
+    logging.getLogger("uvicorn").warning("foreign %s", "message")
+    shutdown_logging()
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["event"] for line in lines] == [
+        "scout_complete",
+        "sampled",
+        "foreign message",
+    ]
+    assert lines[0]["oshi_id"] == "o1"
+    assert lines[0]["name"] == "推し"
+    assert lines[0]["level"] == "info"
+    assert lines[0]["logger"] == "test"
+    assert "timestamp" in lines[0]
+    assert lines[1]["sample_rate"] == 0.5
+    assert lines[2]["level"] == "warning"
+
+
+def test_shutdown_logging_reports_dropped_records(restore_logging, monkeypatch, capsys):
+    """停止時に捨てた件数を出力し、停止後のログも出力先に直接書き出す"""
+    monkeypatch.setattr(settings, "log_async", True)
+    monkeypatch.setattr(settings, "log_level", "INFO")
+    configure_logging()
+    logging_config._queue_handler.dropped = 2
+
+    structlog.get_logger("test").info("before_shutdown")
+    shutdown_logging()
+    structlog.get_logger("test").info("after_shutdown")
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["event"] for line in lines] == [
+        "before_shutdown",
+        "log_queue_dropped",
+        "after_shutdown",
+    ]
+    assert lines[1]["dropped"] == 2
+
+
+def test_queue_handler_drops_when_full():
+    """キューが満杯ならブロックせずに捨てた件数を数える"""
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "msg", None, None)
+
+    handler.emit(record)
+    handler.emit(record)
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
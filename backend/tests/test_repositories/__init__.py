@@ -0,0 +1 @@
+"""リポジトリテストパッケージ"""
@@ -0,0 +1,38 @@
+"""EventRepositoryのテスト（インメモリFirestoreを使用）"""
+from datetime import datetime
+
+import pytest
+
+from app.models.event import EventCreate
+from app.repositories.event_repository import EventRepository
+from tests.fakes import InMemoryFirestore
+
+
+@pytest.fixture
+def event_repo():
+    """EventRepositoryインスタンス"""
+    return EventRepository(InMemoryFirestore())
+
+
+def test_update_calendar_ids_writes_all_in_batch(event_repo):
+    """複数イベントのカレンダーイベントIDをまとめて更新できる"""
+    events = [
+        event_repo.create(
+            EventCreate(
+                oshi_id="oshi1",
+                title=f"ライブ{i}",
+                start_datetime=datetime(2025, 3, i + 1, 18, 0),
+            )
+        )
+        for i in range(3)
+    ]
+
+    updated = event_repo.update_calendar_ids(
+        {events[0].id: "cal-0", events[2].id: "cal-2"}
+    )
+
+    assert updated == 2
+    stored = event_repo.get_many([event.id for event in events])
+    assert stored[events[0].id].calendar_event_id == "cal-0"
+    assert stored[events[1].id].calendar_event_id is None
+    assert stored[events[2].id].calendar_event_id == "cal-2"
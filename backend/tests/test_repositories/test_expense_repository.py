@@ -0,0 +1,113 @@
+"""ExpenseRepositoryのテスト（インメモリFirestoreを使用）"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.expense import ExpenseCategory, ExpenseCreate
+from app.repositories.expense_repository import ExpenseRepository
+from tests.fakes import InMemoryFirestore
+
+
+@pytest.fixture
+def db():
+    """インメモリFirestore"""
+    return InMemoryFirestore()
+
+
+@pytest.fixture
+def expense_repo(db):
+    """ExpenseRepositoryインスタンス"""
+    return ExpenseRepository(db)
+
+
+def _create(repo, user_id, amount, category, expense_date):
+    return repo.create(
+        user_id,
+        ExpenseCreate(amount=amount, category=category, expense_date=expense_date),
+    )
+
+
+def test_create_maintains_monthly_rollup(expense_repo):
+    """支出作成時にユーザー・月ごとのロールアップが加算される"""
+    _create(expense_repo, "user1", 8000, ExpenseCategory.TICKET, datetime(2025, 1, 5))
+    _create(expense_repo, "user1", 3000, ExpenseCategory.GOODS, datetime(2025, 1, 20))
+    _create(expense_repo, "user1", 2000, ExpenseCategory.GOODS, datetime(2025, 1, 31))
+    _create(expense_repo, "user1", 5000, ExpenseCategory.TICKET, datetime(2025, 2, 1))
+    _create(expense_repo, "user2", 9999, ExpenseCategory.FOOD, datetime(2025, 1, 5))
+
+    rollup = expense_repo.get_monthly_rollup("user1", 2025, 1)
+
+    assert rollup.id == "user1_2025-01"
+    assert rollup.total == 13000
+    assert rollup.count == 3
+    assert rollup.by_category == {"ticket": 8000, "goods": 5000}
+    assert rollup.count_by_category == {"ticket": 1, "goods": 2}
+    assert expense_repo.get_monthly_rollup("user1", 2025, 2).total == 5000
+    assert expense_repo.get_monthly_rollup("user1", 2025, 3) is None
+
+
+def test_rollup_period_uses_utc(expense_repo):
+    """タイムゾーン付きの支出日は get_monthly と同じく UTC の月に集計される"""
+    jst = timezone(timedelta(hours=9))
+    assert ExpenseRepository.rollup_period(datetime(2025, 2, 1, 8, 0, tzinfo=jst)) == (
+        2025,
+        1,
+    )
+    assert ExpenseRepository.rollup_period(datetime(2025, 2, 1, 8, 0)) == (2025, 2)
+
+
+def test_rebuild_rollups_backfills_and_removes_stale(db, expense_repo):
+    """ロールアップ導入前の支出からロールアップを作り直し、古いロールアップは削除する"""
+    # ロールアップを経由せずに書き込まれた既存データ
+    for amount, category, day in [
+        (4000, "ticket", 3),
+        (1500, "goods", 10),
+        (500, "goods", 11),
+    ]:
+        db.collection("expenses").document().set(
+            {
+                "user_id": "user1",
+                "amount": amount,
+                "category": category,
+                "expense_date": datetime(2025, 3, day),
+                "created_at": datetime(2025, 3, day),
+            }
+        )
+    db.collection("expense_rollups").document("user1_2024-12").set(
+        {"user_id": "user1", "year": 2024, "month": 12, "total": 1, "count": 1}
+    )
+
+    assert expense_repo.rebuild_rollups(user_id="user1", dry_run=True) == 1
+    assert expense_repo.get_monthly_rollup("user1", 2025, 3) is None
+
+    assert expense_repo.rebuild_rollups(user_id="user1") == 1
+
+    rollup = expense_repo.get_monthly_rollup("user1", 2025, 3)
+    assert rollup.total == 6000
+    assert rollup.count == 3
+    assert rollup.by_category == {"ticket": 4000, "goods": 2000}
+    assert expense_repo.get_monthly_rollup("user1", 2024, 12) is None
+
+    # 再構築後の作成は増分で反映される
+    _create(expense_repo, "user1", 1000, ExpenseCategory.FOOD, datetime(2025, 3, 20))
+    assert expense_repo.get_monthly_rollup("user1", 2025, 3).total == 7000
+
+
+def test_create_invalidates_cached_advice(expense_repo):
+    """同じ月に支出を作成するとキャッシュ済みのアドバイスが消える"""
+    _create(expense_repo, "user1", 8000, ExpenseCategory.TICKET, datetime(2025, 1, 5))
+    assert expense_repo.save_advice("user1", 2025, 1, "節約しましょう", "digest1")
+    assert expense_repo.get_monthly_rollup("user1", 2025, 1).advice == "節約しましょう"
+
+    _create(expense_repo, "user1", 3000, ExpenseCategory.GOODS, datetime(2025, 1, 6))
+
+    rollup = expense_repo.get_monthly_rollup("user1", 2025, 1)
+    assert rollup.advice is None
+    assert rollup.advice_digest is None
+    assert rollup.total == 11000
+
+
+def test_save_advice_requires_rollup(expense_repo):
+    """ロールアップのない月にはアドバイスを保存しない"""
+    assert not expense_repo.save_advice("user1", 2025, 1, "節約しましょう", "digest1")
+    assert expense_repo.get_monthly_rollup("user1", 2025, 1) is None
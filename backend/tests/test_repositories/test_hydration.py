@@ -0,0 +1,148 @@
+"""読み取り時のモデル組み立て（hydration）のテスト"""
+import types
+from datetime import datetime, timezone
+
+import pytest
+from google.cloud.firestore_v1.base_document import DocumentSnapshot
+from pydantic import ValidationError
+
+from app.models.expense import ExpenseRollupModel
+from app.models.info import CollectedInfoModel, Priority
+from app.models.network_node import NetworkNodeModel, NodeRing, NodeType
+from app.models.trip_plan import TransportInfo, TripPlanModel
+from app.repositories import hydration
+from app.repositories.hydration import hydrate, hydrate_all, hydrate_dict
+
+NOW = datetime(2026, 4, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _info_data(**overrides):
+    data = {
+        "id": "info1",
+        "oshi_id": "oshi1",
+        "title": "ライブ告知",
+        "url": "https://example.com/news/1",
+        "priority": "urgent",
+        "collected_at": NOW,
+        "updated_at": NOW,
+    }
+    data.update(overrides)
+    return data
+
+
+def _snapshot(data):
+    data = dict(data)
+    reference = types.SimpleNamespace(id=data.pop("id"))
+    return DocumentSnapshot(reference, data, True, None, None, None)
+
+
+def test_hydrated_model_equals_validated_model():
+    """Model(**data) と同じモデル（Enum・既定値・設定済みフィールド）になる"""
+    data = _info_data()
+
+    hydrated = hydrate_dict(CollectedInfoModel, dict(data))
+    validated = CollectedInfoModel(**data)
+
+    assert hydrated == validated
+    assert hydrated.priority is Priority.URGENT
+    assert hydrated.snippet is None
+    assert hydrated.model_fields_set == validated.model_fields_set
+    assert hydrated.model_dump(mode="json") == validated.model_dump(mode="json")
+
+
+def test_hydrate_converts_int_enums_and_ignores_unknown_fields():
+    """int の Enum を変換し、モデルにないフィールドは無視する"""
+    node = hydrate_dict(
+        NetworkNodeModel,
+        {
+            "id": "node1",
+            "oshi_id": "oshi1",
+            "name": "メンバーA",
+            "node_type": "member",
+            "ring": 1,
+            "relationship": "同じグループ",
+            "discovered_at": NOW,
+            "legacy_field": "x",
+        },
+    )
+
+    assert node.node_type is NodeType.MEMBER
+    assert node.ring is NodeRing.INNER
+    assert node.search_queries == []
+    assert "legacy_field" not in node.model_dump()
+
+
+def test_hydrate_does_not_share_mutable_defaults():
+    """default_factory の既定値はインスタンスごとに生成する"""
+    data = {"id": "u_2026-04", "user_id": "u", "year": 2026, "month": 4}
+
+    first = hydrate_dict(ExpenseRollupModel, dict(data))
+    second = hydrate_dict(ExpenseRollupModel, dict(data))
+    first.by_category["goods"] = 1000
+
+    assert second.by_category == {}
+
+
+def test_missing_required_field_falls_back_to_validation():
+    """必須フィールドが欠けた古いドキュメントは検証してエラーにする"""
+    data = _info_data()
+    del data["updated_at"]
+
+    with pytest.raises(ValidationError):
+        hydrate_dict(CollectedInfoModel, data)
+
+
+def test_nested_models_are_validated():
+    """入れ子のモデルを持つモデルは検証で組み立てる"""
+    plan = hydrate_dict(
+        TripPlanModel,
+        {
+            "id": "plan1",
+            "user_id": "u",
+            "event_id": "e",
+            "departure": "東京",
+            "destination": "大阪",
+            "transport": {"mode": "train", "distance_km": 500},
+            "accommodation": {"nights": 1},
+            "created_at": NOW,
+            "updated_at": NOW,
+        },
+    )
+
+    assert isinstance(plan.transport, TransportInfo)
+    assert plan.transport.distance_km == 500.0
+
+
+def test_reads_are_validated():
+    """読み取りでも検証する"""
+    with pytest.raises(ValidationError):
+        hydrate_dict(CollectedInfoModel, _info_data(title=""))
+
+
+def test_hydrate_snapshot_does_not_modify_snapshot():
+    """スナップショットのデータをコピーせずに使っても、スナップショット自体は変わらない"""
+    snapshot = _snapshot(_info_data())
+
+    info = hydrate(CollectedInfoModel, snapshot)
+    infos = hydrate_all(CollectedInfoModel, [snapshot, snapshot])
+
+    assert info.id == "info1"
+    assert [i.id for i in infos] == ["info1", "info1"]
+    assert "id" not in snapshot.to_dict()
+    assert snapshot.to_dict()["priority"] == "urgent"
+
+
+def test_snapshot_falls_back_to_to_dict(monkeypatch):
+    """内部データを直接読めないバージョンでは to_dict() を使う"""
+    monkeypatch.setattr(hydration, "_READ_SNAPSHOT_DATA", False)
+    snapshot = _snapshot(_info_data())
+    calls = []
+    original_to_dict = snapshot.to_dict
+    monkeypatch.setattr(
+        snapshot, "to_dict", lambda: calls.append(1) or original_to_dict()
+    )
+
+    info = hydrate(CollectedInfoModel, snapshot)
+
+    assert info.priority is Priority.URGENT
+    assert calls == [1]
@@ -0,0 +1,158 @@
+"""リクエスト単位のアイデンティティマップのテスト（インメモリFirestoreを使用）"""
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.event import EventCreate
+from app.models.info import CollectedInfoCreate, Priority
+from app.models.oshi import OshiCreate
+from app.repositories.event_repository import EventRepository
+from app.repositories.identity_map import (
+    IdentityMapMiddleware,
+    current_identity_map,
+    identity_map_scope,
+)
+from app.repositories.info_repository import InfoRepository
+from app.repositories.oshi_repository import OshiRepository
+from tests.fakes import FakeDocumentReference, InMemoryFirestore
+
+
+@pytest.fixture
+def db():
+    """インメモリFirestore"""
+    return InMemoryFirestore()
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """ドキュメントの読み取り回数（ID → 回数）"""
+    counts: dict[str, int] = {}
+    original_get = FakeDocumentReference.get
+
+    def counting_get(self):
+        counts[self.id] = counts.get(self.id, 0) + 1
+        return original_get(self)
+
+    monkeypatch.setattr(FakeDocumentReference, "get", counting_get)
+    return counts
+
+
+def _create_oshi(db) -> str:
+    """スコープの外で推しを作成してIDを返す"""
+    return OshiRepository(db).create("user1", OshiCreate(name="推し", category="声優")).id
+
+
+def test_get_by_id_reads_once_per_scope(db, reads):
+    """同じスコープ内の別のリポジトリからの読み取りも1回にまとめる"""
+    oshi_id = _create_oshi(db)
+
+    with identity_map_scope():
+        first = OshiRepository(db).get_by_id(oshi_id)
+        second = OshiRepository(db).get_by_id(oshi_id)
+        assert OshiRepository(db).get_by_id("missing") is None
+        assert OshiRepository(db).get_by_id("missing") is None
+
+    assert first is second
+    assert reads == {oshi_id: 1, "missing": 1}
+
+
+def test_reads_without_scope_are_not_cached(db, reads):
+    """リクエストの外ではこれまでどおり毎回読む"""
+    oshi_id = _create_oshi(db)
+
+    OshiRepository(db).get_by_id(oshi_id)
+    OshiRepository(db).get_by_id(oshi_id)
+
+    assert current_identity_map() is None
+    assert reads == {oshi_id: 2}
+
+
+def test_writes_are_visible_in_scope(db, reads):
+    """作成・更新・削除した内容を読み直さずに返す"""
+    repo = OshiRepository(db)
+
+    with identity_map_scope():
+        created = repo.create("user1", OshiCreate(name="推し", category="声優"))
+        assert repo.get_by_id(created.id) is created
+
+        repo.update(created.id, OshiCreate(name="改名", category="声優"))
+        assert repo.get_by_id(created.id).name == "改名"
+
+        assert repo.delete(created.id) is True
+        assert repo.get_by_id(created.id) is None
+        assert repo.delete(created.id) is False
+
+    # 作成・存在確認では読まず、更新後の内容の読み取りだけ
+    assert reads == {created.id: 1}
+
+
+def test_partial_updates_patch_cached_models(db, reads):
+    """部分更新（重要度・カレンダーID）を記録済みのモデルに反映する"""
+    info_repo = InfoRepository(db)
+    event_repo = EventRepository(db)
+
+    with identity_map_scope():
+        info = info_repo.create(
+            CollectedInfoCreate(oshi_id="oshi1", title="告知", url="https://e.com/1")
+        )
+        event = event_repo.create(
+            EventCreate(
+                oshi_id="oshi1", title="ライブ", start_datetime=datetime(2026, 3, 1)
+            )
+        )
+
+        assert info_repo.update_priority(info.id, Priority.URGENT) is True
+        event_repo.update_calendar_ids({event.id: "cal-1"})
+
+        assert info_repo.get_by_id(info.id).priority is Priority.URGENT
+        assert event_repo.get_many([event.id])[event.id].calendar_event_id == "cal-1"
+
+    assert reads == {}
+    assert InfoRepository(db).get_by_id(info.id).priority is Priority.URGENT
+
+
+def test_get_many_reads_only_unknown_ids(db, reads):
+    """get_many は記録済みでないIDだけを読む"""
+    repo = InfoRepository(db)
+    infos = repo.create_batch(
+        [
+            CollectedInfoCreate(
+                oshi_id="oshi1", title=f"告知{i}", url=f"https://e.com/{i}"
+            )
+            for i in range(3)
+        ]
+    )
+    ids = [info.id for info in infos]
+
+    with identity_map_scope():
+        repo.get_by_id(ids[0])
+        found = repo.get_many(ids + ["missing"])
+        again = repo.get_many(ids + ["missing"])
+
+    assert set(found) == set(ids)
+    assert again == found
+    assert reads == {ids[0]: 1, ids[1]: 1, ids[2]: 1, "missing": 1}
+
+
+def test_middleware_shares_map_across_threads_within_request(db, reads):
+    """ミドルウェアはリクエストごとに対応を作り、to_thread 先とも共有する"""
+    oshi_id = _create_oshi(db)
+    repo = OshiRepository(db)
+    app = FastAPI()
+    app.add_middleware(IdentityMapMiddleware)
+
+    @app.get("/oshi")
+    async def get_oshi():
+        first = repo.get_by_id(oshi_id)
+        second = await asyncio.to_thread(repo.get_by_id, oshi_id)
+        return {"same": first is second}
+
+    client = TestClient(app)
+    assert client.get("/oshi").json() == {"same": True}
+    assert client.get("/oshi").json() == {"same": True}
+
+    # リクエストごとに1回
+    assert reads == {oshi_id: 2}
@@ -0,0 +1,36 @@
+"""InfoRepositoryの正規化URLキーのテスト（インメモリFirestoreを使用）"""
+from datetime import datetime
+
+from app.models.info import CollectedInfoCreate
+from app.repositories.info_repository import InfoRepository
+from tests.fakes import InMemoryFirestore
+
+
+def test_find_by_url_matches_backfilled_legacy_infos():
+    """canonical_url の無い既存データはバックフィル後に表記ゆれのURLで見つかる"""
+    repo = InfoRepository(InMemoryFirestore())
+    repo.collection.document("legacy").set(
+        {
+            "oshi_id": "oshi1",
+            "title": "ツアー決定",
+            "url": "https://www.example.com/news/1/",
+            "priority": "normal",
+            "collected_at": datetime(2025, 1, 1),
+            "updated_at": datetime(2025, 1, 1),
+        }
+    )
+    created = repo.create(
+        CollectedInfoCreate(
+            oshi_id="oshi1", title="新曲", url="https://example.com/news/2"
+        )
+    )
+
+    assert repo.find_by_url("oshi1", "https://example.com/news/1?utm_source=x") is None
+    assert repo.backfill_canonical_urls(dry_run=True) == 1
+    assert repo.backfill_canonical_urls() == 1
+    assert repo.backfill_canonical_urls() == 0
+
+    found = repo.find_by_url("oshi1", "https://example.com/news/1?utm_source=x")
+    assert found.id == "legacy"
+    assert repo.find_by_url("oshi1", "https://example.com/news/2/").id == created.id
+    assert repo.find_by_url("oshi2", "https://example.com/news/2") is None
@@ -0,0 +1,115 @@
+"""JobRepositoryのシャード・リースのテスト（インメモリFirestoreを使用）"""
+from datetime import timedelta
+
+import pytest
+
+from app.models.job import JobStatus, JobType
+from app.repositories.job_repository import JobRepository
+from tests.fakes import InMemoryFirestore
+
+
+@pytest.fixture
+def job_repo(clock):
+    """JobRepositoryインスタンス"""
+    return JobRepository(InMemoryFirestore(), clock=clock)
+
+
+@pytest.fixture
+def parent(job_repo):
+    """2シャードの scout-all の親ジョブ"""
+    parent = job_repo.create(JobType.SCOUT_ALL, {"shard_count": 2})
+    job_repo.create_shards(parent.id, 2)
+    return parent
+
+
+def test_create_shards(job_repo, parent):
+    """シャードは番号とシャード数を持つ未実行の子ジョブとして作成する"""
+    shards = job_repo.get_shards(parent.id)
+
+    assert sorted(shard.input_data["shard"] for shard in shards) == [0, 1]
+    assert all(shard.job_type == JobType.SCOUT_SHARD for shard in shards)
+    assert all(shard.status == JobStatus.PENDING for shard in shards)
+    assert all(shard.parent_job_id == parent.id for shard in shards)
+
+
+def test_claim_shard_is_exclusive(job_repo, parent, clock):
+    """リース中のシャードは他のワーカーに渡さない"""
+    first = job_repo.claim_shard(parent.id, "worker-a", 60, 3)
+    second = job_repo.claim_shard(parent.id, "worker-b", 60, 3)
+
+    assert first.id != second.id
+    assert first.status == JobStatus.RUNNING
+    assert first.lease_owner == "worker-a"
+    assert first.lease_expires_at == clock.now + timedelta(seconds=60)
+    assert first.attempts == 1
+    assert job_repo.claim_shard(parent.id, "worker-c", 60, 3) is None
+
+
+def test_expired_lease_is_reclaimed(job_repo, parent, clock):
+    """リースが切れたシャードは他のワーカーが取り直し、元のワーカーは結果を保存できない"""
+    first = job_repo.claim_shard(parent.id, "worker-a", 60, 3)
+    job_repo.claim_shard(parent.id, "worker-a", 60, 3)
+
+    clock.advance(30)
+    assert job_repo.renew_lease(first.id, "worker-a", 60) is True
+    clock.advance(40)
+    # 延長していない方だけがリース切れ
+    reclaimed = job_repo.claim_shard(parent.id, "worker-b", 60, 3)
+    assert reclaimed.id != first.id
+    assert reclaimed.attempts == 2
+
+    clock.advance(30)
+    reclaimed_first = job_repo.claim_shard(parent.id, "worker-b", 60, 3)
+    assert reclaimed_first.id == first.id
+    assert job_repo.renew_lease(first.id, "worker-a", 60) is False
+    assert (
+        job_repo.finish_shard(first.id, "worker-a", JobStatus.COMPLETED, {"n": 1})
+        is False
+    )
+    assert job_repo.finish_shard(first.id, "worker-b", JobStatus.COMPLETED, {"n": 2})
+
+    finished = job_repo.get_by_id(first.id)
+    assert finished.status == JobStatus.COMPLETED
+    assert finished.output_data == {"n": 2}
+    assert finished.lease_owner is None
+
+
+def test_shard_fails_after_max_attempts(job_repo, clock):
+    """リース切れが実行回数の上限に達したシャードは失敗として確定する"""
+    parent = job_repo.create(JobType.SCOUT_ALL, {"shard_count": 1})
+    job_repo.create_shards(parent.id, 1)
+
+    for owner in ("worker-a", "worker-b"):
+        assert job_repo.claim_shard(parent.id, owner, 60, 2) is not None
+        clock.advance(61)
+
+    assert job_repo.claim_shard(parent.id, "worker-c", 60, 2) is None
+    (shard,) = job_repo.get_shards(parent.id)
+    assert shard.status == JobStatus.FAILED
+    assert shard.attempts == 2
+    assert "2 attempts" in shard.error_message
+
+
+def test_released_shard_is_retried_until_max_attempts(job_repo):
+    """失敗したシャードは上限までは未実行に戻り、上限に達したら失敗として確定する"""
+    parent = job_repo.create(JobType.SCOUT_ALL, {"shard_count": 1})
+    job_repo.create_shards(parent.id, 1)
+
+    first = job_repo.claim_shard(parent.id, "worker-a", 60, 2)
+    assert job_repo.release_shard(first.id, "worker-b", 2, "other") is None
+    assert job_repo.release_shard(first.id, "worker-a", 2, "timeout") == (
+        JobStatus.PENDING
+    )
+    pending = job_repo.get_by_id(first.id)
+    assert pending.status == JobStatus.PENDING
+    assert pending.lease_owner is None
+
+    second = job_repo.claim_shard(parent.id, "worker-b", 60, 2)
+    assert second.attempts == 2
+    assert job_repo.release_shard(second.id, "worker-b", 2, "timeout") == (
+        JobStatus.FAILED
+    )
+    failed = job_repo.get_by_id(first.id)
+    assert failed.status == JobStatus.FAILED
+    assert failed.error_message == "timeout"
+    assert job_repo.claim_shard(parent.id, "worker-c", 60, 2) is None
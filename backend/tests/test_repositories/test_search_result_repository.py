@@ -0,0 +1,62 @@
+"""SearchResultRepositoryのテスト（インメモリFirestoreを使用）"""
+import pytest
+
+from app.repositories.search_result_repository import (
+    SEARCH_COMPLETED,
+    SEARCH_RUNNING,
+    SearchResultRepository,
+)
+from tests.fakes import InMemoryFirestore
+
+
+@pytest.fixture
+def repo():
+    """SearchResultRepositoryインスタンス"""
+    return SearchResultRepository(InMemoryFirestore())
+
+
+def test_claim_is_exclusive_until_completed(repo):
+    """検索中のクエリは他のシャードに渡さず、保存後は結果を返す"""
+    claimed, _ = repo.claim("job1", "推し 最新情報", 10, "shard-a", 60)
+    assert claimed
+
+    claimed, entry = repo.claim("job1", "推し 最新情報", 10, "shard-b", 60)
+    assert not claimed
+    assert entry["status"] == SEARCH_RUNNING
+    assert entry["owner"] == "shard-a"
+
+    repo.complete("job1", "推し 最新情報", 10, "shard-a", [{"link": "x"}], 3600)
+    claimed, entry = repo.claim("job1", "推し 最新情報", 10, "shard-b", 60)
+    assert not claimed
+    assert entry["status"] == SEARCH_COMPLETED
+    assert entry["results"] == [{"link": "x"}]
+
+    # 別の実行・取得件数のクエリは別の結果
+    assert repo.claim("job2", "推し 最新情報", 10, "shard-b", 60)[0]
+    assert repo.claim("job1", "推し 最新情報", 5, "shard-b", 60)[0]
+
+
+def test_expired_or_abandoned_lease_is_reclaimed(repo):
+    """リースが切れた・手放された検索は他のシャードが取り直す"""
+    assert repo.claim("job1", "推し ライブ", 10, "shard-a", 0)[0]
+    assert repo.claim("job1", "推し ライブ", 10, "shard-b", 60)[0]
+
+    assert not repo.abandon("job1", "推し ライブ", 10, "shard-a")
+    assert repo.abandon("job1", "推し ライブ", 10, "shard-b")
+    assert repo.claim("job1", "推し ライブ", 10, "shard-c", 60)[0]
+
+
+def test_renew_extends_only_own_running_lease(repo):
+    """検索中のリースはリースを持つシャードだけが延長でき、保存後は延長しない"""
+    assert repo.claim("job1", "推し ライブ", 10, "shard-a", 0)[0]
+    entry = repo.get("job1", "推し ライブ", 10)
+    assert repo.lease_expired(entry)
+
+    assert not repo.renew("job1", "推し ライブ", 10, "shard-b", 60)
+    assert repo.renew("job1", "推し ライブ", 10, "shard-a", 60)
+    assert not repo.lease_expired(repo.get("job1", "推し ライブ", 10))
+    assert not repo.claim("job1", "推し ライブ", 10, "shard-b", 60)[0]
+
+    repo.complete("job1", "推し ライブ", 10, "shard-a", [], 3600)
+    assert not repo.renew("job1", "推し ライブ", 10, "shard-a", 60)
+    assert repo.get("job1", "推し ネット", 10) is None
@@ -0,0 +1,77 @@
+"""TripAdviceCacheRepositoryのテスト（インメモリFirestoreを使用）"""
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.repositories.trip_advice_cache_repository import TripAdviceCacheRepository
+from app.utils.cache_stats import reset_cache_stats
+from tests.clock import FakeClock
+from tests.fakes import InMemoryFirestore
+
+
+@pytest.fixture(autouse=True)
+def _reset_stats():
+    """テストごとにヒット率の集計をリセット"""
+    reset_cache_stats()
+    yield
+    reset_cache_stats()
+
+
+@pytest.fixture
+def db():
+    """インメモリFirestore"""
+    return InMemoryFirestore()
+
+
+@pytest.fixture
+def clock():
+    """テスト用の時計（2025-03-01 12:00 から）"""
+    return FakeClock(datetime(2025, 3, 1, 12, 0))
+
+
+@pytest.fixture
+def cache_repo(db, clock):
+    """TripAdviceCacheRepositoryインスタンス（TTL 1時間）"""
+    return TripAdviceCacheRepository(db, ttl_seconds=3600, clock=clock)
+
+
+def test_cache_key_normalizes_destination_and_area():
+    """会場・地域の表記ゆれは同じキーになり、開催日が違えば別のキーになる"""
+    key = TripAdviceCacheRepository.cache_key("日本武道館", date(2025, 3, 1), "東京都")
+    assert key == TripAdviceCacheRepository.cache_key(
+        "日本 武道館", date(2025, 3, 1), "東京都"
+    )
+    assert key != TripAdviceCacheRepository.cache_key(
+        "日本武道館", date(2025, 3, 2), "東京都"
+    )
+    assert key != TripAdviceCacheRepository.cache_key(
+        "日本武道館", date(2025, 3, 1), "大阪府"
+    )
+
+
+def test_get_respects_ttl_and_records_hit_rate(db, clock, cache_repo):
+    """TTLを過ぎたアドバイスはTTLポリシーによる削除前でもミスとして扱う"""
+    cache_repo.put("key1", "早めに会場入りしましょう")
+
+    stored = db.collection("trip_advice_cache").document("key1").get().to_dict()
+    assert stored["expires_at"] == clock.now + timedelta(hours=1)
+
+    assert cache_repo.get("key1") == "早めに会場入りしましょう"
+    assert cache_repo.get("missing") is None
+
+    clock.now += timedelta(hours=1)
+    assert cache_repo.get("key1") is None
+
+    assert cache_repo.stats.snapshot() == {"hits": 1, "misses": 2, "hit_rate": 0.3333}
+
+
+def test_get_many_accepts_timezone_aware_expiry(db, clock, cache_repo):
+    """Firestoreから読んだタイムゾーン付きの expires_at とも比較できる"""
+    db.collection("trip_advice_cache").document("key1").set(
+        {
+            "advice": "アドバイス",
+            "expires_at": datetime(2025, 3, 1, 13, 0, tzinfo=timezone.utc),
+        }
+    )
+
+    assert cache_repo.get_many(["key1", "key1"]) == {"key1": "アドバイス"}
@@ -1,4 +1,7 @@
 """ヘルスチェックエンドポイントのテスト"""
+import threading
+import time
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -40,3 +43,62 @@ def test_ヘルスチェックのHTTPメソッド():
     # DELETEは失敗
     response = client.delete("/health")
     assert response.status_code == 405
+
+
+def test_キャッシュのヒット率():
+    """キャッシュごとのヒット率を返す"""
+    from app.utils.cache_stats import get_cache_stats, reset_cache_stats
+
+    reset_cache_stats()
+    stats = get_cache_stats("trip_advice_cache")
+    stats.record_hit(3)
+    stats.record_miss()
+
+    response = client.get("/health/caches")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "caches": {"trip_advice_cache": {"hits": 3, "misses": 1, "hit_rate": 0.75}}
+    }
+    reset_cache_stats()
+
+
+def test_ウォームアップ完了まではレディネスが503(monkeypatch):
+    """起動はウォームアップを待たず、バックグラウンドで完了するまでは503を返す"""
+    from app import warmup
+    from app.config import settings
+
+    warmup.reset_warmup_state()
+    calls = []
+    release = threading.Event()
+
+    def step(probe):
+        calls.append(probe)
+        release.wait(timeout=5)
+
+    monkeypatch.setattr(settings, "warmup_enabled", True)
+    monkeypatch.setattr(settings, "warmup_probe", False)
+    monkeypatch.setattr(warmup, "WARMUP_STEPS", {"firestore": step})
+    try:
+        with TestClient(app) as started_client:
+            assert started_client.get("/health").status_code == 200
+            response = started_client.get("/ready")
+            assert response.status_code == 503
+            assert response.json()["status"] == "warming_up"
+
+            release.set()
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                response = started_client.get("/ready")
+                if response.status_code == 200:
+                    break
+                time.sleep(0.01)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert data["warmup"]["steps"]["firestore"]["status"] == "ok"
+        assert calls == [False]
+    finally:
+        release.set()
+        warmup.reset_warmup_state()
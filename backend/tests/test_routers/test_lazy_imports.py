@@ -0,0 +1,14 @@
+"""起動時の遅延ロードのテスト"""
+from benchmarks.import_profile import LAZY_MODULES, measure_first_request
+
+
+def test_app_startup_does_not_load_heavy_sdks():
+    """本番と同じ設定で app.main を読み込んでも重いSDKを読み込まない
+
+    ウォームアップは起動をブロックせず、受け付け開始後にバックグラウンドで読み込む。
+    """
+    result = measure_first_request()
+
+    assert result["loaded_lazy_modules"] == [], (
+        f"app.main の読み込みで読み込まれた: {result['loaded_lazy_modules']}（対象: {LAZY_MODULES}）"
+    )
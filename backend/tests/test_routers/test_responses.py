@@ -0,0 +1,94 @@
+"""大きなレスポンスのJSON出力・gzip圧縮のテスト"""
+import json
+from datetime import datetime
+from enum import Enum
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi.testclient import TestClient
+
+from app.agents.root_agent import RootAgent
+from app.agents.scout_coordinator import ScoutCoordinator
+from app.config import settings
+from app.dependencies import get_root_agent, get_scout_coordinator
+from app.main import app
+from app.models.workflow_results import ScoutWorkflowResult
+from app.routers.responses import FastJSONResponse, dumps
+
+
+class Color(str, Enum):
+    RED = "red"
+
+
+def _scout_result(index: int) -> ScoutWorkflowResult:
+    info_ids = [f"info-{index}-{i}" for i in range(20)]
+    return ScoutWorkflowResult(
+        oshi_id=f"oshi-{index}",
+        oshi_name=f"推し{index}",
+        collected_count=len(info_ids),
+        new_info_ids=info_ids,
+        priority_results={info_id: "normal" for info_id in info_ids},
+    )
+
+
+def test_dumps_nested_models_and_native_types():
+    """辞書の中の Pydantic モデル・日時・Enum・数値キーを書き出せる"""
+    body = dumps(
+        {
+            "results": [_scout_result(0)],
+            "at": datetime(2026, 1, 2, 3, 4, 5),
+            "color": Color.RED,
+            "counts": {1: 2},
+        }
+    )
+
+    data = json.loads(body)
+    assert data["results"][0]["oshi_id"] == "oshi-0"
+    assert data["results"][0]["new_event_ids"] == []
+    assert data["at"] == "2026-01-02T03:04:05"
+    assert data["color"] == "red"
+    assert data["counts"] == {"1": 2}
+
+
+def test_model_body_matches_default_json_response():
+    """モデルの出力は FastAPI 標準の JSONResponse と同じバイト列になる"""
+    from fastapi.responses import JSONResponse
+
+    result = _scout_result(1)
+
+    assert (
+        FastJSONResponse(result).body
+        == JSONResponse(result.model_dump(mode="json")).body
+    )
+
+
+def test_scout_all_response_is_gzipped_when_accepted():
+    """大きなレスポンスは Accept-Encoding: gzip のクライアントにだけ圧縮して返す"""
+    root_agent = MagicMock(spec=RootAgent)
+    payload = {
+        "total_oshis": 50,
+        "success_count": 50,
+        "error_count": 0,
+        "results": [_scout_result(i) for i in range(50)],
+    }
+    root_agent.run_all_scouts = AsyncMock(return_value=payload)
+    app.dependency_overrides[get_root_agent] = lambda: root_agent
+    app.dependency_overrides[get_scout_coordinator] = lambda: MagicMock(
+        spec=ScoutCoordinator
+    )
+    client = TestClient(app)
+    headers = {"X-Internal-Api-Key": settings.internal_api_key}
+    try:
+        compressed = client.post(
+            "/agent/scout-all", headers={**headers, "Accept-Encoding": "gzip"}
+        )
+        plain = client.post(
+            "/agent/scout-all", headers={**headers, "Accept-Encoding": "identity"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert compressed.status_code == 200
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in plain.headers
+    assert compressed.json() == plain.json()
+    assert plain.json()["results"][49]["oshi_id"] == "oshi-49"
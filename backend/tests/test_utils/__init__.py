@@ -0,0 +1 @@
+"""ユーティリティテストパッケージ"""
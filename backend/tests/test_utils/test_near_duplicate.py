@@ -0,0 +1,46 @@
+"""近似重複検出のテスト"""
+from app.utils.near_duplicate import (
+    NearDuplicateIndex,
+    cluster_near_duplicates,
+    jaccard,
+    shingles,
+)
+
+
+def test_same_announcement_from_different_sites_is_clustered():
+    """公式・ニュース・ブログの同じ告知は1クラスタになる"""
+    items = [
+        ("official", "XXX ライブツアー2025 チケット先行受付開始 ファンクラブ会員限定の最速先行は1月10日まで"),
+        ("news", "【速報】XXX、ライブツアー2025のチケット先行受付を開始 ファンクラブ会員限定の最速先行は1月10日まで - ナタリー"),
+        ("blog", "ＸＸＸ ライブツアー2025 チケット先行受付開始！！ ファンクラブ会員限定の最速先行は1月10日まで"),
+    ]
+
+    assert cluster_near_duplicates(items) == [["official", "news", "blog"]]
+
+
+def test_different_announcements_of_same_tour_are_kept_apart():
+    """同じツアーでも先行受付と一般発売・追加公演は別クラスタ"""
+    items = [
+        ("presale", "XXX ライブツアー2025 チケット先行受付開始 1月10日まで"),
+        ("general", "XXX ライブツアー2025 チケット一般発売 4月1日から"),
+        ("extra", "XXX ライブツアー2025 追加公演決定"),
+    ]
+
+    assert cluster_near_duplicates(items) == [["presale"], ["general"], ["extra"]]
+
+
+def test_index_returns_most_similar_key():
+    """インデックスは閾値以上で最も類似度が高いキーを返す"""
+    index = NearDuplicateIndex(threshold=0.6)
+    index.add("tour", "ライブツアー2025 チケット先行受付開始")
+    index.add("song", "新曲MV公開 3rdシングル")
+
+    assert index.find("【速報】ライブツアー2025 チケット先行受付開始") == "tour"
+    assert index.find("グッズ通販サイトリニューアル") is None
+    assert len(index) == 2
+
+
+def test_shingles_normalize_width_and_symbols():
+    """全角・半角や記号の違いは特徴量に影響しない"""
+    assert shingles("ＬＩＶＥ　２０２５！") == shingles("live2025")
+    assert jaccard(shingles("ライブ"), shingles("ライブ")) == 1.0
@@ -0,0 +1,40 @@
+"""出発地の地域判定のテスト"""
+import pytest
+
+from app.utils.region_utils import departure_region
+
+
+@pytest.mark.parametrize(
+    "departure, expected",
+    [
+        ("東京都港区六本木", "東京都"),
+        ("東京", "東京都"),
+        ("東京駅", "東京都"),
+        ("京都駅", "京都府"),
+        ("大阪", "大阪府"),
+        ("神奈川県横浜市", "神奈川県"),
+        ("横浜駅", "神奈川県"),
+        ("新宿駅西口", "東京都"),
+        ("名古屋", "愛知県"),
+        ("北海道札幌市", "北海道"),
+        ("札幌", "北海道"),
+        ("博多駅", "福岡県"),
+        ("ＪＲ仙台駅", "宮城県"),
+        ("和歌山市", "和歌山県"),
+    ],
+)
+def test_departure_region(departure, expected):
+    """都道府県名・接尾辞なしの表記・主要都市名から都道府県を判定できる"""
+    assert departure_region(departure) == expected
+
+
+def test_departure_region_prefers_full_prefecture_name():
+    """都道府県名が含まれていれば、都市名より都道府県名を優先する"""
+    # 「東京都」に含まれる「京都」や、後ろに続く他県の都市名に引きずられない
+    assert departure_region("東京都在住（実家は名古屋）") == "東京都"
+
+
+def test_departure_region_unknown():
+    """判定できない出発地はNone"""
+    assert departure_region("Tokyo Station") is None
+    assert departure_region("自宅") is None
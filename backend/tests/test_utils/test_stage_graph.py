@@ -0,0 +1,71 @@
+"""StageGraphのテスト"""
+import asyncio
+
+import pytest
+
+from app.utils.stage_graph import StageGraph
+
+
+@pytest.mark.asyncio
+async def test_independent_stages_run_concurrently():
+    """依存関係のないステージは並行に実行される"""
+    graph = StageGraph()
+
+    async def sleeper(value):
+        await asyncio.sleep(0.05)
+        return value
+
+    graph.add("a", lambda: sleeper(1))
+    graph.add("b", lambda: sleeper(2))
+    graph.add("c", lambda a, b: sleeper(a + b), ["a", "b"])
+
+    results = await graph.run()
+
+    assert results == {"a": 1, "b": 2, "c": 3}
+    # a と b が直列なら 150ms 以上かかる
+    assert graph.report()["total_ms"] < 140
+    assert graph.timings["c"].started_at >= graph.timings["a"].finished_at
+
+
+@pytest.mark.asyncio
+async def test_critical_path_follows_slowest_dependency():
+    """クリティカルパスは最も遅く終わった依存先を辿る"""
+    graph = StageGraph()
+    graph.add("fast", lambda: asyncio.sleep(0.01))
+    graph.add("slow", lambda: asyncio.sleep(0.05))
+    graph.add("join", lambda fast, slow: asyncio.sleep(0), ["fast", "slow"])
+
+    await graph.run()
+
+    assert graph.critical_path() == ["slow", "join"]
+    report = graph.report()
+    assert report["stages"]["slow"]["critical"] is True
+    assert report["stages"]["fast"]["critical"] is False
+
+
+@pytest.mark.asyncio
+async def test_failure_cancels_remaining_stages():
+    """ステージの失敗は呼び出し元に伝播し、未完了のステージはキャンセルされる"""
+    graph = StageGraph()
+    finished = []
+
+    async def boom():
+        raise RuntimeError("boom")
+
+    async def long_running():
+        await asyncio.sleep(1)
+        finished.append("long")
+
+    graph.add("boom", boom)
+    graph.add("long", long_running)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await graph.run()
+    assert finished == []
+
+
+def test_unknown_dependency_is_rejected():
+    """未定義のステージへの依存はエラー"""
+    graph = StageGraph()
+    with pytest.raises(ValueError, match="Unknown dependency"):
+        graph.add("b", lambda a: asyncio.sleep(0), ["a"])
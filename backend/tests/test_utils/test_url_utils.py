@@ -0,0 +1,143 @@
+"""URL正規化のテスト"""
+import pytest
+
+from app.utils.url_utils import canonicalize_url
+
+# 実際の検索結果で見られる表記ゆれのコーパス（ページごとにグループ化）
+URL_CORPUS: dict[str, list[str]] = {
+    "official_news": [
+        "https://www.oshi-official.jp/news/2025/0110/",
+        "https://www.oshi-official.jp/news/2025/0110",
+        "https://oshi-official.jp/news/2025/0110/",
+        "https://www.oshi-official.jp/news/2025/0110/?utm_source=twitter&utm_medium=social",
+        "https://www.oshi-official.jp/news/2025/0110/#ticket",
+        "https://WWW.OSHI-OFFICIAL.JP/news/2025/0110/index.html",
+    ],
+    "news_article": [
+        "https://natalie.example.com/music/news/601234",
+        "https://natalie.example.com/music/news/601234?fbclid=IwAR0abc",
+        "https://natalie.example.com/music/news/601234/",
+        "https://natalie.example.com/music/news/601234?gclid=xyz&utm_campaign=tour",
+    ],
+    # AMP版・http のURLが同じページを指すことが分かっているホスト
+    "yahoo_news": [
+        "https://news.yahoo.co.jp/articles/0123abcd",
+        "https://news.yahoo.co.jp/amp/articles/0123abcd",
+        "http://news.yahoo.co.jp/articles/0123abcd?utm_source=line",
+    ],
+    "news_article_page2": [
+        "https://natalie.example.com/music/news/601234?page=2",
+        "https://natalie.example.com/music/news/601234?utm_source=x&page=2",
+    ],
+    "video": [
+        "https://www.youtube.com/watch?v=abcDEF123",
+        "https://m.youtube.com/watch?v=abcDEF123&feature=share",
+        "https://youtube.com/watch?feature=youtu.be&v=abcDEF123",
+    ],
+    "other_video": [
+        "https://www.youtube.com/watch?v=zzzZZZ999",
+    ],
+    "tweet": [
+        "https://x.com/oshi_staff/status/1870000000000000000",
+        "https://x.com/oshi_staff/status/1870000000000000000?s=20",
+        "https://x.com/oshi_staff/status/1870000000000000000?s=46&t=AbCdEf",
+    ],
+    "blog_ja": [
+        "https://ameblo.jp/oshi-blog/entry-12880000000.html",
+        "https://sp.ameblo.jp/oshi-blog/entry-12880000000.html",
+        "https://ameblo.jp/oshi-blog/entry-12880000000.html?frm=theme",
+    ],
+    "wiki": [
+        "https://ja.wikipedia.org/wiki/%E6%8E%A8%E3%81%97",
+        "https://ja.wikipedia.org/wiki/%e6%8e%a8%e3%81%97",
+        "https://ja.wikipedia.org/wiki/推し",
+    ],
+    "search_page": [
+        "https://shop.example.jp/search?s=グッズ",
+    ],
+}
+
+
+# 表記が似ていても別ページのURLの組（同じキーに潰すと新着情報を取りこぼす）
+DISTINCT_URL_PAIRS = [
+    ("https://www.docomo.ne.jp/mobile/", "https://www.docomo.ne.jp/"),
+    ("https://example.com/sp/schedule", "https://example.com/schedule"),
+    ("https://example.com/mobile/news/1", "https://example.com/news/1"),
+    (
+        "https://shop.example.com/item?ref=A123",
+        "https://shop.example.com/item?ref=B456",
+    ),
+    ("https://example.com/report?output=pdf", "https://example.com/report?output=csv"),
+    ("https://example.com/player?si=2", "https://example.com/player?si=3"),
+    ("https://example.com/list?feature=new", "https://example.com/list?feature=top"),
+    ("https://example.com/article?amp=1", "https://example.com/article?amp=0"),
+    ("https://sp.example.com/news/1", "https://example.com/news/1"),
+    # 既知のホスト以外では m. / amp. / /amp / http を同一視しない
+    ("https://m.example.com/news/1", "https://example.com/news/1"),
+    ("https://amp.example.com/news/1", "https://example.com/news/1"),
+    ("https://example.com/amp/news/1", "https://example.com/news/1"),
+    ("https://example.com/news/1/amp", "https://example.com/news/1"),
+    ("http://example.com/news/1", "https://example.com/news/1"),
+]
+
+
+def test_corpus_dedup_improves_hit_rate():
+    """コーパス全体で、正規化キーによる重複排除が生URLより多くの重複を検出する"""
+    all_urls = [url for urls in URL_CORPUS.values() for url in urls]
+
+    raw_unique = len(set(all_urls))
+    canonical_unique = len({canonicalize_url(url) for url in all_urls})
+
+    # 生URLではほぼ全件が別物扱いになる
+    assert raw_unique == len(all_urls) == 29
+    # 正規化後は「ameblo の frm パラメータ」以外の表記ゆれが吸収される
+    assert canonical_unique == len(URL_CORPUS) + 1 == 11
+
+    raw_hit_rate = 1 - raw_unique / len(all_urls)
+    canonical_hit_rate = 1 - canonical_unique / len(all_urls)
+    assert raw_hit_rate == 0
+    assert canonical_hit_rate > 0.6
+
+
+@pytest.mark.parametrize("page, urls", URL_CORPUS.items())
+def test_distinct_pages_are_not_merged(page, urls):
+    """別ページのURLが同じキーに潰れない"""
+    own_key = canonicalize_url(urls[0])
+    for other_page, other_urls in URL_CORPUS.items():
+        if other_page == page:
+            continue
+        assert own_key not in {canonicalize_url(url) for url in other_urls}
+
+
+@pytest.mark.parametrize("url, other", DISTINCT_URL_PAIRS)
+def test_similar_urls_of_distinct_pages_are_not_merged(url, other):
+    """汎用的な名前のパラメータや、既知のホスト以外のモバイル版・AMP版の表記では
+    別ページを同一視しない"""
+    assert canonicalize_url(url) != canonicalize_url(other)
+
+
+def test_host_specific_params_are_removed_only_on_that_host():
+    """ref・si などの共有用パラメータは既知のホストでだけ除去する"""
+    assert canonicalize_url(
+        "https://www.amazon.co.jp/dp/B0ABC?ref=sr_1_1"
+    ) == canonicalize_url("https://amazon.co.jp/dp/B0ABC")
+    assert canonicalize_url("https://youtu.be/abcDEF123?si=XyZ") == "youtu.be/abcDEF123"
+    assert canonicalize_url(
+        "https://x.com/oshi_staff?ref_src=twsrc"
+    ) == canonicalize_url("https://x.com/oshi_staff")
+
+
+def test_meaningful_query_parameters_are_kept():
+    """ページを区別するクエリパラメータは保持され、順序は正規化される"""
+    assert canonicalize_url("https://example.com/list?b=2&a=1") == canonicalize_url(
+        "https://example.com/list?a=1&b=2&utm_content=x"
+    )
+    assert canonicalize_url("https://example.com/list?a=1") != canonicalize_url(
+        "https://example.com/list?a=2"
+    )
+
+
+def test_unparseable_input_is_returned_as_is():
+    """URLとして解釈できない文字列は前後の空白だけ除去して返す"""
+    assert canonicalize_url("  http://[::1/  ") == "http://[::1/"
+    assert canonicalize_url("") == ""
@@ -0,0 +1,76 @@
+"""起動時のウォームアップのテスト"""
+import time
+
+import pytest
+
+from app import warmup
+from app.warmup import get_warmup_state, reset_warmup_state, warm_up
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    """テストごとにウォームアップ状態を初期化"""
+    reset_warmup_state()
+    yield
+    reset_warmup_state()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_runs_all_steps_and_marks_ready(monkeypatch):
+    """全ステップを probe の指定付きで実行し、完了後に ready になる"""
+    calls = []
+    monkeypatch.setattr(
+        warmup,
+        "WARMUP_STEPS",
+        {
+            "firestore": lambda probe: calls.append(("firestore", probe)),
+            "gemini": lambda probe: calls.append(("gemini", probe)),
+        },
+    )
+
+    assert get_warmup_state().ready is False
+    result = await warm_up(probe=True, timeout_seconds=5)
+
+    assert sorted(calls) == [("firestore", True), ("gemini", True)]
+    assert result["ready"] is True
+    assert {name: step["status"] for name, step in result["steps"].items()} == {
+        "firestore": "ok",
+        "gemini": "ok",
+    }
+
+
+@pytest.mark.asyncio
+async def test_warm_up_continues_when_step_fails(monkeypatch):
+    """失敗したステップがあっても他のステップを実行し、ready にする"""
+
+    def failing(probe):
+        raise ConnectionError("firestore down")
+
+    monkeypatch.setattr(
+        warmup,
+        "WARMUP_STEPS",
+        {"firestore": failing, "google_maps": lambda probe: None},
+    )
+
+    result = await warm_up(probe=False, timeout_seconds=5)
+
+    assert result["ready"] is True
+    assert result["steps"]["firestore"]["status"] == "failed"
+    assert result["steps"]["firestore"]["error"] == "firestore down"
+    assert result["steps"]["google_maps"]["status"] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_warm_up_timeout_marks_pending_steps(monkeypatch):
+    """上限時間を超えたステップは timeout として記録し、ready にする"""
+    monkeypatch.setattr(
+        warmup,
+        "WARMUP_STEPS",
+        {"gemini": lambda probe: time.sleep(0.5), "google_maps": lambda probe: None},
+    )
+
+    result = await warm_up(probe=False, timeout_seconds=0.05)
+
+    assert result["ready"] is True
+    assert result["steps"]["gemini"]["status"] == "timeout"
+    assert result["steps"]["google_maps"]["status"] == "ok"